@@ -1,13 +1,6 @@
-import { Pool } from 'pg';
 import jwt from 'jsonwebtoken';
 import { serialize } from 'cookie';
-
-const pool = new Pool({
-  connectionString: process.env.POSTGRES_URL,
-  ssl: {
-    rejectUnauthorized: false,
-  },
-});
+import { withTransaction } from '../db.js';
 
 // IMPORTANT: Use a strong, securely stored secret for JWT signing in production.
 const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
@@ -24,31 +17,39 @@ export default async function handler(req, res) {
   }
 
   try {
-    const client = await pool.connect();
-    const userResult = await client.query(
-      'SELECT id, uuid, name, email, otp, otp_expires_at FROM users WHERE email = $1',
-      [email]
-    );
+    // The row is locked between the check and the clear, so an OTP can only be used once.
+    const outcome = await withTransaction(async (tx) => {
+      const userResult = await tx.query({
+        name: 'auth_login_user',
+        text: 'SELECT id, uuid, name, email, otp, otp_expires_at FROM users WHERE email = $1 FOR UPDATE',
+      }, [email]);
 
-    if (userResult.rowCount === 0) {
-      client.release();
-      return res.status(404).json({ message: 'User not found' });
-    }
+      if (userResult.rowCount === 0) {
+        return { status: 404 };
+      }
+
+      const user = userResult.rows[0];
+      const now = new Date();
 
-    const user = userResult.rows[0];
-    const now = new Date();
+      if (user.otp !== otp || (user.otp_expires_at && new Date(user.otp_expires_at) < now)) {
+        return { status: 401 };
+      }
 
-    if (user.otp !== otp || (user.otp_expires_at && new Date(user.otp_expires_at) < now)) {
-      client.release();
+      // OTP is valid, clear it from the database
+      await tx.query({
+        name: 'auth_clear_otp',
+        text: 'UPDATE users SET otp = NULL, otp_expires_at = NULL WHERE id = $1',
+      }, [user.id]);
+      return { user };
+    }, { label: 'auth/login' });
+
+    if (outcome.status === 404) {
+      return res.status(404).json({ message: 'User not found' });
+    }
+    if (outcome.status === 401) {
       return res.status(401).json({ message: 'Invalid or expired OTP' });
     }
-
-    // OTP is valid, clear it from the database
-    await client.query(
-      'UPDATE users SET otp = NULL, otp_expires_at = NULL WHERE id = $1',
-      [user.id]
-    );
-    client.release();
+    const { user } = outcome;
 
     // Create JWT
     const token = jwt.sign(
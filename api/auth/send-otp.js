@@ -1,12 +1,10 @@
-import { Pool } from 'pg';
 import nodemailer from 'nodemailer';
+import { prepared } from '../db.js';
 
-const pool = new Pool({
-  connectionString: process.env.POSTGRES_URL,
-  ssl: {
-    rejectUnauthorized: false,
-  },
-});
+const setOtp = prepared(
+  'auth_set_otp',
+  'UPDATE users SET otp = $1, otp_expires_at = $2 WHERE email = $3 RETURNING id'
+);
 
 const transporter = nodemailer.createTransport({
   host: process.env.EMAIL_HOST,
@@ -33,12 +31,7 @@ export default async function handler(req, res) {
     const otp = Math.floor(100000 + Math.random() * 900000).toString();
     const otpExpiresAt = new Date(Date.now() + 10 * 60 * 1000); // 10 minutes from now
 
-    const client = await pool.connect();
-    const result = await client.query(
-      'UPDATE users SET otp = $1, otp_expires_at = $2 WHERE email = $3 RETURNING id',
-      [otp, otpExpiresAt, email]
-    );
-    client.release();
+    const result = await setOtp([otp, otpExpiresAt, email]);
 
     if (result.rowCount === 0) {
       // The user does not exist. Return a 404 error.
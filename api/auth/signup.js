@@ -1,11 +1,9 @@
-import { Pool } from 'pg';
+import { prepared } from '../db.js';
 
-const pool = new Pool({
-  connectionString: process.env.POSTGRES_URL,
-  ssl: {
-    rejectUnauthorized: false,
-  },
-});
+const insertUser = prepared(
+  'auth_insert_user',
+  'INSERT INTO users (name, email) VALUES ($1, $2) RETURNING id, name, email, created_at'
+);
 
 export default async function handler(req, res) {
   if (req.method !== 'POST') {
@@ -19,13 +17,8 @@ export default async function handler(req, res) {
   }
 
   try {
-    const client = await pool.connect();
     // The user is created without a password, assuming a passwordless/OTP flow.
-    const result = await client.query(
-      'INSERT INTO users (name, email) VALUES ($1, $2) RETURNING id, name, email, created_at',
-      [name, email]
-    );
-    client.release();
+    const result = await insertUser([name, email]);
     res.status(201).json(result.rows[0]);
   } catch (error) {
     console.error(error);
@@ -1,20 +1,9 @@
-import jwt from 'jsonwebtoken';
-import cookie from 'cookie';
+import { withAuth } from './middleware/auth.js';
 import { query } from './db.js';
 
-const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
-
-export default async function handler(req, res) {
+async function handler(req, res) {
   try {
-    const cookies = cookie.parse(req.headers.cookie || '');
-    const token = cookies.auth_token;
-
-    if (!token) {
-      return res.status(401).json({ message: 'Not authenticated' });
-    }
-
-    const decoded = jwt.verify(token, JWT_SECRET);
-    const userUuid = decoded.sub; // Use the 'sub' claim for the user's UUID.
+    const userUuid = req.user.sub; // Use the 'sub' claim for the user's UUID.
 
     if (!userUuid) {
       return res.status(401).json({ message: 'Invalid token: user UUID not found.' });
@@ -44,9 +33,8 @@ export default async function handler(req, res) {
     }
   } catch (error) {
     console.error('Briefing template endpoint error:', error);
-    if (error.name === 'JsonWebTokenError' || error.name === 'TokenExpiredError') {
-      return res.status(401).json({ message: 'Not authenticated' });
-    }
     res.status(500).json({ message: 'Internal Server Error' });
   }
-}
\ No newline at end of file
+}
+
+export default withAuth(handler);
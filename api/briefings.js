@@ -1,21 +1,11 @@
-import jwt from 'jsonwebtoken';
-import cookie from 'cookie';
+import { withAuth } from './middleware/auth.js';
 import { query } from './db.js';
+import { collectionEtag, respondNotModified, readChanges } from './utils/sync.js';
 
-const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
-
-export default async function handler(req, res) {
+async function handler(req, res) {
   try {
-    const cookies = cookie.parse(req.headers.cookie || '');
-    const token = cookies.auth_token;
-
-    if (!token) {
-      return res.status(401).json({ message: 'Not authenticated' });
-    }
-
-    const decoded = jwt.verify(token, JWT_SECRET);
     // O 'sub' (subject) do JWT é o UUID do usuário, que corresponde a 'auth.users(id)'.
-    const userUuid = decoded.sub;
+    const userUuid = req.user.sub;
 
     if (!userUuid) {
       return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
@@ -24,6 +14,15 @@ export default async function handler(req, res) {
     // A busca extra na tabela 'users' foi removida pois era incorreta e desnecessária.
 
     if (req.method === 'GET') {
+      const params = req.query || {};
+      // ?sync=1 -> rows changed since params.since plus deletions (api/utils/sync.js).
+      const variant = params.sync ? 'sync' : 'list';
+      if (!params.cursor && respondNotModified(req, res, await collectionEtag('briefings', userUuid, variant))) {
+        return;
+      }
+      if (params.sync) {
+        return res.status(200).json(await readChanges({ table: 'briefings', columns: '*', userUuid, params }));
+      }
       const { rows } = await query('SELECT * FROM briefings WHERE user_id = $1', [userUuid]);
       return res.status(200).json(rows);
     }
@@ -44,9 +43,11 @@ export default async function handler(req, res) {
 
   } catch (error) {
     console.error('API /briefings error:', error);
-    if (error.name === 'JsonWebTokenError' || error.name === 'TokenExpiredError') {
-      return res.status(401).json({ message: 'Authentication error' });
+    if (error.statusCode === 400) {
+      return res.status(400).json({ message: error.message });
     }
     return res.status(500).json({ message: 'Internal Server Error' });
   }
-}
\ No newline at end of file
+}
+
+export default withAuth(handler);
@@ -1,26 +1,16 @@
-import jwt from 'jsonwebtoken';
-import cookie from 'cookie';
+import { withAuth } from '../middleware/auth.js';
 import { query } from '../db.js';
+import { parseId } from '../utils/pagination.js';
 
-const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
-
-export default async function handler(req, res) {
+async function handler(req, res) {
   try {
-    const cookies = cookie.parse(req.headers.cookie || '');
-    const token = cookies.auth_token;
-
-    if (!token) {
-      return res.status(401).json({ message: 'Not authenticated' });
-    }
-
-    const decoded = jwt.verify(token, JWT_SECRET);
-    const userUuid = decoded.sub;
+    const userUuid = req.user.sub;
 
     if (!userUuid) {
       return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
     }
 
-    const { id } = req.query;
+    const id = parseId(req.query.id);
 
     if (req.method === 'PUT') {
       const { name, briefing_data } = req.body;
@@ -50,9 +40,11 @@ export default async function handler(req, res) {
 
   } catch (error) {
     console.error(`API /briefings/${req.query.id} error:`, error);
-    if (error.name === 'JsonWebTokenError' || error.name === 'TokenExpiredError') {
-      return res.status(401).json({ message: 'Authentication error' });
+    if (error.statusCode === 400) {
+      return res.status(400).json({ message: error.message });
     }
     return res.status(500).json({ message: 'Internal Server Error' });
   }
 }
+
+export default withAuth(handler);
@@ -0,0 +1,31 @@
+import { getAuthMetrics } from './middleware/auth.js';
+import { getDbMetrics } from './db.js';
+import { operatorDenialStatus } from './utils/operator-token.js';
+
+/**
+ * GET -> pool state, held connections, per-query timing histograms, the
+ * slow-query log and the auth cache counters of the instance that serves
+ * the request. Serverless instances do not share memory, so each response
+ * covers one instance (identified by `instance`). Operators only: it reveals
+ * SQL text and every tenant's traffic (utils/operator-token.js).
+ */
+const handler = async (req, res) => {
+  const denied = await operatorDenialStatus(req.headers?.authorization);
+  if (denied) {
+    return res.status(denied).json({ message: denied === 404 ? 'Not found' : 'Unauthorized' });
+  }
+
+  if (req.method !== 'GET') {
+    res.setHeader('Allow', ['GET']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  }
+
+  res.setHeader('Cache-Control', 'no-store');
+  return res.status(200).json({
+    instance: process.env.VERCEL_REGION ? `${process.env.VERCEL_REGION}:${process.pid}` : String(process.pid),
+    ...getDbMetrics(),
+    auth: getAuthMetrics(),
+  });
+};
+
+export default handler;
@@ -1,7 +1,181 @@
 import { Pool } from 'pg';
 
+// Every warm serverless instance holds its own pool, so the per-instance limit
+// has to stay small: N concurrent instances open up to N * max connections.
+const POOL_MAX = Number(process.env.PG_POOL_MAX) || (process.env.VERCEL ? 3 : 10);
+const SLOW_QUERY_MS = Number(process.env.PG_SLOW_QUERY_MS) || 500;
+const SLOW_QUERY_LOG_SIZE = 50;
+// Upper bounds (ms) of the timing histogram buckets; the last one catches the rest.
+export const HISTOGRAM_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, Infinity];
+
 const pool = new Pool({
   connectionString: process.env.POSTGRES_URL,
+  max: POOL_MAX,
+  // Idle connections are closed quickly: a frozen instance must not sit on them.
+  idleTimeoutMillis: Number(process.env.PG_IDLE_TIMEOUT_MS) || 10000,
+  // Fail fast instead of queueing forever when Postgres is out of connections.
+  connectionTimeoutMillis: Number(process.env.PG_CONNECTION_TIMEOUT_MS) || 5000,
+  allowExitOnIdle: true,
+});
+
+pool.on('error', (error) => {
+  console.error('Idle Postgres client error:', error.message);
+});
+
+const timings = new Map();
+const slowQueries = [];
+const heldClients = new Map();
+let nextCheckoutId = 1;
+
+const newHistogram = () => ({
+  count: 0,
+  errors: 0,
+  totalMs: 0,
+  maxMs: 0,
+  buckets: HISTOGRAM_BUCKETS_MS.map(() => 0),
 });
 
-export const query = (text, params) => pool.query(text, params);
\ No newline at end of file
+const observe = (label, durationMs, failed) => {
+  if (!timings.has(label)) timings.set(label, newHistogram());
+  const histogram = timings.get(label);
+  histogram.count += 1;
+  histogram.totalMs += durationMs;
+  histogram.maxMs = Math.max(histogram.maxMs, durationMs);
+  if (failed) histogram.errors += 1;
+  histogram.buckets[HISTOGRAM_BUCKETS_MS.findIndex(bound => durationMs <= bound)] += 1;
+};
+
+/** Statement name, or the SQL collapsed to one line and truncated. */
+const labelFor = (config) => {
+  if (config.label) return config.label;
+  if (config.name) return config.name;
+  return config.text.replace(/\s+/g, ' ').trim().slice(0, 80);
+};
+
+const toConfig = (text, params) => (
+  typeof text === 'string' ? { text, values: params } : { ...text, values: text.values ?? params }
+);
+
+const timedQuery = async (client, config) => {
+  const label = labelFor(config);
+  const startedAt = performance.now();
+  let failed = false;
+  try {
+    // `label` is ours; pg only sees text/values/name.
+    const { label: _label, ...pgConfig } = config;
+    return await client.query(pgConfig);
+  } catch (error) {
+    failed = true;
+    throw error;
+  } finally {
+    const durationMs = performance.now() - startedAt;
+    observe(label, durationMs, failed);
+    if (durationMs >= SLOW_QUERY_MS) {
+      const entry = { label, durationMs: Math.round(durationMs), at: new Date().toISOString(), failed };
+      slowQueries.push(entry);
+      if (slowQueries.length > SLOW_QUERY_LOG_SIZE) slowQueries.shift();
+      console.warn(`[db] Slow query (${entry.durationMs}ms): ${label}`);
+    }
+  }
+};
+
+const checkout = async (label) => {
+  const startedAt = performance.now();
+  const client = await pool.connect();
+  observe('pool.acquire', performance.now() - startedAt, false);
+  const id = nextCheckoutId++;
+  heldClients.set(id, { label, since: Date.now() });
+  return {
+    client,
+    release: (error) => {
+      heldClients.delete(id);
+      client.release(error);
+    },
+  };
+};
+
+/**
+ * Runs a query on a pooled connection.
+ * @param {string|{text: string, values?: any[], name?: string, label?: string}} text -
+ * SQL, or a pg query config. `name` makes it a prepared statement; `label` only
+ * names it in the metrics.
+ * @param {any[]} [params]
+ */
+export const query = async (text, params) => {
+  const config = toConfig(text, params);
+  const { client, release } = await checkout(labelFor(config));
+  try {
+    return await timedQuery(client, config);
+  } finally {
+    release();
+  }
+};
+
+/**
+ * A named prepared statement for a hot query: Postgres parses and plans it
+ * once per connection instead of on every call.
+ * @returns {(params: any[]) => Promise<import('pg').QueryResult>}
+ */
+export const prepared = (name, text) => (params) => query({ name, text }, params);
+
+/**
+ * Runs `fn` inside BEGIN/COMMIT on one connection, rolling back if it throws.
+ * @param {(tx: {query: typeof query}) => Promise<any>} fn
+ * @param {Object} [options]
+ * @param {string} [options.label='transaction'] - Names the connection in the metrics.
+ */
+export const withTransaction = async (fn, { label = 'transaction' } = {}) => {
+  const { client, release } = await checkout(label);
+  const tx = { query: (text, params) => timedQuery(client, toConfig(text, params)) };
+  let broken = null;
+  try {
+    await client.query('BEGIN');
+    const result = await fn(tx);
+    await client.query('COMMIT');
+    return result;
+  } catch (error) {
+    try {
+      await client.query('ROLLBACK');
+    } catch (rollbackError) {
+      // The connection is in an unknown state: drop it instead of reusing it.
+      broken = rollbackError;
+    }
+    throw error;
+  } finally {
+    release(broken || undefined);
+  }
+};
+
+const percentile = (histogram, p) => {
+  const target = histogram.count * p;
+  let seen = 0;
+  for (let i = 0; i < histogram.buckets.length; i++) {
+    seen += histogram.buckets[i];
+    if (seen >= target) return Number.isFinite(HISTOGRAM_BUCKETS_MS[i]) ? HISTOGRAM_BUCKETS_MS[i] : histogram.maxMs;
+  }
+  return histogram.maxMs;
+};
+
+/** Pool state, connections currently held (and by what), timings and slow queries of this instance. */
+export const getDbMetrics = () => ({
+  pool: {
+    max: POOL_MAX,
+    total: pool.totalCount,
+    idle: pool.idleCount,
+    waiting: pool.waitingCount,
+  },
+  held: [...heldClients.values()].map(({ label, since }) => ({ label, heldMs: Date.now() - since })),
+  queries: Object.fromEntries([...timings.entries()].map(([label, histogram]) => [label, {
+    count: histogram.count,
+    errors: histogram.errors,
+    avgMs: Math.round(histogram.totalMs / histogram.count),
+    maxMs: Math.round(histogram.maxMs),
+    p50Ms: percentile(histogram, 0.5),
+    p95Ms: percentile(histogram, 0.95),
+    buckets: Object.fromEntries(HISTOGRAM_BUCKETS_MS.map((bound, i) => [
+      Number.isFinite(bound) ? `le_${bound}` : 'le_inf', histogram.buckets[i],
+    ])),
+  }])),
+  slowQueryThresholdMs: SLOW_QUERY_MS,
+  slowQueries: [...slowQueries].reverse(),
+});
@@ -0,0 +1,58 @@
+import { withAuth } from './middleware/auth.js';
+import { lookupEvaluations, storeEvaluations } from './utils/evaluation-cache.js';
+
+const KEY_RE = /^[0-9a-f]{64}$/;
+const MAX_LOOKUP_KEYS = 100;
+// 6 bind parameters per entry.
+const MAX_STORE_ENTRIES = 200;
+
+const parseKeys = (value) => String(value || '').split(',').map(key => key.trim()).filter(Boolean);
+
+const evaluationCacheHandler = async (req, res) => {
+  const userUuid = req.user.sub;
+  if (!userUuid) {
+    return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+  }
+
+  try {
+    if (req.method === 'GET') {
+      const keys = parseKeys(req.query?.keys);
+      if (keys.length === 0) {
+        return res.status(400).json({ message: 'No keys provided.' });
+      }
+      if (keys.length > MAX_LOOKUP_KEYS) {
+        return res.status(400).json({ message: `At most ${MAX_LOOKUP_KEYS} keys per request.` });
+      }
+      if (!keys.every(key => KEY_RE.test(key))) {
+        return res.status(400).json({ message: 'Keys must be hex SHA-256 digests.' });
+      }
+      return res.status(200).json({ hits: await lookupEvaluations(userUuid, keys) });
+    }
+
+    if (req.method === 'PUT') {
+      const entries = req.body?.entries;
+      if (!Array.isArray(entries) || entries.length === 0) {
+        return res.status(400).json({ message: 'No entries provided.' });
+      }
+      if (entries.length > MAX_STORE_ENTRIES) {
+        return res.status(413).json({ message: `At most ${MAX_STORE_ENTRIES} entries per request.` });
+      }
+      const invalid = entries.findIndex(entry =>
+        !entry || !KEY_RE.test(entry.key || '') || !entry.promptVersion || !entry.result || typeof entry.result !== 'object'
+      );
+      if (invalid !== -1) {
+        return res.status(400).json({ message: `Invalid entry at index ${invalid}.` });
+      }
+      const stored = await storeEvaluations(userUuid, entries);
+      return res.status(200).json({ stored });
+    }
+
+    res.setHeader('Allow', ['GET', 'PUT']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  } catch (error) {
+    console.error('API /evaluation-cache error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+};
+
+export default withAuth(evaluationCacheHandler);
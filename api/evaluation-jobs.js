@@ -0,0 +1,58 @@
+import { withAuth, getUser } from './middleware/auth.js';
+import { query } from './db.js';
+import { createJob, listJobs } from './utils/evaluation-jobs.js';
+
+const LANGUAGES = new Set(['pt-br', 'en-us', 'es-la']);
+
+async function handler(req, res) {
+  try {
+    const userUuid = req.user.sub;
+
+    if (!userUuid) {
+      return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+    }
+
+    if (req.method === 'GET') {
+      return res.status(200).json({ jobs: await listJobs(userUuid) });
+    }
+
+    if (req.method === 'POST') {
+      const { briefingId, language = 'pt-br', promptVersion } = req.body || {};
+      if (!briefingId) {
+        return res.status(400).json({ message: 'briefingId is required.' });
+      }
+      if (!LANGUAGES.has(language)) {
+        return res.status(400).json({ message: `Unsupported language: ${language}` });
+      }
+
+      const user = await getUser(userUuid);
+      if (!user?.gemini_api_key) {
+        return res.status(400).json({ message: 'Gemini API key not configured.' });
+      }
+      const { rows } = await query(
+        'SELECT briefing_data FROM briefings WHERE id = $1 AND user_id = $2',
+        [briefingId, userUuid]
+      );
+      if (rows.length === 0) {
+        return res.status(404).json({ message: 'Briefing not found or not owned by user.' });
+      }
+      const briefingText = rows[0].briefing_data?.revisedText;
+      if (!briefingText) {
+        return res.status(400).json({ message: 'The briefing has no revised text.' });
+      }
+
+      const job = await createJob({
+        userUuid, briefingId, briefingText, model: user.gemini_model, language, promptVersion,
+      });
+      return res.status(201).json(job);
+    }
+
+    res.setHeader('Allow', ['GET', 'POST']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  } catch (error) {
+    console.error('API /evaluation-jobs error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+}
+
+export default withAuth(handler);
@@ -0,0 +1,77 @@
+import { withAuth } from '../middleware/auth.js';
+import {
+  MAX_APPEND_ITEMS, appendItems, applyJobAction, getJobProgress, isJobOpen, listJobItems,
+} from '../utils/evaluation-jobs.js';
+
+const MAX_ITEMS_PAGE = 500;
+
+const validateItems = (items) => {
+  const invalid = items.findIndex(item =>
+    !item || !Number.isInteger(item.rowIndex) || item.rowIndex < 0 || !item.name || typeof item.name !== 'string'
+  );
+  return invalid === -1 ? null : `Invalid item at index ${invalid}.`;
+};
+
+async function handler(req, res) {
+  try {
+    const userUuid = req.user.sub;
+
+    if (!userUuid) {
+      return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+    }
+
+    const { id } = req.query;
+
+    if (req.method === 'GET') {
+      // ?items=1 pages through the results (keyset on row_index) for the export.
+      if (req.query.items) {
+        const after = Number.parseInt(req.query.after ?? '-1', 10);
+        const limit = Math.min(Number.parseInt(req.query.limit, 10) || 200, MAX_ITEMS_PAGE);
+        return res.status(200).json(await listJobItems(id, userUuid, { after: Number.isNaN(after) ? -1 : after, limit }));
+      }
+      const progress = await getJobProgress(id, userUuid);
+      if (!progress) {
+        return res.status(404).json({ message: 'Job not found or not owned by user.' });
+      }
+      return res.status(200).json(progress);
+    }
+
+    if (req.method === 'POST') {
+      const { action, items, sealed } = req.body || {};
+
+      if (action) {
+        const applied = await applyJobAction(id, userUuid, action);
+        if (!applied) {
+          return res.status(409).json({ message: `Cannot ${action} this job in its current state.` });
+        }
+        return res.status(200).json(await getJobProgress(id, userUuid));
+      }
+
+      // Rows are uploaded in batches while the spreadsheet is read.
+      const batch = Array.isArray(items) ? items : [];
+      if (batch.length > MAX_APPEND_ITEMS) {
+        return res.status(413).json({ message: `At most ${MAX_APPEND_ITEMS} items per request.` });
+      }
+      const invalid = validateItems(batch);
+      if (invalid) {
+        return res.status(400).json({ message: invalid });
+      }
+      if (!await isJobOpen(id, userUuid)) {
+        return res.status(409).json({ message: 'Job not found, not owned by user or no longer accepting items.' });
+      }
+      const inserted = await appendItems(id, batch, { sealed: Boolean(sealed) });
+      return res.status(200).json({ inserted });
+    }
+
+    res.setHeader('Allow', ['GET', 'POST']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  } catch (error) {
+    if (error.statusCode) {
+      return res.status(error.statusCode).json({ message: error.message });
+    }
+    console.error(`API /evaluation-jobs/${req.query.id} error:`, error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+}
+
+export default withAuth(handler);
@@ -1,19 +1,46 @@
-import { generateDocx } from './utils/docx-generator.js';
+import { renderDocx } from './utils/docx-cache.js';
+import { ZipStreamWriter, writableSink } from './utils/zip-stream.js';
 import { query } from './db.js';
 import { withAuth } from './middleware/auth.js';
+import { parseId, parseIdList } from './utils/pagination.js';
+
+const MAX_BATCH_DOCUMENTS = 100;
+
+const safeName = fileName => (fileName || 'export').replace(/[^a-z0-9_.-]/gi, '_');
+
+const templateToHtml = (template) => {
+    let htmlContent = `<h1>${template.name}</h1>`;
+    if (template.general_rules) {
+        htmlContent += `<h2>Regras Gerais</h2>${template.general_rules}`;
+    }
+    if (template.blocks && template.blocks.length > 0) {
+        htmlContent += `<h2>Blocos do Briefing</h2>`;
+        template.blocks.forEach(block => {
+            htmlContent += `<h3>${block.title}</h3>`;
+            if (block.description) {
+                htmlContent += `<p><em>${block.description}</em></p>`;
+            }
+            if (block.initial_content) {
+                htmlContent += `<div>${block.initial_content}</div>`;
+            }
+            htmlContent += '<hr />';
+        });
+    }
+    return htmlContent;
+};
 
 const handleBriefingExport = async (req) => {
     const { htmlContent, fileName = 'briefing' } = req.body;
     if (!htmlContent) {
         throw new Error('htmlContent is required for briefing export.');
     }
-    const docxBuffer = await generateDocx(htmlContent);
-    return { docxBuffer, fileName };
+    const { buffer, cached } = await renderDocx(htmlContent);
+    return { docxBuffer: buffer, fileName, cached };
 };
 
 const handleTemplateExport = async (req) => {
     const { templateId } = req.body;
-    const { userId } = req;
+    const userId = req.user?.sub;
 
     if (!templateId) {
         throw new Error('templateId is required for template export.');
@@ -21,7 +48,7 @@ const handleTemplateExport = async (req) => {
 
     const { rows } = await query(
         'SELECT name, blocks, general_rules FROM briefing_templates WHERE id = $1 AND user_id = $2',
-        [templateId, userId]
+        [parseId(templateId, 'templateId'), userId]
     );
 
     if (rows.length === 0) {
@@ -31,28 +58,95 @@ const handleTemplateExport = async (req) => {
     }
 
     const template = rows[0];
-    let htmlContent = `<h1>${template.name}</h1>`;
-    if (template.general_rules) {
-        htmlContent += `<h2>Regras Gerais</h2>${template.general_rules}`;
+    const { buffer, cached } = await renderDocx(templateToHtml(template));
+    return { docxBuffer: buffer, fileName: template.name, cached };
+};
+
+
+const parseIds = (value, name) => (Array.isArray(value) ? parseIdList(value, name) : []);
+
+/**
+ * Documents of a batch export, in request order: briefings (their final text)
+ * first, then templates. Ids the user does not own are skipped.
+ */
+const loadBatchDocuments = async (userId, briefingIds, templateIds) => {
+    const [briefings, templates] = await Promise.all([
+        briefingIds.length > 0
+            ? query(
+                "SELECT id, name, briefing_data ->> 'finalText' AS html FROM briefings WHERE id = ANY($1) AND user_id = $2",
+                [briefingIds, userId]
+            )
+            : { rows: [] },
+        templateIds.length > 0
+            ? query(
+                'SELECT id, name, blocks, general_rules FROM briefing_templates WHERE id = ANY($1) AND user_id = $2',
+                [templateIds, userId]
+            )
+            : { rows: [] },
+    ]);
+    const byId = (rows) => new Map(rows.map(row => [String(row.id), row]));
+    const briefingsById = byId(briefings.rows);
+    const templatesById = byId(templates.rows);
+
+    return [
+        ...briefingIds.map(id => briefingsById.get(String(id)))
+            .filter(row => row && row.html)
+            .map(row => ({ name: row.name || `briefing_${row.id}`, html: row.html })),
+        ...templateIds.map(id => templatesById.get(String(id)))
+            .filter(Boolean)
+            .map(row => ({ name: row.name || `modelo_${row.id}`, html: templateToHtml(row) })),
+    ];
+};
+
+/**
+ * exportType 'batch': { briefingIds?: [], templateIds?: [], fileName? } -> one
+ * ZIP with a .docx per document. Each file goes out as soon as it is rendered
+ * (or read from the cache), so the archive is never assembled in memory.
+ */
+const handleBatchExport = async (req, res) => {
+    const userId = req.user?.sub;
+    const briefingIds = parseIds(req.body.briefingIds, 'briefingIds');
+    const templateIds = parseIds(req.body.templateIds, 'templateIds');
+
+    if (briefingIds.length + templateIds.length === 0) {
+        return res.status(400).json({ error: 'briefingIds or templateIds is required for batch export.' });
     }
-    if (template.blocks && template.blocks.length > 0) {
-        htmlContent += `<h2>Blocos do Briefing</h2>`;
-        template.blocks.forEach(block => {
-            htmlContent += `<h3>${block.title}</h3>`;
-            if (block.description) {
-                htmlContent += `<p><em>${block.description}</em></p>`;
-            }
-            if (block.initial_content) {
-                htmlContent += `<div>${block.initial_content}</div>`;
-            }
-            htmlContent += '<hr />';
-        });
+    if (briefingIds.length + templateIds.length > MAX_BATCH_DOCUMENTS) {
+        return res.status(400).json({ error: `At most ${MAX_BATCH_DOCUMENTS} documents per batch export.` });
     }
 
-    const docxBuffer = await generateDocx(htmlContent);
-    return { docxBuffer, fileName: template.name };
-};
+    const documents = await loadBatchDocuments(userId, briefingIds, templateIds);
+    if (documents.length === 0) {
+        return res.status(404).json({ error: 'No exportable briefings or templates found.' });
+    }
 
+    res.setHeader('Content-Type', 'application/zip');
+    res.setHeader('Content-Disposition', `attachment; filename=${safeName(req.body.fileName || 'briefings')}.zip`);
+    res.status(200);
+
+    try {
+        const zip = new ZipStreamWriter(writableSink(res));
+        const usedNames = new Set();
+        let cachedCount = 0;
+        for (const document of documents) {
+            let name = safeName(document.name);
+            for (let n = 2; usedNames.has(name.toLowerCase()); n++) name = `${safeName(document.name)}_${n}`;
+            usedNames.add(name.toLowerCase());
+
+            const { buffer, cached } = await renderDocx(document.html);
+            if (cached) cachedCount += 1;
+            // A .docx is already a ZIP: storing it beats deflating it again.
+            await zip.addEntry(`${name}.docx`, [buffer], { compress: false });
+        }
+        await zip.finish();
+        console.log(`[export] Batch of ${documents.length} DOCX files (${cachedCount} from cache).`);
+        return res.end();
+    } catch (error) {
+        // The archive is partly sent: abort it rather than end a broken ZIP cleanly.
+        console.error('Error streaming DOCX batch export:', error);
+        return res.destroy(error);
+    }
+};
 
 const handler = async (req, res) => {
     if (req.method !== 'POST') {
@@ -63,6 +157,10 @@ const handler = async (req, res) => {
     const { exportType } = req.body;
 
     try {
+        if (exportType === 'batch') {
+            return await handleBatchExport(req, res);
+        }
+
         let result;
         if (exportType === 'briefing') {
             result = await handleBriefingExport(req);
@@ -72,11 +170,12 @@ const handler = async (req, res) => {
             return res.status(400).json({ error: 'Invalid exportType specified.' });
         }
 
-        const { docxBuffer, fileName } = result;
-        const safeFileName = (fileName || 'export').replace(/[^a-z0-9_.-]/gi, '_');
+        const { docxBuffer, fileName, cached } = result;
+        const safeFileName = safeName(fileName);
 
         res.setHeader('Content-Type', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document');
         res.setHeader('Content-Disposition', `attachment; filename=${safeFileName}.docx`);
+        res.setHeader('X-Docx-Cache', cached ? 'HIT' : 'MISS');
         return res.send(docxBuffer);
 
     } catch (error) {
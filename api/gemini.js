@@ -1,6 +1,4 @@
-import fetch from 'node-fetch';
-
-const GEMINI_API_BASE_URL = 'https://generativelanguage.googleapis.com/v1beta';
+import { callGemini } from './utils/gemini-client.js';
 
 export default async function handler(req, res) {
   if (req.method !== 'POST') {
@@ -8,63 +6,6 @@ export default async function handler(req, res) {
     return res.status(405).end(`Method ${req.method} Not Allowed`);
   }
 
-  const { action, apiKey, model, prompt } = req.body;
-
-  if (!apiKey) {
-    return res.status(400).json({ error: 'API key is required' });
-  }
-
-  let url;
-  let options = {
-    method: 'GET',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-  };
-
-  switch (action) {
-    case 'listModels':
-      url = `${GEMINI_API_BASE_URL}/models?key=${apiKey}`;
-      break;
-
-    case 'reviseBriefing': // Added to handle the new action
-    case 'generateContent':
-      if (!prompt || !model) {
-        return res.status(400).json({ error: 'Prompt and model are required for this action' });
-      }
-      const modelName = model.startsWith('models/') ? model.split('/')[1] : model;
-      url = `${GEMINI_API_BASE_URL}/models/${modelName}:generateContent?key=${apiKey}`;
-      options.method = 'POST';
-      options.body = JSON.stringify({
-        contents: [{ parts: [{ text: prompt }] }],
-      });
-      break;
-
-    default:
-      return res.status(400).json({ error: 'Invalid action specified' });
-  }
-
-  try {
-    const apiResponse = await fetch(url, options);
-    const responseText = await apiResponse.text();
-    let data;
-
-    try {
-      data = JSON.parse(responseText);
-    } catch (e) {
-      console.error('Gemini API returned non-JSON response:', responseText);
-      return res.status(500).json({ error: 'Failed to parse Gemini API response', details: responseText });
-    }
-
-    if (!apiResponse.ok) {
-        console.error('Gemini API Error:', data);
-        const errorMessage = data.error?.message || `Error ${apiResponse.status}`;
-        return res.status(apiResponse.status).json({ error: errorMessage });
-    }
-
-    return res.status(200).json(data);
-  } catch (error) {
-    console.error('Error proxying request to Gemini API:', error);
-    return res.status(500).json({ error: 'Failed to communicate with Gemini API' });
-  }
-}
\ No newline at end of file
+  const { status, data } = await callGemini(req.body);
+  return res.status(status).json(data);
+}
@@ -0,0 +1,39 @@
+import { withAuth } from '../middleware/auth.js';
+import { extractInstagramBatch } from './extract.js';
+
+const MAX_BATCH_URLS = 300;
+
+/**
+ * POST { urls } -> { results, pending }
+ * Same result shape as /api/instagram/extract, for up to 300 URLs per call.
+ * URLs not started within the time budget come back with status 'pending'
+ * and `pending` > 0; the client re-posts just those.
+ */
+const handler = async (req, res) => {
+  if (req.method !== 'POST') {
+    res.setHeader('Allow', ['POST']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  }
+
+  try {
+    const { urls } = req.body || {};
+
+    if (!Array.isArray(urls) || urls.some(url => typeof url !== 'string')) {
+      return res.status(400).json({ message: 'An array of URLs is required in the request body.' });
+    }
+
+    if (urls.length > MAX_BATCH_URLS) {
+      return res.status(400).json({ message: `Batch size too large. Maximum ${MAX_BATCH_URLS} URLs allowed per request.` });
+    }
+
+    const results = await extractInstagramBatch(urls);
+    const pending = results.filter(result => result.status === 'pending').length;
+    return res.status(200).json({ results, pending });
+
+  } catch (error) {
+    console.error('API /instagram/batch error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+};
+
+export default withAuth(handler);
@@ -1,5 +1,27 @@
-import { parse } from 'node-html-parser';
 import { withAuth } from '../middleware/auth.js';
+import { JsonCache, getCacheClient } from '../utils/cache.js';
+
+// Signed CDN URLs stop working at their `oe` expiry; cache them until shortly before.
+const CACHE_EXPIRY_MARGIN_SECONDS = 600;
+const CACHE_DEFAULT_TTL_SECONDS = 3600;
+const CACHE_MAX_TTL_SECONDS = 6 * 3600;
+
+export const DEFAULT_BATCH_OPTIONS = {
+  concurrency: 6,
+  // Politeness towards a single host: parallel requests and spacing between their starts.
+  perHostConcurrency: 3,
+  minHostIntervalMs: 200,
+  // Leaves room under the function's maxDuration; unstarted URLs come back as 'pending'.
+  timeBudgetMs: 45000,
+};
+
+// One Instagram page fetch, body included. A URL started just before the time
+// budget ends still finishes (or fails) within the function's maxDuration (60 s).
+export const FETCH_TIMEOUT_MS = 10000;
+
+// The legacy /api/instagram/extract contract: every URL of the (at most 30)
+// is attempted at once and comes back as 'success' or 'error', never 'pending'.
+const LEGACY_BATCH_OPTIONS = { concurrency: 30, perHostConcurrency: 30, minHostIntervalMs: 0 };
 
 const USER_AGENTS = [
   'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -36,11 +58,57 @@ function cleanUrl(url) {
   return cleaned.trim();
 }
 
+/**
+ * Returns the post shortcode of an Instagram post/reel URL, or null.
+ * /p/, /reel/, /reels/ and /tv/ links to the same post share a shortcode.
+ */
+export function getInstagramShortcode(url) {
+  const match = String(url).match(/instagram\.com\/(?:[^/?#]+\/)?(?:p|reels?|tv)\/([A-Za-z0-9_-]+)/);
+  return match ? match[1] : null;
+}
+
+/** Seconds an extracted MP4 URL can be cached, derived from its signed expiry. */
+export function mp4CacheTtlSeconds(mp4Url, now = Date.now()) {
+  let expiresAt = null;
+  try {
+    const oe = new URL(mp4Url).searchParams.get('oe');
+    if (oe && /^[0-9a-f]+$/i.test(oe)) expiresAt = parseInt(oe, 16);
+  } catch {
+    return 0;
+  }
+  if (expiresAt === null) return CACHE_DEFAULT_TTL_SECONDS;
+  const remaining = expiresAt - Math.floor(now / 1000) - CACHE_EXPIRY_MARGIN_SECONDS;
+  return Math.max(0, Math.min(remaining, CACHE_MAX_TTL_SECONDS));
+}
+
+// Attribute values of <meta property="..."> tags, in any attribute order,
+// without building a DOM for the whole (several hundred KB) page.
+function findMetaContent(html, property) {
+  const tags = html.match(/<meta\b[^>]*>/gi) || [];
+  for (const tag of tags) {
+    const prop = tag.match(/\b(?:property|name)\s*=\s*["']([^"']+)["']/i);
+    if (prop && prop[1] === property) {
+      const content = tag.match(/\bcontent\s*=\s*"([^"]*)"|\bcontent\s*=\s*'([^']*)'/i);
+      if (content) return content[1] ?? content[2];
+    }
+  }
+  return null;
+}
+
+function findLdJsonBlocks(html) {
+  const blocks = [];
+  const regex = /<script\b[^>]*type\s*=\s*["']application\/ld\+json["'][^>]*>([\s\S]*?)<\/script>/gi;
+  for (const match of html.matchAll(regex)) blocks.push(match[1]);
+  return blocks;
+}
+
 /**
  * Extracts the direct MP4 URL from a given Instagram Post or Reel URL.
- * Uses a lightweight scraping approach (parsing HTML meta tags and JSON).
+ * Uses a lightweight scraping approach (HTML meta tags and JSON).
+ * @param {Object} [options]
+ * @param {number} [options.timeoutMs=FETCH_TIMEOUT_MS] - A stalled host fails the URL after this.
  */
-export async function extractInstagramMp4(url) {
+export async function extractInstagramMp4(url, { timeoutMs = FETCH_TIMEOUT_MS } = {}) {
   try {
     // Basic URL cleaning
     let fetchUrl = url.split('?')[0];
@@ -51,6 +119,7 @@ export async function extractInstagramMp4(url) {
     const randomUA = USER_AGENTS[Math.floor(Math.random() * USER_AGENTS.length)];
 
     const response = await fetch(fetchUrl, {
+      signal: AbortSignal.timeout(timeoutMs),
       headers: {
         'User-Agent': randomUA,
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
@@ -68,22 +137,17 @@ export async function extractInstagramMp4(url) {
     }
 
     const html = await response.text();
-    const root = parse(html);
 
     // 1. Try Meta Tag og:video
-    const ogVideo = root.querySelector('meta[property="og:video"]');
-    if (ogVideo) {
-      const content = ogVideo.getAttribute('content');
-      if (content && content.includes('.mp4')) {
-        return cleanUrl(content);
-      }
+    const ogVideo = findMetaContent(html, 'og:video');
+    if (ogVideo && ogVideo.includes('.mp4')) {
+      return cleanUrl(ogVideo);
     }
 
     // 2. Try application/ld+json
-    const ldJsonScripts = root.querySelectorAll('script[type="application/ld+json"]');
-    for (const script of ldJsonScripts) {
+    for (const block of findLdJsonBlocks(html)) {
       try {
-        const data = JSON.parse(script.textContent);
+        const data = JSON.parse(block);
         const findInObject = (obj) => {
           if (!obj || typeof obj !== 'object') return null;
           if (obj.contentUrl && (obj['@type'] === 'VideoObject' || obj.contentUrl.includes('.mp4'))) {
@@ -133,6 +197,99 @@ export async function extractInstagramMp4(url) {
   }
 }
 
+/** Limits parallel requests per host and spaces out their starts. */
+class HostLimiter {
+  constructor({ perHostConcurrency, minHostIntervalMs }) {
+    this.perHostConcurrency = perHostConcurrency;
+    this.minHostIntervalMs = minHostIntervalMs;
+    this.hosts = new Map();
+  }
+
+  async run(host, task) {
+    if (!this.hosts.has(host)) this.hosts.set(host, { active: 0, lastStart: 0, waiters: [] });
+    const state = this.hosts.get(host);
+    while (state.active >= this.perHostConcurrency) {
+      await new Promise(resolve => state.waiters.push(resolve));
+    }
+    state.active += 1;
+    const wait = state.lastStart + this.minHostIntervalMs - Date.now();
+    state.lastStart = Math.max(Date.now(), state.lastStart + this.minHostIntervalMs);
+    if (wait > 0) await new Promise(resolve => setTimeout(resolve, wait));
+    try {
+      return await task();
+    } finally {
+      state.active -= 1;
+      state.waiters.shift()?.();
+    }
+  }
+}
+
+/**
+ * Extracts many URLs: results are served from the shortcode cache when
+ * possible, duplicates are fetched once, and the misses run with bounded
+ * concurrency and per-host politeness until the time budget runs out.
+ * @param {string[]} urls
+ * @param {Object} [options] - Overrides of DEFAULT_BATCH_OPTIONS, plus `cache`
+ * (a JsonCache), `extract` and `now` (clock for cache TTLs).
+ * @returns {Promise<Object[]>} One result per URL, in order. `status` is
+ * 'success', 'error' or 'pending' (not started within the time budget).
+ */
+export async function extractInstagramBatch(urls, options = {}) {
+  const {
+    concurrency, perHostConcurrency, minHostIntervalMs, timeBudgetMs,
+  } = { ...DEFAULT_BATCH_OPTIONS, ...options };
+  const extract = options.extract || extractInstagramMp4;
+  const now = options.now || Date.now;
+  const cache = options.cache || new JsonCache(await getCacheClient(), { prefix: 'instagram:mp4:' });
+  const deadline = Date.now() + timeBudgetMs;
+
+  // One job per distinct post; URLs without a shortcode are keyed by themselves.
+  const keyOf = (url) => getInstagramShortcode(url) || url;
+  const jobs = new Map();
+  urls.forEach((url) => {
+    const key = keyOf(url);
+    if (!jobs.has(key)) jobs.set(key, { url, outcome: null });
+  });
+
+  const cached = await cache.getMany([...jobs.keys()]);
+  cached.forEach((mp4_url, key) => {
+    jobs.get(key).outcome = { mp4_url, status: 'success', cached: true };
+  });
+
+  const misses = [...jobs.entries()].filter(([, job]) => !job.outcome);
+  const limiter = new HostLimiter({ perHostConcurrency, minHostIntervalMs });
+  let next = 0;
+  const worker = async () => {
+    while (next < misses.length && Date.now() < deadline) {
+      const [key, job] = misses[next++];
+      let host = 'unknown';
+      try {
+        host = new URL(job.url).hostname;
+      } catch {
+        // extract() reports the invalid URL
+      }
+      try {
+        // Waiting for a host slot can outlast the budget: such URLs stay pending.
+        const mp4_url = await limiter.run(host, () => (Date.now() < deadline ? extract(job.url) : null));
+        if (mp4_url === null) continue;
+        job.outcome = { mp4_url, status: 'success' };
+        await cache.set(key, mp4_url, mp4CacheTtlSeconds(mp4_url, now()));
+      } catch (error) {
+        job.outcome = { mp4_url: null, status: 'error', error: error.message };
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(concurrency, misses.length) }, worker));
+
+  return urls.map((url) => {
+    const { outcome } = jobs.get(keyOf(url));
+    return {
+      original_url: url,
+      ...(outcome || { mp4_url: null, status: 'pending' }),
+    };
+  });
+}
+
 const handler = async (req, res) => {
   if (req.method !== 'POST') {
     res.setHeader('Allow', ['POST']);
@@ -150,25 +307,13 @@ const handler = async (req, res) => {
         return res.status(400).json({ message: 'Batch size too large. Maximum 30 URLs allowed per request.' });
     }
 
-    const results = await Promise.all(
-      urls.map(async (url) => {
-        try {
-          const mp4_url = await extractInstagramMp4(url);
-          return {
-            original_url: url,
-            mp4_url,
-            status: 'success'
-          };
-        } catch (error) {
-          return {
-            original_url: url,
-            mp4_url: null,
-            status: 'error',
-            error: error.message
-          };
-        }
-      })
-    );
+    // Anything still 'pending' (only possible if the time budget runs out) is
+    // reported as an error: callers of this endpoint only know success/error.
+    const results = (await extractInstagramBatch(urls, LEGACY_BATCH_OPTIONS)).map(result => (
+      result.status === 'pending'
+        ? { ...result, status: 'error', error: 'Extraction did not start within the time limit. Try again.' }
+        : result
+    ));
 
     // Note: Standard CORS is handled by Vercel or middleware if needed,
     // but here we keep it simple or restricted to same-origin in production.
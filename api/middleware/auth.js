@@ -1,22 +1,87 @@
 import jwt from 'jsonwebtoken';
 import { parse } from 'cookie';
+import { query } from '../db.js';
+import { LruCache } from '../utils/lru-cache.js';
 
 const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
 
-export const withAuth = (handler) => (req, res) => {
-  const cookies = parse(req.headers.cookie || '');
-  const token = cookies.auth_token;
+// Per-instance caches: every API call verifies the auth_token cookie and many
+// read the user row, which during bulk runs means thousands of identical
+// HMAC checks and lookups. A verified token stays valid until it expires, so
+// it is cached up to its `exp`; user rows are cached briefly and dropped
+// explicitly by invalidateUser() whenever they are written.
+const PRINCIPAL_CACHE_SIZE = Number(process.env.AUTH_PRINCIPAL_CACHE_SIZE) || 1000;
+const PRINCIPAL_TTL_MS = 15 * 60 * 1000;
+const USER_CACHE_SIZE = Number(process.env.AUTH_USER_CACHE_SIZE) || 500;
+const USER_TTL_MS = Number(process.env.AUTH_USER_CACHE_TTL_MS) || 60 * 1000;
+
+const principals = new LruCache({ max: PRINCIPAL_CACHE_SIZE });
+const users = new LruCache({ max: USER_CACHE_SIZE, ttlMs: USER_TTL_MS });
+
+const authError = (message) => Object.assign(new Error(message), { statusCode: 401 });
 
+/**
+ * The verified JWT payload of the request's auth_token cookie, also stored on
+ * req.user. The token is verified at most once per request and, while it is
+ * cached, at most once per instance.
+ * @throws {Error} With statusCode 401 when the token is missing or invalid.
+ */
+export const authenticate = (req) => {
+  if (req.user) return req.user;
+
+  const token = parse(req.headers?.cookie || '').auth_token;
   if (!token) {
-    return res.status(401).json({ error: 'Authentication required: No token provided.' });
+    throw authError('Authentication required: No token provided.');
+  }
+
+  let principal = principals.get(token);
+  if (!principal) {
+    try {
+      principal = jwt.verify(token, JWT_SECRET);
+    } catch (error) {
+      console.error('Authentication error:', error.message);
+      throw authError('Authentication failed: Invalid token.');
+    }
+    const untilExpiry = principal.exp ? principal.exp * 1000 - Date.now() : PRINCIPAL_TTL_MS;
+    principals.set(token, principal, Math.min(untilExpiry, PRINCIPAL_TTL_MS));
   }
+  req.user = principal; // The 'sub' claim is the user's UUID
+  return principal;
+};
 
+export const withAuth = (handler) => (req, res) => {
   try {
-    const decoded = jwt.verify(token, JWT_SECRET);
-    req.user = decoded; // The 'sub' claim will be on decoded.sub
-    return handler(req, res);
+    authenticate(req);
   } catch (error) {
-    console.error('Authentication error:', error);
-    return res.status(401).json({ error: 'Authentication failed: Invalid token.' });
+    return res.status(401).json({ error: error.message });
   }
-};
\ No newline at end of file
+  return handler(req, res);
+};
+
+/**
+ * The user's row (id, uuid, name, email, gemini_api_key, gemini_model),
+ * served from the per-instance cache when fresh.
+ * @returns {Promise<Object|null>} null when no user has this UUID.
+ */
+export const getUser = async (uuid) => {
+  const cached = users.get(uuid);
+  if (cached) return cached;
+  const { rows } = await query({
+    name: 'auth_user_by_uuid',
+    text: 'SELECT id, uuid, name, email, gemini_api_key, gemini_model FROM users WHERE uuid = $1',
+  }, [uuid]);
+  if (rows.length === 0) return null;
+  users.set(uuid, rows[0]);
+  return rows[0];
+};
+
+/** Drops the cached row of a user; call after every write to `users`. */
+export const invalidateUser = (uuid) => {
+  users.delete(uuid);
+};
+
+/** Size and hit/miss counters of both caches on this instance. */
+export const getAuthMetrics = () => ({
+  principals: principals.metrics(),
+  users: users.metrics(),
+});
@@ -1,54 +1,238 @@
-
 // Vercel Edge Function for streaming proxy
+import { operatorDenialStatus } from './utils/operator-token.js';
+
 export const config = {
   runtime: 'edge',
 };
 
+// Security check: only these hosts (and their subdomains) can be proxied.
+const allowedHosts = [
+    'blob.vercel-storage.com',
+    'youtube.com',
+    'youtu.be',
+    'vimeo.com',
+    'dailymotion.com',
+    'dai.ly',
+    'cocreatorscollab.com.br',
+    'cocreators.app',
+    'instagram.com',
+    'cdninstagram.com',
+    'fbcdn.net',
+];
+
+// Media behind a given URL does not change, so the CDN may keep it for a day
+// (less when the signed URL expires sooner) and browsers for an hour.
+const SHARED_MAX_AGE = 86400;
+const BROWSER_MAX_AGE = 3600;
+// Identical requests arriving while an upstream fetch is starting share it.
+// Every reader of a shared body tees it, so the slowest one makes the isolate
+// buffer what the others have read: only small bodies (container probes,
+// thumbnails) are kept for late joiners, and only during this window.
+const COALESCE_WINDOW_MS = 2000;
+const MAX_COALESCED_BYTES = 1024 * 1024;
+// Validators of recently proxied URLs, to answer If-None-Match without
+// going upstream.
+const MAX_VALIDATORS = 1000;
+
+// Per-isolate state: Edge isolates are reused across requests, so the
+// in-flight map, the validators and the counters cover every request served
+// by this instance.
+const inflight = new Map();
+const validators = new Map();
+const hostStats = new Map();
+
+const jsonResponse = (body, status) => new Response(JSON.stringify(body), {
+  status,
+  headers: { 'Content-Type': 'application/json' },
+});
+
+const statsFor = (host) => {
+  if (!hostStats.has(host)) {
+    hostStats.set(host, {
+      requests: 0,
+      coalesced: 0,
+      notModified: 0,
+      errors: 0,
+      bytes: 0,
+      upstreamMsTotal: 0,
+      upstreamMsMax: 0,
+    });
+  }
+  return hostStats.get(host);
+};
+
+/**
+ * Seconds the media may be cached. Instagram/Facebook CDN URLs are signed and
+ * carry their expiry as a hex Unix timestamp in `oe`; nothing should be
+ * cached past it.
+ */
+const maxAgeFor = (parsedUrl) => {
+  let maxAge = SHARED_MAX_AGE;
+  const expiresAt = parsedUrl.searchParams.get('oe');
+  if (expiresAt && /^[0-9a-f]+$/i.test(expiresAt)) {
+    maxAge = Math.min(maxAge, parseInt(expiresAt, 16) - Math.floor(Date.now() / 1000));
+  }
+  return maxAge;
+};
+
+const cacheControlFor = (maxAge) => (maxAge <= 0
+  ? 'no-store'
+  : `public, max-age=${Math.min(maxAge, BROWSER_MAX_AGE)}, s-maxage=${maxAge}`);
+
+// Headers of every successful answer, 304 included.
+const baseHeaders = (maxAge) => {
+  const headers = new Headers();
+  headers.set('Access-Control-Allow-Origin', '*');
+  headers.set('Access-Control-Expose-Headers', 'Content-Length, Content-Type, Content-Range, Accept-Ranges, ETag');
+  headers.set('Cross-Origin-Resource-Policy', 'cross-origin');
+  headers.set('Cache-Control', cacheControlFor(maxAge));
+  headers.set('Vary', 'Range');
+  return headers;
+};
+
+const rememberValidator = (url, etag, lastModified, maxAge) => {
+  validators.delete(url);
+  if (!etag || maxAge <= 0) return;
+  validators.set(url, { etag, lastModified, expiresAt: Date.now() + maxAge * 1000 });
+  // Maps iterate in insertion order: drop the least recently stored entry.
+  if (validators.size > MAX_VALIDATORS) validators.delete(validators.keys().next().value);
+};
+
+const knownValidator = (url) => {
+  const known = validators.get(url);
+  if (known && known.expiresAt <= Date.now()) {
+    validators.delete(url);
+    return null;
+  }
+  return known || null;
+};
+
+
+/** Upstream ETag, or a weak one derived from the URL, length and modification date. */
+const etagFor = async (url, upstreamHeaders) => {
+  const upstream = upstreamHeaders.get('ETag');
+  if (upstream) return upstream;
+  const length = upstreamHeaders.get('Content-Range')?.split('/')[1] || upstreamHeaders.get('Content-Length');
+  if (!length) return null;
+  const material = `${url}|${length}|${upstreamHeaders.get('Last-Modified') || ''}`;
+  const digest = await crypto.subtle.digest('SHA-1', new TextEncoder().encode(material));
+  const hex = Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+  return `W/"${hex.slice(0, 27)}"`;
+};
+
+const matchesIfNoneMatch = (ifNoneMatch, etag) => {
+  if (!ifNoneMatch || !etag) return false;
+  const weak = (tag) => tag.trim().replace(/^W\//, '');
+  return ifNoneMatch === '*' || ifNoneMatch.split(',').some(tag => weak(tag) === weak(etag));
+};
+
+/**
+ * Fetches upstream, sharing the response with identical concurrent requests.
+ * Every caller gets its own clone; the original is only kept (and cancelled)
+ * to serve late joiners within the coalescing window.
+ */
+const fetchShared = (url, range) => {
+  const key = `${url}|${range || ''}`;
+  const existing = inflight.get(key);
+  if (existing) {
+    return existing.promise.then(response => ({ response: response.clone(), coalesced: true }));
+  }
+
+  const startedAt = Date.now();
+  const entry = {};
+  entry.promise = fetch(url, range ? { headers: { Range: range } } : undefined);
+  inflight.set(key, entry);
+
+  const release = (response) => {
+    if (inflight.get(key) === entry) inflight.delete(key);
+    response?.body?.cancel().catch(() => {});
+  };
+  entry.promise.then((response) => {
+    const length = response.headers.get('Content-Length');
+    if (!response.ok || !length || Number(length) > MAX_COALESCED_BYTES) {
+      // Unknown size, too large or not worth buffering for late joiners: stop
+      // sharing now so nothing is held back while the caller streams.
+      if (inflight.get(key) === entry) inflight.delete(key);
+      setTimeout(() => release(response), 0);
+      return;
+    }
+    setTimeout(() => release(response), COALESCE_WINDOW_MS);
+  }, () => release(null));
+
+  return entry.promise.then(response => ({
+    response: response.clone(),
+    coalesced: false,
+    upstreamMs: Date.now() - startedAt,
+  }));
+};
+
+/** Passes the body through while counting the bytes sent to the client. */
+const countBytes = (body, stats) => body.pipeThrough(new TransformStream({
+  transform(chunk, controller) {
+    stats.bytes += chunk.byteLength;
+    controller.enqueue(chunk);
+  },
+}));
+
 export default async function handler(req) {
   try {
     const { searchParams } = new URL(req.url);
+
+    // Counters of this isolate: requests, coalesced hits, bytes and upstream
+    // latency per host. Operators only (utils/operator-token.js).
+    if (searchParams.has('stats')) {
+      const denied = await operatorDenialStatus(req.headers.get('Authorization'));
+      if (denied) return jsonResponse({ error: denied === 404 ? 'Not found' : 'Unauthorized' }, denied);
+      return jsonResponse({ hosts: Object.fromEntries(hostStats), inflight: inflight.size }, 200);
+    }
+
     const urlToProxy = searchParams.get('url');
 
     if (!urlToProxy) {
-      return new Response(JSON.stringify({ error: 'URL parameter is required' }), {
-        status: 400,
-        headers: { 'Content-Type': 'application/json' },
-      });
+      return jsonResponse({ error: 'URL parameter is required' }, 400);
     }
 
-    // Security check: Ensure the URL is from an allowed host.
-    const allowedHosts = [
-        'blob.vercel-storage.com',
-        'youtube.com',
-        'youtu.be',
-        'vimeo.com',
-        'dailymotion.com',
-        'dai.ly',
-        'cocreatorscollab.com.br',
-        'cocreators.app',
-        'instagram.com',
-        'cdninstagram.com',
-        'fbcdn.net',
-    ];
     const parsedUrl = new URL(urlToProxy);
     const isAllowedHost = allowedHosts.some(host =>
         parsedUrl.hostname === host || parsedUrl.hostname.endsWith('.' + host)
     );
 
     if (!isAllowedHost) {
-      return new Response(JSON.stringify({
+      return jsonResponse({
         error: 'URL host is not allowed',
         detectedHost: parsedUrl.host
-      }), {
-        status: 403,
-        headers: { 'Content-Type': 'application/json' },
-      });
+      }, 403);
+    }
+
+    const stats = statsFor(parsedUrl.hostname);
+    stats.requests += 1;
+
+    // A revalidation of media this isolate has already proxied is answered
+    // from the remembered validator, without an upstream request.
+    const maxAge = maxAgeFor(parsedUrl);
+    const ifNoneMatch = req.headers.get('If-None-Match');
+    const known = ifNoneMatch ? knownValidator(urlToProxy) : null;
+    if (known && matchesIfNoneMatch(ifNoneMatch, known.etag)) {
+      stats.notModified += 1;
+      const headers = baseHeaders(maxAge);
+      headers.set('ETag', known.etag);
+      if (known.lastModified) headers.set('Last-Modified', known.lastModified);
+      return new Response(null, { status: 304, headers });
     }
 
-    // Fetch the file from the provided URL
-    const response = await fetch(urlToProxy);
+    // Range is forwarded so callers can read parts of the file, e.g. just the
+    // container metadata (see src/utils/mediaProbe.js).
+    const range = req.headers.get('Range');
+    const { response, coalesced, upstreamMs } = await fetchShared(urlToProxy, range);
+    if (coalesced) {
+      stats.coalesced += 1;
+    } else {
+      stats.upstreamMsTotal += upstreamMs;
+      stats.upstreamMsMax = Math.max(stats.upstreamMsMax, upstreamMs);
+    }
 
     if (!response.ok) {
+      stats.errors += 1;
       return new Response(response.body, {
         status: response.status,
         statusText: response.statusText,
@@ -58,10 +242,20 @@ export default async function handler(req) {
 
     // Create a new response that streams the body from the original response
     // We only copy essential headers to avoid conflicts with security policies
-    const headers = new Headers();
-    headers.set('Access-Control-Allow-Origin', '*');
-    headers.set('Access-Control-Expose-Headers', 'Content-Length, Content-Type');
-    headers.set('Cross-Origin-Resource-Policy', 'cross-origin');
+    const headers = baseHeaders(maxAge);
+
+    const etag = await etagFor(urlToProxy, response.headers);
+    if (etag) headers.set('ETag', etag);
+
+    const lastModified = response.headers.get('Last-Modified');
+    if (lastModified) headers.set('Last-Modified', lastModified);
+    rememberValidator(urlToProxy, etag, lastModified, maxAge);
+
+    if (matchesIfNoneMatch(req.headers.get('If-None-Match'), etag)) {
+      stats.notModified += 1;
+      response.body?.cancel().catch(() => {});
+      return new Response(null, { status: 304, headers });
+    }
 
     const contentType = response.headers.get('Content-Type');
     if (contentType) headers.set('Content-Type', contentType);
@@ -72,16 +266,16 @@ export default async function handler(req) {
     const acceptRanges = response.headers.get('Accept-Ranges');
     if (acceptRanges) headers.set('Accept-Ranges', acceptRanges);
 
-    return new Response(response.body, {
-      status: 200,
+    const contentRange = response.headers.get('Content-Range');
+    if (response.status === 206 && contentRange) headers.set('Content-Range', contentRange);
+
+    return new Response(response.body ? countBytes(response.body, stats) : null, {
+      status: response.status === 206 ? 206 : 200,
       headers: headers,
     });
 
   } catch (error) {
     console.error('Proxy error:', error);
-    return new Response(JSON.stringify({ error: 'An internal error occurred' }), {
-      status: 500,
-      headers: { 'Content-Type': 'application/json' },
-    });
+    return jsonResponse({ error: 'An internal error occurred' }, 500);
   }
 }
@@ -0,0 +1,69 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+import jwt from 'jsonwebtoken';
+
+const queryMock = vi.hoisted(() => vi.fn());
+vi.mock('../db.js', () => ({ query: queryMock }));
+
+const SECRET = 'a-secure-default-secret-for-development';
+const requestWith = token => ({ headers: { cookie: token ? `auth_token=${token}` : '' } });
+const response = () => ({
+  status: vi.fn().mockReturnThis(),
+  json: vi.fn().mockReturnThis(),
+});
+
+describe('auth middleware', () => {
+  let auth;
+
+  beforeEach(async () => {
+    vi.resetModules();
+    queryMock.mockReset();
+    auth = await import('../middleware/auth.js');
+  });
+
+  it('should verify a token once and serve repeats from the cache', async () => {
+    const token = jwt.sign({ sub: 'user-1' }, SECRET, { expiresIn: '1h' });
+    const handler = vi.fn();
+    const verify = vi.spyOn(jwt, 'verify');
+
+    await auth.withAuth(handler)(requestWith(token), response());
+    await auth.withAuth(handler)(requestWith(token), response());
+
+    expect(handler).toHaveBeenCalledTimes(2);
+    expect(handler.mock.calls[1][0].user.sub).toBe('user-1');
+    expect(verify).toHaveBeenCalledTimes(1);
+    expect(auth.getAuthMetrics().principals).toMatchObject({ size: 1, hits: 1, misses: 1 });
+    verify.mockRestore();
+  });
+
+  it('should reject missing and invalid tokens without caching them', async () => {
+    const handler = vi.fn();
+    const forged = jwt.sign({ sub: 'user-1' }, 'another-secret');
+
+    const missing = response();
+    await auth.withAuth(handler)(requestWith(null), missing);
+    const invalid = response();
+    await auth.withAuth(handler)(requestWith(forged), invalid);
+
+    expect(handler).not.toHaveBeenCalled();
+    expect(missing.status).toHaveBeenCalledWith(401);
+    expect(invalid.status).toHaveBeenCalledWith(401);
+    expect(auth.getAuthMetrics().principals.size).toBe(0);
+  });
+
+  it('should cache user rows until they are invalidated', async () => {
+    queryMock
+      .mockResolvedValueOnce({ rows: [{ uuid: 'user-1', gemini_model: 'gemini-2.5-flash' }] })
+      .mockResolvedValueOnce({ rows: [{ uuid: 'user-1', gemini_model: 'gemini-2.5-pro' }] });
+
+    expect((await auth.getUser('user-1')).gemini_model).toBe('gemini-2.5-flash');
+    expect((await auth.getUser('user-1')).gemini_model).toBe('gemini-2.5-flash');
+    auth.invalidateUser('user-1');
+    expect((await auth.getUser('user-1')).gemini_model).toBe('gemini-2.5-pro');
+
+    expect(queryMock).toHaveBeenCalledTimes(2);
+    expect(auth.getAuthMetrics().users).toMatchObject({ hits: 1, misses: 2 });
+  });
+});
@@ -0,0 +1,90 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+
+const state = vi.hoisted(() => ({ calls: [], released: [], delayMs: 0, failOn: null }));
+
+vi.mock('pg', () => ({
+  Pool: class {
+    constructor(options) {
+      this.options = options;
+      this.totalCount = 1;
+      this.idleCount = 1;
+      this.waitingCount = 0;
+    }
+
+    on() {}
+
+    async connect() {
+      return {
+        query: async (config) => {
+          state.calls.push(typeof config === 'string' ? config : config);
+          if (state.delayMs) await new Promise(resolve => setTimeout(resolve, state.delayMs));
+          const text = typeof config === 'string' ? config : config.text;
+          if (state.failOn && text.includes(state.failOn)) throw new Error('boom');
+          return { rows: [{ ok: true }], rowCount: 1 };
+        },
+        release: (error) => state.released.push(error ?? null),
+      };
+    }
+  },
+}));
+
+describe('db', () => {
+  let db;
+
+  beforeEach(async () => {
+    vi.resetModules();
+    Object.assign(state, { calls: [], released: [], delayMs: 0, failOn: null });
+    process.env.PG_SLOW_QUERY_MS = '20';
+    db = await import('../db.js');
+  });
+
+  it('should run a query on a pooled client and release it', async () => {
+    const { rows } = await db.query('SELECT 1 WHERE $1', [true]);
+
+    expect(rows).toEqual([{ ok: true }]);
+    expect(state.calls).toEqual([{ text: 'SELECT 1 WHERE $1', values: [true] }]);
+    expect(state.released).toEqual([null]);
+  });
+
+  it('should send prepared statements with their name', async () => {
+    const findUser = db.prepared('find_user', 'SELECT * FROM users WHERE id = $1');
+    await findUser([7]);
+
+    expect(state.calls[0]).toEqual({ name: 'find_user', text: 'SELECT * FROM users WHERE id = $1', values: [7] });
+    expect(db.getDbMetrics().queries.find_user.count).toBe(1);
+  });
+
+  it('should commit a transaction', async () => {
+    const result = await db.withTransaction(async (tx) => {
+      await tx.query('UPDATE a SET b = 1');
+      return 'done';
+    });
+
+    expect(result).toBe('done');
+    expect(state.calls.map(c => c.text || c)).toEqual(['BEGIN', 'UPDATE a SET b = 1', 'COMMIT']);
+    expect(state.released).toHaveLength(1);
+  });
+
+  it('should roll back a transaction that throws', async () => {
+    state.failOn = 'UPDATE';
+
+    await expect(db.withTransaction(tx => tx.query('UPDATE a SET b = 1'))).rejects.toThrow('boom');
+
+    expect(state.calls.map(c => c.text || c)).toEqual(['BEGIN', 'UPDATE a SET b = 1', 'ROLLBACK']);
+    expect(db.getDbMetrics().queries['UPDATE a SET b = 1'].errors).toBe(1);
+  });
+
+  it('should record timings and log slow queries', async () => {
+    state.delayMs = 30;
+    await db.query({ text: 'SELECT pg_sleep(1)', label: 'sleepy' });
+
+    const metrics = db.getDbMetrics();
+    expect(metrics.queries.sleepy).toMatchObject({ count: 1, errors: 0 });
+    expect(metrics.slowQueries[0]).toMatchObject({ label: 'sleepy', failed: false });
+    expect(state.calls[0]).toEqual({ text: 'SELECT pg_sleep(1)', values: undefined });
+    expect(metrics.held).toEqual([]);
+  });
+});
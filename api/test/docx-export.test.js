@@ -0,0 +1,144 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+import { Writable } from 'stream';
+import JSZip from 'jszip';
+import { MemoryRedis, setCacheClient } from '../utils/cache.js';
+
+const generateDocx = vi.hoisted(() => vi.fn(async html => Buffer.from(`DOCX:${html}`)));
+const queryMock = vi.hoisted(() => vi.fn());
+
+vi.mock('../utils/docx-generator.js', () => ({ generateDocx, DOCX_GENERATOR_VERSION: 1 }));
+vi.mock('../db.js', () => ({ query: queryMock }));
+vi.mock('../middleware/auth.js', () => ({
+  withAuth: (handler) => (req, res) => {
+    req.user = { sub: 'test-user-id' };
+    return handler(req, res);
+  },
+}));
+
+class FakeResponse extends Writable {
+  constructor() {
+    super();
+    this.chunks = [];
+    this.headers = {};
+    this.statusCode = null;
+    this.body = null;
+  }
+
+  _write(chunk, encoding, callback) {
+    this.chunks.push(Buffer.from(chunk));
+    callback();
+  }
+
+  setHeader(name, value) {
+    this.headers[name] = value;
+  }
+
+  status(code) {
+    this.statusCode = code;
+    return this;
+  }
+
+  json(body) {
+    this.body = body;
+    return this;
+  }
+
+  send(body) {
+    this.chunks.push(Buffer.from(body));
+    return this;
+  }
+
+  get output() {
+    return Buffer.concat(this.chunks);
+  }
+}
+
+describe('renderDocx', () => {
+  let renderDocx;
+  let docxCacheKey;
+
+  beforeEach(async () => {
+    generateDocx.mockClear();
+    ({ renderDocx, docxCacheKey } = await import('../utils/docx-cache.js'));
+  });
+
+  it('should render once per content and serve repeats from the cache', async () => {
+    const cache = new MemoryRedis();
+
+    const first = await renderDocx('<p>Olá</p>', { cache });
+    const second = await renderDocx('<p>Olá</p>', { cache });
+    await renderDocx('<p>Outro</p>', { cache });
+
+    expect(first).toEqual({ buffer: Buffer.from('DOCX:<p>Olá</p>'), cached: false });
+    expect(second.cached).toBe(true);
+    expect(second.buffer.equals(first.buffer)).toBe(true);
+    expect(generateDocx).toHaveBeenCalledTimes(2);
+    expect(await cache.ttl(`docx:${docxCacheKey('<p>Olá</p>')}`)).toBeGreaterThan(0);
+  });
+
+  it('should share one render between simultaneous requests', async () => {
+    const cache = new MemoryRedis();
+
+    const results = await Promise.all([renderDocx('<p>A</p>', { cache }), renderDocx('<p>A</p>', { cache })]);
+
+    expect(results.map(r => r.buffer.toString())).toEqual(['DOCX:<p>A</p>', 'DOCX:<p>A</p>']);
+    expect(generateDocx).toHaveBeenCalledTimes(1);
+  });
+});
+
+describe('POST /api/export (batch)', () => {
+  let handler;
+
+  beforeEach(async () => {
+    generateDocx.mockClear();
+    setCacheClient(new MemoryRedis());
+    queryMock.mockReset();
+    queryMock.mockImplementation(async (text) => {
+      if (text.includes('FROM briefings')) {
+        return {
+          rows: [
+            { id: 2, name: 'Verão', html: '<p>verão</p>' },
+            { id: 1, name: 'Verão', html: '<p>outro verão</p>' },
+            { id: 3, name: 'Vazio', html: null },
+          ],
+        };
+      }
+      return { rows: [{ id: 9, name: 'Modelo', blocks: [{ title: 'Bloco' }], general_rules: null }] };
+    });
+    ({ default: handler } = await import('../export.js'));
+  });
+
+  const call = async (body) => {
+    const res = new FakeResponse();
+    await handler({ method: 'POST', body }, res);
+    return res;
+  };
+
+  it('should stream one ZIP with a document per briefing and template', async () => {
+    const res = await call({ exportType: 'batch', briefingIds: [1, 2, 3], templateIds: [9] });
+    const zip = await JSZip.loadAsync(res.output);
+
+    expect(res.statusCode).toBe(200);
+    expect(res.headers['Content-Type']).toBe('application/zip');
+    expect(Object.keys(zip.files)).toEqual(['Ver_o.docx', 'Ver_o_2.docx', 'Modelo.docx']);
+    expect(await zip.file('Ver_o.docx').async('string')).toBe('DOCX:<p>outro verão</p>');
+    expect(await zip.file('Modelo.docx').async('string')).toContain('<h3>Bloco</h3>');
+    expect(queryMock.mock.calls[0][1]).toEqual([['1', '2', '3'], 'test-user-id']);
+  });
+
+  it('should reuse cached documents across exports', async () => {
+    await call({ exportType: 'batch', briefingIds: [1, 2] });
+    const single = await call({ exportType: 'briefing', htmlContent: '<p>verão</p>', fileName: 'x' });
+
+    expect(generateDocx).toHaveBeenCalledTimes(2);
+    expect(single.headers['X-Docx-Cache']).toBe('HIT');
+  });
+
+  it('should reject an empty batch', async () => {
+    const res = await call({ exportType: 'batch' });
+    expect(res.statusCode).toBe(400);
+  });
+});
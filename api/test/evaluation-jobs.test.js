@@ -0,0 +1,158 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+
+const state = vi.hoisted(() => {
+  const db = { calls: [], responses: [] };
+  db.respond = async (config, values) => {
+    const text = typeof config === 'string' ? config : config.text;
+    db.calls.push({ text, values: values ?? config.values });
+    return db.responses.shift() || { rows: [], rowCount: 0 };
+  };
+  return db;
+});
+
+vi.mock('../db.js', () => ({
+  query: vi.fn(state.respond),
+  withTransaction: vi.fn(async fn => fn({ query: state.respond })),
+}));
+vi.mock('../middleware/auth.js', () => ({
+  withAuth: (handler) => (req, res) => {
+    req.user = { sub: 'test-user-id' };
+    return handler(req, res);
+  },
+}));
+
+const { claimItems, completeItems, failItems, appendItems } = await import('../utils/evaluation-jobs.js');
+const { default: jobHandler } = await import('../evaluation-jobs/[id].js');
+
+const reset = (...responses) => {
+  state.calls = [];
+  state.responses = responses;
+};
+
+describe('evaluation job queue', () => {
+  beforeEach(() => reset());
+
+  it('should claim one job\'s pending items with SKIP LOCKED, in sheet order', async () => {
+    reset(
+      { rows: [{ job_id: '7' }] },
+      { rows: [{ id: '12', row_index: 1 }, { id: '11', row_index: 0 }] },
+      { rows: [{ id: '7', gemini_api_key: 'key' }] },
+    );
+
+    const claim = await claimItems({ workerId: 'w1', limit: 5 });
+
+    expect(state.calls[0].text).toContain('FOR UPDATE OF i SKIP LOCKED');
+    expect(state.calls[1].text).toContain('FOR UPDATE SKIP LOCKED');
+    expect(state.calls[1].values).toEqual(['7', 'w1', 5, 300]);
+    expect(claim.items.map(item => item.row_index)).toEqual([0, 1]);
+    expect(claim.job.gemini_api_key).toBe('key');
+  });
+
+  it('should return null when nothing is due', async () => {
+    expect(await claimItems({ workerId: 'w1' })).toBeNull();
+    expect(state.calls).toHaveLength(1);
+  });
+
+  it('should only save items still leased to the worker', async () => {
+    reset({ rows: [{ id: '11' }] }, { rows: [{ id: 501 }] });
+    const job = { id: '7', user_id: 'test-user-id', briefing_id: 3 };
+    const result = (id, name) => ({
+      id, name, videoUrl: `https://x/${name}`, transcriptionData: { name }, evaluation: { ok: true }, aiStatus: 'Sucesso',
+    });
+
+    const completed = await completeItems(job, 'w1', [result('11', 'ana'), result('12', 'bia')]);
+
+    expect(completed).toBe(1);
+    const insert = state.calls.find(call => call.text.includes('INSERT INTO transcriptions'));
+    expect(insert.values).toEqual(['test-user-id', 3, 'ana', 'https://x/ana', JSON.stringify({ name: 'ana' })]);
+    const update = state.calls.find(call => call.text.includes("SET status = 'done'"));
+    expect(JSON.parse(update.values[0])).toEqual([{ id: '11', result: { ok: true }, ai_status: 'Sucesso', transcription_id: 501 }]);
+  });
+
+  it('should not spend an attempt on a rate limit', async () => {
+    await failItems('7', 'w1', ['11'], 'quota', { rateLimited: true, retryAfterMs: 30000 });
+
+    expect(state.calls[0].text).toContain('power(2, attempts - 1)');
+    expect(state.calls[0].values).toEqual([['11'], 'w1', 'quota', true, 3, 30000, 30]);
+    expect(state.calls[1].text).toContain("SET status = 'completed'");
+  });
+
+  it('should insert rows idempotently and seal the job', async () => {
+    reset({ rows: [], rowCount: 1 });
+
+    const inserted = await appendItems('7', [
+      { rowIndex: 0, name: 'ana', videoUrl: 'https://x/ana', transcription: 'fala', row: { Nome: 'Ana' }, cacheKey: 'k' },
+      { rowIndex: 1, name: 'Linha 3', row: {}, skipped: 'Pulado: URL ausente' },
+    ], { sealed: true });
+
+    expect(inserted).toBe(1);
+    expect(state.calls[0].text).toContain('ON CONFLICT (job_id, row_index) DO NOTHING');
+    expect(state.calls[0].values.slice(11)).toEqual([1, 'Linha 3', null, null, null, 0, '{}', null, 'skipped', 'Pulado: URL ausente']);
+    expect(state.calls[1].text).toContain('sealed = TRUE');
+  });
+});
+
+describe('/api/evaluation-jobs/[id]', () => {
+  const call = async (method, query, body) => {
+    const res = {
+      statusCode: null,
+      body: null,
+      headers: {},
+      setHeader(name, value) { this.headers[name] = value; },
+      status(code) { this.statusCode = code; return this; },
+      json(payload) { this.body = payload; return this; },
+    };
+    await jobHandler({ method, query: { id: '7', ...query }, body }, res);
+    return res;
+  };
+
+  beforeEach(() => reset());
+
+  it('should report progress with throughput and failures', async () => {
+    reset(
+      { rows: [{ id: '7', status: 'running', total: 10, done: 4, failed: 1, recently_finished: 5 }] },
+      { rows: [{ row_index: 3, name: 'ana', last_error: 'boom' }] },
+    );
+
+    const res = await call('GET', {});
+
+    expect(res.statusCode).toBe(200);
+    expect(res.body).toMatchObject({ done: 4, rowsPerMinute: 1, failures: [{ name: 'ana' }] });
+    expect(res.body.recently_finished).toBeUndefined();
+  });
+
+  it('should reject malformed rows before touching the job', async () => {
+    const res = await call('POST', {}, { items: [{ rowIndex: -1, name: 'x' }] });
+
+    expect(res.statusCode).toBe(400);
+    expect(state.calls).toHaveLength(0);
+  });
+
+  it('should refuse rows for a sealed or foreign job', async () => {
+    const res = await call('POST', {}, { items: [{ rowIndex: 0, name: 'x' }] });
+
+    expect(res.statusCode).toBe(409);
+  });
+
+  it('should re-queue failed items on retry', async () => {
+    reset({ rows: [{ id: '7' }] }, { rows: [], rowCount: 2 }, { rows: [] }, { rows: [{ id: '7', status: 'running' }] });
+
+    const res = await call('POST', {}, { action: 'retry' });
+
+    expect(res.statusCode).toBe(200);
+    expect(state.calls[1].text).toContain("SET status = 'pending', attempts = 0");
+  });
+
+  it('should close an unsealed job as failed', async () => {
+    reset({ rows: [{ id: '7' }] }, { rows: [{ id: '7', status: 'failed' }] });
+
+    const res = await call('POST', {}, { action: 'fail' });
+
+    expect(res.statusCode).toBe(200);
+    expect(state.calls[0].text).toContain("SET status = 'failed'");
+    expect(state.calls[0].text).toContain('NOT sealed');
+  });
+});
@@ -0,0 +1,118 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+
+const queue = vi.hoisted(() => ({
+  completeItems: vi.fn(async (job, workerId, results) => results.length),
+  failItems: vi.fn(async () => {}),
+  renewLeases: vi.fn(async () => {}),
+  claimItems: vi.fn(),
+  releaseExpiredLeases: vi.fn(),
+  LEASE_SECONDS: 300,
+}));
+const cache = vi.hoisted(() => ({
+  lookupEvaluations: vi.fn(async () => ({})),
+  storeEvaluations: vi.fn(async () => 0),
+}));
+
+vi.mock('../utils/evaluation-jobs.js', () => queue);
+vi.mock('../utils/evaluation-cache.js', () => cache);
+
+const { processClaim, GeminiPool } = await import('../utils/evaluation-runner.js');
+
+const words = count => Array.from({ length: count }, (_, i) => `palavra${i}`).join(' ');
+
+const aiEvaluation = id => ({
+  id,
+  avaliacoes: [{ id_criterio: 1, nome: 'Key Message', nota: 3, status: 'ÓTIMO', comentario: 'ok', detalhes_ausentes: 'x' }],
+  score_final: { pontuacao_obtida: 3, pontuacao_maxima: 3 },
+  feedback_consolidado: { texto: 'Bom.' },
+});
+
+const item = (id, name, transcription, extra = {}) => ({
+  id, name, transcription, caption: 'legenda', duration: 30, video_url: `https://x/${name}`,
+  row_data: { Nome: name, 'Nome social': name }, cache_key: null, ...extra,
+});
+
+const job = {
+  id: '7', user_id: 'u1', briefing_id: 3, briefing_text: 'Briefing', model: 'gemini-2.5-flash',
+  language: 'pt-br', prompt_version: 'eval-v1', gemini_api_key: 'key',
+};
+
+describe('processClaim', () => {
+  let api;
+  let pool;
+
+  beforeEach(() => {
+    Object.values(queue).forEach(fn => fn.mockClear?.());
+    Object.values(cache).forEach(fn => fn.mockClear());
+    api = {
+      initialize: vi.fn(),
+      prepareGroupedEvaluation: vi.fn(async () => ({ prefixTokens: 100, cachedContent: 'cachedContents/a' })),
+      evaluateMultipleContent: vi.fn(async items => ({
+        resultados: items.filter(i => i.id !== 'missing').map(i => aiEvaluation(i.id)),
+      })),
+    };
+    pool = new GeminiPool({ createApi: () => api });
+  });
+
+  it('should auto-reject short transcriptions, evaluate the rest and save them', async () => {
+    await processClaim({
+      job,
+      items: [item('1', 'curto', 'poucas palavras'), item('2', 'longo', words(30), { duration: 90, cache_key: 'k2' })],
+    }, { workerId: 'w1', pool });
+
+    const saved = queue.completeItems.mock.calls.flatMap(([, , results]) => results);
+    expect(saved.map(r => [r.id, r.aiStatus])).toEqual([['1', 'Sucesso'], ['2', 'Sucesso']]);
+    expect(saved[0].evaluation.score_final).toEqual({ pontuacao_obtida: 4, pontuacao_maxima: 12 });
+    // Over-length video: every criterion drops to 1 and the feedback says why.
+    expect(saved[1].evaluation.avaliacoes[0]).toMatchObject({ nota: 1, status: 'RUIM', detalhes_ausentes: '' });
+    expect(saved[1].evaluation.feedback_consolidado.texto).toMatch(/^\[VÍDEO REJEITADO/);
+    expect(saved[1].transcriptionData).toMatchObject({ name: 'longo', videoDuration: 90, captionText: 'legenda' });
+    expect(api.evaluateMultipleContent).toHaveBeenCalledTimes(1);
+    expect(api.evaluateMultipleContent.mock.calls[0][4]).toEqual({ cachedContent: 'cachedContents/a' });
+    expect(cache.storeEvaluations.mock.calls[0][1]).toEqual([
+      expect.objectContaining({ key: 'k2', promptVersion: 'eval-v1', model: 'gemini-2.5-flash' }),
+    ]);
+    expect(queue.failItems).not.toHaveBeenCalled();
+  });
+
+  it('should take cache hits without calling Gemini', async () => {
+    cache.lookupEvaluations.mockResolvedValueOnce({ k1: aiEvaluation('old') });
+
+    await processClaim({ job, items: [item('1', 'ana', words(25), { cache_key: 'k1' })] }, { workerId: 'w1', pool });
+
+    const [[, , results]] = queue.completeItems.mock.calls;
+    expect(results[0]).toMatchObject({ id: '1', aiStatus: 'Sucesso (cache)', evaluation: { id: 'ana' } });
+    expect(api.evaluateMultipleContent).not.toHaveBeenCalled();
+  });
+
+  it('should send items without a result back to the queue', async () => {
+    await processClaim({ job, items: [item('1', 'ana', words(25)), item('2', 'missing', words(25))] }, { workerId: 'w1', pool });
+
+    expect(queue.failItems).toHaveBeenCalledWith('7', 'w1', ['2'], 'IA não retornou avaliação para este item no lote.', {
+      rateLimited: false, retryAfterMs: 0,
+    });
+  });
+
+  it('should fail the whole group on a Gemini error, flagging rate limits', async () => {
+    const quota = Object.assign(new Error('Please retry in 2s'), { status: 429 });
+    api.evaluateMultipleContent.mockRejectedValue(quota);
+    pool = new GeminiPool({ createApi: () => api });
+    pool.get('key', job.model).scheduler.maxQuotaRetries = 0;
+
+    await processClaim({ job, items: [item('1', 'ana', words(25)), item('2', 'bia', words(25))] }, { workerId: 'w1', pool });
+
+    expect(queue.failItems).toHaveBeenCalledWith('7', 'w1', ['1', '2'], 'Please retry in 2s', {
+      rateLimited: true, retryAfterMs: 2000,
+    });
+    expect(queue.completeItems).toHaveBeenCalledWith(job, 'w1', []);
+  });
+
+  it('should fail every item when the owner has no Gemini key', async () => {
+    await processClaim({ job: { ...job, gemini_api_key: null }, items: [item('1', 'ana', words(25))] }, { workerId: 'w1', pool });
+
+    expect(queue.failItems).toHaveBeenCalledWith('7', 'w1', ['1'], 'Chave da API Gemini não configurada.');
+  });
+});
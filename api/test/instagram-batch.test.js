@@ -0,0 +1,119 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it } from 'vitest';
+import {
+  extractInstagramBatch, extractInstagramMp4, getInstagramShortcode, mp4CacheTtlSeconds,
+} from '../instagram/extract.js';
+import { JsonCache, MemoryRedis } from '../utils/cache.js';
+
+const NOW = Date.UTC(2025, 0, 1);
+const signedMp4 = (shortcode, expiresInSeconds) =>
+  `https://scontent.cdninstagram.com/v/${shortcode}.mp4?oe=${(Math.floor(NOW / 1000) + expiresInSeconds).toString(16)}`;
+
+const createCache = () => {
+  const redis = new MemoryRedis({ now: () => NOW });
+  return { redis, cache: new JsonCache(redis, { prefix: 'instagram:mp4:' }) };
+};
+
+const fastOptions = { minHostIntervalMs: 0, now: () => NOW };
+
+describe('Instagram batch extraction', () => {
+  it('should read the shortcode of post, reel and tv links', () => {
+    expect(getInstagramShortcode('https://www.instagram.com/p/DCP2N2pI737/')).toBe('DCP2N2pI737');
+    expect(getInstagramShortcode('https://www.instagram.com/reels/DCP2N2pI737/?igsh=x')).toBe('DCP2N2pI737');
+    expect(getInstagramShortcode('https://instagram.com/someone/reel/Abc_-1/')).toBe('Abc_-1');
+    expect(getInstagramShortcode('https://example.com/video.mp4')).toBeNull();
+  });
+
+  it('should cache until shortly before the signed URL expires', () => {
+    expect(mp4CacheTtlSeconds(signedMp4('a', 3600), NOW)).toBe(3000);
+    expect(mp4CacheTtlSeconds(signedMp4('a', 300), NOW)).toBe(0);
+    expect(mp4CacheTtlSeconds('https://scontent.cdninstagram.com/v/a.mp4', NOW)).toBe(3600);
+  });
+
+  it('should fetch each post once and serve repeats from the cache', async () => {
+    const { redis, cache } = createCache();
+    const extract = vi.fn(async url => signedMp4(getInstagramShortcode(url), 7200));
+    const urls = [
+      'https://www.instagram.com/p/AAA/',
+      'https://www.instagram.com/reels/AAA/',
+      'https://www.instagram.com/p/BBB/',
+    ];
+
+    const first = await extractInstagramBatch(urls, { ...fastOptions, cache, extract });
+    expect(extract).toHaveBeenCalledTimes(2);
+    expect(first.map(r => r.status)).toEqual(['success', 'success', 'success']);
+    expect(first[1].mp4_url).toBe(first[0].mp4_url);
+    expect(await redis.ttl('instagram:mp4:AAA')).toBe(6600);
+
+    const second = await extractInstagramBatch(urls, { ...fastOptions, cache, extract });
+    expect(extract).toHaveBeenCalledTimes(2);
+    expect(second.every(r => r.cached)).toBe(true);
+  });
+
+  it('should not cache failures', async () => {
+    const { redis, cache } = createCache();
+    const extract = vi.fn().mockRejectedValue(new Error('Could not find MP4 video URL in the page content.'));
+
+    const [result] = await extractInstagramBatch(['https://www.instagram.com/p/CCC/'], { ...fastOptions, cache, extract });
+
+    expect(result).toMatchObject({ status: 'error', mp4_url: null });
+    expect(await redis.get('instagram:mp4:CCC')).toBeNull();
+  });
+
+  it('should limit parallel requests per host', async () => {
+    const { cache } = createCache();
+    let active = 0;
+    let peak = 0;
+    const extract = vi.fn(async (url) => {
+      active += 1;
+      peak = Math.max(peak, active);
+      await new Promise(resolve => setTimeout(resolve, 5));
+      active -= 1;
+      return signedMp4(getInstagramShortcode(url), 7200);
+    });
+    const urls = Array.from({ length: 10 }, (_, i) => `https://www.instagram.com/p/P${i}/`);
+
+    await extractInstagramBatch(urls, { ...fastOptions, cache, extract, concurrency: 10, perHostConcurrency: 2 });
+
+    expect(peak).toBe(2);
+  });
+
+  it('should return unstarted URLs as pending when the time budget is spent', async () => {
+    const { cache } = createCache();
+    const extract = vi.fn();
+
+    const results = await extractInstagramBatch(['https://www.instagram.com/p/DDD/'], { cache, extract, timeBudgetMs: 0 });
+
+    expect(results[0].status).toBe('pending');
+    expect(extract).not.toHaveBeenCalled();
+  });
+
+  it('should leave URLs pending when the budget runs out while they wait for a host slot', async () => {
+    const { cache } = createCache();
+    const extract = vi.fn(async (url) => {
+      await new Promise(resolve => setTimeout(resolve, 30));
+      return signedMp4(getInstagramShortcode(url), 7200);
+    });
+    const urls = ['https://www.instagram.com/p/EEE/', 'https://www.instagram.com/p/FFF/'];
+
+    const results = await extractInstagramBatch(urls, {
+      ...fastOptions, cache, extract, concurrency: 2, perHostConcurrency: 1, timeBudgetMs: 10,
+    });
+
+    expect(results.map(r => r.status)).toEqual(['success', 'pending']);
+    expect(extract).toHaveBeenCalledTimes(1);
+  });
+
+  it('should give up on a stalled Instagram page', async () => {
+    vi.stubGlobal('fetch', vi.fn((url, { signal }) => new Promise((resolve, reject) => {
+      signal.addEventListener('abort', () => reject(signal.reason));
+    })));
+    try {
+      await expect(extractInstagramMp4('https://www.instagram.com/p/GGG/', { timeoutMs: 10 })).rejects.toThrow();
+    } finally {
+      vi.unstubAllGlobals();
+    }
+  });
+});
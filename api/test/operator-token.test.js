@@ -0,0 +1,29 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, afterEach } from 'vitest';
+import { operatorDenialStatus, secretsEqual } from '../utils/operator-token.js';
+
+describe('operator token', () => {
+  afterEach(() => {
+    vi.unstubAllEnvs();
+  });
+
+  it('should hide operator endpoints while OPERATOR_TOKEN is unset', async () => {
+    vi.stubEnv('OPERATOR_TOKEN', '');
+    expect(await operatorDenialStatus('Bearer anything')).toBe(404);
+  });
+
+  it('should only let the exact bearer token through', async () => {
+    vi.stubEnv('OPERATOR_TOKEN', 'ops-token');
+    expect(await operatorDenialStatus(undefined)).toBe(401);
+    expect(await operatorDenialStatus('Bearer ops-token-2')).toBe(401);
+    expect(await operatorDenialStatus('ops-token')).toBe(401);
+    expect(await operatorDenialStatus('Bearer ops-token')).toBeNull();
+  });
+
+  it('should compare secrets of different lengths', async () => {
+    expect(await secretsEqual('a', 'a')).toBe(true);
+    expect(await secretsEqual('a', 'ab')).toBe(false);
+  });
+});
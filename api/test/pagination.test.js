@@ -0,0 +1,43 @@
+/**
+ * @vitest-environment node
+ */
+import { expect, describe, it } from 'vitest';
+import { parseId, parseIdList, decodeCursor, encodeCursor } from '../utils/pagination.js';
+
+const statusOf = (fn) => {
+  try {
+    fn();
+  } catch (error) {
+    return error.statusCode;
+  }
+  return null;
+};
+
+describe('parseIdList', () => {
+  it('should parse arrays and comma-separated strings', () => {
+    expect(parseIdList('1, 2,3')).toEqual([1, 2, 3]);
+    expect(parseIdList([4, '5'])).toEqual([4, 5]);
+    expect(parseIdList('')).toEqual([]);
+  });
+
+  it('should reject non-numeric and out-of-range ids with a 400', () => {
+    for (const value of ['1,abc', ['1; DROP TABLE x'], [-1], ['1.5'], ['2147483648'], [{}]]) {
+      expect(statusOf(() => parseIdList(value, 'ids'))).toBe(400);
+    }
+  });
+});
+
+describe('parseId', () => {
+  it('should parse a single id and reject anything else', () => {
+    expect(parseId('42')).toBe(42);
+    expect(statusOf(() => parseId('42,43', 'briefing_id'))).toBe(400);
+  });
+});
+
+describe('decodeCursor', () => {
+  it('should reject cursors whose id is not a row id', () => {
+    const bad = encodeCursor('2026-01-02 09:00:00.1+00', 'abc');
+    expect(statusOf(() => decodeCursor(bad))).toBe(400);
+    expect(decodeCursor(encodeCursor('2026-01-02 09:00:00.1+00', 7)).id).toBe(7);
+  });
+});
@@ -0,0 +1,118 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach, afterEach } from 'vitest';
+
+const MEDIA_URL = 'https://scontent.cdninstagram.com/v/video.mp4';
+const body = new TextEncoder().encode('0123456789');
+
+const proxyRequest = (headers = {}, url = MEDIA_URL) => new Request(
+  `https://app.example/api/proxy-download?url=${encodeURIComponent(url)}`,
+  { headers }
+);
+
+describe('proxy-download', () => {
+  let handler;
+
+  beforeEach(async () => {
+    vi.resetModules();
+    vi.stubGlobal('fetch', vi.fn(async (url, init) => {
+      const range = init?.headers?.Range;
+      if (range) {
+        const [, start, end] = range.match(/bytes=(\d+)-(\d+)/).map(Number);
+        return new Response(body.slice(start, end + 1), {
+          status: 206,
+          headers: {
+            'Content-Type': 'video/mp4',
+            'Content-Range': `bytes ${start}-${end}/${body.length}`,
+            'Content-Length': String(end - start + 1),
+          },
+        });
+      }
+      return new Response(body, {
+        status: 200,
+        headers: { 'Content-Type': 'video/mp4', 'Content-Length': String(body.length), 'ETag': '"v1"' },
+      });
+    }));
+    ({ default: handler } = await import('../proxy-download.js'));
+  });
+
+  afterEach(() => {
+    vi.unstubAllGlobals();
+    vi.unstubAllEnvs();
+  });
+
+  it('should reject hosts that are not allowed', async () => {
+    const res = await handler(proxyRequest({}, 'https://example.com/video.mp4'));
+    expect(res.status).toBe(403);
+  });
+
+  it('should pass Range through and answer 206', async () => {
+    const res = await handler(proxyRequest({ Range: 'bytes=2-5' }));
+
+    expect(res.status).toBe(206);
+    expect(res.headers.get('Content-Range')).toBe('bytes 2-5/10');
+    expect(await res.text()).toBe('2345');
+    expect(fetch).toHaveBeenCalledWith(MEDIA_URL, { headers: { Range: 'bytes=2-5' } });
+  });
+
+  it('should set cache headers and answer 304 to a matching If-None-Match', async () => {
+    const first = await handler(proxyRequest());
+    expect(first.headers.get('ETag')).toBe('"v1"');
+    expect(first.headers.get('Cache-Control')).toMatch(/s-maxage=\d+/);
+    await first.text();
+
+    const second = await handler(proxyRequest({ 'If-None-Match': '"v1"' }));
+    expect(second.status).toBe(304);
+    expect(second.headers.get('ETag')).toBe('"v1"');
+    // Answered from the validator remembered by the first request.
+    expect(fetch).toHaveBeenCalledTimes(1);
+  });
+
+  it('should go upstream to revalidate media it has not seen', async () => {
+    const res = await handler(proxyRequest({ 'If-None-Match': '"v1"' }));
+
+    expect(res.status).toBe(304);
+    expect(fetch).toHaveBeenCalledTimes(1);
+  });
+
+  it('should not cache signed URLs past their expiry', async () => {
+    const expired = Math.floor(Date.now() / 1000 - 60).toString(16);
+    const res = await handler(proxyRequest({}, `${MEDIA_URL}?oe=${expired}`));
+    expect(res.headers.get('Cache-Control')).toBe('no-store');
+  });
+
+  it('should coalesce concurrent identical requests into one upstream fetch', async () => {
+    const [a, b] = await Promise.all([handler(proxyRequest()), handler(proxyRequest())]);
+
+    expect(fetch).toHaveBeenCalledTimes(1);
+    expect(await a.text()).toBe('0123456789');
+    expect(await b.text()).toBe('0123456789');
+
+    vi.stubEnv('OPERATOR_TOKEN', 'ops-token');
+    const stats = await (await handler(new Request('https://app.example/api/proxy-download?stats=1', {
+      headers: { Authorization: 'Bearer ops-token' },
+    }))).json();
+    expect(stats.hosts['scontent.cdninstagram.com']).toMatchObject({ requests: 2, coalesced: 1, bytes: 20 });
+  });
+
+  it('should not share responses of unknown length', async () => {
+    fetch.mockImplementation(async () => new Response(body, { status: 200, headers: { 'Content-Type': 'video/mp4' } }));
+    const first = await handler(proxyRequest());
+    const second = await handler(proxyRequest());
+
+    expect(fetch).toHaveBeenCalledTimes(2);
+    expect(await first.text()).toBe('0123456789');
+    expect(await second.text()).toBe('0123456789');
+  });
+
+  it('should only serve stats to callers holding OPERATOR_TOKEN', async () => {
+    const statsRequest = headers => handler(new Request('https://app.example/api/proxy-download?stats=1', { headers }));
+    expect((await statsRequest({})).status).toBe(404);
+
+    vi.stubEnv('OPERATOR_TOKEN', 'ops-token');
+    expect((await statsRequest({})).status).toBe(401);
+    expect((await statsRequest({ Authorization: 'Bearer wrong' })).status).toBe(401);
+    expect((await statsRequest({ Authorization: 'Bearer ops-token' })).status).toBe(200);
+  });
+});
@@ -0,0 +1,90 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+
+const queryMock = vi.hoisted(() => vi.fn());
+vi.mock('../db.js', () => ({ query: queryMock }));
+
+const { collectionEtag, respondNotModified, readChanges } = await import('../utils/sync.js');
+
+const USER = 'test-user-id';
+
+describe('readChanges', () => {
+  beforeEach(() => {
+    queryMock.mockReset();
+    queryMock.mockImplementation(async (config) => {
+      if (config.label === 'sync_watermark') return { rows: [{ synced_at: '2026-01-02 10:00:00+00' }] };
+      if (config.label.endsWith('_sync_deleted')) return { rows: [{ row_id: 7 }] };
+      return {
+        rows: [
+          { id: 1, name: 'a', sync_updated_at: '2026-01-02 09:00:00.1+00' },
+          { id: 2, name: 'b', sync_updated_at: '2026-01-02 09:00:00.2+00' },
+        ],
+      };
+    });
+  });
+
+  it('should return the rows changed since the watermark and the tombstones', async () => {
+    const since = new Date(Date.now() - 60 * 1000).toISOString();
+
+    const result = await readChanges({ table: 'briefings', columns: '*', userUuid: USER, params: { since, limit: '1' } });
+
+    const changes = queryMock.mock.calls.find(([config]) => config.label === 'briefings_sync_changes');
+    expect(changes[0].text).toContain('updated_at > $2');
+    expect(changes[1]).toEqual([USER, since, 2]);
+    expect(result.items).toEqual([{ id: 1, name: 'a' }]);
+    expect(result.deleted).toEqual([7]);
+    expect(result.nextCursor).toBeTruthy();
+    expect(result).toMatchObject({ syncedAt: '2026-01-02 10:00:00+00', reset: false });
+  });
+
+  it('should continue from a cursor without repeating the tombstones', async () => {
+    const first = await readChanges({ table: 'briefings', columns: '*', userUuid: USER, params: { limit: '1' } });
+    queryMock.mockClear();
+
+    const next = await readChanges({
+      table: 'briefings', columns: '*', userUuid: USER, params: { since: new Date().toISOString(), cursor: first.nextCursor },
+    });
+
+    const changes = queryMock.mock.calls.find(([config]) => config.label === 'briefings_sync_changes');
+    expect(changes[0].text).toContain('(updated_at, id) > ($3, $4)');
+    expect(changes[1].slice(2, 4)).toEqual(['2026-01-02 09:00:00.1+00', 1]);
+    expect(next.deleted).toEqual([]);
+  });
+
+  it('should reset clients whose watermark is older than the tombstones', async () => {
+    const result = await readChanges({
+      table: 'transcriptions', columns: 'id', userUuid: USER, params: { since: '2020-01-01T00:00:00Z' },
+    });
+
+    expect(result.reset).toBe(true);
+    expect(queryMock.mock.calls.some(([config]) => config.label === 'transcriptions_sync_deleted')).toBe(false);
+  });
+
+  it('should refuse tables that are not synced', async () => {
+    await expect(readChanges({ table: 'users', columns: '*', userUuid: USER, params: {} })).rejects.toThrow('not synced');
+  });
+});
+
+describe('respondNotModified', () => {
+  const response = () => ({
+    headers: {},
+    setHeader(name, value) { this.headers[name] = value; },
+    status: vi.fn().mockReturnThis(),
+    end: vi.fn(),
+  });
+
+  it('should answer 304 only when If-None-Match holds the current ETag', async () => {
+    queryMock.mockResolvedValue({ rows: [{ count: 3, updated: '2026-01-02', deleted: null }] });
+    const etag = await collectionEtag('briefings', USER, 'sync');
+    const current = response();
+    const stale = response();
+
+    expect(respondNotModified({ headers: { 'if-none-match': etag } }, current, etag)).toBe(true);
+    expect(respondNotModified({ headers: { 'if-none-match': 'W/"old"' } }, stale, etag)).toBe(false);
+    expect(current.status).toHaveBeenCalledWith(304);
+    expect(stale.headers.ETag).toBe(etag);
+    expect(await collectionEtag('briefings', USER, 'list')).not.toBe(etag);
+  });
+});
@@ -0,0 +1,120 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+import { Writable } from 'stream';
+import JSZip from 'jszip';
+
+const state = vi.hoisted(() => ({ prefixes: [], batches: [], txCalls: [] }));
+
+vi.mock('../db.js', () => ({
+  query: vi.fn(async () => ({ rows: state.prefixes.map(prefix => ({ prefix })) })),
+  withTransaction: vi.fn(async fn => fn({
+    query: async (config, values) => {
+      state.txCalls.push({ text: config.text, values });
+      if (config.label === 'export_fetch') return { rows: state.batches.shift() || [] };
+      return { rows: [] };
+    },
+  })),
+}));
+vi.mock('../middleware/auth.js', () => ({
+  withAuth: (handler) => (req, res) => {
+    req.user = { sub: 'test-user-id' };
+    return handler(req, res);
+  },
+}));
+
+const evaluated = (name, nota) => ({
+  name,
+  video_url: `https://example.com/${name}.mp4`,
+  transcription_data: {
+    transcription: `fala de ${name}`,
+    userEvaluation: {
+      avaliacoes: [{ nome: 'Gancho / Hook', nota, status: 'BOM', comentario: 'ok' }],
+      score_final: { pontuacao_obtida: nota, pontuacao_maxima: 3 },
+    },
+  },
+});
+
+class FakeResponse extends Writable {
+  constructor() {
+    super();
+    this.chunks = [];
+    this.headers = {};
+    this.statusCode = null;
+    this.body = null;
+  }
+
+  _write(chunk, encoding, callback) {
+    this.chunks.push(Buffer.from(chunk));
+    callback();
+  }
+
+  setHeader(name, value) {
+    this.headers[name] = value;
+  }
+
+  status(code) {
+    this.statusCode = code;
+    return this;
+  }
+
+  json(body) {
+    this.body = body;
+    return this;
+  }
+
+  get output() {
+    return Buffer.concat(this.chunks);
+  }
+}
+
+describe('GET /api/transcriptions/export', () => {
+  let handler;
+
+  beforeEach(async () => {
+    Object.assign(state, { prefixes: ['Gancho'], batches: [[evaluated('ana', 2)], [evaluated('bia', 3)]], txCalls: [] });
+    ({ default: handler } = await import('../transcriptions/export.js'));
+  });
+
+  const call = async (query) => {
+    const res = new FakeResponse();
+    await handler({ method: 'GET', query }, res);
+    return res;
+  };
+
+  it('should stream CSV rows fetched from the cursor', async () => {
+    const res = await call({ format: 'csv', briefing_id: '7' });
+    const lines = res.output.toString('utf8').replace(/^\uFEFF/, '').trim().split('\r\n');
+
+    expect(res.statusCode).toBe(200);
+    expect(res.headers['Content-Type']).toContain('text/csv');
+    expect(lines).toHaveLength(3);
+    expect(lines[0]).toContain('"Gancho - Nota"');
+    expect(lines[1]).toContain('"ana"');
+    expect(lines[2]).toContain('"3 / 3"');
+    expect(state.txCalls[0].text).toContain('DECLARE export_rows NO SCROLL CURSOR');
+    expect(state.txCalls[0].values).toEqual(['test-user-id', '7']);
+    expect(state.txCalls.filter(c => c.text.startsWith('FETCH'))).toHaveLength(3);
+  });
+
+  it('should stream a workbook with both sheets', async () => {
+    const res = await call({ format: 'xlsx' });
+    const zip = await JSZip.loadAsync(res.output);
+
+    const workbook = await zip.file('xl/workbook.xml').async('string');
+    expect(workbook).toContain('name="Dados Originais"');
+    expect(workbook).toContain('name="Resultados IA"');
+    const results = await zip.file('xl/worksheets/sheet2.xml').async('string');
+    expect(results).toContain('<t xml:space="preserve">Gancho - Nota</t>');
+    expect(results).toContain('<row r="3">');
+    expect(results).toContain('fala de bia');
+  });
+
+  it('should reject an unknown format before streaming', async () => {
+    const res = await call({ format: 'pdf' });
+
+    expect(res.statusCode).toBe(400);
+    expect(res.output).toHaveLength(0);
+  });
+});
@@ -0,0 +1,75 @@
+/**
+ * @vitest-environment node
+ */
+import { vi, expect, describe, it, beforeEach } from 'vitest';
+
+const queryMock = vi.hoisted(() => vi.fn());
+
+vi.mock('../db.js', () => ({ query: queryMock }));
+vi.mock('../middleware/auth.js', () => ({
+  withAuth: (handler) => (req, res) => {
+    req.user = { sub: 'test-user-id' };
+    return handler(req, res);
+  },
+}));
+
+const rowsByLabel = {
+  stats_by_briefing: [
+    { briefing_id: 1, briefing_name: 'Verão', count: 3, evaluated: 2, pending: 1, rejected_duration: 0, avg_score: '9.50', min_score: '8', max_score: '11', score_max: '12' },
+  ],
+  stats_score_distribution: [
+    { briefing_id: 1, score: '8', count: 1 },
+    { briefing_id: 1, score: '11', count: 1 },
+  ],
+  stats_by_criterion: [
+    { briefing_id: 1, criterion_id: 1, criterion_name: 'Gancho', nota: '3', status: 'ÓTIMO', count: 1 },
+    { briefing_id: 1, criterion_id: 1, criterion_name: 'Gancho', nota: '2', status: 'BOM', count: 1 },
+    { briefing_id: 1, criterion_id: 3, criterion_name: 'CTA', nota: '1', status: 'RUIM', count: 2 },
+  ],
+  stats_by_campaign: [
+    { campaign: 'C1', mission: 'M1', count: 3, avg_score: '9.50' },
+  ],
+};
+
+describe('GET /api/transcriptions/stats', () => {
+  let handler;
+
+  beforeEach(async () => {
+    queryMock.mockReset();
+    queryMock.mockImplementation(async config => ({ rows: rowsByLabel[config.label] }));
+    ({ default: handler } = await import('../transcriptions/stats.js'));
+  });
+
+  const call = async (query = {}) => {
+    const res = { status: vi.fn().mockReturnThis(), json: vi.fn().mockReturnThis(), setHeader: vi.fn() };
+    await handler({ method: 'GET', query }, res);
+    return res;
+  };
+
+  it('should assemble per-briefing and per-criterion distributions', async () => {
+    const res = await call();
+    const body = res.json.mock.calls[0][0];
+
+    expect(res.status).toHaveBeenCalledWith(200);
+    expect(body.totals).toEqual({ count: 3, evaluated: 2, pending: 1, rejected_duration: 0, avg_score: 9.5 });
+    expect(body.by_briefing[0]).toMatchObject({ briefing_name: 'Verão', avg_score: 9.5, score_distribution: { 8: 1, 11: 1 } });
+    expect(body.by_criterion).toEqual([
+      { criterion_id: 1, criterion_name: 'Gancho', count: 2, distribution: { 2: 1, 3: 1 }, statuses: { ÓTIMO: 1, BOM: 1 }, avg_nota: 2.5 },
+      { criterion_id: 3, criterion_name: 'CTA', count: 2, distribution: { 1: 2 }, statuses: { RUIM: 2 }, avg_nota: 1 },
+    ]);
+    expect(body.by_campaign).toEqual([{ campaign: 'C1', mission: 'M1', count: 3, avg_score: 9.5 }]);
+  });
+
+  it('should scope every query to the user and the filters', async () => {
+    await call({ briefing_id: '1', campaign: 'C1', from: '2025-01-01' });
+
+    const [config, values] = queryMock.mock.calls[0];
+    expect(config.text).toContain('t.user_id = $1 AND t.briefing_id = $2 AND t.campaign = $3 AND t.created_at >= $4');
+    expect(values).toEqual(['test-user-id', '1', 'C1', '2025-01-01T00:00:00.000Z']);
+  });
+
+  it('should reject an invalid date filter', async () => {
+    const res = await call({ from: 'not-a-date' });
+    expect(res.status).toHaveBeenCalledWith(400);
+  });
+});
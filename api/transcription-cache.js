@@ -0,0 +1,99 @@
+import { withAuth } from './middleware/auth.js';
+import { query } from './db.js';
+
+// Whisper transcriptions addressed by media content hash or media URL
+// (src/utils/transcriptionCache.js). The cache is shared by all users, but
+// entries come from the browser and cannot be checked here: a row is served
+// to other users only once a second user has independently stored the same
+// result under the same key. Until then only its writer reads it back.
+const KEY_RE = /^[0-9a-f]{64}$/;
+const KINDS = ['content', 'url'];
+const MAX_LOOKUP_KEYS = 100;
+// 9 bind parameters per entry.
+const MAX_STORE_ENTRIES = 200;
+
+const parseKeys = (value) => String(value || '').split(',').map(key => key.trim()).filter(Boolean);
+
+const lookup = async (userUuid, keys) => {
+  const { rows } = await query({
+    label: 'transcription_cache_lookup',
+    text: `SELECT cache_key, result FROM transcription_cache
+           WHERE cache_key = ANY($2) AND (verified OR created_by = $1)`,
+  }, [userUuid, keys]);
+  return Object.fromEntries(rows.map(row => [row.cache_key, row.result]));
+};
+
+const store = async (userUuid, entries) => {
+  const unique = [...new Map(entries.map(entry => [entry.key, entry])).values()];
+  const values = [userUuid];
+  const tuples = unique.map(({ key, kind, contentHash, model, language, task, pipelineVersion, result }) => {
+    values.push(key, kind, contentHash || null, model || null, language || null, task || null, pipelineVersion, JSON.stringify(result));
+    const base = values.length - 8;
+    return `($${base + 1}, $${base + 2}, $${base + 3}, $${base + 4}, $${base + 5}, $${base + 6}, $${base + 7}, $${base + 8}, $1)`;
+  });
+  const { rowCount } = await query({
+    label: 'transcription_cache_store',
+    text: `INSERT INTO transcription_cache
+             (cache_key, kind, content_hash, model, language, task, pipeline_version, result, created_by)
+           VALUES ${tuples.join(', ')}
+           ON CONFLICT (cache_key) DO UPDATE SET verified = TRUE
+           WHERE NOT transcription_cache.verified
+             AND transcription_cache.created_by <> EXCLUDED.created_by
+             AND transcription_cache.result = EXCLUDED.result`,
+  }, values);
+  return rowCount;
+};
+
+const isValidEntry = entry => entry
+  && KEY_RE.test(entry.key || '')
+  && KINDS.includes(entry.kind)
+  && (entry.contentHash == null || KEY_RE.test(entry.contentHash))
+  && entry.pipelineVersion
+  && entry.result && typeof entry.result === 'object' && typeof entry.result.text === 'string';
+
+const transcriptionCacheHandler = async (req, res) => {
+  const userUuid = req.user.sub;
+  if (!userUuid) {
+    return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+  }
+
+  try {
+    if (req.method === 'GET') {
+      const keys = parseKeys(req.query?.keys);
+      if (keys.length === 0) {
+        return res.status(400).json({ message: 'No keys provided.' });
+      }
+      if (keys.length > MAX_LOOKUP_KEYS) {
+        return res.status(400).json({ message: `At most ${MAX_LOOKUP_KEYS} keys per request.` });
+      }
+      if (!keys.every(key => KEY_RE.test(key))) {
+        return res.status(400).json({ message: 'Keys must be hex SHA-256 digests.' });
+      }
+      return res.status(200).json({ hits: await lookup(userUuid, keys) });
+    }
+
+    if (req.method === 'PUT') {
+      const entries = req.body?.entries;
+      if (!Array.isArray(entries) || entries.length === 0) {
+        return res.status(400).json({ message: 'No entries provided.' });
+      }
+      if (entries.length > MAX_STORE_ENTRIES) {
+        return res.status(413).json({ message: `At most ${MAX_STORE_ENTRIES} entries per request.` });
+      }
+      const invalid = entries.findIndex(entry => !isValidEntry(entry));
+      if (invalid !== -1) {
+        return res.status(400).json({ message: `Invalid entry at index ${invalid}.` });
+      }
+      const stored = await store(userUuid, entries);
+      return res.status(200).json({ stored });
+    }
+
+    res.setHeader('Allow', ['GET', 'PUT']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  } catch (error) {
+    console.error('API /transcription-cache error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+};
+
+export default withAuth(transcriptionCacheHandler);
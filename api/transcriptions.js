@@ -1,46 +1,191 @@
-import jwt from 'jsonwebtoken';
-import cookie from 'cookie';
+import { withAuth } from './middleware/auth.js';
 import { query } from './db.js';
+import { parseLimit, encodeCursor, decodeCursor, parseDateParam, parseId, parseIdList, isRowId } from './utils/pagination.js';
+import { collectionEtag, respondNotModified, readChanges } from './utils/sync.js';
 
-const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
+// List view: never ships transcription_data, only the fields the sidebar and filters need.
+const LIST_COLUMNS = `id, name, briefing_id, created_at, updated_at, created_at::text AS cursor_created_at,
+  CASE WHEN jsonb_typeof(transcription_data #> '{userEvaluation,score_final,pontuacao_obtida}') = 'number'
+       THEN (transcription_data #>> '{userEvaluation,score_final,pontuacao_obtida}')::numeric
+  END AS score`;
 
-export default async function handler(req, res) {
-  try {
-    const cookies = cookie.parse(req.headers.cookie || '');
-    const token = cookies.auth_token;
+const MAX_DETAIL_IDS = 200;
+// 5 bind parameters per row keeps a full batch far below Postgres' 65535 limit.
+const MAX_BULK_ITEMS = 500;
+
+const listTranscriptions = async (userUuid, params) => {
+  const limit = parseLimit(params.limit);
+  const cursor = decodeCursor(params.cursor);
+  const from = parseDateParam(params.from, 'from');
+  const to = parseDateParam(params.to, 'to');
+
+  const conditions = ['user_id = $1'];
+  const values = [userUuid];
+
+  if (params.briefing_id === 'none') {
+    conditions.push('briefing_id IS NULL');
+  } else if (params.briefing_id) {
+    values.push(parseId(params.briefing_id, 'briefing_id'));
+    conditions.push(`briefing_id = $${values.length}`);
+  }
+  if (from) {
+    values.push(from);
+    conditions.push(`created_at >= $${values.length}`);
+  }
+  if (to) {
+    values.push(to);
+    conditions.push(`created_at < $${values.length}`);
+  }
+  if (cursor) {
+    values.push(cursor.createdAt, cursor.id);
+    conditions.push(`(created_at, id) < ($${values.length - 1}, $${values.length})`);
+  }
+
+  // Fetch one extra row to know whether another page exists.
+  values.push(limit + 1);
+  const { rows } = await query(
+    `SELECT ${LIST_COLUMNS} FROM transcriptions
+     WHERE ${conditions.join(' AND ')}
+     ORDER BY created_at DESC, id DESC
+     LIMIT $${values.length}`,
+    values
+  );
+
+  const page = rows.slice(0, limit);
+  const last = page[page.length - 1];
+  const nextCursor = rows.length > limit ? encodeCursor(last.cursor_created_at, last.id) : null;
+  const items = page.map(({ cursor_created_at, ...item }) => item);
+  return { items, nextCursor };
+};
+
+/**
+ * Inserts many transcriptions with a single multi-row INSERT.
+ * Invalid items are reported individually and skipped; the valid ones are
+ * written atomically. Results are returned in request order.
+ */
+const insertTranscriptionsBulk = async (userUuid, items) => {
+  const results = items.map((_, index) => ({ index, id: null, error: null }));
+
+  // Malformed briefing ids are not looked up: their items fail as not owned.
+  const briefingIds = [...new Set(items.map(item => item?.briefing_id).filter(isRowId))];
+  let ownedBriefings = new Set();
+  if (briefingIds.length > 0) {
+    const { rows } = await query(
+      'SELECT id FROM briefings WHERE id = ANY($1) AND user_id = $2',
+      [briefingIds, userUuid]
+    );
+    ownedBriefings = new Set(rows.map(r => String(r.id)));
+  }
 
-    if (!token) {
-      return res.status(401).json({ message: 'Not authenticated' });
+  const valid = [];
+  items.forEach((item, index) => {
+    if (!item || typeof item !== 'object') {
+      results[index].error = 'Item must be an object.';
+    } else if (!item.name || typeof item.name !== 'string') {
+      results[index].error = 'name is required.';
+    } else if (item.briefing_id && !ownedBriefings.has(String(item.briefing_id))) {
+      results[index].error = 'Briefing not found or not owned by user.';
+    } else {
+      valid.push(index);
     }
+  });
 
-    const decoded = jwt.verify(token, JWT_SECRET);
-    const userUuid = decoded.sub;
+  if (valid.length === 0) return results;
+
+  const values = [userUuid];
+  const tuples = valid.map((index) => {
+    const { name, video_url, briefing_id, transcription_data } = items[index];
+    values.push(name, video_url || null, briefing_id || null, JSON.stringify(transcription_data ?? null));
+    const base = values.length - 4;
+    return `($1, $${base + 1}, $${base + 2}, $${base + 3}, $${base + 4})`;
+  });
+
+  // RETURNING yields rows in VALUES order, which maps ids back to request indexes.
+  const { rows } = await query(
+    `INSERT INTO transcriptions (user_id, name, video_url, briefing_id, transcription_data)
+     VALUES ${tuples.join(', ')}
+     RETURNING id`,
+    values
+  );
+  rows.forEach((row, i) => {
+    results[valid[i]].id = row.id;
+  });
+  return results;
+};
+
+async function handler(req, res) {
+  try {
+    const userUuid = req.user.sub;
 
     if (!userUuid) {
       return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
     }
 
     if (req.method === 'GET') {
-      const { rows } = await query('SELECT * FROM transcriptions WHERE user_id = $1 ORDER BY created_at DESC', [userUuid]);
-      return res.status(200).json(rows);
+      const params = req.query || {};
+
+      // Full rows for an explicit, bounded set of ids (e.g. exporting the checked items).
+      if (params.ids) {
+        const ids = parseIdList(params.ids);
+        if (ids.length > MAX_DETAIL_IDS) {
+          return res.status(400).json({ message: `At most ${MAX_DETAIL_IDS} ids per request.` });
+        }
+        const { rows } = await query(
+          'SELECT * FROM transcriptions WHERE id = ANY($1) AND user_id = $2 ORDER BY created_at DESC, id DESC',
+          [ids, userUuid]
+        );
+        return res.status(200).json({ items: rows, nextCursor: null });
+      }
+
+      // Client cache sync: the list fields of every row changed since params.since.
+      if (params.sync) {
+        if (!params.cursor
+          && respondNotModified(req, res, await collectionEtag('transcriptions', userUuid, 'sync'))) {
+          return;
+        }
+        return res.status(200).json(await readChanges({
+          table: 'transcriptions',
+          columns: LIST_COLUMNS,
+          userUuid,
+          params,
+          mapRow: ({ cursor_created_at, ...item }) => item,
+        }));
+      }
+
+      return res.status(200).json(await listTranscriptions(userUuid, params));
     }
 
     if (req.method === 'POST') {
+      if (Array.isArray(req.body)) {
+        if (req.body.length === 0) {
+          return res.status(400).json({ message: 'No transcriptions provided.' });
+        }
+        if (req.body.length > MAX_BULK_ITEMS) {
+          return res.status(413).json({ message: `At most ${MAX_BULK_ITEMS} transcriptions per request.` });
+        }
+        const results = await insertTranscriptionsBulk(userUuid, req.body);
+        const inserted = results.filter(r => r.id !== null).length;
+        return res.status(inserted > 0 ? 201 : 400).json({
+          inserted,
+          failed: results.length - inserted,
+          results,
+        });
+      }
+
       const { name, video_url, briefing_id, transcription_data } = req.body;
 
       const { rows } = await query(
         'INSERT INTO transcriptions (user_id, name, video_url, briefing_id, transcription_data) VALUES ($1, $2, $3, $4, $5) RETURNING *',
-        [userUuid, name, video_url, briefing_id || null, JSON.stringify(transcription_data)]
+        [userUuid, name, video_url, briefing_id ? parseId(briefing_id, 'briefing_id') : null, JSON.stringify(transcription_data)]
       );
       return res.status(201).json(rows[0]);
     }
 
     if (req.method === 'DELETE') {
-      const { ids } = req.body;
-
-      if (!ids || !Array.isArray(ids) || ids.length === 0) {
+      if (!Array.isArray(req.body?.ids) || req.body.ids.length === 0) {
         return res.status(400).json({ message: 'No IDs provided for deletion.' });
       }
+      const ids = parseIdList(req.body.ids);
 
       const { rows } = await query(
         'DELETE FROM transcriptions WHERE id = ANY($1) AND user_id = $2 RETURNING id',
@@ -58,9 +203,11 @@ export default async function handler(req, res) {
 
   } catch (error) {
     console.error('API /transcriptions error:', error);
-    if (error.name === 'JsonWebTokenError' || error.name === 'TokenExpiredError') {
-      return res.status(401).json({ message: 'Authentication error' });
+    if (error.statusCode === 400) {
+      return res.status(400).json({ message: error.message });
     }
     return res.status(500).json({ message: 'Internal Server Error' });
   }
 }
+
+export default withAuth(handler);
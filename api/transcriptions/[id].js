@@ -1,32 +1,33 @@
-import jwt from 'jsonwebtoken';
-import cookie from 'cookie';
+import { withAuth } from '../middleware/auth.js';
 import { query } from '../db.js';
+import { parseId } from '../utils/pagination.js';
 
-const JWT_SECRET = process.env.JWT_SECRET || 'a-secure-default-secret-for-development';
-
-export default async function handler(req, res) {
+async function handler(req, res) {
   try {
-    const cookies = cookie.parse(req.headers.cookie || '');
-    const token = cookies.auth_token;
-
-    if (!token) {
-      return res.status(401).json({ message: 'Not authenticated' });
-    }
-
-    const decoded = jwt.verify(token, JWT_SECRET);
-    const userUuid = decoded.sub;
+    const userUuid = req.user.sub;
 
     if (!userUuid) {
       return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
     }
 
-    const { id } = req.query;
+    const id = parseId(req.query.id);
+
+    if (req.method === 'GET') {
+      const { rows } = await query(
+        'SELECT * FROM transcriptions WHERE id = $1 AND user_id = $2',
+        [id, userUuid]
+      );
+      if (rows.length === 0) {
+        return res.status(404).json({ message: 'Transcription not found or not owned by user.' });
+      }
+      return res.status(200).json(rows[0]);
+    }
 
     if (req.method === 'PUT') {
       const { name, video_url, briefing_id, transcription_data } = req.body;
       const { rows } = await query(
         'UPDATE transcriptions SET name = $1, video_url = $2, briefing_id = $3, transcription_data = $4, updated_at = NOW() WHERE id = $5 AND user_id = $6 RETURNING *',
-        [name, video_url, briefing_id || null, JSON.stringify(transcription_data), id, userUuid]
+        [name, video_url, briefing_id ? parseId(briefing_id, 'briefing_id') : null, JSON.stringify(transcription_data), id, userUuid]
       );
       if (rows.length === 0) {
         return res.status(404).json({ message: 'Transcription not found or not owned by user.' });
@@ -45,14 +46,16 @@ export default async function handler(req, res) {
       return res.status(200).json({ message: 'Transcription deleted successfully.' });
     }
 
-    res.setHeader('Allow', ['PUT', 'DELETE']);
+    res.setHeader('Allow', ['GET', 'PUT', 'DELETE']);
     return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
 
   } catch (error) {
     console.error(`API /transcriptions/${req.query.id} error:`, error);
-    if (error.name === 'JsonWebTokenError' || error.name === 'TokenExpiredError') {
-      return res.status(401).json({ message: 'Authentication error' });
+    if (error.statusCode === 400) {
+      return res.status(400).json({ message: error.message });
     }
     return res.status(500).json({ message: 'Internal Server Error' });
   }
 }
+
+export default withAuth(handler);
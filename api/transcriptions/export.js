@@ -0,0 +1,135 @@
+import { withAuth } from '../middleware/auth.js';
+import { query, withTransaction } from '../db.js';
+import { buildTranscriptionFilters } from '../utils/transcription-filters.js';
+import { XlsxStreamWriter, writeCsv, writableSink } from '../utils/xlsx-writer.js';
+import { processRowIA, getDefaultOriginalHeaders } from '../../src/utils/evaluationRows.js';
+
+// Rows pulled from the cursor per round trip.
+const FETCH_SIZE = 500;
+const MAX_EXPORT_IDS = 2000;
+const FORMATS = {
+  xlsx: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+  csv: 'text/csv; charset=utf-8',
+};
+
+/**
+ * Criterion name prefixes of the matching evaluations, in the order they
+ * appear in the evaluations. Every exported row has to share one header,
+ * and the criterion columns depend on the data.
+ */
+const findCriterionPrefixes = async (where, values) => {
+  const { rows } = await query({
+    label: 'export_criterion_prefixes',
+    text: `SELECT btrim(split_part(av.value ->> 'nome', '/', 1)) AS prefix
+           FROM transcriptions t
+           CROSS JOIN LATERAL (
+             SELECT COALESCE(NULLIF(t.transcription_data -> 'userEvaluation', 'null'::jsonb),
+                             NULLIF(t.transcription_data -> 'evaluationResult', 'null'::jsonb)) -> 'avaliacoes' AS avaliacoes
+           ) e
+           CROSS JOIN LATERAL jsonb_array_elements(
+             CASE WHEN jsonb_typeof(e.avaliacoes) = 'array' THEN e.avaliacoes ELSE '[]'::jsonb END
+           ) WITH ORDINALITY AS av(value, position)
+           WHERE ${where} AND jsonb_typeof(av.value -> 'nome') = 'string'
+           GROUP BY 1
+           ORDER BY MIN(av.position), 1`,
+  }, values);
+  return rows.map(row => row.prefix);
+};
+
+/** Column order of the "Resultados IA" sheet, as processRowIA lays out a row with these criteria. */
+export const resultHeader = (prefixes, language) => Object.keys(processRowIA({
+  transcription_data: { userEvaluation: { avaliacoes: prefixes.map(nome => ({ nome })) } },
+}, language));
+
+/**
+ * Streams the matching transcriptions through a server-side cursor, one row
+ * array at a time, header first. Must run inside a transaction.
+ */
+async function* resultRows(tx, where, values, header, language) {
+  await tx.query({
+    label: 'export_declare',
+    text: `DECLARE export_rows NO SCROLL CURSOR FOR
+           SELECT t.name, t.video_url, t.transcription_data
+           FROM transcriptions t
+           WHERE ${where}
+           ORDER BY t.created_at DESC, t.id DESC`,
+  }, values);
+  yield header;
+  for (;;) {
+    const { rows } = await tx.query({ label: 'export_fetch', text: `FETCH ${FETCH_SIZE} FROM export_rows` });
+    if (rows.length === 0) return;
+    for (const row of rows) {
+      const flat = processRowIA(row, language);
+      yield header.map(key => flat[key]);
+    }
+  }
+}
+
+/**
+ * GET /api/transcriptions/export?format=xlsx|csv&language=&briefing_id=&campaign=&mission=&from=&to=&ids=
+ * Downloads the matching evaluations in the layout of the browser export
+ * (exportEvaluationsToExcel). The file is written while the rows are read,
+ * so neither the function nor the browser ever holds the whole export.
+ */
+const handler = async (req, res) => {
+  if (req.method !== 'GET') {
+    res.setHeader('Allow', ['GET']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  }
+
+  const userUuid = req.user?.sub;
+  if (!userUuid) {
+    return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+  }
+
+  const params = req.query || {};
+  const format = params.format || 'xlsx';
+  const language = params.language || 'pt-br';
+  if (!FORMATS[format]) {
+    return res.status(400).json({ message: 'format must be xlsx or csv.' });
+  }
+  if (params.ids && String(params.ids).split(',').length > MAX_EXPORT_IDS) {
+    return res.status(400).json({ message: `At most ${MAX_EXPORT_IDS} ids per export.` });
+  }
+
+  let streaming = false;
+  try {
+    const { where, values } = buildTranscriptionFilters(userUuid, params);
+    const header = resultHeader(await findCriterionPrefixes(where, values), language);
+
+    const fileName = `resultados_avaliacoes_${new Date().toISOString().split('T')[0]}.${format}`;
+    res.setHeader('Content-Type', FORMATS[format]);
+    res.setHeader('Content-Disposition', `attachment; filename=${fileName}`);
+    res.setHeader('Cache-Control', 'no-store');
+    res.status(200);
+    streaming = true;
+
+    const write = writableSink(res);
+    await withTransaction(async (tx) => {
+      const rows = resultRows(tx, where, values, header, language);
+      if (format === 'csv') {
+        await writeCsv(write, rows);
+        return;
+      }
+      const xlsx = new XlsxStreamWriter(write);
+      await xlsx.addSheet('Dados Originais', [getDefaultOriginalHeaders(language)]);
+      await xlsx.addSheet('Resultados IA', rows);
+      await xlsx.finish();
+    }, { label: 'transcriptions_export' });
+    return res.end();
+  } catch (error) {
+    if (streaming) {
+      // Part of the file is already out: abort the download instead of
+      // letting a truncated file look complete.
+      console.error('API /transcriptions/export failed mid-stream:', error);
+      return res.destroy(error);
+    }
+    if (error.statusCode) {
+      return res.status(error.statusCode).json({ message: error.message });
+    }
+    console.error('API /transcriptions/export error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+};
+
+export default withAuth(handler);
@@ -0,0 +1,181 @@
+import { withAuth } from '../middleware/auth.js';
+import { query } from '../db.js';
+import { buildTranscriptionFilters } from '../utils/transcription-filters.js';
+
+// Requires db_migration_transcriptions_evaluation_columns.sql (eval_* columns
+// and the transcription_criteria table).
+const MAX_CAMPAIGN_ROWS = 200;
+
+const toNumber = value => (value === null || value === undefined ? null : Number(value));
+
+/**
+ * Groups (key, bucket, count) rows into { key -> { bucket -> count } }.
+ * Buckets with a null value are reported under 'none'.
+ */
+const distributionsBy = (rows, keyOf, bucketOf) => {
+  const groups = new Map();
+  rows.forEach((row) => {
+    const key = keyOf(row);
+    if (!groups.has(key)) groups.set(key, {});
+    const bucket = bucketOf(row) ?? 'none';
+    groups.get(key)[bucket] = (groups.get(key)[bucket] || 0) + Number(row.count);
+  });
+  return groups;
+};
+
+export const summarize = async (userUuid, params) => {
+  const { where, values } = buildTranscriptionFilters(userUuid, params);
+
+  const [briefings, scores, criteria, campaigns] = await Promise.all([
+    query({
+      label: 'stats_by_briefing',
+      text: `SELECT t.briefing_id, b.name AS briefing_name,
+                    COUNT(*)::int AS count,
+                    COUNT(*) FILTER (WHERE t.eval_status = 'evaluated')::int AS evaluated,
+                    COUNT(*) FILTER (WHERE t.eval_status = 'pending')::int AS pending,
+                    COUNT(*) FILTER (WHERE t.eval_status = 'rejected_duration')::int AS rejected_duration,
+                    ROUND(AVG(t.eval_score), 2) AS avg_score,
+                    MIN(t.eval_score) AS min_score,
+                    MAX(t.eval_score) AS max_score,
+                    MAX(t.eval_score_max) AS score_max
+             FROM transcriptions t
+             LEFT JOIN briefings b ON b.id = t.briefing_id
+             WHERE ${where}
+             GROUP BY t.briefing_id, b.name
+             ORDER BY count DESC`,
+    }, values),
+    query({
+      label: 'stats_score_distribution',
+      text: `SELECT t.briefing_id, t.eval_score AS score, COUNT(*)::int AS count
+             FROM transcriptions t
+             WHERE ${where} AND t.eval_score IS NOT NULL
+             GROUP BY t.briefing_id, t.eval_score`,
+    }, values),
+    query({
+      label: 'stats_by_criterion',
+      text: `SELECT t.briefing_id, c.criterion_id, MAX(c.criterion_name) AS criterion_name,
+                    c.nota, c.status, COUNT(*)::int AS count
+             FROM transcription_criteria c
+             JOIN transcriptions t ON t.id = c.transcription_id
+             WHERE ${where}
+             GROUP BY t.briefing_id, c.criterion_id, c.nota, c.status`,
+    }, values),
+    query({
+      label: 'stats_by_campaign',
+      text: `SELECT t.campaign, t.mission, COUNT(*)::int AS count,
+                    ROUND(AVG(t.eval_score), 2) AS avg_score
+             FROM transcriptions t
+             WHERE ${where}
+             GROUP BY t.campaign, t.mission
+             ORDER BY count DESC
+             LIMIT ${MAX_CAMPAIGN_ROWS}`,
+    }, values),
+  ]);
+
+  const scoreDistributions = distributionsBy(scores.rows, row => row.briefing_id, row => toNumber(row.score));
+
+  // Criteria per briefing, and the same rows folded across briefings.
+  const criterionStats = (rows) => {
+    const byCriterion = new Map();
+    rows.forEach((row) => {
+      if (!byCriterion.has(row.criterion_id)) {
+        byCriterion.set(row.criterion_id, {
+          criterion_id: row.criterion_id,
+          criterion_name: row.criterion_name,
+          count: 0,
+          graded: 0,
+          notaSum: 0,
+          distribution: {},
+          statuses: {},
+        });
+      }
+      const stats = byCriterion.get(row.criterion_id);
+      const count = Number(row.count);
+      const nota = toNumber(row.nota);
+      stats.count += count;
+      if (nota !== null) {
+        stats.graded += count;
+        stats.notaSum += nota * count;
+      }
+      stats.distribution[nota ?? 'none'] = (stats.distribution[nota ?? 'none'] || 0) + count;
+      if (row.status) stats.statuses[row.status] = (stats.statuses[row.status] || 0) + count;
+    });
+    return [...byCriterion.values()]
+      .sort((a, b) => a.criterion_id - b.criterion_id)
+      .map(({ graded, notaSum, ...stats }) => ({
+        ...stats,
+        avg_nota: graded > 0 ? Math.round((notaSum / graded) * 100) / 100 : null,
+      }));
+  };
+  const criteriaByBriefing = new Map();
+  criteria.rows.forEach((row) => {
+    if (!criteriaByBriefing.has(row.briefing_id)) criteriaByBriefing.set(row.briefing_id, []);
+    criteriaByBriefing.get(row.briefing_id).push(row);
+  });
+
+  const byBriefing = briefings.rows.map(row => ({
+    briefing_id: row.briefing_id,
+    briefing_name: row.briefing_name,
+    count: row.count,
+    evaluated: row.evaluated,
+    pending: row.pending,
+    rejected_duration: row.rejected_duration,
+    avg_score: toNumber(row.avg_score),
+    min_score: toNumber(row.min_score),
+    max_score: toNumber(row.max_score),
+    score_max: toNumber(row.score_max),
+    score_distribution: scoreDistributions.get(row.briefing_id) || {},
+    criteria: criterionStats(criteriaByBriefing.get(row.briefing_id) || []),
+  }));
+
+  const totals = byBriefing.reduce((acc, row) => ({
+    count: acc.count + row.count,
+    evaluated: acc.evaluated + row.evaluated,
+    pending: acc.pending + row.pending,
+    rejected_duration: acc.rejected_duration + row.rejected_duration,
+  }), { count: 0, evaluated: 0, pending: 0, rejected_duration: 0 });
+  const scoredRows = scores.rows.reduce((sum, row) => sum + Number(row.count), 0);
+  const scoreSum = scores.rows.reduce((sum, row) => sum + Number(row.score) * Number(row.count), 0);
+  totals.avg_score = scoredRows > 0 ? Math.round((scoreSum / scoredRows) * 100) / 100 : null;
+
+  return {
+    totals,
+    by_briefing: byBriefing,
+    by_criterion: criterionStats(criteria.rows),
+    by_campaign: campaigns.rows.map(row => ({
+      campaign: row.campaign,
+      mission: row.mission,
+      count: row.count,
+      avg_score: toNumber(row.avg_score),
+    })),
+  };
+};
+
+/**
+ * GET /api/transcriptions/stats?briefing_id=&campaign=&mission=&from=&to=
+ * Counts and score distributions per briefing, per criterion and per
+ * campaign/mission, aggregated in SQL over the promoted eval_* columns.
+ */
+const handler = async (req, res) => {
+  if (req.method !== 'GET') {
+    res.setHeader('Allow', ['GET']);
+    return res.status(405).json({ message: `Method ${req.method} Not Allowed` });
+  }
+
+  const userUuid = req.user?.sub;
+  if (!userUuid) {
+    return res.status(400).json({ message: 'Invalid token: User UUID not found.' });
+  }
+
+  try {
+    return res.status(200).json(await summarize(userUuid, req.query || {}));
+  } catch (error) {
+    if (error.statusCode) {
+      return res.status(error.statusCode).json({ message: error.message });
+    }
+    console.error('API /transcriptions/stats error:', error);
+    return res.status(500).json({ message: 'Internal Server Error' });
+  }
+};
+
+export default withAuth(handler);
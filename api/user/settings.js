@@ -1,4 +1,4 @@
-import { withAuth } from '../middleware/auth.js';
+import { withAuth, getUser, invalidateUser } from '../middleware/auth.js';
 import { query } from '../db.js';
 
 const parseBody = async (req) => {
@@ -18,13 +18,13 @@ const settingsHandler = async (req, res) => {
 
   if (req.method === 'GET') {
     try {
-      const { rows } = await query('SELECT gemini_api_key, gemini_model FROM users WHERE uuid = $1', [userId]);
-      if (rows.length === 0) {
+      const user = await getUser(userId);
+      if (!user) {
         return res.status(404).json({ error: 'User not found' });
       }
       res.status(200).json({
-        gemini_api_key: rows[0].gemini_api_key || '',
-        gemini_model: rows[0].gemini_model || 'gemini-pro',
+        gemini_api_key: user.gemini_api_key || '',
+        gemini_model: user.gemini_model || 'gemini-pro',
       });
     } catch (error) {
       console.error('Error fetching user settings:', error);
@@ -56,15 +56,16 @@ const settingsHandler = async (req, res) => {
       const sql = `UPDATE users SET ${updateFields.join(', ')} WHERE uuid = $${queryIndex}`;
 
       await query(sql, values);
+      invalidateUser(userId);
 
       // After updating, fetch the updated settings to return to the client
-      const { rows } = await query('SELECT gemini_api_key, gemini_model FROM users WHERE uuid = $1', [userId]);
+      const user = await getUser(userId);
 
       res.status(200).json({
         message: 'Settings updated successfully',
         settings: {
-          gemini_api_key: rows[0].gemini_api_key || '',
-          gemini_model: rows[0].gemini_model || 'gemini-pro',
+          gemini_api_key: user.gemini_api_key || '',
+          gemini_model: user.gemini_model || 'gemini-pro',
         }
       });
     } catch (error) {
@@ -0,0 +1,111 @@
+// Small key/value cache with per-entry TTL for the serverless functions.
+//
+// With REDIS_URL set, entries live in Redis (ioredis) and are shared by every
+// function instance; otherwise each warm instance keeps its own in-memory copy.
+// MemoryRedis implements the handful of ioredis commands used here, so it is
+// both the fallback and the local Redis stand-in for tests.
+
+export class MemoryRedis {
+  constructor({ now = () => Date.now() } = {}) {
+    this.now = now;
+    this.entries = new Map();
+  }
+
+  read(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return null;
+    if (entry.expiresAt !== null && entry.expiresAt <= this.now()) {
+      this.entries.delete(key);
+      return null;
+    }
+    return entry.value;
+  }
+
+  async get(key) {
+    return this.read(key);
+  }
+
+  async mget(...keys) {
+    return keys.flat().map(key => this.read(key));
+  }
+
+  /** Supports `set(key, value)` and `set(key, value, 'EX', seconds)`. */
+  async set(key, value, mode, seconds) {
+    const expiresAt = String(mode).toUpperCase() === 'EX' ? this.now() + seconds * 1000 : null;
+    this.entries.set(key, { value: String(value), expiresAt });
+    return 'OK';
+  }
+
+  async del(...keys) {
+    return keys.flat().reduce((count, key) => count + (this.entries.delete(key) ? 1 : 0), 0);
+  }
+
+  async ttl(key) {
+    const entry = this.entries.get(key);
+    if (!entry || this.read(key) === null) return -2;
+    return entry.expiresAt === null ? -1 : Math.ceil((entry.expiresAt - this.now()) / 1000);
+  }
+}
+
+/** JSON values on top of a Redis-like client. Cache failures are logged and treated as misses. */
+export class JsonCache {
+  constructor(client, { prefix = '' } = {}) {
+    this.client = client;
+    this.prefix = prefix;
+  }
+
+  /** @returns {Promise<Map<string, any>>} key -> value, for the hits only. */
+  async getMany(keys) {
+    const hits = new Map();
+    if (keys.length === 0) return hits;
+    try {
+      const values = await this.client.mget(...keys.map(key => this.prefix + key));
+      values.forEach((value, i) => {
+        if (value !== null && value !== undefined) hits.set(keys[i], JSON.parse(value));
+      });
+    } catch (error) {
+      console.error('Cache read failed:', error.message);
+    }
+    return hits;
+  }
+
+  async set(key, value, ttlSeconds) {
+    if (!(ttlSeconds > 0)) return;
+    try {
+      await this.client.set(this.prefix + key, JSON.stringify(value), 'EX', Math.ceil(ttlSeconds));
+    } catch (error) {
+      console.error('Cache write failed:', error.message);
+    }
+  }
+}
+
+let sharedClient = null;
+
+/**
+ * The client shared by this function instance: ioredis when REDIS_URL is set
+ * (connected lazily), MemoryRedis otherwise.
+ */
+export const getCacheClient = async () => {
+  if (sharedClient) return sharedClient;
+  if (process.env.REDIS_URL) {
+    try {
+      const { default: Redis } = await import('ioredis');
+      sharedClient = new Redis(process.env.REDIS_URL, {
+        lazyConnect: true,
+        maxRetriesPerRequest: 1,
+        enableOfflineQueue: true,
+      });
+      sharedClient.on('error', (error) => console.error('Redis error:', error.message));
+      return sharedClient;
+    } catch (error) {
+      console.error('Redis unavailable, using the in-memory cache:', error.message);
+    }
+  }
+  sharedClient = new MemoryRedis();
+  return sharedClient;
+};
+
+/** Overrides the shared client (tests). */
+export const setCacheClient = (client) => {
+  sharedClient = client;
+};
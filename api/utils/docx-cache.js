@@ -0,0 +1,70 @@
+import { createHash } from 'crypto';
+import { generateDocx, DOCX_GENERATOR_VERSION } from './docx-generator.js';
+import { getCacheClient } from './cache.js';
+
+// Generated .docx files, addressed by a hash of their HTML and of the
+// generator version. The same content always yields the same file, so an
+// entry never goes stale; the TTL only bounds how much is kept.
+const KEY_PREFIX = 'docx:';
+const TTL_SECONDS = 7 * 24 * 60 * 60;
+// Larger documents are rendered every time rather than stored in the cache.
+const MAX_CACHED_BYTES = 2 * 1024 * 1024;
+
+// Renders in progress on this instance, so simultaneous requests for the same
+// content share one render.
+const inflight = new Map();
+
+export const docxCacheKey = htmlContent => createHash('sha256')
+  .update(`${DOCX_GENERATOR_VERSION}\n${htmlContent}`)
+  .digest('hex');
+
+const readCached = async (client, key) => {
+  try {
+    const value = await client.get(KEY_PREFIX + key);
+    return value ? Buffer.from(value, 'base64') : null;
+  } catch (error) {
+    console.error('DOCX cache read failed:', error.message);
+    return null;
+  }
+};
+
+const writeCached = async (client, key, buffer) => {
+  if (buffer.length > MAX_CACHED_BYTES) return;
+  try {
+    await client.set(KEY_PREFIX + key, buffer.toString('base64'), 'EX', TTL_SECONDS);
+  } catch (error) {
+    console.error('DOCX cache write failed:', error.message);
+  }
+};
+
+/**
+ * generateDocx through the cache.
+ * @param {string} htmlContent
+ * @param {Object} [options]
+ * @param {Object} [options.cache] - Redis-like client; defaults to getCacheClient().
+ * @param {(html: string) => Promise<Buffer>} [options.generate=generateDocx]
+ * @returns {Promise<{buffer: Buffer, cached: boolean}>}
+ */
+export const renderDocx = async (htmlContent, { cache, generate = generateDocx } = {}) => {
+  if (!htmlContent) {
+    throw new Error('htmlContent is required');
+  }
+  const client = cache || await getCacheClient();
+  const key = docxCacheKey(htmlContent);
+
+  const cached = await readCached(client, key);
+  if (cached) return { buffer: cached, cached: true };
+
+  if (!inflight.has(key)) {
+    inflight.set(key, (async () => {
+      try {
+        const buffer = Buffer.from(await generate(htmlContent));
+        await writeCached(client, key, buffer);
+        return buffer;
+      } finally {
+        inflight.delete(key);
+      }
+    })());
+  }
+  return { buffer: await inflight.get(key), cached: false };
+};
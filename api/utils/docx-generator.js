@@ -1,6 +1,10 @@
 import { Document, Packer, Paragraph, TextRun, HeadingLevel, Table, TableCell, TableRow, WidthType, BorderStyle, AlignmentType, UnderlineType, PageBreak } from 'docx';
 import { parse } from 'node-html-parser';
 
+// Part of the DOCX cache key (docx-cache.js): bump it whenever a change here
+// alters the generated document, so cached files from the old code are not served.
+const DOCX_GENERATOR_VERSION = 1;
+
 const generateDocx = async (htmlContent) => {
     if (!htmlContent) {
         throw new Error('htmlContent is required');
@@ -136,4 +140,4 @@ function createTable(tableNode) {
     });
 }
 
-export { generateDocx };
\ No newline at end of file
+export { generateDocx, DOCX_GENERATOR_VERSION };
\ No newline at end of file
@@ -0,0 +1,30 @@
+// Reads and writes of the evaluation_cache table (create_evaluation_cache_table.sql),
+// shared by /api/evaluation-cache and the evaluation worker.
+import { query } from '../db.js';
+
+export const lookupEvaluations = async (userUuid, keys) => {
+  const { rows } = await query(
+    'SELECT cache_key, result FROM evaluation_cache WHERE user_id = $1 AND cache_key = ANY($2)',
+    [userUuid, keys]
+  );
+  return Object.fromEntries(rows.map(row => [row.cache_key, row.result]));
+};
+
+export const storeEvaluations = async (userUuid, entries) => {
+  // ON CONFLICT DO UPDATE cannot touch the same row twice in one statement.
+  const unique = [...new Map(entries.map(entry => [entry.key, entry])).values()];
+  const values = [userUuid];
+  const tuples = unique.map(({ key, promptVersion, model, language, result }) => {
+    values.push(key, promptVersion, model || null, language || null, JSON.stringify(result));
+    const base = values.length - 5;
+    return `($1, $${base + 1}, $${base + 2}, $${base + 3}, $${base + 4}, $${base + 5})`;
+  });
+  await query(
+    `INSERT INTO evaluation_cache (user_id, cache_key, prompt_version, model, language, result)
+     VALUES ${tuples.join(', ')}
+     ON CONFLICT (user_id, cache_key)
+     DO UPDATE SET result = EXCLUDED.result, prompt_version = EXCLUDED.prompt_version, created_at = NOW()`,
+    values
+  );
+  return unique.length;
+};
@@ -0,0 +1,360 @@
+// Durable queue of bulk evaluation runs (create_evaluation_jobs_tables.sql).
+//
+// The browser creates a job and uploads the prepared spreadsheet rows as
+// items; workers (api/utils/evaluation-runner.js) claim items in batches with
+// FOR UPDATE SKIP LOCKED, so any number of them can share the queue without
+// handing the same row to two workers. A claim is a lease: items whose worker
+// died are released once it expires. Failed items are retried with
+// exponential backoff up to MAX_ATTEMPTS and can be re-queued by the user.
+import { query, withTransaction } from '../db.js';
+
+export const MAX_ATTEMPTS = Number(process.env.EVALUATION_JOB_MAX_ATTEMPTS) || 3;
+export const LEASE_SECONDS = Number(process.env.EVALUATION_JOB_LEASE_SECONDS) || 300;
+const RETRY_BASE_SECONDS = 30;
+// Window of the throughput reported by getJobProgress.
+const THROUGHPUT_WINDOW_MINUTES = 5;
+const FAILURES_SHOWN = 20;
+// 10 bind parameters per item.
+export const MAX_APPEND_ITEMS = 500;
+
+const JOB_COLUMNS = `j.id, j.briefing_id, j.model, j.language, j.status, j.sealed,
+  j.created_at, j.updated_at, j.finished_at`;
+
+const COUNTS = `
+  COUNT(i.id)::int AS total,
+  COUNT(i.id) FILTER (WHERE i.status = 'pending')::int AS pending,
+  COUNT(i.id) FILTER (WHERE i.status = 'running')::int AS running,
+  COUNT(i.id) FILTER (WHERE i.status = 'done')::int AS done,
+  COUNT(i.id) FILTER (WHERE i.status = 'failed')::int AS failed,
+  COUNT(i.id) FILTER (WHERE i.status = 'skipped')::int AS skipped`;
+
+export const createJob = async ({ userUuid, briefingId, briefingText, model, language, promptVersion }) => {
+  const { rows } = await query(
+    `INSERT INTO evaluation_jobs (user_id, briefing_id, briefing_text, model, language, prompt_version)
+     VALUES ($1, $2, $3, $4, $5, $6)
+     RETURNING id, briefing_id, model, language, status, sealed, created_at, updated_at, finished_at`,
+    [userUuid, briefingId || null, briefingText, model, language, promptVersion || null]
+  );
+  return rows[0];
+};
+
+/** Marks a finished job completed; a no-op while items are left or rows may still arrive. */
+const completeIfDone = (db, jobId) => db.query(
+  `UPDATE evaluation_jobs SET status = 'completed', finished_at = NOW(), updated_at = NOW()
+   WHERE id = $1 AND status = 'running' AND sealed
+     AND NOT EXISTS (SELECT 1 FROM evaluation_job_items
+                     WHERE job_id = $1 AND status IN ('pending', 'running'))`,
+  [jobId]
+);
+
+/**
+ * Adds prepared rows to a job. Rows already present (same row_index) are kept
+ * as they are, so a batch re-sent after a network error is harmless.
+ * @param {Object[]} items - { rowIndex, name, videoUrl, caption, transcription,
+ * duration, row, cacheKey, skipped } where `skipped` is the ai_status of a row
+ * that is not evaluated (no URL, no transcription).
+ * @param {Object} [options]
+ * @param {boolean} [options.sealed] - No more rows will follow.
+ * @returns {Promise<number>} Rows inserted.
+ */
+export const appendItems = async (jobId, items, { sealed = false } = {}) => withTransaction(async (tx) => {
+  let inserted = 0;
+  if (items.length > 0) {
+    const values = [jobId];
+    const tuples = items.map((item) => {
+      values.push(
+        item.rowIndex,
+        item.name,
+        item.videoUrl || null,
+        item.caption || null,
+        item.transcription || null,
+        Number(item.duration) || 0,
+        JSON.stringify(item.row || {}),
+        item.cacheKey || null,
+        item.skipped ? 'skipped' : 'pending',
+        item.skipped || null
+      );
+      const base = values.length - 10;
+      return `($1, ${Array.from({ length: 10 }, (_, k) => `$${base + k + 1}`).join(', ')})`;
+    });
+    const result = await tx.query(
+      `INSERT INTO evaluation_job_items
+         (job_id, row_index, name, video_url, caption, transcription, duration, row_data, cache_key, status, ai_status)
+       VALUES ${tuples.join(', ')}
+       ON CONFLICT (job_id, row_index) DO NOTHING`,
+      values
+    );
+    inserted = result.rowCount;
+  }
+  if (sealed) {
+    await tx.query('UPDATE evaluation_jobs SET sealed = TRUE, updated_at = NOW() WHERE id = $1', [jobId]);
+    await completeIfDone(tx, jobId);
+  }
+  return inserted;
+}, { label: 'evaluation_jobs_append' });
+
+/**
+ * Reserves up to `limit` pending items of one running job for `workerId`.
+ * Items of a claim share the job, so they can go into the same grouped
+ * Gemini call. Concurrent workers skip each other's rows instead of waiting.
+ * @returns {Promise<{job: Object, items: Object[]}|null>} null when nothing is due.
+ * `job` carries the briefing and the owner's Gemini key.
+ */
+export const claimItems = async ({ workerId, limit = 20, leaseSeconds = LEASE_SECONDS }) => withTransaction(async (tx) => {
+  const { rows: [next] } = await tx.query({
+    label: 'evaluation_jobs_claim_next',
+    text: `SELECT i.job_id FROM evaluation_job_items i
+           JOIN evaluation_jobs j ON j.id = i.job_id
+           WHERE i.status = 'pending' AND i.available_at <= NOW() AND j.status = 'running'
+           ORDER BY i.available_at, i.id
+           LIMIT 1
+           FOR UPDATE OF i SKIP LOCKED`,
+  });
+  if (!next) return null;
+
+  const { rows: items } = await tx.query({
+    label: 'evaluation_jobs_claim',
+    text: `UPDATE evaluation_job_items
+           SET status = 'running', attempts = attempts + 1, locked_by = $2,
+               locked_until = NOW() + make_interval(secs => $4), updated_at = NOW()
+           WHERE id IN (
+             SELECT id FROM evaluation_job_items
+             WHERE job_id = $1 AND status = 'pending' AND available_at <= NOW()
+             ORDER BY row_index
+             LIMIT $3
+             FOR UPDATE SKIP LOCKED
+           )
+           RETURNING id, row_index, name, video_url, caption, transcription, duration, row_data, cache_key, attempts`,
+  }, [next.job_id, workerId, limit, leaseSeconds]);
+
+  const { rows: [job] } = await tx.query(
+    `SELECT j.id, j.user_id, j.briefing_id, j.briefing_text, j.model, j.language, j.prompt_version, u.gemini_api_key
+     FROM evaluation_jobs j JOIN users u ON u.uuid = j.user_id
+     WHERE j.id = $1`,
+    [next.job_id]
+  );
+  items.sort((a, b) => a.row_index - b.row_index);
+  return { job, items };
+}, { label: 'evaluation_jobs_claim' });
+
+/** Extends the lease of items still being worked on (long rate-limit waits). */
+export const renewLeases = async (workerId, ids, leaseSeconds = LEASE_SECONDS) => {
+  if (ids.length === 0) return;
+  await query({
+    label: 'evaluation_jobs_renew',
+    text: `UPDATE evaluation_job_items SET locked_until = NOW() + make_interval(secs => $3)
+           WHERE id = ANY($1) AND status = 'running' AND locked_by = $2`,
+  }, [ids, workerId, leaseSeconds]);
+};
+
+/**
+ * Returns items whose lease expired (their worker died or hung) to the queue,
+ * or fails them once they have used up their attempts: a row that keeps
+ * killing workers must not be retried forever.
+ * @returns {Promise<number>} Items released.
+ */
+export const releaseExpiredLeases = async () => {
+  const { rows } = await query({
+    label: 'evaluation_jobs_release',
+    text: `UPDATE evaluation_job_items
+           SET status = CASE WHEN attempts >= $1 THEN 'failed' ELSE 'pending' END,
+               ai_status = CASE WHEN attempts >= $1 THEN 'Erro: processamento interrompido.' ELSE ai_status END,
+               last_error = 'Lease expired',
+               locked_by = NULL, locked_until = NULL, available_at = NOW(), updated_at = NOW()
+           WHERE status = 'running' AND locked_until < NOW()
+           RETURNING job_id`,
+  }, [MAX_ATTEMPTS]);
+  for (const jobId of new Set(rows.map(row => row.job_id))) {
+    await completeIfDone({ query }, jobId);
+  }
+  return rows.length;
+};
+
+/**
+ * Stores evaluated items and their transcriptions in one transaction. Items
+ * no longer leased to `workerId` (the lease expired and another worker took
+ * them) are left alone, so a row is never saved twice.
+ * @param {Object} job - From claimItems.
+ * @param {Object[]} results - { id, name, videoUrl, transcriptionData, evaluation, aiStatus }.
+ * @returns {Promise<number>} Items completed.
+ */
+export const completeItems = async (job, workerId, results) => {
+  if (results.length === 0) return 0;
+  return withTransaction(async (tx) => {
+    const { rows: owned } = await tx.query(
+      `SELECT id FROM evaluation_job_items
+       WHERE id = ANY($1) AND status = 'running' AND locked_by = $2
+       FOR UPDATE`,
+      [results.map(r => r.id), workerId]
+    );
+    const ownedIds = new Set(owned.map(row => String(row.id)));
+    const mine = results.filter(r => ownedIds.has(String(r.id)));
+    if (mine.length === 0) return 0;
+
+    const values = [job.user_id, job.briefing_id];
+    const tuples = mine.map(({ name, videoUrl, transcriptionData }) => {
+      values.push(name, videoUrl || null, JSON.stringify(transcriptionData));
+      const base = values.length - 3;
+      return `($1, $${base + 1}, $${base + 2}, $2, $${base + 3})`;
+    });
+    // RETURNING yields rows in VALUES order, which maps ids back to items.
+    const { rows: saved } = await tx.query(
+      `INSERT INTO transcriptions (user_id, name, video_url, briefing_id, transcription_data)
+       VALUES ${tuples.join(', ')}
+       RETURNING id`,
+      values
+    );
+
+    await tx.query(
+      `UPDATE evaluation_job_items i
+       SET status = 'done', result = r.result, ai_status = r.ai_status, transcription_id = r.transcription_id,
+           last_error = NULL, locked_by = NULL, locked_until = NULL, updated_at = NOW()
+       FROM jsonb_to_recordset($1::jsonb) AS r(id BIGINT, result JSONB, ai_status TEXT, transcription_id INTEGER)
+       WHERE i.id = r.id`,
+      [JSON.stringify(mine.map((r, index) => ({
+        id: r.id, result: r.evaluation, ai_status: r.aiStatus, transcription_id: saved[index].id,
+      })))]
+    );
+    await completeIfDone(tx, job.id);
+    return mine.length;
+  }, { label: 'evaluation_jobs_complete' });
+};
+
+/**
+ * Gives items back after a failed attempt: they are retried after an
+ * exponential backoff, or marked failed once MAX_ATTEMPTS is reached. A rate
+ * limit is not the item's fault and does not use up an attempt.
+ * @param {Object} [options]
+ * @param {number} [options.retryAfterMs] - Wait asked for by the API.
+ * @param {boolean} [options.rateLimited]
+ */
+export const failItems = async (jobId, workerId, ids, message, { retryAfterMs = 0, rateLimited = false } = {}) => {
+  if (ids.length === 0) return;
+  await query({
+    label: 'evaluation_jobs_fail',
+    text: `UPDATE evaluation_job_items
+           SET status = CASE WHEN NOT $4 AND attempts >= $5 THEN 'failed' ELSE 'pending' END,
+               ai_status = CASE WHEN NOT $4 AND attempts >= $5 THEN 'Erro: ' || $3 ELSE ai_status END,
+               attempts = CASE WHEN $4 THEN attempts - 1 ELSE attempts END,
+               available_at = NOW() + make_interval(secs => GREATEST($6::float8 / 1000, $7 * power(2, attempts - 1))),
+               last_error = $3, locked_by = NULL, locked_until = NULL, updated_at = NOW()
+           WHERE id = ANY($1) AND status = 'running' AND locked_by = $2`,
+  }, [ids, workerId, message, rateLimited, MAX_ATTEMPTS, retryAfterMs, RETRY_BASE_SECONDS]);
+  await completeIfDone({ query }, jobId);
+};
+
+/** Jobs of a user, newest first, with item counts. */
+export const listJobs = async (userUuid, { limit = 20 } = {}) => {
+  const { rows } = await query(
+    `SELECT ${JOB_COLUMNS}, ${COUNTS}
+     FROM evaluation_jobs j
+     LEFT JOIN evaluation_job_items i ON i.job_id = j.id
+     WHERE j.user_id = $1
+     GROUP BY j.id
+     ORDER BY j.created_at DESC
+     LIMIT $2`,
+    [userUuid, limit]
+  );
+  return rows;
+};
+
+/**
+ * A job's state for the progress poll: item counts, throughput over the last
+ * minutes and the latest failures.
+ * @returns {Promise<Object|null>} null when the job is not the user's.
+ */
+export const getJobProgress = async (jobId, userUuid) => {
+  const { rows: [job] } = await query({
+    label: 'evaluation_jobs_progress',
+    text: `SELECT ${JOB_COLUMNS}, ${COUNTS},
+             COUNT(i.id) FILTER (
+               WHERE i.status IN ('done', 'failed')
+                 AND i.updated_at > NOW() - make_interval(mins => $3)
+             )::int AS recently_finished
+           FROM evaluation_jobs j
+           LEFT JOIN evaluation_job_items i ON i.job_id = j.id
+           WHERE j.id = $1 AND j.user_id = $2
+           GROUP BY j.id`,
+  }, [jobId, userUuid, THROUGHPUT_WINDOW_MINUTES]);
+  if (!job) return null;
+
+  const { rows: failures } = await query(
+    `SELECT row_index, name, last_error FROM evaluation_job_items
+     WHERE job_id = $1 AND status = 'failed'
+     ORDER BY row_index
+     LIMIT $2`,
+    [jobId, FAILURES_SHOWN]
+  );
+  const { recently_finished: recent, ...rest } = job;
+  return { ...rest, rowsPerMinute: recent / THROUGHPUT_WINDOW_MINUTES, failures };
+};
+
+/**
+ * A page of a job's items in sheet order, for exporting the results.
+ * @returns {Promise<{items: Object[], nextAfter: number|null}>}
+ */
+export const listJobItems = async (jobId, userUuid, { after = -1, limit = 200 } = {}) => {
+  const { rows } = await query(
+    `SELECT i.row_index, i.name, i.status, i.ai_status, i.transcription, i.result, i.row_data, i.last_error
+     FROM evaluation_job_items i
+     JOIN evaluation_jobs j ON j.id = i.job_id
+     WHERE i.job_id = $1 AND j.user_id = $2 AND i.row_index > $3
+     ORDER BY i.row_index
+     LIMIT $4`,
+    [jobId, userUuid, after, limit]
+  );
+  return { items: rows, nextAfter: rows.length === limit ? rows[rows.length - 1].row_index : null };
+};
+
+const ACTIONS = {
+  pause: `UPDATE evaluation_jobs SET status = 'paused', updated_at = NOW()
+          WHERE id = $1 AND user_id = $2 AND status = 'running' RETURNING id`,
+  resume: `UPDATE evaluation_jobs SET status = 'running', updated_at = NOW()
+           WHERE id = $1 AND user_id = $2 AND status = 'paused' RETURNING id`,
+  cancel: `UPDATE evaluation_jobs SET status = 'cancelled', finished_at = NOW(), updated_at = NOW()
+           WHERE id = $1 AND user_id = $2 AND status IN ('running', 'paused') RETURNING id`,
+  // The browser could not upload every row: the job is incomplete for good.
+  fail: `UPDATE evaluation_jobs SET status = 'failed', finished_at = NOW(), updated_at = NOW()
+         WHERE id = $1 AND user_id = $2 AND NOT sealed AND status IN ('running', 'paused') RETURNING id`,
+};
+
+/**
+ * Pauses, resumes or cancels a job, marks a job whose upload broke off as
+ * failed, or puts its failed items back in the queue with fresh attempts
+ * ('retry', which also reopens a completed job).
+ * @returns {Promise<boolean>} false when the job is not the user's or the
+ * action does not apply to its current status.
+ */
+export const applyJobAction = async (jobId, userUuid, action) => {
+  if (action === 'retry') {
+    return withTransaction(async (tx) => {
+      const { rows } = await tx.query(
+        `UPDATE evaluation_jobs SET status = 'running', finished_at = NULL, updated_at = NOW()
+         WHERE id = $1 AND user_id = $2 AND status NOT IN ('cancelled', 'failed') RETURNING id`,
+        [jobId, userUuid]
+      );
+      if (rows.length === 0) return false;
+      await tx.query(
+        `UPDATE evaluation_job_items
+         SET status = 'pending', attempts = 0, ai_status = NULL, available_at = NOW(), updated_at = NOW()
+         WHERE job_id = $1 AND status = 'failed'`,
+        [jobId]
+      );
+      await completeIfDone(tx, jobId);
+      return true;
+    }, { label: 'evaluation_jobs_retry' });
+  }
+  if (!ACTIONS[action]) throw Object.assign(new Error(`Unknown action: ${action}`), { statusCode: 400 });
+  const { rows } = await query(ACTIONS[action], [jobId, userUuid]);
+  return rows.length > 0;
+};
+
+/** Whether the job exists, belongs to the user and still accepts rows. */
+export const isJobOpen = async (jobId, userUuid) => {
+  const { rows } = await query(
+    `SELECT 1 FROM evaluation_jobs
+     WHERE id = $1 AND user_id = $2 AND NOT sealed AND status IN ('running', 'paused')`,
+    [jobId, userUuid]
+  );
+  return rows.length > 0;
+};
@@ -0,0 +1,215 @@
+// Worker side of the evaluation queue (api/utils/evaluation-jobs.js): claims
+// batches of items, evaluates them the same way the browser does (shared
+// prompt builders in src/utils/geminiAPI.js, rules in src/utils/bulkEvaluation.js)
+// and saves the results. Run by scripts/evaluation-worker.mjs.
+import { GeminiAPI } from '../../src/utils/geminiAPI.js';
+import {
+  EvaluationScheduler, getModelQuota, isRateLimitError, parseRetryDelayMs,
+} from '../../src/utils/evaluationScheduler.js';
+import { packItems } from '../../src/utils/promptPacker.js';
+import {
+  MIN_EVALUATION_WORDS, getWordCount, shortTranscriptionEvaluation, sanitizeEvaluation,
+  applyDurationRule, buildTranscriptionData,
+} from '../../src/utils/bulkEvaluation.js';
+import { callGemini } from './gemini-client.js';
+import { lookupEvaluations, storeEvaluations } from './evaluation-cache.js';
+import {
+  LEASE_SECONDS, claimItems, completeItems, failItems, renewLeases, releaseExpiredLeases,
+} from './evaluation-jobs.js';
+
+/** GeminiAPI that calls Gemini directly instead of going through /api/gemini. */
+export class ServerGeminiAPI extends GeminiAPI {
+  async callProxy(body) {
+    return callGemini({ ...body, apiKey: this.apiKey });
+  }
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Gemini clients and schedulers of one worker process. A scheduler per key
+ * and model: the quota belongs to the user's project, and every job of that
+ * user handled by this process shares it.
+ */
+export class GeminiPool {
+  constructor({ createApi = () => new ServerGeminiAPI() } = {}) {
+    this.createApi = createApi;
+    this.entries = new Map();
+  }
+
+  get(apiKey, model) {
+    const key = `${apiKey}|${model}`;
+    if (!this.entries.has(key)) {
+      const api = this.createApi();
+      api.initialize(apiKey);
+      this.entries.set(key, { api, scheduler: new EvaluationScheduler(getModelQuota(model)) });
+    }
+    return this.entries.get(key);
+  }
+}
+
+const toResult = (job, item, evaluation, aiStatus) => {
+  const duration = Number(item.duration) || 0;
+  const finalEval = applyDurationRule(evaluation, duration, job.language);
+  return {
+    id: item.id,
+    name: item.name,
+    videoUrl: item.video_url,
+    evaluation: finalEval,
+    aiStatus,
+    transcriptionData: buildTranscriptionData({
+      row: item.row_data,
+      caption: item.caption,
+      transcription: item.transcription,
+      duration,
+      evaluation: finalEval,
+    }),
+  };
+};
+
+/**
+ * Evaluates one claim and records the outcome of every item in it: done,
+ * back in the queue for a retry, or failed.
+ * @param {{job: Object, items: Object[]}} claim - From claimItems.
+ * @param {Object} options
+ * @param {string} options.workerId
+ * @param {GeminiPool} options.pool
+ * @param {number} [options.leaseSeconds]
+ */
+export const processClaim = async ({ job, items }, { workerId, pool, leaseSeconds = LEASE_SECONDS }) => {
+  const language = job.language;
+  if (!job.gemini_api_key) {
+    await failItems(job.id, workerId, items.map(item => item.id), 'Chave da API Gemini não configurada.');
+    return;
+  }
+
+  // Keeps the claim while requests wait for the quota.
+  const pending = new Set(items.map(item => item.id));
+  const heartbeat = setInterval(() => {
+    renewLeases(workerId, [...pending], leaseSeconds).catch(error => (
+      console.error('[Evaluation worker] Lease renewal failed:', error.message)
+    ));
+  }, (leaseSeconds * 1000) / 3);
+
+  const finish = async (results) => {
+    await completeItems(job, workerId, results);
+    results.forEach(result => pending.delete(result.id));
+  };
+  const fail = async (failed, error) => {
+    await failItems(job.id, workerId, failed.map(item => item.id), error.message, {
+      rateLimited: isRateLimitError(error),
+      retryAfterMs: parseRetryDelayMs(error) || 0,
+    });
+    failed.forEach(item => pending.delete(item.id));
+  };
+
+  try {
+    const immediate = [];
+    const candidates = [];
+    items.forEach((item) => {
+      const wordCount = getWordCount(item.transcription);
+      if (wordCount < MIN_EVALUATION_WORDS) {
+        immediate.push(toResult(job, item, shortTranscriptionEvaluation(wordCount, language), 'Sucesso'));
+      } else {
+        candidates.push(item);
+      }
+    });
+
+    // Unchanged rows from earlier runs are not re-billed.
+    const keys = candidates.map(item => item.cache_key).filter(Boolean);
+    const cached = keys.length > 0 ? await lookupEvaluations(job.user_id, keys) : {};
+    const toEvaluate = [];
+    candidates.forEach((item) => {
+      const hit = item.cache_key && cached[item.cache_key];
+      if (hit) immediate.push(toResult(job, item, { ...hit, id: item.name }, 'Sucesso (cache)'));
+      else toEvaluate.push(item);
+    });
+    await finish(immediate);
+    if (toEvaluate.length === 0) return;
+
+    const { api, scheduler } = pool.get(job.gemini_api_key, job.model);
+    const prepared = await api.prepareGroupedEvaluation(job.briefing_text, job.model, language);
+    const groups = packItems(
+      toEvaluate.map(item => ({ id: item.name, transcription: item.transcription, caption: item.caption || '', item })),
+      { prefixTokens: prepared.prefixTokens }
+    );
+
+    await Promise.all(groups.map(async ({ items: group, tokens }) => {
+      const groupItems = group.map(entry => entry.item);
+      let grouped;
+      try {
+        grouped = await scheduler.schedule(
+          () => api.evaluateMultipleContent(group, job.briefing_text, job.model, language, {
+            cachedContent: prepared.cachedContent,
+          }),
+          { tokens, units: group.length }
+        );
+      } catch (error) {
+        console.error(`[Evaluation worker] Job ${job.id}: grouped evaluation failed:`, error.message);
+        await fail(groupItems, error);
+        return;
+      }
+
+      const evaluated = [];
+      const missing = [];
+      groupItems.forEach((item) => {
+        const found = grouped?.resultados?.find(r => r.id === item.name);
+        if (found) evaluated.push({ item, evaluation: sanitizeEvaluation(found, language) });
+        else missing.push(item);
+      });
+
+      const cacheEntries = evaluated
+        .filter(({ item }) => item.cache_key && job.prompt_version)
+        .map(({ item, evaluation }) => ({
+          key: item.cache_key, promptVersion: job.prompt_version, model: job.model, language, result: evaluation,
+        }));
+      if (cacheEntries.length > 0) {
+        await storeEvaluations(job.user_id, cacheEntries)
+          .catch(error => console.error('[Evaluation worker] Evaluation cache write failed:', error.message));
+      }
+      await finish(evaluated.map(({ item, evaluation }) => toResult(job, item, evaluation, 'Sucesso')));
+      if (missing.length > 0) {
+        await fail(missing, new Error('IA não retornou avaliação para este item no lote.'));
+      }
+    }));
+  } catch (error) {
+    console.error(`[Evaluation worker] Job ${job.id}: batch failed:`, error);
+    await fail(items.filter(item => pending.has(item.id)), error);
+  } finally {
+    clearInterval(heartbeat);
+  }
+};
+
+/**
+ * Claims and processes batches until `signal` is aborted.
+ * @param {Object} options
+ * @param {string} options.workerId - Unique per process (host:pid).
+ * @param {number} [options.batchSize=20] - Items per claim.
+ * @param {number} [options.concurrency=2] - Claims processed at once.
+ * @param {number} [options.pollMs=2000] - Wait when the queue is empty.
+ * @param {AbortSignal} [options.signal]
+ * @param {GeminiPool} [options.pool]
+ */
+export const runWorker = async ({
+  workerId, batchSize = 20, concurrency = 2, pollMs = 2000, signal, pool = new GeminiPool(),
+}) => {
+  const loop = async () => {
+    while (!signal?.aborted) {
+      try {
+        await releaseExpiredLeases();
+        const claim = await claimItems({ workerId, limit: batchSize });
+        if (!claim || claim.items.length === 0) {
+          await sleep(pollMs);
+          continue;
+        }
+        console.log(`[Evaluation worker] Job ${claim.job.id}: ${claim.items.length} itens reservados.`);
+        await processClaim(claim, { workerId, pool });
+      } catch (error) {
+        // Database hiccup: the claimed items come back when their lease expires.
+        console.error('[Evaluation worker] Loop error:', error);
+        await sleep(pollMs);
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: concurrency }, loop));
+};
@@ -0,0 +1,104 @@
+import fetch from 'node-fetch';
+
+// Overridable so tests and local runs can point at a stub server.
+const GEMINI_API_BASE_URL = process.env.GEMINI_API_BASE_URL || 'https://generativelanguage.googleapis.com/v1beta';
+
+const badRequest = (message) => Object.assign(new Error(message), { statusCode: 400 });
+
+const buildRequest = ({ action, apiKey, model, prompt, cachedContent, ttlSeconds }) => {
+  if (!apiKey) {
+    throw badRequest('API key is required');
+  }
+
+  const options = {
+    method: 'GET',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+  };
+
+  switch (action) {
+    case 'listModels':
+      return { url: `${GEMINI_API_BASE_URL}/models?key=${apiKey}`, options };
+
+    case 'reviseBriefing': // Added to handle the new action
+    case 'generateContent': {
+      if (!prompt || !model) {
+        throw badRequest('Prompt and model are required for this action');
+      }
+      const modelName = model.startsWith('models/') ? model.split('/')[1] : model;
+      options.method = 'POST';
+      options.body = JSON.stringify({
+        contents: [{ role: 'user', parts: [{ text: prompt }] }],
+        // Shared prompt prefix stored with createCachedContent; must belong to the same model.
+        ...(cachedContent ? { cachedContent } : {}),
+      });
+      return { url: `${GEMINI_API_BASE_URL}/models/${modelName}:generateContent?key=${apiKey}`, options };
+    }
+
+    case 'createCachedContent': {
+      if (!prompt || !model) {
+        throw badRequest('Prompt and model are required for this action');
+      }
+      const cacheModel = model.startsWith('models/') ? model : `models/${model}`;
+      options.method = 'POST';
+      options.body = JSON.stringify({
+        model: cacheModel,
+        contents: [{ role: 'user', parts: [{ text: prompt }] }],
+        ttl: `${Number(ttlSeconds) || 3600}s`,
+      });
+      return { url: `${GEMINI_API_BASE_URL}/cachedContents?key=${apiKey}`, options };
+    }
+
+    case 'deleteCachedContent':
+      if (!/^cachedContents\/[\w-]+$/.test(cachedContent || '')) {
+        throw badRequest('A valid cachedContent name is required for this action');
+      }
+      options.method = 'DELETE';
+      return { url: `${GEMINI_API_BASE_URL}/${cachedContent}?key=${apiKey}`, options };
+
+    default:
+      throw badRequest('Invalid action specified');
+  }
+};
+
+/**
+ * Performs one Gemini REST call. Shared by the /api/gemini proxy and the
+ * evaluation worker, which calls Gemini directly.
+ * @param {Object} body - { action, apiKey, model, prompt, cachedContent, ttlSeconds }, as sent to /api/gemini.
+ * @returns {Promise<{ok: boolean, status: number, data: Object}>} `data` is
+ * Gemini's JSON, or { error } when the call failed.
+ */
+export const callGemini = async (body) => {
+  let request;
+  try {
+    request = buildRequest(body || {});
+  } catch (error) {
+    return { ok: false, status: error.statusCode, data: { error: error.message } };
+  }
+
+  try {
+    const apiResponse = await fetch(request.url, request.options);
+    const responseText = await apiResponse.text();
+    let data;
+
+    try {
+      // deleteCachedContent answers with an empty body.
+      data = responseText ? JSON.parse(responseText) : {};
+    } catch (e) {
+      console.error('Gemini API returned non-JSON response:', responseText);
+      return { ok: false, status: 500, data: { error: 'Failed to parse Gemini API response', details: responseText } };
+    }
+
+    if (!apiResponse.ok) {
+      console.error('Gemini API Error:', data);
+      const errorMessage = data.error?.message || `Error ${apiResponse.status}`;
+      return { ok: false, status: apiResponse.status, data: { error: errorMessage } };
+    }
+
+    return { ok: true, status: 200, data };
+  } catch (error) {
+    console.error('Error proxying request to Gemini API:', error);
+    return { ok: false, status: 500, data: { error: 'Failed to communicate with Gemini API' } };
+  }
+};
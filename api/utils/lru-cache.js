@@ -0,0 +1,61 @@
+// Bounded in-memory LRU with per-entry TTL, for per-instance caches of small
+// values (verified tokens, user rows). Map iteration order is insertion order,
+// so re-inserting on every hit keeps the least recently used entry first.
+
+export class LruCache {
+  /**
+   * @param {Object} options
+   * @param {number} options.max - Entries kept; the least recently used is evicted first.
+   * @param {number} [options.ttlMs] - Default lifetime of an entry; no expiry when omitted.
+   * @param {() => number} [options.now]
+   */
+  constructor({ max, ttlMs = null, now = () => Date.now() }) {
+    this.max = max;
+    this.ttlMs = ttlMs;
+    this.now = now;
+    this.entries = new Map();
+    this.stats = { hits: 0, misses: 0, evictions: 0 };
+  }
+
+  /** @returns {*} The value, or undefined on a miss (absent or expired). */
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry || (entry.expiresAt !== null && entry.expiresAt <= this.now())) {
+      if (entry) this.entries.delete(key);
+      this.stats.misses += 1;
+      return undefined;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.stats.hits += 1;
+    return entry.value;
+  }
+
+  /** @param {number} [ttlMs] - Overrides the default lifetime for this entry. */
+  set(key, value, ttlMs = this.ttlMs) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: ttlMs === null ? null : this.now() + ttlMs });
+    while (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value);
+      this.stats.evictions += 1;
+    }
+  }
+
+  delete(key) {
+    return this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  metrics() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      size: this.entries.size,
+      max: this.max,
+      ...this.stats,
+      hitRate: lookups ? Number((this.stats.hits / lookups).toFixed(3)) : null,
+    };
+  }
+}
@@ -0,0 +1,25 @@
+// Operator-only endpoints (proxy stats, database metrics) expose internals of
+// the instance rather than tenant data, so they are not behind the user login:
+// they need `Authorization: Bearer <OPERATOR_TOKEN>`, and do not exist at all
+// while that variable is unset. Web Crypto only, so the Edge proxy can use it.
+
+const sha256 = async text => new Uint8Array(await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text)));
+
+/** Compares two secrets in constant time (over their fixed-length digests). */
+export const secretsEqual = async (a, b) => {
+  const [x, y] = await Promise.all([sha256(a), sha256(b)]);
+  let diff = 0;
+  for (let i = 0; i < x.length; i += 1) diff |= x[i] ^ y[i];
+  return diff === 0;
+};
+
+/**
+ * @param {string|null|undefined} authorization - The Authorization header.
+ * @returns {Promise<number|null>} null when allowed, otherwise the status to
+ * answer with: 404 while OPERATOR_TOKEN is unset, 401 for a wrong token.
+ */
+export const operatorDenialStatus = async (authorization) => {
+  const token = process.env.OPERATOR_TOKEN;
+  if (!token) return 404;
+  return await secretsEqual(authorization || '', `Bearer ${token}`) ? null : 401;
+};
@@ -0,0 +1,82 @@
+// Opaque keyset cursors for lists ordered by (created_at DESC, id DESC).
+//
+// The timestamp is carried as Postgres' own text form (select `created_at::text`)
+// rather than a JS Date, which would truncate microseconds and skip rows that
+// share the same millisecond.
+
+export const DEFAULT_PAGE_SIZE = 50;
+export const MAX_PAGE_SIZE = 200;
+
+export const parseLimit = (value) => {
+  const limit = parseInt(value, 10);
+  if (!Number.isFinite(limit) || limit <= 0) return DEFAULT_PAGE_SIZE;
+  return Math.min(limit, MAX_PAGE_SIZE);
+};
+
+const TIMESTAMP_RE = /^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d{1,6})?([+-]\d{2}(:?\d{2})?|Z)?$/;
+
+export const encodeCursor = (createdAtText, id) =>
+  Buffer.from(JSON.stringify({ t: createdAtText, id })).toString('base64url');
+
+/**
+ * Decodes a cursor produced by encodeCursor.
+ * Returns null for an empty cursor and throws a 400-tagged error for a malformed one.
+ */
+export const decodeCursor = (cursor) => {
+  if (!cursor) return null;
+  try {
+    const { t, id } = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+    if (typeof t !== 'string' || !TIMESTAMP_RE.test(t) || !isRowId(id)) {
+      throw new Error('incomplete cursor');
+    }
+    return { createdAt: t, id };
+  } catch {
+    const err = new Error('Invalid cursor.');
+    err.statusCode = 400;
+    throw err;
+  }
+};
+
+/**
+ * Parses an optional date filter (ISO 8601 or YYYY-MM-DD) from the query string.
+ */
+export const parseDateParam = (value, name) => {
+  if (value === undefined || value === null || value === '') return null;
+  const parsed = new Date(value);
+  if (Number.isNaN(parsed.getTime())) {
+    const err = new Error(`Invalid date for '${name}'.`);
+    err.statusCode = 400;
+    throw err;
+  }
+  return parsed.toISOString();
+};
+
+// ids are SERIAL (int4) columns: anything else would reach Postgres and fail there.
+const MAX_INT4 = 2147483647;
+
+export const isRowId = (value) => /^\d+$/.test(String(value ?? '').trim())
+  && Number(value) > 0 && Number(value) <= MAX_INT4;
+
+const invalidId = (name) => {
+  const err = new Error(`Invalid id in '${name}'.`);
+  err.statusCode = 400;
+  return err;
+};
+
+/**
+ * Parses a list of row ids, given as an array or a comma-separated string.
+ * Throws a 400-tagged error when any of them is not a positive integer.
+ * @returns {number[]}
+ */
+export const parseIdList = (value, name = 'ids') => {
+  const raw = Array.isArray(value) ? value : String(value ?? '').split(',');
+  const ids = raw.map(id => String(id ?? '').trim()).filter(Boolean);
+  if (!ids.every(isRowId)) throw invalidId(name);
+  return ids.map(Number);
+};
+
+/** Parses a single row id, throwing a 400-tagged error when malformed. */
+export const parseId = (value, name = 'id') => {
+  if (!isRowId(value)) throw invalidId(name);
+  return Number(value);
+};
@@ -0,0 +1,133 @@
+// Incremental sync of a user's rows for the client-side cache
+// (src/utils/syncedCollection.js).
+//
+// A sync request carries the `since` watermark returned by the previous sync
+// and receives the rows with a newer updated_at, ordered by (updated_at, id)
+// and paged with a keyset cursor, plus the ids deleted since then (from the
+// deleted_rows tombstones, see db_migration_sync_tombstones.sql). Every
+// response also carries a weak ETag of the whole collection, so a client
+// whose copy is current gets a 304 without any rows being read.
+import { createHash } from 'crypto';
+import { query } from '../db.js';
+import { encodeCursor, decodeCursor, parseDateParam } from './pagination.js';
+
+// The watermark trails the database clock: updated_at is the start time of
+// the writing transaction, which may commit after a sync has already read
+// past it. Rows within the overlap are simply sent twice.
+export const SYNC_OVERLAP_SECONDS = 30;
+// Clients that last synced before this get a full resync (`reset: true`).
+export const TOMBSTONE_RETENTION_DAYS = 30;
+const DEFAULT_SYNC_PAGE_SIZE = 1000;
+const MAX_SYNC_PAGE_SIZE = 2000;
+const SYNCED_TABLES = new Set(['briefings', 'transcriptions']);
+
+const assertTable = (table) => {
+  if (!SYNCED_TABLES.has(table)) throw new Error(`Table ${table} is not synced.`);
+};
+
+/**
+ * Weak ETag of a user's rows in `table`: changes with any insert, update or
+ * deletion. `variant` tells apart representations of the same rows.
+ */
+export const collectionEtag = async (table, userUuid, variant = '') => {
+  assertTable(table);
+  const { rows } = await query({
+    label: `${table}_sync_version`,
+    text: `SELECT COUNT(*)::int AS count,
+                  MAX(updated_at)::text AS updated,
+                  (SELECT MAX(deleted_at)::text FROM deleted_rows
+                   WHERE user_id = $1 AND table_name = $2) AS deleted
+           FROM ${table}
+           WHERE user_id = $1`,
+  }, [userUuid, table]);
+  const { count, updated, deleted } = rows[0];
+  const digest = createHash('sha1').update(`${table}|${variant}|${count}|${updated}|${deleted}`).digest('base64url');
+  return `W/"${digest}"`;
+};
+
+/**
+ * Sets the ETag and answers 304 when the request's If-None-Match holds it.
+ * @returns {boolean} true when the 304 has been sent.
+ */
+export const respondNotModified = (req, res, etag) => {
+  res.setHeader('ETag', etag);
+  res.setHeader('Cache-Control', 'private, no-cache');
+  const header = req.headers?.['if-none-match'];
+  if (header && header.split(',').map(tag => tag.trim()).includes(etag)) {
+    res.status(304).end();
+    return true;
+  }
+  return false;
+};
+
+const parseSyncLimit = (value) => {
+  const limit = parseInt(value, 10);
+  if (!Number.isFinite(limit) || limit <= 0) return DEFAULT_SYNC_PAGE_SIZE;
+  return Math.min(limit, MAX_SYNC_PAGE_SIZE);
+};
+
+/**
+ * One page of a sync.
+ * @param {Object} options
+ * @param {string} options.table - 'briefings' or 'transcriptions'.
+ * @param {string} options.columns - SELECT list of the synced fields.
+ * @param {string} options.userUuid
+ * @param {Object} options.params - Query string: since, cursor, limit.
+ * @param {(row: Object) => Object} [options.mapRow]
+ * @returns {Promise<{items: Object[], deleted: number[], nextCursor: string|null, syncedAt: string, reset: boolean}>}
+ * `deleted` is only filled on the first page; `syncedAt` is the `since` of the next sync.
+ */
+export const readChanges = async ({ table, columns, userUuid, params, mapRow = row => row }) => {
+  assertTable(table);
+  const limit = parseSyncLimit(params.limit);
+  const cursor = decodeCursor(params.cursor);
+  let since = parseDateParam(params.since, 'since');
+  const horizon = Date.now() - TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60 * 1000;
+  const reset = Boolean(since) && new Date(since).getTime() < horizon;
+  if (reset) since = null;
+
+  const { rows: [clock] } = await query({
+    label: 'sync_watermark',
+    text: `SELECT (NOW() - make_interval(secs => $1))::text AS synced_at`,
+  }, [SYNC_OVERLAP_SECONDS]);
+
+  const conditions = ['user_id = $1'];
+  const values = [userUuid];
+  if (since) {
+    values.push(since);
+    conditions.push(`updated_at > $${values.length}`);
+  }
+  if (cursor) {
+    values.push(cursor.createdAt, cursor.id);
+    conditions.push(`(updated_at, id) > ($${values.length - 1}, $${values.length})`);
+  }
+  values.push(limit + 1);
+  const { rows } = await query({
+    label: `${table}_sync_changes`,
+    text: `SELECT ${columns}, updated_at::text AS sync_updated_at
+           FROM ${table}
+           WHERE ${conditions.join(' AND ')}
+           ORDER BY updated_at, id
+           LIMIT $${values.length}`,
+  }, values);
+
+  let deleted = [];
+  if (since && !cursor) {
+    const { rows: tombstones } = await query({
+      label: `${table}_sync_deleted`,
+      text: `SELECT row_id FROM deleted_rows
+             WHERE user_id = $1 AND table_name = $2 AND deleted_at > $3`,
+    }, [userUuid, table, since]);
+    deleted = tombstones.map(row => row.row_id);
+  }
+
+  const page = rows.slice(0, limit);
+  const last = page[page.length - 1];
+  return {
+    items: page.map(({ sync_updated_at, ...row }) => mapRow(row)),
+    deleted,
+    nextCursor: rows.length > limit ? encodeCursor(last.sync_updated_at, last.id) : null,
+    syncedAt: clock.synced_at,
+    reset,
+  };
+};
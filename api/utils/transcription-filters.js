@@ -0,0 +1,33 @@
+import { parseDateParam, parseId, parseIdList } from './pagination.js';
+
+/**
+ * WHERE clause over transcriptions `t` for the optional filters of a query
+ * string: briefing_id ('none' for unlinked), campaign, mission, from, to and
+ * ids (comma-separated). The user's uuid is always $1.
+ * @returns {{where: string, values: any[]}}
+ */
+export const buildTranscriptionFilters = (userUuid, params) => {
+  const conditions = ['t.user_id = $1'];
+  const values = [userUuid];
+  const add = (sql, value) => {
+    values.push(value);
+    conditions.push(sql.replace('?', `$${values.length}`));
+  };
+
+  if (params.briefing_id === 'none') {
+    conditions.push('t.briefing_id IS NULL');
+  } else if (params.briefing_id) {
+    add('t.briefing_id = ?', parseId(params.briefing_id, 'briefing_id'));
+  }
+  if (params.campaign) add('t.campaign = ?', params.campaign);
+  if (params.mission) add('t.mission = ?', params.mission);
+  const from = parseDateParam(params.from, 'from');
+  const to = parseDateParam(params.to, 'to');
+  if (from) add('t.created_at >= ?', from);
+  if (to) add('t.created_at < ?', to);
+  if (params.ids) {
+    add('t.id = ANY(?)', parseIdList(params.ids));
+  }
+
+  return { where: conditions.join(' AND '), values };
+};
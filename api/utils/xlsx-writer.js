@@ -0,0 +1,146 @@
+import { ZipStreamWriter } from './zip-stream.js';
+
+export { writableSink } from './zip-stream.js';
+
+// Streaming XLSX and CSV writers for exports that never hold the whole file.
+//
+// An .xlsx is a ZIP of XML parts; sheets are written as they are produced
+// (see zip-stream.js). Cells are inline strings, which avoids the
+// shared-string table (and with it a second pass).
+
+// Sheet XML is handed to the deflater in pieces of about this size.
+const SHEET_FLUSH_CHARS = 64 * 1024;
+// Excel rejects longer cell texts.
+const MAX_CELL_CHARS = 32767;
+
+// Characters XML 1.0 does not allow at all (control characters other than tab/LF/CR).
+// eslint-disable-next-line no-control-regex
+const INVALID_XML_CHARS = /[\u0000-\u0008\u000B\u000C\u000E-\u001F\uFFFE\uFFFF]/g;
+
+export const escapeXml = value => String(value)
+  .replace(INVALID_XML_CHARS, '')
+  .replace(/&/g, '&amp;')
+  .replace(/</g, '&lt;')
+  .replace(/>/g, '&gt;')
+  .replace(/"/g, '&quot;');
+
+/** Spreadsheet column letters for a 0-based index: 0 -> A, 26 -> AA. */
+export const columnName = (index) => {
+  let name = '';
+  for (let n = index + 1; n > 0; n = Math.floor((n - 1) / 26)) {
+    name = String.fromCharCode(65 + ((n - 1) % 26)) + name;
+  }
+  return name;
+};
+
+const cellXml = (value, ref) => {
+  if (value === null || value === undefined || value === '') return '';
+  if (typeof value === 'number' && Number.isFinite(value)) return `<c r="${ref}"><v>${value}</v></c>`;
+  if (typeof value === 'boolean') return `<c r="${ref}" t="b"><v>${value ? 1 : 0}</v></c>`;
+  const text = (typeof value === 'object' && !(value instanceof Date) ? JSON.stringify(value) : String(value))
+    .slice(0, MAX_CELL_CHARS);
+  return `<c r="${ref}" t="inlineStr"><is><t xml:space="preserve">${escapeXml(text)}</t></is></c>`;
+};
+
+export const rowXml = (values, rowNumber) => {
+  const cells = values.map((value, index) => cellXml(value, `${columnName(index)}${rowNumber}`)).join('');
+  return `<row r="${rowNumber}">${cells}</row>`;
+};
+
+async function* sheetXml(rows) {
+  yield '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>';
+  let rowNumber = 0;
+  let pending = '';
+  for await (const values of rows) {
+    rowNumber += 1;
+    pending += rowXml(values, rowNumber);
+    if (pending.length >= SHEET_FLUSH_CHARS) {
+      yield pending;
+      pending = '';
+    }
+  }
+  yield `${pending}</sheetData></worksheet>`;
+}
+
+/**
+ * Streaming .xlsx writer.
+ * @example
+ * const xlsx = new XlsxStreamWriter(writableSink(res));
+ * await xlsx.addSheet('Resultados', rowsAsyncIterable);
+ * await xlsx.finish();
+ */
+export class XlsxStreamWriter {
+  /** @param {(chunk: Buffer) => Promise<void>} write */
+  constructor(write) {
+    this.zip = new ZipStreamWriter(write);
+    this.sheets = [];
+  }
+
+  /**
+   * Streams one worksheet. Sheets are written one after another.
+   * @param {string} name - Tab name (Excel keeps 31 characters).
+   * @param {AsyncIterable<any[]>|Iterable<any[]>} rows - Cell values per row, header included.
+   */
+  async addSheet(name, rows) {
+    const index = this.sheets.length + 1;
+    this.sheets.push(String(name).replace(/[\\/?*[\]:]/g, ' ').slice(0, 31));
+    await this.zip.addEntry(`xl/worksheets/sheet${index}.xml`, sheetXml(rows));
+  }
+
+  async finish() {
+    const sheetOverrides = this.sheets.map((_, i) => `<Override PartName="/xl/worksheets/sheet${i + 1}.xml" `
+      + 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>').join('');
+    const parts = {
+      '[Content_Types].xml': '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        + '<Default Extension="xml" ContentType="application/xml"/>'
+        + '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        + `${sheetOverrides}</Types>`,
+      '_rels/.rels': '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        + '</Relationships>',
+      'xl/workbook.xml': '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        + '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        + 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+        + this.sheets.map((name, i) => `<sheet name="${escapeXml(name)}" sheetId="${i + 1}" r:id="rId${i + 1}"/>`).join('')
+        + '</sheets></workbook>',
+      'xl/_rels/workbook.xml.rels': '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + this.sheets.map((_, i) => `<Relationship Id="rId${i + 1}" `
+          + 'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+          + `Target="worksheets/sheet${i + 1}.xml"/>`).join('')
+        + '</Relationships>',
+    };
+    for (const [name, xml] of Object.entries(parts)) {
+      await this.zip.addEntry(name, [xml]);
+    }
+    await this.zip.finish();
+  }
+}
+
+const csvCell = (value) => {
+  if (value === null || value === undefined) return '""';
+  const text = typeof value === 'object' ? JSON.stringify(value) : String(value);
+  return `"${text.replace(/"/g, '""')}"`;
+};
+
+/**
+ * CSV in the format of the browser export (exportCsv): UTF-8 with BOM, `;`
+ * separated, every field quoted.
+ * @param {(chunk: string) => Promise<void>} write
+ * @param {AsyncIterable<any[]>|Iterable<any[]>} rows - Header included.
+ */
+export const writeCsv = async (write, rows) => {
+  let pending = '\uFEFF';
+  for await (const values of rows) {
+    pending += `${values.map(csvCell).join(';')}\r\n`;
+    if (pending.length >= SHEET_FLUSH_CHARS) {
+      await write(pending);
+      pending = '';
+    }
+  }
+  if (pending) await write(pending);
+};
@@ -0,0 +1,133 @@
+import { createDeflateRaw } from 'zlib';
+import { once } from 'events';
+
+// ZIP archives written as a stream. Each entry is closed with a data
+// descriptor, so neither its sizes nor its CRC have to be known before the
+// data has gone out. No ZIP64: an archive must stay under 4 GB.
+
+const CRC_TABLE = Array.from({ length: 256 }, (_, n) => {
+  let c = n;
+  for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+  return c >>> 0;
+});
+
+export const crc32 = (buffer, crc = 0) => {
+  let c = crc ^ 0xFFFFFFFF;
+  for (let i = 0; i < buffer.length; i++) c = CRC_TABLE[(c ^ buffer[i]) & 0xFF] ^ (c >>> 8);
+  return (c ^ 0xFFFFFFFF) >>> 0;
+};
+
+// Flag bit 3: sizes and CRC follow the data. Bit 11: UTF-8 file names.
+const ZIP_FLAGS = 0x0808;
+const STORE = 0;
+const DEFLATE = 8;
+// 1980-01-01 00:00 in MS-DOS format; entry timestamps are not used.
+const DOS_TIME = 0;
+const DOS_DATE = (1 << 5) | 1;
+
+/** Writes ZIP entries to `write` (chunk -> Promise) as they are produced. */
+export class ZipStreamWriter {
+  constructor(write) {
+    this.write = write;
+    this.offset = 0;
+    this.entries = [];
+  }
+
+  async emit(buffer) {
+    this.offset += buffer.length;
+    await this.write(buffer);
+  }
+
+  /**
+   * @param {string} name - Path inside the archive.
+   * @param {AsyncIterable<string|Buffer>|Iterable<string|Buffer>} source
+   * @param {Object} [options]
+   * @param {boolean} [options.compress=true] - false stores the data as is
+   * (for content that is already compressed, such as .docx files).
+   */
+  async addEntry(name, source, { compress = true } = {}) {
+    const nameBytes = Buffer.from(name, 'utf8');
+    const method = compress ? DEFLATE : STORE;
+    const entry = { nameBytes, method, offset: this.offset, crc: 0, compressedSize: 0, size: 0 };
+
+    const header = Buffer.alloc(30);
+    header.writeUInt32LE(0x04034b50, 0);
+    header.writeUInt16LE(20, 4);
+    header.writeUInt16LE(ZIP_FLAGS, 6);
+    header.writeUInt16LE(method, 8);
+    header.writeUInt16LE(DOS_TIME, 10);
+    header.writeUInt16LE(DOS_DATE, 12);
+    header.writeUInt16LE(nameBytes.length, 26);
+    await this.emit(Buffer.concat([header, nameBytes]));
+
+    const toBuffer = (chunk) => {
+      const buffer = Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk, 'utf8');
+      entry.crc = crc32(buffer, entry.crc);
+      entry.size += buffer.length;
+      return buffer;
+    };
+
+    if (compress) {
+      const deflate = createDeflateRaw();
+      const feed = (async () => {
+        for await (const chunk of source) {
+          if (!deflate.write(toBuffer(chunk))) await once(deflate, 'drain');
+        }
+        deflate.end();
+      })().catch((error) => deflate.destroy(error));
+
+      for await (const compressed of deflate) {
+        entry.compressedSize += compressed.length;
+        await this.emit(compressed);
+      }
+      await feed;
+    } else {
+      for await (const chunk of source) {
+        const buffer = toBuffer(chunk);
+        entry.compressedSize += buffer.length;
+        await this.emit(buffer);
+      }
+    }
+
+    const descriptor = Buffer.alloc(16);
+    descriptor.writeUInt32LE(0x08074b50, 0);
+    descriptor.writeUInt32LE(entry.crc, 4);
+    descriptor.writeUInt32LE(entry.compressedSize, 8);
+    descriptor.writeUInt32LE(entry.size, 12);
+    await this.emit(descriptor);
+    this.entries.push(entry);
+  }
+
+  /** Writes the central directory; the archive is complete afterwards. */
+  async finish() {
+    const start = this.offset;
+    for (const entry of this.entries) {
+      const record = Buffer.alloc(46);
+      record.writeUInt32LE(0x02014b50, 0);
+      record.writeUInt16LE(20, 4);
+      record.writeUInt16LE(20, 6);
+      record.writeUInt16LE(ZIP_FLAGS, 8);
+      record.writeUInt16LE(entry.method, 10);
+      record.writeUInt16LE(DOS_TIME, 12);
+      record.writeUInt16LE(DOS_DATE, 14);
+      record.writeUInt32LE(entry.crc, 16);
+      record.writeUInt32LE(entry.compressedSize, 20);
+      record.writeUInt32LE(entry.size, 24);
+      record.writeUInt16LE(entry.nameBytes.length, 28);
+      record.writeUInt32LE(entry.offset, 42);
+      await this.emit(Buffer.concat([record, entry.nameBytes]));
+    }
+    const end = Buffer.alloc(22);
+    end.writeUInt32LE(0x06054b50, 0);
+    end.writeUInt16LE(this.entries.length, 8);
+    end.writeUInt16LE(this.entries.length, 10);
+    end.writeUInt32LE(this.offset - start, 12);
+    end.writeUInt32LE(start, 16);
+    await this.emit(end);
+  }
+}
+
+/** Writes a chunk to a Node writable, waiting for 'drain' when its buffer is full. */
+export const writableSink = stream => async (chunk) => {
+  if (!stream.write(chunk)) await once(stream, 'drain');
+};
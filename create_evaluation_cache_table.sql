@@ -0,0 +1,27 @@
+-- =================================================================
+-- SCRIPT PARA CRIAR A TABELA 'evaluation_cache'
+-- =================================================================
+-- Resultados de avaliação da IA endereçados pelo conteúdo: cache_key é o
+-- SHA-256 (hex) de versão do prompt + modelo + idioma + briefing + transcrição
+-- + legenda, calculado no navegador (src/utils/evaluationCache.js).
+
+CREATE TABLE IF NOT EXISTS evaluation_cache (
+    user_id UUID NOT NULL,
+    cache_key CHAR(64) NOT NULL,
+    prompt_version VARCHAR(50) NOT NULL,
+    model VARCHAR(100),
+    language VARCHAR(10),
+    result JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, cache_key),
+    CONSTRAINT fk_user
+        FOREIGN KEY(user_id)
+        REFERENCES users(uuid)
+        ON DELETE CASCADE
+);
+
+-- Permite expurgar entradas antigas ou de versões de prompt obsoletas, ex.:
+-- DELETE FROM evaluation_cache WHERE created_at < NOW() - INTERVAL '180 days';
+CREATE INDEX IF NOT EXISTS idx_evaluation_cache_created_at ON evaluation_cache(created_at);
+
+-- =================================================================
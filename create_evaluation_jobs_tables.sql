@@ -0,0 +1,69 @@
+-- =================================================================
+-- SCRIPT PARA CRIAR AS TABELAS 'evaluation_jobs' E 'evaluation_job_items'
+-- =================================================================
+-- Fila durável da avaliação em massa. O navegador envia as linhas da planilha
+-- já preparadas (transcrição, legenda, duração) e os workers
+-- (scripts/evaluation-worker.mjs) as reservam com FOR UPDATE SKIP LOCKED,
+-- avaliam com o Gemini e salvam em 'transcriptions'. O progresso sobrevive ao
+-- fechamento da aba e a um worker que caia no meio de um lote.
+
+CREATE TABLE IF NOT EXISTS evaluation_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL,
+    briefing_id INTEGER REFERENCES briefings(id) ON DELETE SET NULL,
+    -- Cópia do briefing revisado: editar o briefing não muda um job em andamento.
+    briefing_text TEXT NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    -- Versão do prompt nas chaves de cache dos itens (EVALUATION_PROMPT_VERSION).
+    prompt_version VARCHAR(50),
+    status VARCHAR(20) NOT NULL DEFAULT 'running'
+        CHECK (status IN ('running', 'paused', 'completed', 'cancelled', 'failed')),
+    -- TRUE quando o navegador terminou de enviar as linhas; só então o job pode concluir.
+    sealed BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ,
+    CONSTRAINT fk_user
+        FOREIGN KEY(user_id)
+        REFERENCES users(uuid)
+        ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_user_created ON evaluation_jobs(user_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS evaluation_job_items (
+    id BIGSERIAL PRIMARY KEY,
+    job_id BIGINT NOT NULL REFERENCES evaluation_jobs(id) ON DELETE CASCADE,
+    -- Posição da linha na planilha; reenviar um lote não duplica itens.
+    row_index INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    video_url TEXT,
+    caption TEXT,
+    transcription TEXT,
+    duration REAL,
+    -- Linha original da planilha (metadados salvos e exportação dos resultados).
+    row_data JSONB NOT NULL,
+    -- Chave do evaluation_cache (src/utils/evaluationCache.js), calculada no navegador.
+    cache_key CHAR(64),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'done', 'failed', 'skipped')),
+    ai_status TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_until TIMESTAMPTZ,
+    result JSONB,
+    transcription_id INTEGER REFERENCES transcriptions(id) ON DELETE SET NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (job_id, row_index)
+);
+
+-- Reserva (claimEvaluationItems) e recuperação de reservas expiradas.
+CREATE INDEX IF NOT EXISTS idx_evaluation_job_items_pending
+    ON evaluation_job_items(available_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_evaluation_job_items_running
+    ON evaluation_job_items(locked_until) WHERE status = 'running';
+
+-- =================================================================
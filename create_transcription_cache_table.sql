@@ -0,0 +1,38 @@
+-- =================================================================
+-- SCRIPT PARA CRIAR A TABELA 'transcription_cache'
+-- =================================================================
+-- Transcrições do Whisper endereçadas pela mídia, compartilhadas entre todos
+-- os usuários. cache_key é o SHA-256 (hex) de versão do pipeline + modelo +
+-- idioma + tarefa + o hash do conteúdo do arquivo (kind = 'content') ou a URL
+-- normalizada da mídia (kind = 'url'), calculado no navegador
+-- (src/utils/transcriptionCache.js).
+--
+-- As entradas vêm do navegador e não podem ser conferidas no servidor. Uma
+-- linha só é servida a outros usuários depois de verificada (verified), o que
+-- acontece quando um segundo usuário grava o mesmo resultado para a mesma
+-- chave. Até lá, apenas quem a gravou (created_by) a lê.
+
+CREATE TABLE IF NOT EXISTS transcription_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('content', 'url')),
+    content_hash CHAR(64),
+    model VARCHAR(100),
+    language VARCHAR(20),
+    task VARCHAR(20),
+    pipeline_version VARCHAR(50) NOT NULL,
+    result JSONB NOT NULL,
+    verified BOOLEAN NOT NULL DEFAULT FALSE,
+    created_by UUID,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT fk_created_by
+        FOREIGN KEY(created_by)
+        REFERENCES users(uuid)
+        ON DELETE SET NULL
+);
+
+-- Permite expurgar entradas antigas ou de versões obsoletas do pipeline, ex.:
+-- DELETE FROM transcription_cache WHERE pipeline_version <> 'asr-v1';
+CREATE INDEX IF NOT EXISTS idx_transcription_cache_created_at ON transcription_cache(created_at);
+CREATE INDEX IF NOT EXISTS idx_transcription_cache_content_hash ON transcription_cache(content_hash);
+
+-- =================================================================
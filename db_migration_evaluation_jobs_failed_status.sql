@@ -0,0 +1,9 @@
+-- Migration: adds the 'failed' status to evaluation_jobs.
+-- A job whose rows could not all be uploaded is closed as 'failed' by the
+-- browser (action 'fail' of POST /api/evaluation-jobs/[id]) instead of
+-- staying 'running' forever.
+-- Please execute this script directly against your PostgreSQL database.
+
+ALTER TABLE evaluation_jobs DROP CONSTRAINT IF EXISTS evaluation_jobs_status_check;
+ALTER TABLE evaluation_jobs ADD CONSTRAINT evaluation_jobs_status_check
+    CHECK (status IN ('running', 'paused', 'completed', 'cancelled', 'failed'));
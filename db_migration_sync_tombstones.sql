@@ -0,0 +1,66 @@
+-- Migration for the incremental sync of briefings and transcriptions
+-- (GET /api/briefings?sync=1 and GET /api/transcriptions?sync=1).
+-- Please execute this script directly against your PostgreSQL database.
+
+-- Clients ask for the rows changed since their last sync, so updated_at has to
+-- move on every write, whichever code path (or ON DELETE SET NULL) makes it.
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS briefings_touch_updated_at ON briefings;
+CREATE TRIGGER briefings_touch_updated_at
+    BEFORE UPDATE ON briefings
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS transcriptions_touch_updated_at ON transcriptions;
+CREATE TRIGGER transcriptions_touch_updated_at
+    BEFORE UPDATE ON transcriptions
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+UPDATE briefings SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE transcriptions SET updated_at = created_at WHERE updated_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_briefings_user_updated
+    ON briefings (user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_updated
+    ON transcriptions (user_id, updated_at, id);
+
+-- Tombstones: deleted rows leave no updated_at behind, so each deletion is
+-- recorded here and sent to clients that synced before it.
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    user_id UUID NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_name, row_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rows_user_table_deleted
+    ON deleted_rows (user_id, table_name, deleted_at);
+
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO deleted_rows (table_name, row_id, user_id)
+    VALUES (TG_TABLE_NAME, OLD.id, OLD.user_id)
+    ON CONFLICT (table_name, row_id) DO UPDATE SET deleted_at = NOW();
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS briefings_record_deleted ON briefings;
+CREATE TRIGGER briefings_record_deleted
+    AFTER DELETE ON briefings
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+DROP TRIGGER IF EXISTS transcriptions_record_deleted ON transcriptions;
+CREATE TRIGGER transcriptions_record_deleted
+    AFTER DELETE ON transcriptions
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+-- Tombstones older than TOMBSTONE_RETENTION_DAYS (api/utils/sync.js) are never
+-- read: clients that synced before that get a full resync. Purge them with:
+-- DELETE FROM deleted_rows WHERE deleted_at < NOW() - INTERVAL '30 days';
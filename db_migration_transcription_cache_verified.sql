@@ -0,0 +1,8 @@
+-- Migration: adds the verified flag to transcription_cache.
+-- Rows are written by the browser, so a row is served to other users only once
+-- a second user has stored the same result under the same key
+-- (api/transcription-cache.js). Until then only its writer reads it back.
+-- Please execute this script directly against your PostgreSQL database.
+
+-- Existing rows were never confirmed, so they start out unverified.
+ALTER TABLE transcription_cache ADD COLUMN IF NOT EXISTS verified BOOLEAN NOT NULL DEFAULT FALSE;
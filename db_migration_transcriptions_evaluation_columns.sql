@@ -0,0 +1,91 @@
+-- Migration for GET /api/transcriptions/stats (server-side evaluation summaries).
+-- Please execute this script directly against your PostgreSQL database (12+).
+
+-- Hot fields of transcription_data promoted to columns. They are GENERATED, so
+-- Postgres keeps them in sync on every write and no application code changes.
+-- Scores come from userEvaluation (the reviewed evaluation), as in the list view.
+ALTER TABLE transcriptions
+    ADD COLUMN IF NOT EXISTS eval_score NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN jsonb_typeof(transcription_data #> '{userEvaluation,score_final,pontuacao_obtida}') = 'number'
+             THEN (transcription_data #>> '{userEvaluation,score_final,pontuacao_obtida}')::numeric
+        END
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS eval_score_max NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN jsonb_typeof(transcription_data #> '{userEvaluation,score_final,pontuacao_maxima}') = 'number'
+             THEN (transcription_data #>> '{userEvaluation,score_final,pontuacao_maxima}')::numeric
+        END
+    ) STORED,
+    -- 'pending' (no evaluation yet), 'rejected_duration' (video over 60 s) or 'evaluated'.
+    ADD COLUMN IF NOT EXISTS eval_status TEXT GENERATED ALWAYS AS (
+        CASE
+            WHEN jsonb_typeof(transcription_data #> '{userEvaluation,avaliacoes}') IS DISTINCT FROM 'array' THEN 'pending'
+            WHEN jsonb_typeof(transcription_data -> 'videoDuration') = 'number'
+                 AND (transcription_data ->> 'videoDuration')::numeric > 60 THEN 'rejected_duration'
+            ELSE 'evaluated'
+        END
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS campaign TEXT GENERATED ALWAYS AS (NULLIF(transcription_data ->> 'campanha', '')) STORED,
+    ADD COLUMN IF NOT EXISTS mission TEXT GENERATED ALWAYS AS (NULLIF(transcription_data ->> 'missao', '')) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_briefing_score
+    ON transcriptions (user_id, briefing_id, eval_score);
+
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_status
+    ON transcriptions (user_id, eval_status);
+
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_campaign_mission
+    ON transcriptions (user_id, campaign, mission);
+
+-- Per-criterion grades (userEvaluation.avaliacoes[]) as rows, maintained by a
+-- trigger. A generated column cannot hold one value per array element.
+CREATE TABLE IF NOT EXISTS transcription_criteria (
+    transcription_id INTEGER NOT NULL REFERENCES transcriptions(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    briefing_id INTEGER,
+    criterion_id INTEGER NOT NULL,
+    criterion_name TEXT,
+    nota NUMERIC,
+    status TEXT,
+    PRIMARY KEY (transcription_id, criterion_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcription_criteria_user_briefing
+    ON transcription_criteria (user_id, briefing_id, criterion_id, nota);
+
+CREATE OR REPLACE FUNCTION sync_transcription_criteria() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM transcription_criteria WHERE transcription_id = NEW.id;
+    INSERT INTO transcription_criteria (transcription_id, user_id, briefing_id, criterion_id, criterion_name, nota, status)
+    SELECT NEW.id, NEW.user_id, NEW.briefing_id, (c ->> 'id_criterio')::integer, c ->> 'nome',
+           CASE WHEN jsonb_typeof(c -> 'nota') = 'number' THEN (c ->> 'nota')::numeric END,
+           c ->> 'status'
+    FROM jsonb_array_elements(
+        CASE WHEN jsonb_typeof(NEW.transcription_data #> '{userEvaluation,avaliacoes}') = 'array'
+             THEN NEW.transcription_data #> '{userEvaluation,avaliacoes}'
+             ELSE '[]'::jsonb
+        END
+    ) AS c
+    WHERE (c ->> 'id_criterio') ~ '^[0-9]+$'
+    ON CONFLICT (transcription_id, criterion_id) DO NOTHING;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_transcription_criteria ON transcriptions;
+CREATE TRIGGER trg_sync_transcription_criteria
+    AFTER INSERT OR UPDATE OF transcription_data, briefing_id ON transcriptions
+    FOR EACH ROW EXECUTE FUNCTION sync_transcription_criteria();
+
+-- Backfill existing rows.
+INSERT INTO transcription_criteria (transcription_id, user_id, briefing_id, criterion_id, criterion_name, nota, status)
+SELECT t.id, t.user_id, t.briefing_id, (c ->> 'id_criterio')::integer, c ->> 'nome',
+       CASE WHEN jsonb_typeof(c -> 'nota') = 'number' THEN (c ->> 'nota')::numeric END,
+       c ->> 'status'
+FROM transcriptions t
+CROSS JOIN LATERAL jsonb_array_elements(t.transcription_data #> '{userEvaluation,avaliacoes}') AS c
+WHERE jsonb_typeof(t.transcription_data #> '{userEvaluation,avaliacoes}') = 'array'
+  AND (c ->> 'id_criterio') ~ '^[0-9]+$'
+ON CONFLICT (transcription_id, criterion_id) DO NOTHING;
+
+ANALYZE transcriptions;
+ANALYZE transcription_criteria;
@@ -0,0 +1,11 @@
+-- Migration for the paginated GET /api/transcriptions.
+-- Please execute this script directly against your PostgreSQL database.
+
+-- Keyset pagination walks (created_at DESC, id DESC) per user; this index serves
+-- every page, with or without the date filters, without sorting.
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_created
+    ON transcriptions (user_id, created_at DESC, id DESC);
+
+-- Same ordering when the list is filtered by briefing.
+CREATE INDEX IF NOT EXISTS idx_transcriptions_user_briefing_created
+    ON transcriptions (user_id, briefing_id, created_at DESC, id DESC);
@@ -0,0 +1,155 @@
+// Speed and accuracy of the Whisper transcription used by the transcription
+// worker, per model size (tiny/base/small, quantized) with and without the
+// voice-activity segmentation of src/utils/audioPreprocess.js.
+//
+// The corpus is a local directory of media files, each next to a reference
+// transcript with the same name and a .txt extension (clip01.mp4 +
+// clip01.txt). Files are decoded once with the system ffmpeg through the same
+// filter graph as the worker; the timed part is the transcription itself
+// (speech detection included).
+//
+// Reports per configuration the real-time factor (transcription seconds per
+// second of audio, lower is faster), the corpus word error rate (errors /
+// reference words, see src/utils/wordErrorRate.js) and the share of the audio
+// that reached Whisper.
+//
+// Usage: node scripts/bench-transcription.mjs [--corpus=bench/transcription-corpus]
+//          [--models=tiny,base,small] [--vad=on,off] [--runs=1]
+//          [--language=portuguese] [--ffmpeg=ffmpeg] [--json=path]
+import { spawn } from 'child_process';
+import { mkdtemp, readdir, readFile, rm, writeFile } from 'fs/promises';
+import { tmpdir } from 'os';
+import { basename, extname, join } from 'path';
+import { performance } from 'perf_hooks';
+import { pipeline } from '@xenova/transformers';
+import { AUDIO_SAMPLE_RATE, ffmpegPcmArgs, transcribeSpeech } from '../src/utils/audioPreprocess.js';
+import { WHISPER_MODELS } from '../src/utils/whisperModels.js';
+import { wordErrorRate } from '../src/utils/wordErrorRate.js';
+
+const args = Object.fromEntries(process.argv.slice(2).map((arg) => {
+  const [key, value = 'true'] = arg.replace(/^--/, '').split('=');
+  return [key, value];
+}));
+const corpusDir = args.corpus || 'bench/transcription-corpus';
+const sizes = (args.models || 'tiny,base,small').split(',');
+const vadModes = (args.vad || 'on,off').split(',').map(mode => mode === 'on');
+const runs = Number(args.runs || 1);
+const language = args.language || 'portuguese';
+const ffmpegBin = args.ffmpeg || 'ffmpeg';
+
+const unknown = sizes.filter(size => !WHISPER_MODELS[size]);
+if (unknown.length > 0) {
+  console.error(`Unknown model size(s): ${unknown.join(', ')}. Use ${Object.keys(WHISPER_MODELS).join(', ')}.`);
+  process.exit(1);
+}
+
+const runFFmpeg = ffmpegArgs => new Promise((resolve, reject) => {
+  const child = spawn(ffmpegBin, ['-v', 'error', '-y', ...ffmpegArgs], { stdio: ['ignore', 'ignore', 'pipe'] });
+  let stderr = '';
+  child.stderr.on('data', (chunk) => { stderr += chunk; });
+  child.on('error', reject);
+  child.on('close', code => (code === 0 ? resolve() : reject(new Error(`ffmpeg exited with ${code}: ${stderr.trim()}`))));
+});
+
+const readPcm = async (path) => {
+  const bytes = await readFile(path);
+  return new Float32Array(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength));
+};
+
+// Media files that have a reference transcript, decoded like worker.js does.
+const loadCorpus = async () => {
+  const files = await readdir(corpusDir);
+  const references = new Set(files.filter(file => extname(file) === '.txt').map(file => basename(file, '.txt')));
+  const media = files.filter(file => extname(file) !== '.txt' && references.has(basename(file, extname(file)))).sort();
+  if (media.length === 0) {
+    throw new Error(`No media with a matching .txt reference in ${corpusDir}.`);
+  }
+
+  const workDir = await mkdtemp(join(tmpdir(), 'bench-transcription-'));
+  try {
+    const clips = [];
+    for (const file of media) {
+      const name = basename(file, extname(file));
+      const output = join(workDir, `${name}.pcm`);
+      const vadOutput = join(workDir, `${name}.vad.pcm`);
+      await runFFmpeg(ffmpegPcmArgs(join(corpusDir, file), output, vadOutput));
+      const samples = await readPcm(output);
+      clips.push({
+        name,
+        samples,
+        vadSamples: await readPcm(vadOutput),
+        seconds: samples.length / AUDIO_SAMPLE_RATE,
+        reference: await readFile(join(corpusDir, `${name}.txt`), 'utf8'),
+      });
+    }
+    return clips;
+  } finally {
+    await rm(workDir, { recursive: true, force: true });
+  }
+};
+
+const median = (values) => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+const main = async () => {
+  const clips = await loadCorpus();
+  const audioSeconds = clips.reduce((sum, clip) => sum + clip.seconds, 0);
+  console.log(`Corpus: ${clips.length} clip(s), ${audioSeconds.toFixed(1)} s of audio.`);
+
+  const summary = [];
+  const details = [];
+  for (const size of sizes) {
+    const { model } = WHISPER_MODELS[size];
+    console.log(`Loading ${model} (quantized)...`);
+    const transcriber = await pipeline('automatic-speech-recognition', model, { quantized: true });
+    // Warm-up: the first call compiles the ONNX sessions.
+    await transcriber(new Float32Array(AUDIO_SAMPLE_RATE), { language, task: 'transcribe' });
+
+    for (const vad of vadModes) {
+      let seconds = 0;
+      let speechSeconds = 0;
+      let errors = 0;
+      let referenceWords = 0;
+      for (const clip of clips) {
+        const times = [];
+        let output;
+        for (let run = 0; run < runs; run++) {
+          const startedAt = performance.now();
+          output = await transcribeSpeech(transcriber, clip.samples, {
+            language, task: 'transcribe', vad, vadSamples: clip.vadSamples,
+          });
+          times.push((performance.now() - startedAt) / 1000);
+        }
+        const time = median(times);
+        const score = wordErrorRate(clip.reference, output.text);
+        seconds += time;
+        speechSeconds += output.speechSeconds;
+        errors += score.substitutions + score.deletions + score.insertions;
+        referenceWords += score.referenceWords;
+        details.push({
+          model: size, vad, clip: clip.name, seconds: Number(time.toFixed(3)),
+          rtf: Number((time / clip.seconds).toFixed(3)), wer: Number(score.wer.toFixed(3)), text: output.text,
+        });
+      }
+      summary.push({
+        model: size,
+        vad: vad ? 'on' : 'off',
+        seconds: Number(seconds.toFixed(2)),
+        rtf: Number((seconds / audioSeconds).toFixed(3)),
+        wer: Number((referenceWords ? errors / referenceWords : 0).toFixed(3)),
+        speechShare: Number((speechSeconds / audioSeconds).toFixed(2)),
+      });
+    }
+    await transcriber.dispose?.();
+  }
+
+  console.table(summary);
+  if (args.json) {
+    await writeFile(args.json, `${JSON.stringify({ corpus: corpusDir, language, runs, audioSeconds, summary, details }, null, 2)}\n`);
+    console.log(`Results written to ${args.json}.`);
+  }
+};
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,104 @@
+// Throughput of the local M2M100 translation used by the transcription worker:
+// the old single-call path (whole text in one pipeline call) against sentence
+// batches (src/utils/sentenceBatcher.js) for several batch sizes. Inputs are
+// synthetic Portuguese transcriptions of increasing length.
+//
+// Reports seconds, input chars/s and the output/input length ratio; a ratio
+// well below ~1 means the model truncated the translation.
+//
+// Usage: node scripts/bench-translation.mjs [--lengths=500,2000,6000]
+//          [--batch-sizes=1,4,8,16] [--runs=3] [--full-precision] [--json=path]
+import { writeFile } from 'fs/promises';
+import { performance } from 'perf_hooks';
+import { pipeline } from '@xenova/transformers';
+import { translateInBatches } from '../src/utils/sentenceBatcher.js';
+
+const MODEL = 'Xenova/m2m100_418M';
+const LANGS = { src_lang: 'pt', tgt_lang: 'es' };
+
+const args = Object.fromEntries(process.argv.slice(2).map((arg) => {
+  const [key, value = 'true'] = arg.replace(/^--/, '').split('=');
+  return [key, value];
+}));
+const list = (value, fallback) => (value ? value.split(',').map(Number) : fallback);
+const lengths = list(args.lengths, [500, 2000, 6000]);
+const batchSizes = list(args['batch-sizes'], [1, 4, 8, 16]);
+const runs = Number(args.runs || 3);
+const quantized = !args['full-precision'];
+
+const SENTENCES = [
+  'Oi gente, tudo bem com vocês?',
+  'Hoje eu vim mostrar para vocês o produto que está fazendo o maior sucesso aqui em casa.',
+  'Ele chegou ontem e eu já testei de todas as formas possíveis.',
+  'A embalagem é linda, super prática, e cabe direitinho na bolsa.',
+  'O que eu mais gostei foi a textura, que é leve e não deixa a pele oleosa.',
+  'Se vocês quiserem experimentar, o link está na minha bio com um cupom de desconto.',
+  'Me contem nos comentários se vocês já conheciam essa marca!',
+];
+
+// Deterministic text of about `length` characters, in paragraphs of four sentences.
+const sampleText = (length) => {
+  const sentences = [];
+  let size = 0;
+  for (let i = 0; size < length; i++) {
+    const sentence = SENTENCES[i % SENTENCES.length];
+    sentences.push(sentence);
+    size += sentence.length + 1;
+  }
+  const paragraphs = [];
+  for (let i = 0; i < sentences.length; i += 4) paragraphs.push(sentences.slice(i, i + 4).join(' '));
+  return paragraphs.join('\n');
+};
+
+const median = (values) => [...values].sort((a, b) => a - b)[Math.floor(values.length / 2)];
+
+const measure = async (translate, text) => {
+  const seconds = [];
+  let output = '';
+  for (let run = 0; run < runs; run++) {
+    const startedAt = performance.now();
+    output = await translate(text);
+    seconds.push((performance.now() - startedAt) / 1000);
+  }
+  const time = median(seconds);
+  return {
+    seconds: Number(time.toFixed(3)),
+    charsPerSecond: Math.round(text.length / time),
+    outputRatio: Number((output.length / text.length).toFixed(2)),
+  };
+};
+
+const main = async () => {
+  console.log(`Loading ${MODEL} (${quantized ? 'quantized' : 'full precision'})...`);
+  const translator = await pipeline('translation', MODEL, { quantized });
+
+  const singleCall = async (text) => (await translator(text, LANGS))[0].translation_text;
+  const batched = batchSize => text => translateInBatches(
+    async batch => (await translator(batch, LANGS)).map(item => item.translation_text),
+    text,
+    { batchSize },
+  );
+
+  // Warm-up: the first call compiles the ONNX session.
+  await singleCall(SENTENCES[0]);
+
+  const results = [];
+  for (const length of lengths) {
+    const text = sampleText(length);
+    results.push({ length, mode: 'single-call', ...await measure(singleCall, text) });
+    for (const batchSize of batchSizes) {
+      results.push({ length, mode: `batched(${batchSize})`, ...await measure(batched(batchSize), text) });
+    }
+  }
+
+  console.table(results);
+  if (args.json) {
+    await writeFile(args.json, `${JSON.stringify({ model: MODEL, quantized, runs, results }, null, 2)}\n`);
+    console.log(`Results written to ${args.json}.`);
+  }
+};
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -0,0 +1,39 @@
+// Long-running worker of the bulk evaluation queue (create_evaluation_jobs_tables.sql,
+// api/utils/evaluation-runner.js). Any number of these can run side by side,
+// on one machine or several: items are claimed with FOR UPDATE SKIP LOCKED.
+// SIGINT/SIGTERM finish the batches in hand and exit; batches of a killed
+// worker go back to the queue when their lease expires.
+//
+// GEMINI_API_BASE_URL points the worker at a stub Gemini server
+// (scripts/gemini-stub.mjs) for local end-to-end runs.
+//
+// Usage: POSTGRES_URL=... node scripts/evaluation-worker.mjs
+//          [--batch-size=20] [--concurrency=2] [--poll-ms=2000]
+import { hostname } from 'os';
+import { runWorker } from '../api/utils/evaluation-runner.js';
+
+const args = Object.fromEntries(process.argv.slice(2).map((arg) => {
+  const [key, value = 'true'] = arg.replace(/^--/, '').split('=');
+  return [key, value];
+}));
+
+const workerId = `${hostname()}:${process.pid}`;
+const controller = new AbortController();
+const stop = () => {
+  if (controller.signal.aborted) process.exit(1);
+  console.log(`[Evaluation worker] ${workerId}: finalizando os lotes em andamento (repita o sinal para sair já)...`);
+  controller.abort();
+};
+process.on('SIGINT', stop);
+process.on('SIGTERM', stop);
+
+console.log(`[Evaluation worker] ${workerId} iniciado.`);
+await runWorker({
+  workerId,
+  batchSize: Number(args['batch-size'] || 20),
+  concurrency: Number(args.concurrency || 2),
+  pollMs: Number(args['poll-ms'] || 2000),
+  signal: controller.signal,
+});
+console.log(`[Evaluation worker] ${workerId} encerrado.`);
+process.exit(0);
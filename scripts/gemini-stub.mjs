@@ -0,0 +1,106 @@
+// Stand-in for the Gemini REST API, for end-to-end runs of the evaluation
+// queue without a key or quota: start it, point GEMINI_API_BASE_URL at it and
+// run scripts/evaluation-worker.mjs (and scripts/loadtest/server.mjs for the API).
+//
+// generateContent answers a grouped evaluation prompt with a valid
+// "resultados" entry for every item of its materials JSON. cachedContents are
+// accepted and forgotten. --rate-limit=0.1 answers that share of calls with a
+// 429 ("Please retry in 1s"), --latency-ms delays every answer.
+//
+// Usage: node scripts/gemini-stub.mjs [port] [--latency-ms=200] [--rate-limit=0]
+//   GEMINI_API_BASE_URL=http://localhost:3200/v1beta node scripts/evaluation-worker.mjs
+import http from 'http';
+
+const args = Object.fromEntries(process.argv.slice(2).filter(arg => arg.startsWith('--')).map((arg) => {
+  const [key, value = 'true'] = arg.replace(/^--/, '').split('=');
+  return [key, value];
+}));
+const PORT = Number(process.argv.slice(2).find(arg => !arg.startsWith('--')) || process.env.PORT || 3200);
+const LATENCY_MS = Number(args['latency-ms'] || 200);
+const RATE_LIMIT = Number(args['rate-limit'] || 0);
+
+let cacheCounter = 0;
+const stats = { generate: 0, items: 0, rateLimited: 0 };
+
+const evaluationFor = (id, index) => {
+  const nota = (index % 3) + 1;
+  const status = ['RUIM', 'BOM', 'ÓTIMO'][nota - 1];
+  const criteria = [[1, 'Key Message / Mensagem Principal'], [3, 'Branding (Do’s & Don’ts)'], [4, 'Criatividade'], [7, 'Call to Action (CTA)']];
+  return {
+    id,
+    avaliacoes: criteria.map(([idCriterio, nome]) => ({
+      id_criterio: idCriterio,
+      nome,
+      nota,
+      status,
+      comentario: `Avaliação simulada de ${id}.`,
+      detalhes_ausentes: nota === 3 ? '' : 'Detalhes simulados.',
+    })),
+    score_final: { pontuacao_obtida: nota * criteria.length, pontuacao_maxima: 12 },
+    feedback_consolidado: { texto: `Feedback simulado de ${id}.` },
+  };
+};
+
+const materialsOf = (prompt) => {
+  const blocks = [...prompt.matchAll(/```json\n([\s\S]*?)\n```/g)];
+  for (const block of blocks.reverse()) {
+    try {
+      const parsed = JSON.parse(block[1]);
+      if (Array.isArray(parsed)) return parsed;
+    } catch {
+      // Not the materials block.
+    }
+  }
+  return [];
+};
+
+const send = (res, status, body) => {
+  res.statusCode = status;
+  res.setHeader('Content-Type', 'application/json');
+  res.end(JSON.stringify(body));
+};
+
+const readJson = async (req) => {
+  const chunks = [];
+  for await (const chunk of req) chunks.push(chunk);
+  const text = Buffer.concat(chunks).toString('utf8');
+  return text ? JSON.parse(text) : {};
+};
+
+const server = http.createServer(async (req, res) => {
+  const { pathname } = new URL(req.url, `http://${req.headers.host}`);
+  await new Promise(resolve => setTimeout(resolve, LATENCY_MS));
+
+  if (req.method === 'GET' && pathname.endsWith('/models')) {
+    return send(res, 200, {
+      models: [{ name: 'models/gemini-2.5-flash', supportedGenerationMethods: ['generateContent'] }],
+    });
+  }
+  if (req.method === 'GET' && pathname.endsWith('/stats')) {
+    return send(res, 200, stats);
+  }
+  if (req.method === 'POST' && pathname.endsWith('/cachedContents')) {
+    cacheCounter += 1;
+    return send(res, 200, { name: `cachedContents/stub-${cacheCounter}` });
+  }
+  if (req.method === 'DELETE' && pathname.includes('/cachedContents/')) {
+    return send(res, 200, {});
+  }
+  if (req.method === 'POST' && pathname.endsWith(':generateContent')) {
+    if (Math.random() < RATE_LIMIT) {
+      stats.rateLimited += 1;
+      return send(res, 429, { error: { code: 429, message: 'Resource has been exhausted. Please retry in 1s.', status: 'RESOURCE_EXHAUSTED' } });
+    }
+    const body = await readJson(req);
+    const items = materialsOf(body.contents?.[0]?.parts?.[0]?.text || '');
+    stats.generate += 1;
+    stats.items += items.length;
+    const text = `\`\`\`json\n${JSON.stringify({ resultados: items.map((item, i) => evaluationFor(item.id, i)) })}\n\`\`\``;
+    return send(res, 200, { candidates: [{ content: { parts: [{ text }] } }] });
+  }
+  return send(res, 404, { error: { message: `No stub for ${req.method} ${pathname}` } });
+});
+
+server.listen(PORT, () => {
+  console.log(`[gemini-stub] http://localhost:${PORT}/v1beta (latency ${LATENCY_MS} ms, rate limit ${RATE_LIMIT})`);
+});
@@ -0,0 +1,491 @@
+"""Asyncio load generator for the api/ handlers against a local Postgres.
+
+Two sub-commands:
+
+    # create the schema from the repo's SQL files and generate rows in Postgres
+    python scripts/loadtest/loadgen.py seed --database-url postgres://localhost/copoc_load \\
+        --users 200 --transcriptions 2000000 --briefings 20000
+
+    # start scripts/loadtest/server.mjs against that database and replay a user mix
+    python scripts/loadtest/loadgen.py run --database-url postgres://localhost/copoc_load \\
+        --concurrency 300 --duration 120 --mix list_transcriptions=40,update_transcription=30,me=20,export=10
+
+`run` prints p50/p95/p99 latency, throughput and error rate per endpoint and can
+write the same numbers as JSON (--report). Requires `pip install -r
+scripts/loadtest/requirements.txt` and a `node` binary with the app's npm
+dependencies installed.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import signal
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_SCRIPT = Path(__file__).with_name("server.mjs")
+DEFAULT_JWT_SECRET = "a-secure-default-secret-for-development"
+
+# The repo has no DDL for `users`; this is the subset of columns the handlers read.
+USERS_DDL = """
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    uuid UUID DEFAULT gen_random_uuid() NOT NULL UNIQUE,
+    name VARCHAR(255),
+    email VARCHAR(255) UNIQUE,
+    gemini_api_key TEXT,
+    gemini_model VARCHAR(255)
+);
+"""
+
+SEED_USERS_SQL = """
+INSERT INTO users (name, email, gemini_model)
+SELECT 'Load User ' || g, 'load' || g || '@example.com', 'gemini-2.5-flash'
+FROM generate_series(1, $1) AS g
+ON CONFLICT (email) DO NOTHING
+"""
+
+SEED_BRIEFINGS_SQL = """
+WITH u AS (SELECT row_number() OVER (ORDER BY id) - 1 AS n, uuid FROM users)
+INSERT INTO briefings (user_id, name, briefing_data)
+SELECT u.uuid,
+       'Briefing ' || g,
+       jsonb_build_object('revisedText', '<p>' || repeat(md5(g::text) || ' ', 60) || '</p>')
+FROM generate_series($1::int, $2::int) AS g
+JOIN u ON u.n = g % $3
+"""
+
+# create_briefings_table.sql drops the table first; it is only used on --reset.
+BRIEFINGS_IF_MISSING = """
+CREATE TABLE IF NOT EXISTS briefings (
+    id SERIAL PRIMARY KEY,
+    uuid UUID DEFAULT gen_random_uuid() NOT NULL UNIQUE,
+    user_id UUID NOT NULL REFERENCES users(uuid) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    briefing_data JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_briefings_user_id ON briefings(user_id);
+"""
+
+# Rows are built entirely server-side so millions of them seed in minutes.
+SEED_TRANSCRIPTIONS_SQL = """
+WITH u AS (SELECT row_number() OVER (ORDER BY id) - 1 AS n, uuid FROM users),
+     b AS (SELECT user_id, array_agg(id ORDER BY id) AS ids FROM briefings GROUP BY user_id)
+INSERT INTO transcriptions (user_id, name, video_url, briefing_id, transcription_data, created_at, updated_at)
+SELECT u.uuid,
+       'AVAL' || lpad(g::text, 8, '0'),
+       'https://www.instagram.com/reel/' || substr(md5(g::text), 1, 11) || '/',
+       b.ids[1 + g % array_length(b.ids, 1)],
+       jsonb_build_object(
+         'captionText', repeat(md5((g * 3)::text) || ' ', 6),
+         'transcription', repeat(md5((g * 7)::text) || ' ', 40),
+         'videoDuration', 10 + (g % 80),
+         'campanha', 'CH' || lpad((g % 40)::text, 3, '0'),
+         'missao', 'M' || lpad((g % 400)::text, 4, '0'),
+         'evaluationResult', jsonb_build_object(
+           'avaliacoes', (SELECT jsonb_agg(jsonb_build_object(
+                            'id_criterio', c, 'nota', 1 + ((g + c) % 3),
+                            'comentario', repeat(md5((g + c)::text), 3)))
+                          FROM unnest(ARRAY[1, 3, 4, 7]) AS c),
+           'score_final', jsonb_build_object('pontuacao_obtida', 4 + (g % 9), 'pontuacao_maxima', 12),
+           'feedback_consolidado', jsonb_build_object('texto', repeat(md5((g * 11)::text) || ' ', 8))
+         )
+       ),
+       NOW() - (g % 31536000) * INTERVAL '1 second',
+       NOW() - (g % 31536000) * INTERVAL '1 second'
+FROM generate_series($1::int, $2::int) AS g
+JOIN u ON u.n = g % $3
+LEFT JOIN b ON b.user_id = u.uuid
+"""
+
+
+# --- JWT -------------------------------------------------------------------
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def make_jwt(claims, secret, ttl=24 * 3600):
+    """HS256 token compatible with jsonwebtoken.verify in the handlers."""
+    now = int(time.time())
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64url(json.dumps({**claims, "iat": now, "exp": now + ttl}, separators=(",", ":")).encode())
+    signing_input = f"{header}.{payload}".encode("ascii")
+    signature = _b64url(hmac.new(secret.encode(), signing_input, hashlib.sha256).digest())
+    return f"{header}.{payload}.{signature}"
+
+
+# --- Scenarios ---------------------------------------------------------------
+
+class VirtualUser:
+    def __init__(self, user_id, user_uuid, secret, transcription_ids, briefing_ids):
+        self.user_id = user_id
+        self.user_uuid = user_uuid
+        self.cookie = f"auth_token={make_jwt({'userId': user_id, 'sub': str(user_uuid)}, secret)}"
+        self.transcription_ids = transcription_ids
+        self.briefing_ids = briefing_ids
+
+
+def _transcription_body(user, rng):
+    return {
+        "name": f"LOAD{rng.randrange(10**8):08d}",
+        "video_url": "https://www.instagram.com/reel/loadtest/",
+        "briefing_id": rng.choice(user.briefing_ids) if user.briefing_ids else None,
+        "transcription_data": {
+            "captionText": "legenda " * 20,
+            "transcription": "transcrição de carga " * 80,
+            "videoDuration": rng.randint(10, 90),
+        },
+    }
+
+
+def scenario_me(user, rng):
+    return "me", "GET", "/api/auth/me", None
+
+
+def scenario_list_briefings(user, rng):
+    return "list_briefings", "GET", "/api/briefings", None
+
+
+def scenario_list_transcriptions(user, rng):
+    return "list_transcriptions", "GET", "/api/transcriptions", None
+
+
+def scenario_page_transcriptions(user, rng):
+    """First page of 50 list rows, filtered by one of the user's briefings when it has any."""
+    briefing = f"&briefing_id={rng.choice(user.briefing_ids)}" if user.briefing_ids else ""
+    return "page_transcriptions", "GET", f"/api/transcriptions?limit=50{briefing}", None
+
+
+def scenario_get_transcription(user, rng):
+    if not user.transcription_ids:
+        return scenario_list_transcriptions(user, rng)
+    return "get_transcription", "GET", f"/api/transcriptions/{rng.choice(user.transcription_ids)}", None
+
+
+def scenario_create_transcription(user, rng):
+    return "create_transcription", "POST", "/api/transcriptions", _transcription_body(user, rng)
+
+
+def scenario_update_transcription(user, rng):
+    if not user.transcription_ids:
+        return scenario_create_transcription(user, rng)
+    tid = rng.choice(user.transcription_ids)
+    return "update_transcription", "PUT", f"/api/transcriptions/{tid}", _transcription_body(user, rng)
+
+
+def scenario_export(user, rng):
+    html = "<h1>Briefing</h1>" + ("<p>" + "conteúdo do briefing " * 40 + "</p>") * 10
+    return "export", "POST", "/api/export", {"exportType": "briefing", "htmlContent": html, "fileName": "load"}
+
+
+SCENARIOS = {
+    "me": scenario_me,
+    "list_briefings": scenario_list_briefings,
+    "list_transcriptions": scenario_list_transcriptions,
+    "page_transcriptions": scenario_page_transcriptions,
+    "get_transcription": scenario_get_transcription,
+    "create_transcription": scenario_create_transcription,
+    "update_transcription": scenario_update_transcription,
+    "export": scenario_export,
+}
+
+DEFAULT_MIX = ("list_transcriptions=20,page_transcriptions=10,get_transcription=15,list_briefings=10,me=15,"
+               "update_transcription=15,create_transcription=10,export=5")
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix must contain at least one scenario with a positive weight")
+    return mix
+
+
+# --- Statistics ---------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.started = None
+        self.finished = None
+
+    def record(self, endpoint, status, elapsed):
+        self.latencies[endpoint].append(elapsed)
+        self.statuses[endpoint][status] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def summary(self):
+        wall = max((self.finished or time.monotonic()) - (self.started or 0), 1e-9)
+        endpoints = {}
+        all_latencies = []
+        for endpoint, values in sorted(self.latencies.items()):
+            values.sort()
+            all_latencies.extend(values)
+            endpoints[endpoint] = self._stats(values, self.errors[endpoint], wall)
+            endpoints[endpoint]["statuses"] = {str(k): v for k, v in self.statuses[endpoint].items()}
+        all_latencies.sort()
+        return {
+            "duration_s": wall,
+            "total": self._stats(all_latencies, sum(self.errors.values()), wall),
+            "endpoints": endpoints,
+        }
+
+    @staticmethod
+    def _stats(values, errors, wall):
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": errors,
+            "error_rate": errors / count if count else 0.0,
+            "throughput_rps": count / wall,
+            "p50_ms": _ms(percentile(values, 50)),
+            "p95_ms": _ms(percentile(values, 95)),
+            "p99_ms": _ms(percentile(values, 99)),
+            "max_ms": _ms(values[-1] if values else None),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def print_summary(summary):
+    header = f"{'endpoint':<24}{'reqs':>9}{'err%':>8}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+    for name, s in rows:
+        print(f"{name:<24}{s['requests']:>9}{s['error_rate'] * 100:>7.2f}%{s['throughput_rps']:>9.1f}"
+              f"{_fmt(s['p50_ms'])}{_fmt(s['p95_ms'])}{_fmt(s['p99_ms'])}")
+
+
+def _fmt(value):
+    return f"{'-':>10}" if value is None else f"{value:>8.1f}ms"
+
+
+# --- Commands -------------------------------------------------------------------
+
+async def seed(args):
+    import asyncpg
+
+    conn = await asyncpg.connect(args.database_url)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+        await conn.execute(USERS_DDL)
+        if args.reset:
+            await conn.execute("DROP TABLE IF EXISTS transcriptions")
+            await conn.execute((REPO_ROOT / "create_briefings_table.sql").read_text(encoding="utf-8"))
+        else:
+            await conn.execute(BRIEFINGS_IF_MISSING)
+        await conn.execute((REPO_ROOT / "create_transcriptions_table.sql").read_text(encoding="utf-8"))
+
+        await conn.execute(SEED_USERS_SQL, args.users)
+        user_count = await conn.fetchval("SELECT count(*) FROM users")
+
+        await _seed_in_batches(conn, "briefings", SEED_BRIEFINGS_SQL, args.briefings, args.batch_size, user_count)
+        await _seed_in_batches(conn, "transcriptions", SEED_TRANSCRIPTIONS_SQL, args.transcriptions,
+                               args.batch_size, user_count)
+        await conn.execute("ANALYZE users; ANALYZE briefings; ANALYZE transcriptions")
+    finally:
+        await conn.close()
+
+
+async def _seed_in_batches(conn, table, sql, total, batch_size, user_count):
+    offset = await conn.fetchval(f"SELECT count(*) FROM {table}")
+    started = time.monotonic()
+    done = 0
+    while done < total:
+        start = offset + done + 1
+        end = offset + min(total, done + batch_size)
+        async with conn.transaction():
+            await conn.execute(sql, start, end, user_count)
+        done = end - offset
+        rate = done / max(time.monotonic() - started, 1e-9)
+        print(f"[seed] {table}: {done}/{total} rows ({rate:,.0f} rows/s)", flush=True)
+
+
+async def _load_users(database_url, limit):
+    import asyncpg
+
+    conn = await asyncpg.connect(database_url)
+    try:
+        users = await conn.fetch("SELECT id, uuid FROM users ORDER BY id LIMIT $1", limit)
+        result = []
+        for user in users:
+            tids = await conn.fetch(
+                "SELECT id FROM transcriptions WHERE user_id = $1 ORDER BY id DESC LIMIT 200", user["uuid"])
+            bids = await conn.fetch("SELECT id FROM briefings WHERE user_id = $1 LIMIT 50", user["uuid"])
+            result.append((user["id"], user["uuid"], [r["id"] for r in tids], [r["id"] for r in bids]))
+        return result
+    finally:
+        await conn.close()
+
+
+async def _wait_for_port(host, port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.returncode is not None:
+            raise RuntimeError(f"server.mjs exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            await writer.wait_closed()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server.mjs did not start listening on {host}:{port} within {timeout}s")
+
+
+async def _start_server(args, secret):
+    env = {**os.environ, "POSTGRES_URL": args.database_url, "JWT_SECRET": secret}
+    process = await asyncio.create_subprocess_exec(
+        args.node, str(SERVER_SCRIPT), str(args.port), cwd=str(REPO_ROOT), env=env,
+        stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+        stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+    )
+    await _wait_for_port("127.0.0.1", args.port, process)
+    return process
+
+
+async def _worker(session, base_url, users, mix, recorder, stop_at, rng, think_time):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.monotonic() < stop_at:
+        user = rng.choice(users)
+        endpoint, method, path, body = SCENARIOS[rng.choices(names, weights)[0]](user, rng)
+        headers = {"Cookie": user.cookie}
+        started = time.monotonic()
+        status = None
+        try:
+            async with session.request(method, base_url + path, json=body, headers=headers) as response:
+                await response.read()
+                status = response.status
+        except Exception:  # noqa: BLE001 - every transport failure counts as an error
+            status = None
+        recorder.record(endpoint, status, time.monotonic() - started)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1.0 / think_time))
+
+
+async def run(args):
+    import aiohttp
+
+    secret = args.jwt_secret
+    users = [VirtualUser(uid, uuid, secret, tids, bids)
+             for uid, uuid, tids, bids in await _load_users(args.database_url, args.users)]
+    if not users:
+        raise SystemExit("No users found; run the `seed` command first.")
+
+    server = None if args.base_url else await _start_server(args, secret)
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    recorder = Recorder()
+    try:
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            if args.warmup:
+                warm_stop = time.monotonic() + args.warmup
+                await asyncio.gather(*(
+                    _worker(session, base_url, users, args.mix, Recorder(), warm_stop,
+                            random.Random(f"warmup-{i}"), args.think_time)
+                    for i in range(min(args.concurrency, 10))
+                ))
+            recorder.started = time.monotonic()
+            stop_at = recorder.started + args.duration
+            await asyncio.gather(*(
+                _worker(session, base_url, users, args.mix, recorder, stop_at,
+                        random.Random(f"{args.seed}-{i}"), args.think_time)
+                for i in range(args.concurrency)
+            ))
+            recorder.finished = time.monotonic()
+    finally:
+        if server is not None and server.returncode is None:
+            server.send_signal(signal.SIGTERM)
+            await server.wait()
+
+    summary = recorder.summary()
+    summary["config"] = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "users": len(users),
+    }
+    print_summary(summary)
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    if args.max_error_rate is not None and summary["total"]["error_rate"] > args.max_error_rate:
+        raise SystemExit(f"error rate {summary['total']['error_rate']:.2%} above {args.max_error_rate:.2%}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--database-url", default=os.environ.get("POSTGRES_URL"),
+                        required="POSTGRES_URL" not in os.environ)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_seed = sub.add_parser("seed", parents=[common], help="create tables and generate synthetic rows")
+    p_seed.add_argument("--users", type=int, default=100)
+    p_seed.add_argument("--briefings", type=int, default=5_000)
+    p_seed.add_argument("--transcriptions", type=int, default=1_000_000)
+    p_seed.add_argument("--batch-size", type=int, default=100_000)
+    p_seed.add_argument("--reset", action="store_true", help="drop and recreate briefings/transcriptions first")
+
+    p_run = sub.add_parser("run", parents=[common], help="replay a concurrent user mix and report latencies")
+    p_run.add_argument("--concurrency", type=int, default=50, help="simultaneous virtual users")
+    p_run.add_argument("--duration", type=float, default=60, help="measured seconds")
+    p_run.add_argument("--warmup", type=float, default=5, help="unmeasured seconds to warm the server")
+    p_run.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                       help=f"weighted scenarios (default: {DEFAULT_MIX})")
+    p_run.add_argument("--users", type=int, default=100, help="distinct accounts to spread requests over")
+    p_run.add_argument("--think-time", type=float, default=0.0, help="mean seconds between a user's requests")
+    p_run.add_argument("--request-timeout", type=float, default=60)
+    p_run.add_argument("--base-url", help="target an already running server instead of starting server.mjs")
+    p_run.add_argument("--port", type=int, default=3100)
+    p_run.add_argument("--node", default="node")
+    p_run.add_argument("--jwt-secret", default=os.environ.get("JWT_SECRET", DEFAULT_JWT_SECRET))
+    p_run.add_argument("--seed", default="load")
+    p_run.add_argument("--report", help="write the summary as JSON to this path")
+    p_run.add_argument("--max-error-rate", type=float, help="exit non-zero above this error rate (0-1)")
+    p_run.add_argument("--verbose", action="store_true", help="show server.mjs output")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = seed if args.command == "seed" else run
+    asyncio.run(command(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+// Local stand-in for the Vercel runtime, used by the load generator.
+//
+// Routes /api/* to the handlers in api/ using the same filesystem rules as
+// Vercel (api/transcriptions/[id].js receives req.query.id) and adds the
+// req.body / res.status / res.json / res.send helpers the Node handlers rely on.
+// Edge handlers (export const config = { runtime: 'edge' }) get a WHATWG Request.
+//
+// Usage: POSTGRES_URL=... JWT_SECRET=... node scripts/loadtest/server.mjs [port]
+import http from 'http';
+import { existsSync, readdirSync } from 'fs';
+import { join, resolve } from 'path';
+import { pathToFileURL } from 'url';
+
+const API_DIR = resolve(process.cwd(), 'api');
+const PORT = Number(process.argv[2] || process.env.PORT || 3100);
+const moduleCache = new Map();
+
+const resolveRoute = (pathname) => {
+  const segments = pathname.replace(/^\/api\/?/, '').split('/').filter(Boolean);
+  const params = {};
+  let dir = API_DIR;
+
+  for (let i = 0; i < segments.length; i++) {
+    const segment = decodeURIComponent(segments[i]);
+    const isLast = i === segments.length - 1;
+
+    if (isLast && existsSync(join(dir, `${segment}.js`))) {
+      return { file: join(dir, `${segment}.js`), params };
+    }
+    if (!isLast && existsSync(join(dir, segment))) {
+      dir = join(dir, segment);
+      continue;
+    }
+
+    const dynamic = existsSync(dir) && readdirSync(dir).find(name => /^\[.+\](\.js)?$/.test(name));
+    if (!dynamic) return null;
+    params[dynamic.replace(/^\[|\](\.js)?$/g, '')] = segment;
+    if (isLast) {
+      return dynamic.endsWith('.js') ? { file: join(dir, dynamic), params } : null;
+    }
+    dir = join(dir, dynamic);
+  }
+  return null;
+};
+
+const loadHandler = async (file) => {
+  if (!moduleCache.has(file)) {
+    moduleCache.set(file, import(pathToFileURL(file).href));
+  }
+  return moduleCache.get(file);
+};
+
+const readBody = async (req) => {
+  const chunks = [];
+  for await (const chunk of req) chunks.push(chunk);
+  return Buffer.concat(chunks);
+};
+
+const decorateResponse = (res) => {
+  res.status = (code) => { res.statusCode = code; return res; };
+  res.json = (payload) => {
+    if (!res.getHeader('Content-Type')) res.setHeader('Content-Type', 'application/json');
+    res.end(JSON.stringify(payload));
+    return res;
+  };
+  res.send = (payload) => {
+    if (Buffer.isBuffer(payload) || typeof payload === 'string') {
+      res.end(payload);
+    } else {
+      res.json(payload);
+    }
+    return res;
+  };
+  res.redirect = (statusOrUrl, url) => {
+    res.statusCode = url ? statusOrUrl : 307;
+    res.setHeader('Location', url || statusOrUrl);
+    res.end();
+    return res;
+  };
+  return res;
+};
+
+const runEdgeHandler = async (handler, req, res, rawBody) => {
+  const request = new Request(`http://${req.headers.host}${req.url}`, {
+    method: req.method,
+    headers: req.headers,
+    body: ['GET', 'HEAD'].includes(req.method) ? undefined : rawBody,
+  });
+  const response = await handler(request);
+  res.statusCode = response.status;
+  response.headers.forEach((value, key) => res.setHeader(key, value));
+  if (response.body) {
+    for await (const chunk of response.body) res.write(chunk);
+  }
+  res.end();
+};
+
+const server = http.createServer(async (req, res) => {
+  const url = new URL(req.url, `http://${req.headers.host}`);
+  const route = url.pathname.startsWith('/api/') ? resolveRoute(url.pathname) : null;
+
+  if (!route) {
+    res.statusCode = 404;
+    res.end('Not Found');
+    return;
+  }
+
+  try {
+    const mod = await loadHandler(route.file);
+    const rawBody = await readBody(req);
+
+    if (mod.config?.runtime === 'edge') {
+      await runEdgeHandler(mod.default, req, res, rawBody);
+      return;
+    }
+
+    req.query = { ...Object.fromEntries(url.searchParams), ...route.params };
+    req.cookies = {};
+    const contentType = req.headers['content-type'] || '';
+    if (rawBody.length > 0 && contentType.includes('application/json')) {
+      req.body = JSON.parse(rawBody.toString('utf8'));
+    } else {
+      req.body = rawBody.length > 0 ? rawBody.toString('utf8') : undefined;
+    }
+    // Handlers such as api/user/settings.js read the raw stream themselves.
+    req[Symbol.asyncIterator] = async function* () { yield rawBody; };
+
+    await mod.default(req, decorateResponse(res));
+  } catch (error) {
+    console.error(`[loadtest-server] ${req.method} ${url.pathname} failed:`, error);
+    if (!res.headersSent) {
+      res.statusCode = 500;
+      res.end('Internal Server Error');
+    } else {
+      res.end();
+    }
+  }
+});
+
+server.keepAliveTimeout = 65_000;
+server.listen(PORT, () => {
+  console.log(`[loadtest-server] listening on http://127.0.0.1:${PORT}`);
+});
@@ -0,0 +1,75 @@
+// Copies the FFmpeg core and downloads the Transformers.js models used by the
+// transcription worker into public/ai-assets/, then writes manifest.json with
+// the SHA-256 and size of every file. The worker serves these from the app's
+// own origin, verifies them against the manifest and caches them per version
+// (see src/utils/aiAssetCache.js).
+//
+// Usage: node scripts/sync-ai-assets.mjs [--skip-models]
+import { createHash } from 'crypto';
+import { mkdir, readFile, writeFile } from 'fs/promises';
+import { dirname, join, resolve } from 'path';
+import { AI_ASSET_GROUPS, FFMPEG_CORE_VERSION } from '../src/utils/aiAssetCache.js';
+
+const ROOT = resolve(process.cwd());
+const OUT_DIR = join(ROOT, 'public', 'ai-assets');
+const FFMPEG_DIST = join(ROOT, 'node_modules', '@ffmpeg', 'core', 'dist', 'esm');
+const HF_BASE = process.env.HF_MIRROR || 'https://huggingface.co';
+const skipModels = process.argv.includes('--skip-models');
+
+const sha256 = (buffer) => createHash('sha256').update(buffer).digest('hex');
+
+const writeAsset = async (path, buffer) => {
+  await mkdir(dirname(path), { recursive: true });
+  await writeFile(path, buffer);
+  return { sha256: sha256(buffer), size: buffer.length };
+};
+
+const syncFFmpeg = async () => {
+  const pkg = JSON.parse(await readFile(join(ROOT, 'node_modules', '@ffmpeg', 'core', 'package.json'), 'utf8'));
+  if (pkg.version !== FFMPEG_CORE_VERSION) {
+    throw new Error(`@ffmpeg/core ${pkg.version} installed, aiAssetCache.js expects ${FFMPEG_CORE_VERSION}.`);
+  }
+  const files = {};
+  for (const file of AI_ASSET_GROUPS.ffmpeg.files) {
+    const buffer = await readFile(join(FFMPEG_DIST, file));
+    files[file] = await writeAsset(join(OUT_DIR, 'ffmpeg', FFMPEG_CORE_VERSION, file), buffer);
+    console.log(`ffmpeg/${FFMPEG_CORE_VERSION}/${file} (${files[file].size} bytes)`);
+  }
+  return { version: FFMPEG_CORE_VERSION, files };
+};
+
+const syncModel = async (model, fileList) => {
+  const files = {};
+  for (const file of fileList) {
+    const url = `${HF_BASE}/${model}/resolve/main/${file}`;
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`GET ${url} failed: HTTP ${response.status}`);
+    }
+    const buffer = Buffer.from(await response.arrayBuffer());
+    files[file] = await writeAsset(join(OUT_DIR, 'models', model, file), buffer);
+    console.log(`models/${model}/${file} (${files[file].size} bytes)`);
+  }
+  return { files };
+};
+
+const main = async () => {
+  const manifest = { ffmpeg: await syncFFmpeg(), models: {} };
+  if (!skipModels) {
+    for (const group of ['transcriber', 'translator']) {
+      const { model, files } = AI_ASSET_GROUPS[group];
+      manifest.models[model] = await syncModel(model, files);
+    }
+  }
+  // The version changes whenever any file does, which invalidates browser caches.
+  manifest.version = sha256(JSON.stringify({ ffmpeg: manifest.ffmpeg, models: manifest.models })).slice(0, 16);
+  manifest.generatedAt = new Date().toISOString();
+
+  await writeFile(join(OUT_DIR, 'manifest.json'), `${JSON.stringify(manifest, null, 2)}\n`);
+  console.log(`manifest.json written (version ${manifest.version}).`);
+};
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
@@ -38,10 +38,11 @@ import { useUserAuth } from '../context/UserAuthContext';
 import { useLayout } from '../context/LayoutContext';
 import { useTheme as useAppTheme } from '../context/ThemeContext';
 import SetupModal from './SetupModal';
-import { getBriefings } from '../utils/briefingState';
+import { getBriefings, exportBriefingsDocx } from '../utils/briefingState';
 import { deleteTranscriptionsBatch } from '../utils/transcriptionState';
-import { exportEvaluationsToExcel } from '../utils/exportUtils';
+import { downloadEvaluationsExport } from '../utils/exportUtils';
 import { toast } from 'sonner';
+import { saveAs } from 'file-saver';
 
 const drawerWidth = 280;
 
@@ -123,6 +124,9 @@ const MainLayout = () => {
     selectedBriefingId,
     transcriptions,
     fetchTranscriptions,
+    loadMoreTranscriptions,
+    hasMoreTranscriptions,
+    isLoadingTranscriptions,
     setSelectedTranscriptionId,
     selectedTranscriptionId,
     checkedTranscriptionIds,
@@ -144,6 +148,8 @@ const MainLayout = () => {
   const [setupModalOpen, setSetupModalOpen] = useState(false);
   const [anchorEl, setAnchorEl] = useState(null);
   const [mobileOpen, setMobileOpen] = useState(false);
+  const [checkedBriefingIds, setCheckedBriefingIds] = useState([]);
+  const [isExportingBriefings, setIsExportingBriefings] = useState(false);
 
   useEffect(() => {
     if (isBriefingPage) {
@@ -226,12 +232,12 @@ const MainLayout = () => {
     }
   };
 
-  const handleExportSelectedTranscriptions = () => {
+  const handleExportSelectedTranscriptions = async () => {
     if (checkedTranscriptionIds.length === 0) return;
 
-    const selectedToExport = transcriptions.filter(t => checkedTranscriptionIds.includes(t.id));
     try {
-      exportEvaluationsToExcel(selectedToExport);
+      // The server streams the file from the database; nothing is loaded here.
+      downloadEvaluationsExport({ ids: checkedTranscriptionIds });
       toast.success(`${checkedTranscriptionIds.length} avaliação(ões) exportada(s) com sucesso.`);
     } catch (error) {
       console.error('Error exporting transcriptions:', error);
@@ -239,6 +245,31 @@ const MainLayout = () => {
     }
   };
 
+  const handleToggleBriefingCheck = (id, event) => {
+    event.stopPropagation();
+    setCheckedBriefingIds((prev) =>
+      prev.includes(id) ? prev.filter((item) => item !== id) : [...prev, id]
+    );
+  };
+
+  const handleExportSelectedBriefings = async () => {
+    if (checkedBriefingIds.length === 0) return;
+
+    setIsExportingBriefings(true);
+    try {
+      // One request: the server zips the documents, reusing cached renders.
+      const zip = await exportBriefingsDocx(checkedBriefingIds);
+      saveAs(zip, `briefings_${new Date().toISOString().split('T')[0]}.zip`);
+      toast.success(`${checkedBriefingIds.length} briefing(s) exportado(s) para Word.`);
+      setCheckedBriefingIds([]);
+    } catch (error) {
+      console.error('Error exporting briefings:', error);
+      toast.error(`Erro ao exportar briefings: ${error.message}`);
+    } finally {
+      setIsExportingBriefings(false);
+    }
+  };
+
   const drawerContent = (
     <div>
       <DrawerHeader>
@@ -304,9 +335,50 @@ const MainLayout = () => {
           <Divider />
         </>
       )}
+      {isBriefingPage && checkedBriefingIds.length > 0 && (
+        <>
+          <Box sx={{ p: 1, display: 'flex', flexDirection: 'column', gap: 1 }}>
+            <Button
+              variant="contained"
+              color="primary"
+              startIcon={<DownloadIcon />}
+              fullWidth
+              size="small"
+              onClick={handleExportSelectedBriefings}
+              disabled={isExportingBriefings}
+              sx={{
+                opacity: isMobile || isDrawerOpen ? 1 : 0,
+                transition: 'opacity 0.2s',
+              }}
+            >
+              {isExportingBriefings ? 'Exportando...' : 'Exportar Word (ZIP)'}
+            </Button>
+            {(isMobile || isDrawerOpen) && (
+              <Typography variant="caption" align="center" sx={{ color: 'text.secondary' }}>
+                {checkedBriefingIds.length} selecionado(s)
+              </Typography>
+            )}
+          </Box>
+          <Divider />
+        </>
+      )}
       <List>
         {isBriefingPage && briefings.map((briefing) => (
-          <ListItem key={briefing.id} disablePadding sx={{ display: 'block' }}>
+          <ListItem
+            key={briefing.id}
+            disablePadding
+            sx={{ display: 'block' }}
+            secondaryAction={
+              (isDrawerOpen || isMobile) && (
+                <Checkbox
+                  edge="end"
+                  onChange={(e) => handleToggleBriefingCheck(briefing.id, e)}
+                  checked={checkedBriefingIds.includes(briefing.id)}
+                  onClick={(e) => e.stopPropagation()}
+                />
+              )
+            }
+          >
             <ListItemButton
               selected={selectedBriefingId === briefing.id}
               onClick={() => handleSelectBriefing(briefing.id)}
@@ -376,6 +448,19 @@ const MainLayout = () => {
             </ListItemButton>
           </ListItem>
         ))}
+        {isTranscriptionPage && hasMoreTranscriptions && (isDrawerOpen || isMobile) && (
+          <ListItem disablePadding sx={{ display: 'block', px: 2, py: 1 }}>
+            <Button
+              fullWidth
+              size="small"
+              variant="outlined"
+              onClick={loadMoreTranscriptions}
+              disabled={isLoadingTranscriptions}
+            >
+              {isLoadingTranscriptions ? 'Carregando...' : 'Carregar mais'}
+            </Button>
+          </ListItem>
+        )}
       </List>
     </div>
   );
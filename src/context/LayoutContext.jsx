@@ -1,8 +1,19 @@
 import React, {
-  createContext, useState, useContext, useCallback,
+  createContext, useState, useContext, useCallback, useRef, useMemo,
 } from 'react';
 import { getBriefings } from '../utils/briefingState';
 import { getTranscriptions } from '../utils/transcriptionState';
+import { SyncedCollection } from '../utils/syncedCollection';
+import { useUserAuth } from './UserAuthContext';
+
+// Page size of the sidebar when it is served from the local copy (the
+// server's default page size).
+const LOCAL_PAGE_SIZE = 50;
+// created_at arrives as an ISO string, which sorts chronologically as text.
+const newestFirst = (a, b) => {
+  if (a.created_at !== b.created_at) return a.created_at < b.created_at ? 1 : -1;
+  return b.id - a.id;
+};
 
 const LayoutContext = createContext(null);
 
@@ -15,30 +26,111 @@ export const useLayout = () => {
 };
 
 export const LayoutProvider = ({ children }) => {
+  const { user } = useUserAuth();
   const [isDrawerOpen, setDrawerOpen] = useState(true);
   const [briefings, setBriefings] = useState([]);
   const [selectedBriefingId, setSelectedBriefingId] = useState(null);
   const [transcriptions, setTranscriptions] = useState([]);
+  const [transcriptionsCursor, setTranscriptionsCursor] = useState(null);
+  const [isLoadingTranscriptions, setIsLoadingTranscriptions] = useState(false);
+  // Filters of the last fetchTranscriptions call, reused by loadMoreTranscriptions.
+  const transcriptionFiltersRef = useRef({});
   const [selectedTranscriptionId, setSelectedTranscriptionId] = useState(null);
   const [checkedTranscriptionIds, setCheckedTranscriptionIds] = useState([]);
+  // Unfiltered lists are served from IndexedDB copies kept current by
+  // incremental sync: the cached rows render at once, the sync follows.
+  const collections = useMemo(() => ({
+    briefings: new SyncedCollection({ name: 'briefings', url: '/api/briefings', scope: user?.uuid }),
+    transcriptions: new SyncedCollection({
+      name: 'transcriptionList', url: '/api/transcriptions', scope: user?.uuid, compare: newestFirst,
+    }),
+  }), [user?.uuid]);
+  // Rows of the local transcription list shown so far; null while the
+  // sidebar pages through the server instead.
+  const [localVisibleCount, setLocalVisibleCount] = useState(null);
 
   const fetchBriefings = useCallback(async () => {
+    const collection = collections.briefings;
     try {
-      const data = await getBriefings();
-      setBriefings(data);
-    } catch (err) {
-      console.error('Failed to fetch briefings:', err);
+      if (!collection.loaded && (await collection.load()).length > 0) setBriefings(collection.list());
+      if (await collection.sync()) setBriefings(collection.list());
+    } catch (syncError) {
+      console.warn('Briefing sync failed, loading the full list:', syncError);
+      try {
+        setBriefings(await getBriefings());
+      } catch (err) {
+        console.error('Failed to fetch briefings:', err);
+      }
+    }
+  }, [collections]);
+
+  const showLocalTranscriptions = useCallback((count) => {
+    setTranscriptions(collections.transcriptions.list().slice(0, count));
+    setTranscriptionsCursor(null);
+    setLocalVisibleCount(count);
+  }, [collections]);
+
+  // Reloads the first page of the (lightweight) transcription list.
+  const fetchTranscriptions = useCallback(async (filters) => {
+    if (filters) transcriptionFiltersRef.current = filters;
+    const collection = collections.transcriptions;
+    const unfiltered = Object.values(transcriptionFiltersRef.current).every(value => !value);
+
+    if (unfiltered) {
+      await collection.load();
+      if (collection.complete) {
+        showLocalTranscriptions(LOCAL_PAGE_SIZE);
+        try {
+          if (await collection.sync()) showLocalTranscriptions(LOCAL_PAGE_SIZE);
+          return;
+        } catch (err) {
+          console.warn('Transcription sync failed, paging through the server:', err);
+        }
+      } else {
+        // First sync: page through the server meanwhile and switch to the
+        // local copy once it is complete.
+        collection.sync()
+          .then(() => {
+            const stillUnfiltered = Object.values(transcriptionFiltersRef.current).every(value => !value);
+            if (stillUnfiltered) showLocalTranscriptions(LOCAL_PAGE_SIZE);
+          })
+          .catch(err => console.warn('Transcription sync failed:', err));
+      }
     }
-  }, []);
 
-  const fetchTranscriptions = useCallback(async () => {
+    setLocalVisibleCount(null);
+    setIsLoadingTranscriptions(true);
     try {
-      const data = await getTranscriptions();
-      setTranscriptions(data);
+      const { items, nextCursor } = await getTranscriptions(transcriptionFiltersRef.current);
+      setTranscriptions(items);
+      setTranscriptionsCursor(nextCursor);
     } catch (err) {
       console.error('Failed to fetch transcriptions:', err);
+    } finally {
+      setIsLoadingTranscriptions(false);
+    }
+  }, [collections, showLocalTranscriptions]);
+
+  const loadMoreTranscriptions = useCallback(async () => {
+    if (localVisibleCount !== null) {
+      showLocalTranscriptions(localVisibleCount + LOCAL_PAGE_SIZE);
+      return;
+    }
+    if (!transcriptionsCursor) return;
+    setIsLoadingTranscriptions(true);
+    try {
+      const { items, nextCursor } = await getTranscriptions({
+        ...transcriptionFiltersRef.current,
+        cursor: transcriptionsCursor,
+      });
+      setTranscriptions(prev => [...prev, ...items]);
+      setTranscriptionsCursor(nextCursor);
+    } catch (err) {
+      console.error('Failed to fetch more transcriptions:', err);
+    } finally {
+      setIsLoadingTranscriptions(false);
     }
-  }, []);
+  }, [transcriptionsCursor, localVisibleCount, showLocalTranscriptions]);
 
   const value = {
     isDrawerOpen,
@@ -49,6 +141,11 @@ export const LayoutProvider = ({ children }) => {
     setSelectedBriefingId,
     transcriptions,
     fetchTranscriptions,
+    loadMoreTranscriptions,
+    hasMoreTranscriptions: localVisibleCount !== null
+      ? localVisibleCount < collections.transcriptions.size
+      : Boolean(transcriptionsCursor),
+    isLoadingTranscriptions,
     selectedTranscriptionId,
     setSelectedTranscriptionId,
     checkedTranscriptionIds,
@@ -3,20 +3,41 @@ import React, { useState, useRef, useEffect } from 'react';
 import {
   Container, TextField, Button, Typography, Box, Paper, CircularProgress, Alert,
   Table, TableBody, TableCell, TableContainer, TableHead, TableRow, Chip, Divider,
-  FormControl, InputLabel, Select, MenuItem, Grid, LinearProgress, RadioGroup, FormControlLabel, Radio
+  FormControl, InputLabel, Select, MenuItem, Grid, LinearProgress, RadioGroup, FormControlLabel, Radio, Checkbox
 } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
 import { toast } from 'sonner';
-import * as XLSX from 'xlsx';
 import { saveAs } from 'file-saver';
 import getFriendlyErrorMessage from '../utils/friendlyErrors';
 import { exportEvaluationsToExcel } from '../utils/exportUtils';
 import { useUserAuth } from '../context/UserAuthContext';
 import { useLayout } from '../context/LayoutContext';
 import geminiAPI from '../utils/geminiAPI';
-import { saveTranscription, updateTranscription, deleteTranscription } from '../utils/transcriptionState';
+import {
+  saveTranscription, saveTranscriptionsBatch, updateTranscription, deleteTranscription, getTranscription,
+} from '../utils/transcriptionState';
 import { extractAudioTranscription } from '../utils/transcriptionParser';
+import { EvaluationScheduler, getModelQuota, formatDuration } from '../utils/evaluationScheduler';
+import { PromptPacker } from '../utils/promptPacker';
+import {
+  EVALUATION_KINDS, computeEvaluationKey, lookupCachedEvaluations, storeCachedEvaluations,
+} from '../utils/evaluationCache';
 import { LANGUAGES, LANGUAGE_CONFIG, getColumnName, getCellValue } from '../utils/languageConfig';
+import { probeMany, toProbeUrl } from '../utils/mediaProbe';
+import { loadSpreadsheet } from '../utils/spreadsheetTable';
+import { lookupTranscriptionsByUrl } from '../utils/transcriptionCache';
+import { transcriptionVariants } from '../utils/whisperModels';
+import {
+  MIN_EVALUATION_WORDS, getWordCount, shortTranscriptionEvaluation, sanitizeEvaluation,
+  applyDurationRule, buildTranscriptionData,
+} from '../utils/bulkEvaluation';
+import {
+  APPEND_BATCH_SIZE, createEvaluationJob, appendEvaluationJobItems, getEvaluationJob, listEvaluationJobs,
+  evaluationJobAction, getEvaluationJobResults, isJobActive, finishedCount, estimateRemainingMs,
+} from '../utils/evaluationJobs';
+
+// Rows per evaluation cache lookup during a local bulk run.
+const CACHE_LOOKUP_WINDOW = 25;
 
 const EvaluationsPage = () => {
   const navigate = useNavigate();
@@ -24,7 +45,6 @@ const EvaluationsPage = () => {
   const {
     briefings,
     fetchBriefings,
-    transcriptions,
     fetchTranscriptions,
     selectedTranscriptionId,
     setSelectedTranscriptionId
@@ -45,32 +65,91 @@ const EvaluationsPage = () => {
   const [isBulkProcessing, setIsBulkProcessing] = useState(false);
   const [bulkProgress, setBulkProgress] = useState({ current: 0, total: 0 });
   const [bulkStatus, setBulkStatus] = useState('');
-  const [bulkData, setBulkData] = useState([]);
-  const [originalData, setOriginalData] = useState([]);
-  const [originalGrid, setOriginalGrid] = useState([]);
+  const [bulkTable, setBulkTable] = useState(null);
+  const [bulkRowCount, setBulkRowCount] = useState(0);
+  const [isBulkLoading, setIsBulkLoading] = useState(false);
+  const bulkTableRef = useRef(null);
+  // The local bulk run in progress: { cancelled, scheduler }.
+  const bulkRunRef = useRef(null);
   const [estimatedTimeRemaining, setEstimatedTimeRemaining] = useState(null);
+  const [bulkThroughput, setBulkThroughput] = useState(null);
   const [selectedLanguage, setSelectedLanguage] = useState('pt-br');
+  const [runOnServer, setRunOnServer] = useState(false);
+  const [serverJob, setServerJob] = useState(null);
 
   useEffect(() => {
     fetchBriefings();
     fetchTranscriptions();
   }, [fetchBriefings, fetchTranscriptions]);
 
+  // A run left on the server (tab closed or reloaded) is picked up again.
   useEffect(() => {
-    if (selectedTranscriptionId) {
-      const selected = transcriptions.find(t => t.id === selectedTranscriptionId);
-      if (selected) {
-        setTranscriptionName(selected.name || '');
-        setVideoUrl(selected.video_url || '');
-        setSelectedBriefingId(selected.briefing_id || '');
-        const data = selected.transcription_data || {};
-        setCaptionText(data.captionText || '');
-        setTranscription(data.transcription || '');
-        setVideoDuration(data.videoDuration || 0);
-        setExistingTranscriptionRaw('');
-        setEvaluationResult(data.evaluationResult || null);
-        setUserEvaluation(data.userEvaluation || null);
+    let cancelled = false;
+    listEvaluationJobs()
+      .then((jobs) => {
+        const unfinished = jobs.find(isJobActive);
+        if (cancelled || !unfinished) return;
+        setServerJob(unfinished);
+        toast.info('Retomando o acompanhamento do processamento em massa no servidor.');
+      })
+      .catch(err => console.warn('[Bulk] Não foi possível consultar os jobs do servidor:', err));
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
+  // Polls the server job while workers are on it.
+  const serverJobId = serverJob?.id;
+  const serverJobActive = isJobActive(serverJob);
+  useEffect(() => {
+    if (!serverJobId || !serverJobActive) return undefined;
+    const SERVER_POLL_MS = 3000;
+    let cancelled = false;
+    const timer = setInterval(async () => {
+      try {
+        const progress = await getEvaluationJob(serverJobId);
+        if (cancelled) return;
+        setServerJob(progress);
+        if (progress.status === 'completed') {
+          toast.success('Processamento em massa no servidor concluído!');
+          fetchTranscriptions();
+        }
+      } catch (err) {
+        console.warn('[Bulk] Falha ao consultar o progresso do job:', err);
       }
+    }, SERVER_POLL_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [serverJobId, serverJobActive, fetchTranscriptions]);
+
+  useEffect(() => {
+    if (selectedTranscriptionId) {
+      // The list only carries summaries; the full record is loaded on selection.
+      let cancelled = false;
+      getTranscription(selectedTranscriptionId)
+        .then((selected) => {
+          if (cancelled) return;
+          setTranscriptionName(selected.name || '');
+          setVideoUrl(selected.video_url || '');
+          setSelectedBriefingId(selected.briefing_id || '');
+          const data = selected.transcription_data || {};
+          setCaptionText(data.captionText || '');
+          setTranscription(data.transcription || '');
+          setVideoDuration(data.videoDuration || 0);
+          setExistingTranscriptionRaw('');
+          setEvaluationResult(data.evaluationResult || null);
+          setUserEvaluation(data.userEvaluation || null);
+        })
+        .catch((err) => {
+          if (cancelled) return;
+          console.error('Failed to load transcription:', err);
+          toast.error(`Erro ao carregar avaliação: ${err.message}`);
+        });
+      return () => {
+        cancelled = true;
+      };
     } else {
       setTranscriptionName('');
       setVideoUrl('');
@@ -86,7 +165,7 @@ const EvaluationsPage = () => {
       setStatus('Aguardando...');
       setError(null);
     }
-  }, [selectedTranscriptionId, transcriptions]);
+  }, [selectedTranscriptionId]);
 
   const selectedBriefing = briefings.find(b => b.id === selectedBriefingId);
   const campaignBriefing = selectedBriefing?.briefing_data?.revisedText || '';
@@ -126,51 +205,236 @@ const EvaluationsPage = () => {
     const file = e.target.files[0];
     if (!file) return;
 
-    const reader = new FileReader();
-    reader.onload = (evt) => {
-      const data = new Uint8Array(evt.target.result);
-      const wb = XLSX.read(data, { type: 'array' });
-      const wsname = wb.SheetNames[0];
-      const ws = wb.Sheets[wsname];
-      const jsonData = XLSX.utils.sheet_to_json(ws, { defval: '' });
-      const grid = XLSX.utils.sheet_to_json(ws, { header: 1, defval: '' });
-
-      // Add original row number (Excel rows start at 1, headers are row 1, first data row is 2)
-      const dataWithIndex = jsonData.map((row, index) => ({
-        ...row,
-        __rowNum__: index + 2
-      }));
+    // Parsing runs in a worker and streams rows in; bulk processing can start
+    // as soon as the header is valid and the first rows are in.
+    bulkTableRef.current?.cancel();
+    const table = loadSpreadsheet(file, {
+      // Filter out "Duplicado" status
+      filter: (row) => {
+        const statusCol = getColumnName(row, 'status');
+        return row[statusCol] !== 'Duplicado';
+      },
+      onChange: (current) => {
+        if (bulkTableRef.current !== current) return;
+        setBulkRowCount(current.rows.length);
+        setIsBulkLoading(!current.complete);
+      },
+    });
+    bulkTableRef.current = table;
+    setBulkTable(null);
+    setBulkRowCount(0);
+    setIsBulkLoading(true);
 
+    table.ready.then(() => {
+      if (bulkTableRef.current !== table) return;
       // Validate required columns
       const requiredFields = ['name', 'socialName', 'brandHashtag', 'campaignHashtag', 'missionHashtag'];
-      const missingFields = requiredFields.filter(field => !getColumnName(jsonData[0] || {}, field));
+      const missingFields = requiredFields.filter(field => !getColumnName(table.headerRow(), field));
 
       if (missingFields.length > 0) {
+        table.cancel();
+        bulkTableRef.current = null;
+        setIsBulkLoading(false);
         const config = LANGUAGE_CONFIG[selectedLanguage] || LANGUAGE_CONFIG['pt-br'];
         const missingNames = missingFields.map(f => config.export[f] || f).join(', ');
         toast.error(`Erro na carga: Colunas obrigatórias ausentes: ${missingNames}`);
         return;
       }
+      console.log("[Bulk Upload] Colunas detectadas na planilha:", table.columns);
+      setBulkTable(table);
+    });
 
-      // Filter out "Duplicado" status
-      const filteredData = dataWithIndex.filter(row => {
-        const statusCol = getColumnName(row, 'status');
-        return row[statusCol] !== 'Duplicado';
+    table.done
+      .then(() => {
+        if (bulkTableRef.current !== table) return;
+        console.log("[Bulk Upload] Dados brutos (exemplo da primeira linha):", { ...table.rows[0] });
+        setBulkProgress({ current: 0, total: table.rows.length });
+        toast.info(`${table.rows.length} registros carregados (excluindo duplicados).`);
+      })
+      .catch((err) => {
+        if (bulkTableRef.current !== table) return;
+        console.error('[Bulk Upload] Erro ao ler a planilha:', err);
+        bulkTableRef.current = null;
+        setBulkTable(null);
+        setIsBulkLoading(false);
+        toast.error(`Erro ao ler a planilha: ${err.message}`);
+      });
+  };
+
+  // Reads the rows of a loaded sheet and resolves what the evaluation needs:
+  // name, transcription (from the sheet or the shared transcription cache) and
+  // duration. Durations come from the MP4 metadata (a few KB per video via Range
+  // requests), so the over-length rule applies without downloading anything.
+  // Rows are probed a batch ahead of the loop, as they arrive from the parser.
+  const createRowPreparer = (table) => {
+    const PROBE_BATCH_SIZE = 50;
+    const probeUrls = new Map();
+    const probes = new Map();
+    const cachedTranscriptions = new Map();
+    let probedUntil = 0;
+    const probeAhead = async (from) => {
+      const batch = table.rows.slice(from, from + PROBE_BATCH_SIZE);
+      probedUntil = from + batch.length;
+      const urls = [];
+      const untranscribed = [];
+      batch.forEach((row) => {
+        const url = (row[getColumnName(row, 'url')] || '').trim();
+        if (/^https?:\/\//i.test(url) && !probeUrls.has(url)) {
+          probeUrls.set(url, toProbeUrl(url));
+          urls.push(probeUrls.get(url));
+          if (!getCellValue(row, 'transcription')) untranscribed.push(url);
+        }
       });
-      console.log("[Bulk Upload] Dados brutos (exemplo da primeira linha):", filteredData[0]);
-      console.log("[Bulk Upload] Colunas detectadas na planilha:", Object.keys(filteredData[0] || {}));
-
-      setOriginalData(jsonData);
-      setOriginalGrid(grid);
-      setBulkData(filteredData);
-      setBulkProgress({ current: 0, total: filteredData.length });
-      toast.info(`${filteredData.length} registros carregados (excluindo duplicados).`);
+      setBulkStatus('Verificando duração dos vídeos...');
+      const [probed, cached] = await Promise.all([
+        probeMany(urls),
+        untranscribed.length > 0
+          ? lookupTranscriptionsByUrl(untranscribed, transcriptionVariants('portuguese'))
+          : new Map(),
+      ]);
+      probed.forEach((probe, url) => probes.set(url, probe));
+      cached.forEach((result, url) => cachedTranscriptions.set(url, result));
+    };
+
+    /**
+     * @returns {Promise<Object>} { skipped } for rows without a URL, { error } for
+     * rows without a transcription, otherwise { name, videoUrl, caption, transcription, duration }.
+     */
+    return async (row, i) => {
+      if (i >= probedUntil) await probeAhead(i);
+
+      const urlCol = getColumnName(row, 'url');
+      const videoUrl = (row[urlCol] || '').trim();
+      if (!videoUrl) {
+        console.warn(`[Bulk] Pulando linha ${i + 2}: URL ausente.`);
+        return { skipped: 'Pulado: URL ausente' };
+      }
+
+      const challengeIdCol = getColumnName(row, 'challengeId');
+      const challengeId = row[challengeIdCol] || '';
+      const rowNum = String(row.__rowNum__ || (i + 1)).padStart(3, '0');
+      const nameColKey = getColumnName(row, 'name');
+      const nameCol = row[nameColKey] || '';
+      const nameParts = nameCol.trim().split(/\s+/).filter(p => p.length > 0);
+      const firstWord = nameParts[0] || '';
+      const lastWord = nameParts.length > 0 ? nameParts[nameParts.length - 1] : '';
+      const name = `${transcriptionName}${challengeId}${rowNum}${firstWord}${lastWord}`;
+
+      setBulkStatus(`Processando: ${name} (Iniciando)`);
+
+      const caption = getCellValue(row, 'caption');
+      const existingTranscriptionRaw = getCellValue(row, 'transcription');
+
+      let transcriptionText = '';
+      const cachedTranscription = cachedTranscriptions.get(videoUrl);
+      const duration = probes.get(probeUrls.get(videoUrl))?.durationSeconds || cachedTranscription?.duration || 0;
+      let isTranscriptionProvided = false;
+
+      if (existingTranscriptionRaw) {
+        console.log(`[Bulk] Transcrição bruta encontrada na planilha para ${name}:`, existingTranscriptionRaw.substring(0, 100) + '...');
+        transcriptionText = extractAudioTranscription(existingTranscriptionRaw);
+        if (transcriptionText) {
+          isTranscriptionProvided = true;
+          console.log(`[Bulk] Transcrição extraída com sucesso para ${name}:`, transcriptionText.substring(0, 100) + '...');
+        } else {
+          console.warn(`[Bulk] Tag de transcrição não encontrada no texto da planilha para ${name}.`);
+        }
+      } else if (cachedTranscription?.text) {
+        console.log(`[Bulk] Transcrição encontrada no cache para ${name}.`);
+        transcriptionText = cachedTranscription.text;
+        isTranscriptionProvided = true;
+      } else {
+        console.log(`[Bulk] Nenhuma coluna 'Transcrição' encontrada ou preenchida para ${name}.`);
+      }
+
+      if (!isTranscriptionProvided) {
+        return { name, error: 'Transcrição não encontrada na planilha.' };
+      }
+      return { name, videoUrl, caption: caption || '', transcription: transcriptionText, duration };
     };
-    reader.readAsArrayBuffer(file);
+  };
+
+  // The rows are handed to the server-side queue: workers evaluate and save
+  // them, and the page only polls the job (see the serverJob effect below).
+  const handleServerBulkProcess = async () => {
+    setIsBulkProcessing(true);
+    const table = bulkTable;
+    const cacheInputs = { kind: EVALUATION_KINDS.GROUPED, briefing: campaignBriefing, model: user.gemini_model, language: selectedLanguage };
+    let job = null;
+    try {
+      setBulkStatus('Criando job no servidor...');
+      job = await createEvaluationJob({ briefingId: selectedBriefingId, language: selectedLanguage });
+      setServerJob({ ...job, total: 0 });
+
+      const prepareRow = createRowPreparer(table);
+      let pending = [];
+      let uploaded = 0;
+      for (let i = 0; ; i++) {
+        const row = await table.rowAt(i);
+        if (!row) break;
+        let item;
+        try {
+          const prepared = await prepareRow(row, i);
+          if (prepared.skipped || prepared.error) {
+            item = { rowIndex: i, name: prepared.name || `Linha ${i + 2}`, row, skipped: prepared.skipped || `Erro: ${prepared.error}` };
+          } else {
+            item = { rowIndex: i, ...prepared, row };
+            if (getWordCount(prepared.transcription) >= MIN_EVALUATION_WORDS) {
+              item.cacheKey = await computeEvaluationKey({ ...cacheInputs, transcription: prepared.transcription, caption: prepared.caption });
+            }
+          }
+        } catch (err) {
+          console.error(`Erro ao processar linha ${i + 1}:`, err);
+          item = { rowIndex: i, name: `Linha ${i + 2}`, row, skipped: `Erro: ${err.message}` };
+        }
+        pending.push(item);
+        if (pending.length >= APPEND_BATCH_SIZE) {
+          uploaded += await appendEvaluationJobItems(job.id, pending);
+          pending = [];
+          setBulkStatus(`Enviando linhas ao servidor (${uploaded} / ${table.rows.length})...`);
+        }
+      }
+      await appendEvaluationJobItems(job.id, pending, { sealed: true });
+      setServerJob(await getEvaluationJob(job.id));
+      setBulkStatus('Linhas enviadas. A avaliação continua no servidor, mesmo com a aba fechada.');
+      toast.success('Processamento enviado ao servidor.');
+    } catch (err) {
+      console.error('[Bulk] Erro ao enviar o processamento ao servidor:', err);
+      toast.error(`Erro ao enviar o processamento ao servidor: ${err.message}`);
+      // A partly uploaded job would otherwise stay 'running' and never finish.
+      if (job) {
+        try {
+          setServerJob(await evaluationJobAction(job.id, 'fail'));
+        } catch (failErr) {
+          console.warn('[Bulk] Não foi possível marcar o job como falho:', failErr);
+          setServerJob(null);
+        }
+        setBulkStatus('Envio interrompido. O job foi encerrado; envie a planilha novamente.');
+      }
+    } finally {
+      setIsBulkProcessing(false);
+    }
+  };
+
+  const handleServerJobAction = async (action) => {
+    try {
+      setServerJob(await evaluationJobAction(serverJob.id, action));
+    } catch (err) {
+      toast.error(getFriendlyErrorMessage(err));
+    }
+  };
+
+  const handleServerJobExport = async () => {
+    try {
+      const results = await getEvaluationJobResults(serverJob.id);
+      exportEvaluationsToExcel(results, results.map(r => r.row), serverJob.language);
+    } catch (err) {
+      toast.error(getFriendlyErrorMessage(err));
+    }
   };
 
   const handleBulkProcess = async () => {
-    if (bulkData.length === 0) {
+    if (!bulkTable || bulkRowCount === 0) {
       toast.error('Nenhum dado carregado para processar.');
       return;
     }
@@ -182,190 +446,125 @@ const EvaluationsPage = () => {
       toast.error('Chave da API Gemini não configurada.');
       return;
     }
-
-    const getWordCount = (text) => {
-      if (!text) return 0;
-      return text.trim().split(/\s+/).filter(word => word.length > 0).length;
-    };
+    if (runOnServer) {
+      await handleServerBulkProcess();
+      return;
+    }
 
     setIsBulkProcessing(true);
     const results = [];
-    let pendingEvaluations = [];
     geminiAPI.initialize(user.gemini_api_key);
-    const startTime = Date.now();
-    const CHUNK_SIZE = 5;
-
-    const evaluateWithRetry = async (transcriptionText, caption, name) => {
-      let quotaRetries = 0;
-      let commRetries = 0;
-      const maxQuotaRetries = 5;
-      const maxCommRetries = 3;
-
-      while (true) {
-        try {
-          return await geminiAPI.evaluateContent(
-            transcriptionText,
-            caption || '',
-            campaignBriefing,
-            user.gemini_model,
-            selectedLanguage
-          );
-        } catch (err) {
-          const waitMatch = err.message.match(/retry in ([\d.]+)s/);
-          if (waitMatch && waitMatch[1]) {
-            const waitSeconds = parseFloat(waitMatch[1]);
-            if (quotaRetries < maxQuotaRetries) {
-              console.log(`[Bulk] Quota excedida. Tentativa ${quotaRetries + 1}. Aguardando ${waitSeconds}s...`);
-              for (let s = Math.ceil(waitSeconds); s > 0; s--) {
-                setBulkStatus(`Quota excedida. Retentando em ${s}s... (${name})`);
-                await new Promise(resolve => setTimeout(resolve, 1000));
-              }
-              quotaRetries++;
-              continue;
-            }
-          } else {
-            // General communication or JSON error
-            if (commRetries < maxCommRetries) {
-              commRetries++;
-              console.warn(`[Bulk] Erro de comunicação (${commRetries}/${maxCommRetries}). Retentando em 2s...`, err.message);
-              setBulkStatus(`Erro de comunicação. Retentando (${commRetries}/${maxCommRetries})...`);
-              await new Promise(resolve => setTimeout(resolve, 2000));
-              continue;
-            }
-          }
-          throw err;
-        }
+    const SAVE_BATCH_SIZE = 50;
+    let pendingSaves = [];
+
+    // Results are persisted in batches instead of one request per row.
+    const flushSaves = async () => {
+      if (pendingSaves.length === 0) return;
+      const batch = pendingSaves;
+      pendingSaves = [];
+      console.log(`[Bulk] Salvando lote de ${batch.length} avaliações.`);
+      setBulkStatus(`Salvando lote de ${batch.length} avaliações...`);
+      try {
+        const saved = await saveTranscriptionsBatch(batch.map(entry => entry.item));
+        saved.forEach((r, i) => {
+          if (r.error) batch[i].result.ai_status = `Erro ao salvar: ${r.error}`;
+        });
+      } catch (err) {
+        console.error('[Bulk] Erro ao salvar lote:', err);
+        batch.forEach((entry) => {
+          entry.result.ai_status = `Erro ao salvar: ${err.message}`;
+        });
       }
     };
 
-    const evaluateMultipleWithRetry = async (chunk) => {
-      let quotaRetries = 0;
-      let commRetries = 0;
-      const maxQuotaRetries = 5;
-      const maxCommRetries = 3;
-
-      while (true) {
-        try {
-          return await geminiAPI.evaluateMultipleContent(
-            chunk,
-            campaignBriefing,
-            user.gemini_model,
-            selectedLanguage
-          );
-        } catch (err) {
-          const waitMatch = err.message.match(/retry in ([\d.]+)s/);
-          if (waitMatch && waitMatch[1]) {
-            const waitSeconds = parseFloat(waitMatch[1]);
-            if (quotaRetries < maxQuotaRetries) {
-              console.log(`[Bulk Grouped] Quota excedida. Tentativa ${quotaRetries + 1}. Aguardando ${waitSeconds}s...`);
-              for (let s = Math.ceil(waitSeconds); s > 0; s--) {
-                setBulkStatus(`Quota excedida (Agrupada). Retentando em ${s}s...`);
-                await new Promise(resolve => setTimeout(resolve, 1000));
-              }
-              quotaRetries++;
-              continue;
-            }
-          } else {
-            // General communication or JSON error
-            if (commRetries < maxCommRetries) {
-              commRetries++;
-              console.warn(`[Bulk Grouped] Erro de comunicação (${commRetries}/${maxCommRetries}). Retentando em 2s...`, err.message);
-              setBulkStatus(`Erro de comunicação (Agrupada). Retentando (${commRetries}/${maxCommRetries})...`);
-              await new Promise(resolve => setTimeout(resolve, 2000));
-              continue;
-            }
-          }
-          throw err;
-        }
+    const queueSave = async (name, url, transcriptionData, result) => {
+      results.push(result);
+      pendingSaves.push({
+        item: { name, videoUrl: url, briefingId: selectedBriefingId, transcriptionData },
+        result,
+      });
+      if (pendingSaves.length >= SAVE_BATCH_SIZE) {
+        await flushSaves();
       }
     };
 
-    const sanitizeEvaluation = (evalResult) => {
-      if (!evalResult || !evalResult.avaliacoes) return evalResult;
-
-      const sanitized = { ...evalResult };
-      const config = LANGUAGE_CONFIG[selectedLanguage];
-      const missingDetailsKey = config.jsonKeys.missingDetails;
-
-      sanitized.avaliacoes = sanitized.avaliacoes.map(av => {
-        if (av.nota === 3 || av.status === config.statuses.OTIMO) {
-          // Use bracket notation to handle both 'detalhes_ausentes' and 'detalles_ausentes'
-          return { ...av, [missingDetailsKey]: '' };
-        }
-        return av;
+    // Requests are paced by the model's RPM/TPM quota instead of fixed sleeps;
+    // several chunks are in flight at once and a 429 pauses the whole queue.
+    const scheduler = new EvaluationScheduler({
+      ...getModelQuota(user.gemini_model),
+      onProgress: (metrics) => {
+        setBulkProgress({ current: metrics.completedUnits + metrics.failedUnits, total: metrics.totalUnits });
+        setEstimatedTimeRemaining(formatDuration(metrics.etaMs));
+        setBulkThroughput(metrics.rowsPerMinute > 0 ? metrics.rowsPerMinute : null);
+      },
+    });
+    const run = { cancelled: false, scheduler };
+    bulkRunRef.current = run;
+    const table = bulkTable;
+    scheduler.setTotal(table.rows.length);
+    const chunkJobs = [];
+    // Rows that need an AI evaluation wait here for a batched cache lookup.
+    let candidates = [];
+    let cacheHits = 0;
+    let cachedContent = null;
+    let packer = null;
+    let packerReady = null;
+
+    const saveEvaluatedItem = async (item, evalResult, aiStatus = 'Sucesso') => {
+      console.log(`[Bulk Grouped] Salvando: ${item.id}`);
+      setBulkStatus(`Enfileirando para salvar: ${item.id}`);
+
+      const finalEval = applyDurationRule(evalResult, item.duration, selectedLanguage);
+      const transcriptionData = buildTranscriptionData({ ...item, evaluation: finalEval });
+      await queueSave(item.id, (item.row['URL'] || '').trim(), transcriptionData, {
+        row: item.row,
+        transcription: item.transcription,
+        evaluation: evalResult,
+        ai_status: aiStatus
       });
-      return sanitized;
     };
 
-    const processChunk = async (chunkToProcess) => {
+    const processChunk = async ({ items: chunkToProcess, tokens }) => {
       if (chunkToProcess.length === 0) return;
 
-      console.log(`[Bulk Grouped] Processando lote de ${chunkToProcess.length} itens.`);
-      setBulkStatus(`IA: Avaliando lote de ${chunkToProcess.length} itens...`);
+      console.log(`[Bulk Grouped] Enfileirando lote de ${chunkToProcess.length} itens.`);
 
       try {
-        let groupedResult = await evaluateMultipleWithRetry(chunkToProcess);
+        let groupedResult = await scheduler.schedule(
+          () => {
+            setBulkStatus(`IA: Avaliando lote de ${chunkToProcess.length} itens...`);
+            return geminiAPI.evaluateMultipleContent(
+              chunkToProcess,
+              campaignBriefing,
+              user.gemini_model,
+              selectedLanguage,
+              { cachedContent }
+            );
+          },
+          { tokens, units: chunkToProcess.length, onRetry: setBulkStatus }
+        );
 
         // Sanitize results
         if (groupedResult.resultados) {
-          groupedResult.resultados = groupedResult.resultados.map(res => ({
-            ...res,
-            ...sanitizeEvaluation(res)
-          }));
+          groupedResult.resultados = groupedResult.resultados.map(res => sanitizeEvaluation(res, selectedLanguage));
         }
         console.log(`[Bulk Grouped] Resultado recebido:`, groupedResult);
 
+        storeCachedEvaluations(chunkToProcess
+          .map(item => ({
+            key: item.cacheKey,
+            result: groupedResult.resultados?.find(r => r.id === item.id),
+            model: user.gemini_model,
+            language: selectedLanguage,
+          }))
+          .filter(entry => entry.result));
+
         // Map results back to records
         for (const item of chunkToProcess) {
           const evalResult = groupedResult.resultados?.find(r => r.id === item.id);
 
           if (evalResult) {
-            console.log(`[Bulk Grouped] Salvando: ${item.id}`);
-            setBulkStatus(`Salvando Avaliação: ${item.id}`);
-
-            const isVideoTooLong = item.duration > 60;
-            let finalEval = evalResult ? { ...evalResult } : null;
-
-            if (isVideoTooLong && finalEval) {
-              const config = LANGUAGE_CONFIG[selectedLanguage];
-              if (finalEval.avaliacoes) {
-                finalEval.avaliacoes = finalEval.avaliacoes.map(av => ({
-                  ...av,
-                  nota: 1,
-                  status: config.statuses.RUIM
-                }));
-              }
-              const prefix = config.messages.videoTooLong;
-              if (finalEval.feedback_consolidado && finalEval.feedback_consolidado.texto && !finalEval.feedback_consolidado.texto.startsWith(prefix)) {
-                 finalEval.feedback_consolidado.texto = prefix + finalEval.feedback_consolidado.texto;
-              }
-              if (finalEval.score_final && finalEval.avaliacoes) {
-                finalEval.score_final.pontuacao_obtida = finalEval.avaliacoes.reduce((acc, curr) => acc + (Number(curr.nota) || 0), 0);
-              }
-            }
-
-            const transcriptionData = {
-              captionText: item.caption,
-              transcription: item.transcription,
-              videoDuration: item.duration,
-              evaluationResult: finalEval,
-              userEvaluation: finalEval,
-              name: getCellValue(item.row, 'name') || '',
-              socialName: getCellValue(item.row, 'socialName') || '',
-              campanha: getCellValue(item.row, 'challengeId') || '',
-              missao: getCellValue(item.row, 'mediaId') || '',
-              brandHashtag: getCellValue(item.row, 'brandHashtag') || '',
-              campaignHashtag: getCellValue(item.row, 'campaignHashtag') || '',
-              missionHashtag: getCellValue(item.row, 'missionHashtag') || '',
-            };
-            await saveTranscription(item.id, (item.row['URL'] || '').trim(), selectedBriefingId, transcriptionData);
-
-            results.push({
-              row: item.row,
-              transcription: item.transcription,
-              evaluation: evalResult,
-              ai_status: 'Sucesso'
-            });
+            await saveEvaluatedItem(item, evalResult);
           } else {
             console.warn(`[Bulk Grouped] Resultado não encontrado para ID: ${item.id}`);
             results.push({
@@ -387,138 +586,108 @@ const EvaluationsPage = () => {
       }
     };
 
-    for (let i = 0; i < bulkData.length; i++) {
-      const row = bulkData[i];
-      setBulkProgress({ current: i + 1, total: bulkData.length });
+    // Briefing and instructions are shared by every group: sent (or cached) once,
+    // while groups are filled up to the token budget instead of a fixed 5 rows.
+    // Prepared on the first cache miss, so a fully cached run never calls Gemini.
+    const getPacker = () => {
+      if (!packerReady) {
+        setBulkStatus('Preparando prompt compartilhado do briefing...');
+        packerReady = geminiAPI.prepareGroupedEvaluation(campaignBriefing, user.gemini_model, selectedLanguage)
+          .then((prepared) => {
+            cachedContent = prepared.cachedContent;
+            packer = new PromptPacker({ prefixTokens: prepared.prefixTokens });
+            return packer;
+          });
+      }
+      return packerReady;
+    };
 
-      const urlCol = getColumnName(row, 'url');
-      const videoUrl = (row[urlCol] || '').trim();
-      if (!videoUrl) {
-        console.warn(`[Bulk] Pulando linha ${i + 2}: URL ausente.`);
-        results.push({
-          row: row,
-          ai_status: 'Pulado: URL ausente'
-        });
-        continue;
+    // Unchanged rows from earlier runs are not re-billed. Lookups go out a
+    // window of rows at a time while the sheet is read, and every group the
+    // packer closes goes to the scheduler right away.
+    const cacheInputs = { kind: EVALUATION_KINDS.GROUPED, briefing: campaignBriefing, model: user.gemini_model, language: selectedLanguage };
+    const flushCandidates = async () => {
+      if (candidates.length === 0) return;
+      const batch = candidates;
+      candidates = [];
+      await Promise.all(batch.map(async (item) => {
+        item.cacheKey = await computeEvaluationKey({ ...cacheInputs, transcription: item.transcription, caption: item.caption });
+      }));
+      const cachedEvaluations = await lookupCachedEvaluations(batch.map(item => item.cacheKey));
+      for (const item of batch) {
+        const cached = cachedEvaluations.get(item.cacheKey);
+        if (cached) {
+          cacheHits += 1;
+          await saveEvaluatedItem(item, { ...cached, id: item.id }, 'Sucesso (cache)');
+          scheduler.markDone();
+          continue;
+        }
+        if (run.cancelled) {
+          results.push({ row: item.row, transcription: item.transcription, ai_status: 'Erro: processamento cancelado.' });
+          continue;
+        }
+        const closedGroup = (await getPacker()).add(item);
+        if (closedGroup) chunkJobs.push(processChunk(closedGroup));
       }
+    };
 
-      const challengeIdCol = getColumnName(row, 'challengeId');
-      const challengeId = row[challengeIdCol] || '';
-      const rowNum = String(row.__rowNum__ || (i + 1)).padStart(3, '0');
-      const nameColKey = getColumnName(row, 'name');
-      const nameCol = row[nameColKey] || '';
-      const socialNameColKey = getColumnName(row, 'socialName');
-      const socialNameCol = row[socialNameColKey] || '';
-      const nameParts = nameCol.trim().split(/\s+/).filter(p => p.length > 0);
-      const firstWord = nameParts[0] || '';
-      const lastWord = nameParts.length > 0 ? nameParts[nameParts.length - 1] : '';
-      const name = `${transcriptionName}${challengeId}${rowNum}${firstWord}${lastWord}`;
+    const prepareRow = createRowPreparer(table);
 
-      setBulkStatus(`Processando: ${name} (Iniciando)`);
+    for (let i = 0; !run.cancelled; i++) {
+      if (candidates.length >= CACHE_LOOKUP_WINDOW) await flushCandidates();
+      const row = await table.rowAt(i);
+      if (!row) break;
+      // The sheet may still be streaming in: the total grows with it.
+      if (table.rows.length !== scheduler.totalUnits) scheduler.setTotal(table.rows.length);
 
       try {
-        const caption = getCellValue(row, 'caption');
-        const existingTranscriptionRaw = getCellValue(row, 'transcription');
-
-        let transcriptionText = '';
-        let duration = 0;
-        let isTranscriptionProvided = false;
-
-        if (existingTranscriptionRaw) {
-          console.log(`[Bulk] Transcrição bruta encontrada na planilha para ${name}:`, existingTranscriptionRaw.substring(0, 100) + '...');
-          transcriptionText = extractAudioTranscription(existingTranscriptionRaw);
-          if (transcriptionText) {
-            isTranscriptionProvided = true;
-            console.log(`[Bulk] Transcrição extraída com sucesso para ${name}:`, transcriptionText.substring(0, 100) + '...');
-          } else {
-            console.warn(`[Bulk] Tag de transcrição não encontrada no texto da planilha para ${name}.`);
-          }
-        } else {
-          console.log(`[Bulk] Nenhuma coluna 'Transcrição' encontrada ou preenchida para ${name}.`);
+        const prepared = await prepareRow(row, i);
+        if (prepared.skipped) {
+          results.push({
+            row: row,
+            ai_status: prepared.skipped
+          });
+          scheduler.markDone();
+          continue;
         }
-
-        if (!isTranscriptionProvided) {
-          throw new Error('Transcrição não encontrada na planilha.');
+        if (prepared.error) {
+          throw new Error(prepared.error);
         }
-
-        const wordCount = !transcriptionText ? 0 : getWordCount(transcriptionText);
-        const isVideoTooLong = duration > 60;
+        const { name, transcription: transcriptionText, caption, duration } = prepared;
+        const wordCount = getWordCount(transcriptionText);
 
         // 2. Evaluate
-        let evaluation = null;
-        if (wordCount >= 20) {
+        if (wordCount >= MIN_EVALUATION_WORDS) {
           console.log(`[Bulk] Adicionando para avaliação agrupada: ${name}`);
           setBulkStatus(`Processando: ${name} (Agrupando para IA)`);
-          pendingEvaluations.push({
+          candidates.push({
             id: name,
             transcription: transcriptionText,
             duration: duration,
-            caption: caption || '',
+            caption: caption,
             row: row
           });
-
-          if (pendingEvaluations.length >= CHUNK_SIZE) {
-            await processChunk(pendingEvaluations);
-            pendingEvaluations = [];
-            // Delay after a chunk
-            for (let s = 2; s > 0; s--) {
-              setBulkStatus(`Aguardando ${s}s para o próximo lote de IA...`);
-              await new Promise(resolve => setTimeout(resolve, 1000));
-            }
-          }
-        } else {
-          console.log(`[Bulk] Reprovando automaticamente (transcrição curta: ${wordCount} palavras): ${name}`);
-          setBulkStatus(`Reprovando: ${name} (Mídia curta)`);
-          const config = LANGUAGE_CONFIG[selectedLanguage];
-          const missingDetailsKey = config.jsonKeys.missingDetails;
-          evaluation = {
-            avaliacoes: [
-              { id_criterio: 1, nome: config.criteria[1], nota: 1, status: config.statuses.RUIM, comentario: config.messages.shortTranscription, [missingDetailsKey]: config.messages.insufficientContent },
-              { id_criterio: 3, nome: config.criteria[3], nota: 1, status: config.statuses.RUIM, comentario: config.messages.shortTranscription, [missingDetailsKey]: config.messages.insufficientContent },
-              { id_criterio: 4, nome: config.criteria[4], nota: 1, status: config.statuses.RUIM, comentario: config.messages.shortTranscription, [missingDetailsKey]: config.messages.insufficientContent },
-              { id_criterio: 7, nome: config.criteria[7], nota: 1, status: config.statuses.RUIM, comentario: config.messages.shortTranscription, [missingDetailsKey]: config.messages.insufficientContent }
-            ],
-            score_final: { pontuacao_obtida: 4, pontuacao_maxima: 12 },
-            feedback_consolidado: { texto: config.messages.rejectedShort(wordCount) }
-          };
+          continue;
         }
 
+        console.log(`[Bulk] Reprovando automaticamente (transcrição curta: ${wordCount} palavras): ${name}`);
+        setBulkStatus(`Reprovando: ${name} (Mídia curta)`);
         // Apply duration warning even for auto-rejected (short) items if duration is known
-        if (isVideoTooLong && evaluation) {
-          const config = LANGUAGE_CONFIG[selectedLanguage];
-          const prefix = config.messages.videoTooLong;
-          if (evaluation.feedback_consolidado && evaluation.feedback_consolidado.texto && !evaluation.feedback_consolidado.texto.startsWith(prefix)) {
-            evaluation.feedback_consolidado.texto = prefix + evaluation.feedback_consolidado.texto;
-          }
-        }
+        const evaluation = applyDurationRule(shortTranscriptionEvaluation(wordCount, selectedLanguage), duration, selectedLanguage);
 
-        // 3. Save (Immediate for individual mode or auto-rejected items)
-        if (evaluation) {
-          console.log(`[Bulk] Salvando: ${name}`);
-          setBulkStatus(`Salvando: ${name}`);
-          const transcriptionData = {
-            captionText: caption || '',
-            transcription: transcriptionText,
-            videoDuration: duration,
-            evaluationResult: evaluation,
-            userEvaluation: evaluation,
-            name: getCellValue(row, 'name') || '',
-            socialName: getCellValue(row, 'socialName') || '',
-            campanha: getCellValue(row, 'challengeId') || '',
-            missao: getCellValue(row, 'mediaId') || '',
-            brandHashtag: getCellValue(row, 'brandHashtag') || '',
-            campaignHashtag: getCellValue(row, 'campaignHashtag') || '',
-            missionHashtag: getCellValue(row, 'missionHashtag') || '',
-          };
-          await saveTranscription(name, videoUrl, selectedBriefingId, transcriptionData);
-
-          results.push({
-            row: row,
-            transcription: transcriptionText,
-            evaluation: evaluation,
-            ai_status: 'Sucesso'
-          });
-        }
+        // 3. Save (Immediate for auto-rejected items)
+        console.log(`[Bulk] Salvando: ${name}`);
+        setBulkStatus(`Enfileirando para salvar: ${name}`);
+        const transcriptionData = buildTranscriptionData({
+          row, caption, transcription: transcriptionText, duration, evaluation,
+        });
+        await queueSave(name, prepared.videoUrl, transcriptionData, {
+          row: row,
+          transcription: transcriptionText,
+          evaluation: evaluation,
+          ai_status: 'Sucesso'
+        });
+        scheduler.markDone();
 
       } catch (err) {
         console.error(`Erro ao processar linha ${i + 1}:`, err);
@@ -527,42 +696,50 @@ const EvaluationsPage = () => {
           transcription: '',
           ai_status: `Erro: ${err.message}`
         });
-      }
-
-      if (i < bulkData.length - 1) {
-        // Calculate estimated time remaining
-        const elapsedMs = Date.now() - startTime;
-        const avgTimePerRowMs = elapsedMs / (i + 1);
-        const remainingRows = bulkData.length - (i + 1);
-        const estimatedRemainingMs = remainingRows * avgTimePerRowMs;
-
-        const minutes = Math.floor(estimatedRemainingMs / 60000);
-        const seconds = Math.floor((estimatedRemainingMs % 60000) / 1000);
-        setEstimatedTimeRemaining(minutes > 0 ? `${minutes}min ${seconds}s` : `${seconds}s`);
-
-        for (let s = 1; s > 0; s--) {
-          setBulkStatus(`Aguardando ${s} segundo para o próximo registro...`);
-          await new Promise(resolve => setTimeout(resolve, 1000));
-        }
+        scheduler.markDone();
       }
     }
 
-    // --- Final Grouped Evaluation Processing (Remaining items) ---
-    if (pendingEvaluations.length > 0) {
-      await processChunk(pendingEvaluations);
-      pendingEvaluations = [];
-    }
+    await flushCandidates();
+    const lastGroup = packer?.flush();
+    if (lastGroup) chunkJobs.push(processChunk(lastGroup));
+    console.log(`[Bulk] Cache de avaliações: ${cacheHits} acertos.`);
+    await Promise.all(chunkJobs);
+    geminiAPI.deletePromptCache(cachedContent);
+    await flushSaves();
+
+    // Chunks finish out of order; the exported sheet keeps the input order.
+    const rowOrder = new Map(table.rows.map((row, index) => [row, index]));
+    results.sort((a, b) => rowOrder.get(a.row) - rowOrder.get(b.row));
 
+    bulkRunRef.current = null;
     setIsBulkProcessing(false);
     setEstimatedTimeRemaining(null);
-    setBulkStatus('Processamento concluído!');
-    toast.success('Processamento em massa concluído!');
+    setBulkThroughput(null);
+    if (run.cancelled) {
+      setBulkStatus('Processamento cancelado.');
+      toast.info('Processamento em massa cancelado. As linhas já avaliadas foram exportadas.');
+    } else {
+      setBulkStatus('Processamento concluído!');
+      toast.success('Processamento em massa concluído!');
+    }
     fetchTranscriptions();
 
-    exportEvaluationsToExcel(results, originalData, selectedLanguage, originalGrid);
+    exportEvaluationsToExcel(results, table.rows, selectedLanguage, table.grid);
   };
 
-  const handleEvaluate = async () => {
+  // Stops reading rows and drops the queued Gemini calls; the calls already in
+  // flight finish and the rows done so far are saved and exported.
+  const handleCancelBulkProcess = () => {
+    const run = bulkRunRef.current;
+    if (!run || run.cancelled) return;
+    run.cancelled = true;
+    run.scheduler.cancel('Processamento cancelado pelo usuário.');
+    setBulkStatus('Cancelando: aguardando as avaliações em andamento...');
+  };
+
+  // bypassCache: "Reavaliar" always asks the AI and overwrites the cached result.
+  const handleEvaluate = async ({ bypassCache = false } = {}) => {
     if (!transcription || !selectedBriefingId || !captionText) {
       alert('Certifique-se de que a transcrição, o briefing e a legenda estejam preenchidos.');
       return;
@@ -578,11 +755,6 @@ const EvaluationsPage = () => {
       return;
     }
 
-    const getWordCount = (text) => {
-      if (!text) return 0;
-      return text.trim().split(/\s+/).filter(word => word.length > 0).length;
-    };
-
     setIsEvaluating(true);
     setError(null);
     setEvaluationResult(null);
@@ -638,7 +810,29 @@ const EvaluationsPage = () => {
           }
         };
 
-        result = await evaluateWithRetry();
+        const cacheEntry = {
+          key: await computeEvaluationKey({
+            kind: EVALUATION_KINDS.SINGLE,
+            transcription,
+            caption: captionText,
+            briefing: campaignBriefing,
+            model: user.gemini_model,
+            language: selectedLanguage,
+          }),
+          model: user.gemini_model,
+          language: selectedLanguage,
+        };
+        const cached = bypassCache
+          ? null
+          : (await lookupCachedEvaluations([cacheEntry.key])).get(cacheEntry.key);
+        if (cached) {
+          console.log('[Evaluate] Avaliação encontrada no cache, a IA não será chamada.');
+          toast.info('Avaliação recuperada do cache. Use "Reavaliar" para gerar uma nova.');
+          result = structuredClone(cached);
+        } else {
+          result = await evaluateWithRetry();
+          storeCachedEvaluations([{ ...cacheEntry, result }]);
+        }
 
         // Sanitize: If score is 3/ÓTIMO, detalles_ausentes must be empty
         if (result && result.avaliacoes) {
@@ -848,22 +1042,39 @@ const EvaluationsPage = () => {
                 Selecionar Planilha
               </Button>
             </label>
-            {bulkData.length > 0 && (
+            {(bulkRowCount > 0 || isBulkLoading) && (
               <Typography variant="body2" sx={{ mt: 1 }}>
-                {bulkData.length} registros carregados (excluindo duplicados).
+                {bulkRowCount} registros carregados (excluindo duplicados){isBulkLoading ? ' — lendo planilha...' : '.'}
               </Typography>
             )}
           </Box>
 
+          <FormControlLabel
+            control={(
+              <Checkbox
+                checked={runOnServer}
+                onChange={(e) => setRunOnServer(e.target.checked)}
+                disabled={isBulkProcessing}
+              />
+            )}
+            label="Processar no servidor (continua mesmo com a aba fechada)"
+            sx={{ mb: 1 }}
+          />
+
           <Button
             variant="contained"
             color="secondary"
             onClick={handleBulkProcess}
-            disabled={isBulkProcessing || bulkData.length === 0 || !selectedBriefingId}
+            disabled={isBulkProcessing || !bulkTable || bulkRowCount === 0 || !selectedBriefingId}
             fullWidth
           >
             {isBulkProcessing ? 'Processando...' : 'Iniciar Processamento em Massa'}
           </Button>
+          {isBulkProcessing && !runOnServer && (
+            <Button color="error" onClick={handleCancelBulkProcess} fullWidth sx={{ mt: 1 }}>
+              Cancelar processamento
+            </Button>
+          )}
 
           {(isBulkProcessing || bulkStatus === 'Processamento concluído!') && (
             <Box sx={{ mt: 2 }}>
@@ -872,11 +1083,62 @@ const EvaluationsPage = () => {
                 <Typography variant="body2">
                     {bulkProgress.current} / {bulkProgress.total}
                     {estimatedTimeRemaining && ` (Restante aprox.: ${estimatedTimeRemaining})`}
+                    {bulkThroughput && ` · ${bulkThroughput.toFixed(1)} linhas/min`}
                 </Typography>
               </Box>
               <LinearProgress variant="determinate" value={bulkProgress.total > 0 ? (bulkProgress.current / bulkProgress.total) * 100 : 0} />
             </Box>
           )}
+
+          {serverJob && (
+            <Box sx={{ mt: 2 }}>
+              <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 1 }}>
+                <Typography variant="body2" component="div">
+                  Job no servidor #{serverJob.id}{' '}
+                  <Chip
+                    size="small"
+                    label={{ running: 'Em andamento', paused: 'Pausado', completed: 'Concluído', cancelled: 'Cancelado', failed: 'Falhou' }[serverJob.status] || serverJob.status}
+                    color={{ completed: 'success', failed: 'error' }[serverJob.status] || 'default'}
+                  />
+                </Typography>
+                <Typography variant="body2">
+                  {finishedCount(serverJob)} / {serverJob.total}
+                  {serverJob.status === 'running' && estimateRemainingMs(serverJob) !== null
+                    && ` (Restante aprox.: ${formatDuration(estimateRemainingMs(serverJob))})`}
+                  {serverJob.rowsPerMinute > 0 && ` · ${serverJob.rowsPerMinute.toFixed(1)} linhas/min`}
+                </Typography>
+              </Box>
+              <LinearProgress
+                variant="determinate"
+                value={serverJob.total > 0 ? (finishedCount(serverJob) / serverJob.total) * 100 : 0}
+              />
+              <Typography variant="caption" display="block" sx={{ mt: 1 }}>
+                Avaliados: {serverJob.done || 0} · Falhas: {serverJob.failed || 0} · Pulados: {serverJob.skipped || 0} · Na fila: {(serverJob.pending || 0) + (serverJob.running || 0)}
+              </Typography>
+              {serverJob.failures?.length > 0 && (
+                <Alert severity="warning" sx={{ mt: 1 }}>
+                  {serverJob.failures.slice(0, 5).map(f => `${f.name}: ${f.last_error}`).join(' · ')}
+                </Alert>
+              )}
+              <Box sx={{ display: 'flex', gap: 1, mt: 1, flexWrap: 'wrap' }}>
+                {serverJob.status === 'running' && (
+                  <Button size="small" onClick={() => handleServerJobAction('pause')}>Pausar</Button>
+                )}
+                {serverJob.status === 'paused' && (
+                  <Button size="small" onClick={() => handleServerJobAction('resume')}>Retomar</Button>
+                )}
+                {serverJob.failed > 0 && !['cancelled', 'failed'].includes(serverJob.status) && (
+                  <Button size="small" onClick={() => handleServerJobAction('retry')}>Reprocessar falhas</Button>
+                )}
+                {isJobActive(serverJob) && (
+                  <Button size="small" color="error" onClick={() => handleServerJobAction('cancel')}>Cancelar</Button>
+                )}
+                <Button size="small" variant="outlined" onClick={handleServerJobExport} disabled={!serverJob.total}>
+                  Baixar resultados
+                </Button>
+              </Box>
+            </Box>
+          )}
         </Paper>
 
         <Typography variant="body1" gutterBottom>
@@ -981,7 +1243,7 @@ const EvaluationsPage = () => {
             <Button
               variant="contained"
               color="secondary"
-              onClick={handleEvaluate}
+              onClick={() => handleEvaluate()}
               disabled={isEvaluating || !campaignBriefing || !captionText}
               fullWidth
               size="large"
@@ -989,6 +1251,18 @@ const EvaluationsPage = () => {
             >
               {isEvaluating ? <CircularProgress size={24} color="inherit" /> : 'Avaliar Material'}
             </Button>
+            {evaluationResult && (
+              <Button
+                variant="outlined"
+                color="secondary"
+                onClick={() => handleEvaluate({ bypassCache: true })}
+                disabled={isEvaluating || !campaignBriefing || !captionText}
+                fullWidth
+                sx={{ mb: 2 }}
+              >
+                Reavaliar (ignorar cache)
+              </Button>
+            )}
           </Box>
         )}
 
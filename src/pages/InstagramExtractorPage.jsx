@@ -31,12 +31,21 @@ import PlayCircleOutlineIcon from '@mui/icons-material/PlayCircleOutline';
 import TranslateIcon from '@mui/icons-material/Translate';
 import FileDownloadIcon from '@mui/icons-material/FileDownload';
 import AutoModeIcon from '@mui/icons-material/AutoMode';
+import CancelIcon from '@mui/icons-material/Cancel';
+import PriorityHighIcon from '@mui/icons-material/PriorityHigh';
 import { toast } from 'sonner';
 import Papa from 'papaparse';
 import { saveAs } from 'file-saver';
 import { useUserAuth } from '../context/UserAuthContext';
 import geminiAPI from '../utils/geminiAPI';
 import InfoBox from '../components/InfoBox';
+import { TranscriptionWorkerPool, computePoolSize, CANCELLED } from '../utils/transcriptionWorkerPool';
+import { probeMedia, getProbeRejection, MAX_VIDEO_DURATION_SECONDS } from '../utils/mediaProbe';
+import { WHISPER_MODELS, DEFAULT_TRANSCRIPTION_PROFILE, selectWhisperModel } from '../utils/whisperModels';
+
+// A clicked item jumps ahead of the batch jobs still waiting in the queue.
+const CLICK_PRIORITY = 10;
+const MAX_EXTRACT_URLS = 300;
 
 const InstagramExtractorPage = () => {
   const navigate = useNavigate();
@@ -49,54 +58,101 @@ const InstagramExtractorPage = () => {
   const [translatorReady, setTranslatorReady] = useState(false);
   const [translatorStatus, setTranslatorStatus] = useState('idle'); // idle, loading, ready, error
   const [translationEngine, setTranslationEngine] = useState('gemini');
+  const [transcriptionProfile, setTranscriptionProfile] = useState(DEFAULT_TRANSCRIPTION_PROFILE);
   const [globalIsProcessing, setGlobalIsProcessing] = useState(false);
   const [batchProgress, setBatchProgress] = useState({ current: 0, total: 0 });
   const [lastBatchTime, setLastBatchTime] = useState(null);
-  const worker = useRef(null);
+  const [poolProgress, setPoolProgress] = useState(null);
+  const pool = useRef(null);
+  // index -> id of the pool job currently working on that item
+  const activeJobs = useRef(new Map());
+  const cancelledItems = useRef(new Set());
+  const whisperSize = selectWhisperModel({ profile: transcriptionProfile, deviceMemory: navigator.deviceMemory });
 
   useEffect(() => {
-    if (translationEngine === 'local' && !translatorReady && translatorStatus === 'idle') {
-      worker.current?.postMessage({ type: 'INIT', loadTranslator: true });
+    if (translationEngine === 'local' && !translatorReady && translatorStatus === 'idle' && pool.current) {
+      pool.current.reinitialize({ ...pool.current.initMessage, loadTranslator: true });
     }
   }, [translationEngine, translatorReady, translatorStatus]);
 
-  useEffect(() => {
-    if (!worker.current) {
-      worker.current = new Worker(new URL('../utils/worker.js', import.meta.url), {
-        type: 'module'
-      });
+  const handleWorkerMessage = (data) => {
+    const { status, model } = data;
+    if (status === 'transcriber_ready') {
+      setWorkerReady(true);
+    } else if (status === 'transcriber_loading') {
+      setWorkerReady(false);
+    } else if (status === 'translator_ready') {
+      setTranslatorReady(true);
+      setTranslatorStatus('ready');
+    } else if (status === 'translator_loading') {
+      setTranslatorStatus('loading');
+    } else if (status === 'translator_error') {
+      setTranslatorStatus('error');
+    } else if (status === 'asset_telemetry') {
+      const { asset, warm, durationMs, bytesFromNetwork, selfHosted } = data.telemetry;
+      console.info(
+        `[Worker] ${asset}: ${warm ? 'partida a quente (cache)' : 'partida a frio (rede)'} em ${durationMs}ms, ` +
+        `${(bytesFromNetwork / 1e6).toFixed(1)} MB baixados${selfHosted ? ' (auto-hospedado)' : ' (CDN)'}.`
+      );
+    } else if (status === 'model_download_progress') {
+      if (model === 'translation') {
+        setTranslatorStatus(`loading (${Math.round(data.progress.progress || 0)}%)`);
+      }
     }
+  };
 
-    const onMessage = (e) => {
-      const { status, model } = e.data;
-      if (status === 'transcriber_ready') {
-        setWorkerReady(true);
-      } else if (status === 'translator_ready') {
-        setTranslatorReady(true);
-        setTranslatorStatus('ready');
-      } else if (status === 'translator_loading') {
-        setTranslatorStatus('loading');
-      } else if (status === 'translator_error') {
-        setTranslatorStatus('error');
-      } else if (status === 'model_download_progress') {
-        if (model === 'translation') {
-          setTranslatorStatus(`loading (${Math.round(e.data.progress.progress || 0)}%)`);
-        }
-      }
-    };
+  // The pool is sized for the memory of one worker with the given Whisper model.
+  const createPool = (size, loadTranslator) => {
+    const { size: poolSize, threadsPerWorker } = computePoolSize({
+      hardwareConcurrency: navigator.hardwareConcurrency,
+      deviceMemory: navigator.deviceMemory,
+      memoryPerWorkerGb: WHISPER_MODELS[size].memoryGb,
+    });
+    console.info(`[Instagram] Pool de transcrição (Whisper ${size}): até ${poolSize} worker(s), ${threadsPerWorker} thread(s) cada.`);
 
-    worker.current.addEventListener('message', onMessage);
-    worker.current.postMessage({ type: 'INIT', loadTranslator: translationEngine === 'local' });
+    const created = new TranscriptionWorkerPool({
+      size: poolSize,
+      createWorker: () => new Worker(new URL('../utils/worker.js', import.meta.url), {
+        type: 'module'
+      }),
+      initMessage: {
+        type: 'INIT',
+        loadTranslator,
+        numThreads: threadsPerWorker,
+        transcriber: { model: WHISPER_MODELS[size].model },
+      },
+      onMessage: handleWorkerMessage,
+      onProgress: setPoolProgress,
+    });
+    // One worker warms up right away; the others start when a batch needs them.
+    created.start();
+    return created;
+  };
+
+  useEffect(() => {
+    pool.current = createPool(whisperSize, translationEngine === 'local');
 
     return () => {
-      if (worker.current) {
-        worker.current.removeEventListener('message', onMessage);
-        worker.current.terminate();
-        worker.current = null;
-      }
+      pool.current?.terminate();
+      pool.current = null;
     };
   }, []);
 
+  // Another model size changes the memory per worker, so the pool is rebuilt
+  // with a size for it. That happens only between jobs: while anything is
+  // queued or running the switch waits, and the effect runs again when the
+  // pool goes idle.
+  const poolIdle = !poolProgress || (poolProgress.running === 0 && poolProgress.queued === 0);
+  useEffect(() => {
+    const { model } = WHISPER_MODELS[whisperSize];
+    const current = pool.current;
+    if (!current || current.initMessage.transcriber?.model === model || !poolIdle) return;
+    const { loadTranslator } = current.initMessage;
+    current.terminate();
+    setWorkerReady(false);
+    pool.current = createPool(whisperSize, loadTranslator);
+  }, [whisperSize, poolIdle]);
+
   const handleBack = () => {
     navigate('/');
   };
@@ -113,8 +169,8 @@ const InstagramExtractorPage = () => {
       return;
     }
 
-    if (urls.length > 30) {
-      toast.error('O limite é de 30 URLs por vez.');
+    if (urls.length > MAX_EXTRACT_URLS) {
+      toast.error(`O limite é de ${MAX_EXTRACT_URLS} URLs por vez.`);
       return;
     }
 
@@ -125,20 +181,35 @@ const InstagramExtractorPage = () => {
     const startTime = Date.now();
 
     try {
-      const response = await fetch('/api/instagram/extract', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ urls }),
-      });
+      // One call extracts the whole list (cached posts come back immediately);
+      // whatever the server could not start in time is re-posted.
+      const data = new Array(urls.length);
+      let pendingIndices = urls.map((_, i) => i);
+      while (pendingIndices.length > 0) {
+        const response = await fetch('/api/instagram/batch', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ urls: pendingIndices.map(i => urls[i]) }),
+        });
+
+        if (!response.ok) {
+          const errData = await response.json();
+          throw new Error(errData.error || errData.message || 'Erro ao processar a solicitação.');
+        }
 
-      if (!response.ok) {
-        const errData = await response.json();
-        throw new Error(errData.error || errData.message || 'Erro ao processar a solicitação.');
+        const { results: batchResults } = await response.json();
+        batchResults.forEach((result, j) => {
+          data[pendingIndices[j]] = result;
+        });
+        const stillPending = pendingIndices.filter((_, j) => batchResults[j].status === 'pending');
+        if (stillPending.length === pendingIndices.length) {
+          throw new Error('O servidor não conseguiu processar os links restantes.');
+        }
+        pendingIndices = stillPending;
       }
 
-      const data = await response.json();
       setResults(data);
       const durationSec = ((Date.now() - startTime) / 1000).toFixed(1);
       toast.success(`Extração concluída em ${durationSec}s!`);
@@ -156,9 +227,24 @@ const InstagramExtractorPage = () => {
     toast.success('Link copiado para a área de transferência!');
   };
 
-  const processItem = async (index, currentResults, silent = false) => {
+  /**
+   * Runs a pool job for an item and keeps track of it so the item can be
+   * prioritized or cancelled while it waits or runs.
+   */
+  const runPoolJob = async (index, message, { priority, onStatus }) => {
+    const { id, promise } = pool.current.submit(message, { priority, onStatus });
+    activeJobs.current.set(index, id);
+    try {
+      return await promise;
+    } finally {
+      if (activeJobs.current.get(index) === id) activeJobs.current.delete(index);
+    }
+  };
+
+  const processItem = async (index, currentResults, silent = false, priority = 0) => {
     const result = currentResults[index];
     if (!result.mp4_url || result.status !== 'success') return result;
+    cancelledItems.current.delete(index);
 
     let updatedResult = { ...result };
 
@@ -171,7 +257,7 @@ const InstagramExtractorPage = () => {
       });
     };
 
-    updateResultInUI({ isProcessing: true, processingStatus: 'Iniciando transcrição...' });
+    updateResultInUI({ isProcessing: true, isQueued: true, processingStatus: 'Na fila...' });
 
     try {
       let finalUrl = result.mp4_url;
@@ -207,38 +293,54 @@ const InstagramExtractorPage = () => {
         finalUrl = new URL(`/api/proxy-download?url=${encodeURIComponent(result.mp4_url)}`, window.location.origin).href;
       }
 
-      // Transcription promise
-      const transcription = await new Promise((resolve, reject) => {
-        const onMessage = (e) => {
-          if (e.data.status === 'complete') {
-            worker.current.removeEventListener('message', onMessage);
-            resolve(e.data.output);
-          } else if (e.data.status === 'error') {
-            worker.current.removeEventListener('message', onMessage);
-            reject(new Error(e.data.error));
-          } else if (e.data.status === 'audio_downloading') {
-            updateResultInUI({ processingStatus: 'Baixando áudio...' });
-          } else if (e.data.status === 'audio_converting') {
-            updateResultInUI({ processingStatus: 'Convertendo áudio...' });
-          } else if (e.data.status === 'transcribing') {
-            updateResultInUI({ processingStatus: 'Transcrevendo...' });
+      // Reads only the MP4 metadata: over-length or silent videos never reach the worker.
+      updateResultInUI({ processingStatus: 'Verificando duração...' });
+      const probe = await probeMedia(finalUrl);
+      if (probe) {
+        updatedResult = { ...updatedResult, duration: probe.durationSeconds };
+        updateResultInUI({ duration: probe.durationSeconds, processingStatus: 'Na fila...' });
+      }
+      const rejection = getProbeRejection(probe);
+      if (rejection) throw new Error(rejection);
+
+      const { output: transcription, duration } = await runPoolJob(index, {
+        audio: finalUrl,
+        sourceUrls: [result.mp4_url, result.original_url].filter(Boolean),
+        language: 'portuguese',
+        task: 'transcribe',
+      }, {
+        priority,
+        onStatus: (data) => {
+          if (data.status === 'audio_downloading') {
+            const { received, total } = data.progress || {};
+            updateResultInUI({
+              isQueued: false,
+              processingStatus: received
+                ? `Baixando áudio... ${total ? `${Math.round((received / total) * 100)}%` : `${(received / 1e6).toFixed(1)} MB`}`
+                : 'Baixando áudio...',
+            });
+          } else if (data.status === 'audio_converting') {
+            updateResultInUI({ isQueued: false, processingStatus: 'Convertendo áudio...' });
+          } else if (data.status === 'transcribing') {
+            const { done, total } = data.progress || {};
+            updateResultInUI({
+              isQueued: false,
+              processingStatus: total > 1 ? `Transcrevendo... (trecho ${done}/${total})` : 'Transcrevendo...',
+            });
+          } else if (data.status === 'cache_hit') {
+            updateResultInUI({ isQueued: false, processingStatus: 'Transcrição encontrada no cache' });
           }
-        };
-        worker.current.addEventListener('message', onMessage);
-        worker.current.postMessage({
-          audio: finalUrl,
-          language: 'portuguese',
-          task: 'transcribe',
-        });
+        },
       });
 
-      updatedResult = { ...updatedResult, transcription, transcriptionStatus: 'success', processingStatus: 'Aguardando 2s para tradução...' };
-      updateResultInUI(updatedResult);
+      // Probe unavailable (not an MP4 or no Range support): fall back to the decoded length.
+      if (!probe && duration > MAX_VIDEO_DURATION_SECONDS) throw new Error('VIDEO_TOO_LONG');
 
-      // 2-second delay
-      await new Promise(resolve => setTimeout(resolve, 2000));
+      updatedResult = { ...updatedResult, transcription, transcriptionStatus: 'success', isQueued: false };
+      updateResultInUI(updatedResult);
 
       try {
+        if (cancelledItems.current.has(index)) throw new Error(CANCELLED);
         updateResultInUI({ processingStatus: `Traduzindo para espanhol (${translationEngine === 'gemini' ? 'Gemini' : 'Local'})...` });
 
         let translation = '';
@@ -286,34 +388,36 @@ const InstagramExtractorPage = () => {
 
           translation = await translateWithRetry();
         } else {
-          // Local translation via worker
-          translation = await new Promise((resolve, reject) => {
-            const onTranslateMessage = (e) => {
-              if (e.data.status === 'translation_complete') {
-                worker.current.removeEventListener('message', onTranslateMessage);
-                resolve(e.data.output);
-              } else if (e.data.status === 'error') {
-                worker.current.removeEventListener('message', onTranslateMessage);
-                reject(new Error(e.data.error));
-              } else if (e.data.status === 'translating') {
+          // Local translation on whichever pooled worker is free first
+          ({ output: translation } = await runPoolJob(index, {
+            type: 'TRANSLATE',
+            text: transcription,
+            src_lang: 'portuguese',
+            tgt_lang: 'spanish'
+          }, {
+            priority,
+            onStatus: (data) => {
+              if (data.status === 'translating') {
                 updateResultInUI({ processingStatus: 'Traduzindo (Local)...' });
+              } else if (data.status === 'translation_progress') {
+                const { done, total } = data.progress;
+                updateResultInUI({ processingStatus: `Traduzindo (Local)... ${done}/${total} trechos` });
               }
-            };
-            worker.current.addEventListener('message', onTranslateMessage);
-            worker.current.postMessage({
-              type: 'TRANSLATE',
-              text: transcription,
-              src_lang: 'portuguese',
-              tgt_lang: 'spanish'
-            });
-          });
+            },
+          }));
         }
+        if (cancelledItems.current.has(index)) throw new Error(CANCELLED);
 
         updatedResult = { ...updatedResult, translation, translationStatus: 'success', isProcessing: false, processingStatus: 'Concluído' };
         updateResultInUI(updatedResult);
         if (!silent) toast.success('Transcrição e tradução concluídas!');
         return updatedResult;
       } catch (transError) {
+        if (transError.message === CANCELLED) {
+          updatedResult = { ...updatedResult, isProcessing: false, processingStatus: 'Tradução cancelada' };
+          updateResultInUI(updatedResult);
+          return updatedResult;
+        }
         console.error('Error in translation:', transError);
         updatedResult = { ...updatedResult, isProcessing: false, processingStatus: `Erro na tradução: ${transError.message}`, translationStatus: 'error' };
         updateResultInUI(updatedResult);
@@ -321,12 +425,18 @@ const InstagramExtractorPage = () => {
         return updatedResult;
       }
     } catch (err) {
+      if (err.message === CANCELLED) {
+        updatedResult = { ...updatedResult, isProcessing: false, isQueued: false, processingStatus: 'Cancelado' };
+        updateResultInUI(updatedResult);
+        return updatedResult;
+      }
       if (err.message === 'VIDEO_TOO_LONG') {
         console.log('[Instagram] Vídeo muito longo (>1:00). Rejeitando.');
         updatedResult = {
           ...updatedResult,
           isProcessing: false,
           processingStatus: 'Vídeo muito longo (>1:00)',
+          isQueued: false,
           transcription: '[VÍDEO REJEITADO POR DURAÇÃO]',
           transcriptionStatus: 'error'
         };
@@ -334,8 +444,22 @@ const InstagramExtractorPage = () => {
         if (!silent) toast.warning('O vídeo tem mais de 1:00 de duração e foi rejeitado.');
         return updatedResult;
       }
+      if (err.message === 'NO_AUDIO_TRACK') {
+        console.log('[Instagram] Vídeo sem faixa de áudio. Rejeitando.');
+        updatedResult = {
+          ...updatedResult,
+          isProcessing: false,
+          isQueued: false,
+          processingStatus: 'Vídeo sem áudio',
+          transcription: '[VÍDEO REJEITADO: SEM ÁUDIO]',
+          transcriptionStatus: 'error'
+        };
+        updateResultInUI(updatedResult);
+        if (!silent) toast.warning('O vídeo não tem faixa de áudio e foi rejeitado.');
+        return updatedResult;
+      }
       console.error('Error in transcription:', err);
-      updatedResult = { ...updatedResult, isProcessing: false, processingStatus: `Erro na transcrição: ${err.message}`, transcriptionStatus: 'error' };
+      updatedResult = { ...updatedResult, isProcessing: false, isQueued: false, processingStatus: `Erro na transcrição: ${err.message}`, transcriptionStatus: 'error' };
       updateResultInUI(updatedResult);
       if (!silent) toast.error(`Erro na transcrição: ${err.message}`);
       return updatedResult;
@@ -343,12 +467,27 @@ const InstagramExtractorPage = () => {
   };
 
   const handleTranscribeAndTranslate = async (index) => {
-    setGlobalIsProcessing(true);
-    try {
-      await processItem(index, results);
-    } finally {
-      setGlobalIsProcessing(false);
+    // Already waiting in the batch queue: move it to the front instead.
+    const jobId = activeJobs.current.get(index);
+    if (jobId !== undefined) {
+      if (pool.current.prioritize(jobId, CLICK_PRIORITY)) {
+        toast.info('Item movido para o início da fila.');
+      }
+      return;
     }
+    await processItem(index, results, false, CLICK_PRIORITY);
+  };
+
+  const handleCancelItem = (index) => {
+    cancelledItems.current.add(index);
+    const jobId = activeJobs.current.get(index);
+    if (jobId !== undefined) pool.current.cancel(jobId);
+  };
+
+  const handleCancelBatch = () => {
+    results.forEach((r, index) => {
+      if (r.isProcessing) handleCancelItem(index);
+    });
   };
 
   const handleExportExcel = (dataToExport = results) => {
@@ -395,11 +534,12 @@ const InstagramExtractorPage = () => {
     const startTime = Date.now();
 
     try {
-      for (const index of indices) {
+      // Everything is queued at once; the pool runs as many items as it has workers.
+      await Promise.all(indices.map(async (index) => {
         const updatedResult = await processItem(index, latestResults, true);
         latestResults[index] = updatedResult;
         setBatchProgress(prev => ({ ...prev, current: prev.current + 1 }));
-      }
+      }));
 
       const durationMs = Date.now() - startTime;
       const durationSec = Math.floor(durationMs / 1000);
@@ -468,6 +608,25 @@ const InstagramExtractorPage = () => {
         </Paper>
 
         <Paper elevation={3} sx={{ p: 3, mb: 4 }}>
+          <Box sx={{ mb: 3 }}>
+            <FormControl component="fieldset">
+              <FormLabel component="legend" sx={{ fontWeight: 'bold', mb: 1 }}>Modelo de Transcrição</FormLabel>
+              <RadioGroup
+                row
+                value={transcriptionProfile}
+                onChange={(e) => setTranscriptionProfile(e.target.value)}
+              >
+                <FormControlLabel value="quality" control={<Radio size="small" />} label="Qualidade" disabled={globalIsProcessing} />
+                <FormControlLabel value="balanced" control={<Radio size="small" />} label="Equilíbrio" disabled={globalIsProcessing} />
+                <FormControlLabel value="speed" control={<Radio size="small" />} label="Velocidade" disabled={globalIsProcessing} />
+              </RadioGroup>
+              <Typography variant="caption" color="textSecondary">
+                Whisper {WHISPER_MODELS[whisperSize].label}. Trechos sem fala são removidos antes da transcrição.
+                {!poolIdle && pool.current?.initMessage.transcriber?.model !== WHISPER_MODELS[whisperSize].model
+                  && ' O novo modelo será carregado quando as transcrições em andamento terminarem.'}
+              </Typography>
+            </FormControl>
+          </Box>
           <Box sx={{ mb: 3 }}>
             <FormControl component="fieldset">
               <Box sx={{ display: 'flex', alignItems: 'center', mb: 1 }}>
@@ -502,7 +661,7 @@ const InstagramExtractorPage = () => {
           </Box>
 
           <Typography variant="body1" gutterBottom>
-            Insira até 30 URLs de posts ou Reels do Instagram (uma por linha ou separadas por vírgula).
+            Insira até {MAX_EXTRACT_URLS} URLs de posts ou Reels do Instagram (uma por linha ou separadas por vírgula).
           </Typography>
           <TextField
             label="URLs do Instagram"
@@ -558,11 +717,22 @@ const InstagramExtractorPage = () => {
             >
               Exportar Planilha (Excel)
             </Button>
+            {globalIsProcessing && batchProgress.total > 0 && (
+              <Button
+                variant="outlined"
+                color="error"
+                startIcon={<CancelIcon />}
+                onClick={handleCancelBatch}
+              >
+                Cancelar Lote
+              </Button>
+            )}
             {batchProgress.total > 0 ? (
               <Box sx={{ flexGrow: 1, minWidth: '200px' }}>
                 <Box sx={{ display: 'flex', justifyContent: 'space-between', mb: 0.5 }}>
                   <Typography variant="caption" color="primary" sx={{ fontWeight: 'bold' }}>
                     Processando: {batchProgress.current} de {batchProgress.total}
+                    {poolProgress && ` (${poolProgress.running} em execução, ${poolProgress.queued} na fila, ${poolProgress.workers} worker(s))`}
                   </Typography>
                   <Typography variant="caption" color="primary" sx={{ fontWeight: 'bold' }}>
                     {Math.round((batchProgress.current / batchProgress.total) * 100)}%
@@ -646,15 +816,33 @@ const InstagramExtractorPage = () => {
                     </TableCell>
                     <TableCell align="center">
                       {result.mp4_url && result.status === 'success' && (
-                        <Button
-                          variant="outlined"
-                          size="small"
-                          startIcon={result.isProcessing ? <CircularProgress size={16} /> : <TranslateIcon />}
-                          onClick={() => handleTranscribeAndTranslate(index)}
-                          disabled={globalIsProcessing || !workerReady || (translationEngine === 'local' && !translatorReady)}
-                        >
-                          {result.isProcessing ? 'Processando...' : 'Transcrever e Traduzir'}
-                        </Button>
+                        <Box sx={{ display: 'flex', justifyContent: 'center', alignItems: 'center' }}>
+                          {result.isQueued ? (
+                            <Button
+                              variant="outlined"
+                              size="small"
+                              startIcon={<PriorityHighIcon />}
+                              onClick={() => handleTranscribeAndTranslate(index)}
+                            >
+                              Priorizar
+                            </Button>
+                          ) : (
+                            <Button
+                              variant="outlined"
+                              size="small"
+                              startIcon={result.isProcessing ? <CircularProgress size={16} /> : <TranslateIcon />}
+                              onClick={() => handleTranscribeAndTranslate(index)}
+                              disabled={result.isProcessing || !workerReady || (translationEngine === 'local' && !translatorReady)}
+                            >
+                              {result.isProcessing ? 'Processando...' : 'Transcrever e Traduzir'}
+                            </Button>
+                          )}
+                          {result.isProcessing && (
+                            <IconButton size="small" color="error" onClick={() => handleCancelItem(index)} title="Cancelar">
+                              <CancelIcon fontSize="small" />
+                            </IconButton>
+                          )}
+                        </Box>
                       )}
                     </TableCell>
                   </TableRow>
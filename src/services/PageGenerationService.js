@@ -1,4 +1,29 @@
 import { drawAndComposeImage } from '../utils/imageComposer';
+import { composePages } from '../utils/pageComposer';
+
+/**
+ * Resolve os parâmetros de composição de uma página: as personalizações da
+ * página têm prioridade sobre as configurações globais da campanha.
+ */
+const resolvePageParams = ({ record, index, campaignContext, pageData = {} }) => {
+  const {
+    brandElements: globalBrandElements,
+    fieldPositions: globalFieldPositions,
+    fieldStyles: globalFieldStyles,
+    aspectRatio: globalAspectRatio,
+    pageTemplate: globalPageTemplate,
+  } = campaignContext;
+
+  return {
+    record,
+    index,
+    brandElements: pageData.customBrandElements !== undefined ? pageData.customBrandElements : globalBrandElements,
+    fieldPositions: pageData.customFieldPositions || globalFieldPositions,
+    fieldStyles: pageData.customFieldStyles || globalFieldStyles,
+    pageTemplate: pageData.customPageTemplate || globalPageTemplate,
+    aspectRatio: globalAspectRatio || '1:1', // Aspect ratio is likely always global for a campaign
+  };
+};
 
 /**
  * Centraliza a lógica de alto nível para gerar uma página.
@@ -16,36 +41,37 @@ const PageGenerationService = {
   async generatePageImage({ record, index, campaignContext, pageData = {} }) {
     console.log(`[PageGenerationService] Generating page for index: ${index}`);
 
-    const {
-      brandElements: globalBrandElements,
-      fieldPositions: globalFieldPositions,
-      fieldStyles: globalFieldStyles,
-      aspectRatio: globalAspectRatio,
-      pageTemplate: globalPageTemplate,
-    } = campaignContext;
-
-    // Prioritize page-specific customizations over global campaign settings
-    const brandElements = pageData.customBrandElements !== undefined ? pageData.customBrandElements : globalBrandElements;
-    const fieldPositions = pageData.customFieldPositions || globalFieldPositions;
-    const fieldStyles = pageData.customFieldStyles || globalFieldStyles;
-    const pageTemplate = pageData.customPageTemplate || globalPageTemplate;
-    const aspectRatio = globalAspectRatio; // Aspect ratio is likely always global for a campaign
-
     try {
-      const finalPageData = await drawAndComposeImage({
-        record,
-        index,
-        brandElements,
-        fieldPositions,
-        fieldStyles,
-        aspectRatio: aspectRatio || '1:1', // Fallback
-        pageTemplate,
-      });
+      const finalPageData = await drawAndComposeImage(resolvePageParams({ record, index, campaignContext, pageData }));
       return finalPageData;
     } catch (error) {
       console.error(`[PageGenerationService] Error generating page ${index}:`, error);
       throw new Error(`Falha na geração para o post #${index + 1}: ${error.message}`);
     }
+  },
+
+  /**
+   * Gera as imagens de várias páginas de uma vez, fora da thread principal
+   * sempre que possível (ver utils/pageComposer.js). As imagens compartilhadas
+   * entre as páginas são decodificadas uma única vez.
+   * @param {object} params - Parâmetros necessários para a geração.
+   * @param {Array<{record: object, index: number, pageData?: object}>} params.items - As páginas a gerar.
+   * @param {object} params.campaignContext - O estado do CampaignContext.
+   * @param {'blob'|'bitmap'} [params.output='blob'] - Blob com URL de objeto ou ImageBitmap.
+   * @param {Function} [params.onPage] - Chamada a cada página pronta (resultado, posição).
+   * @returns {Promise<object[]>} Os dados das imagens geradas, na ordem de `items`.
+   */
+  async generatePageImages({ items, campaignContext, output = 'blob', onPage }) {
+    console.log(`[PageGenerationService] Generating ${items.length} pages`);
+    try {
+      return await composePages(
+        items.map(({ record, index, pageData }) => resolvePageParams({ record, index, campaignContext, pageData })),
+        { output, onPage }
+      );
+    } catch (error) {
+      console.error('[PageGenerationService] Error generating pages:', error);
+      throw new Error(`Falha na geração das páginas: ${error.message}`);
+    }
   }
 };
 
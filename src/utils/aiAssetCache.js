@@ -0,0 +1,257 @@
+/**
+ * Versioned Cache Storage layer for the FFmpeg core and the Transformers.js
+ * models used by the transcription worker.
+ *
+ * Assets are served from the app's own /ai-assets/ (filled by
+ * `npm run assets:sync`, which also writes manifest.json with a SHA-256 per
+ * file) and fall back to the public CDNs when the manifest is missing. Every
+ * download is verified against the manifest before it is cached, the cache
+ * name carries the manifest version so a new sync invalidates old entries, and
+ * each load reports whether it was served warm (cache) or cold (network).
+ *
+ * Works in the worker and on the main thread (Cache Storage is per origin), so
+ * prefetchAiAssets() can warm a tab before the worker is even started.
+ */
+export const AI_ASSETS_BASE = '/ai-assets/';
+export const FFMPEG_CORE_VERSION = '0.12.6';
+const FFMPEG_CDN_BASE = `https://unpkg.com/@ffmpeg/core@${FFMPEG_CORE_VERSION}/dist/esm`;
+const MODELS_CDN_BASE = 'https://huggingface.co';
+const CACHE_PREFIX = 'copoc-ai-assets-';
+
+// Files Transformers.js reads for each (quantized) model. Also used by
+// scripts/sync-ai-assets.mjs to decide what to self-host.
+export const AI_ASSET_GROUPS = {
+  ffmpeg: {
+    files: ['ffmpeg-core.js', 'ffmpeg-core.wasm'],
+  },
+  transcriber: {
+    model: 'Xenova/whisper-small',
+    files: [
+      'config.json',
+      'generation_config.json',
+      'preprocessor_config.json',
+      'tokenizer.json',
+      'tokenizer_config.json',
+      'onnx/encoder_model_quantized.onnx',
+      'onnx/decoder_model_merged_quantized.onnx',
+    ],
+  },
+  translator: {
+    model: 'Xenova/m2m100_418M',
+    files: [
+      'config.json',
+      'generation_config.json',
+      'tokenizer.json',
+      'tokenizer_config.json',
+      'onnx/encoder_model_quantized.onnx',
+      'onnx/decoder_model_merged_quantized.onnx',
+    ],
+  },
+};
+
+export const sha256Hex = async (buffer) => {
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+export class AiAssetCache {
+  /**
+   * @param {Object} [options]
+   * @param {string} [options.baseUrl] - Where the self-hosted assets and manifest.json live.
+   * @param {(event: Object) => void} [options.onTelemetry] - Called after every asset load.
+   */
+  constructor({ baseUrl = AI_ASSETS_BASE, onTelemetry } = {}) {
+    this.baseUrl = baseUrl;
+    this.onTelemetry = onTelemetry;
+    this.manifest = null;
+    this.cache = null;
+    this.initPromise = null;
+    this.stats = { hits: 0, misses: 0, bytesFromCache: 0, bytesFromNetwork: 0 };
+  }
+
+  init() {
+    if (!this.initPromise) {
+      this.initPromise = (async () => {
+        try {
+          const response = await fetch(`${this.baseUrl}manifest.json`, { cache: 'no-store' });
+          const isJson = (response.headers.get('content-type') || '').includes('json');
+          this.manifest = response.ok && isJson ? await response.json() : null;
+        } catch {
+          this.manifest = null;
+        }
+        if (!this.manifest) {
+          console.warn('[AiAssetCache] manifest.json não encontrado; usando CDN (rode `npm run assets:sync`).');
+        }
+
+        if (typeof caches === 'undefined') return;
+        const cacheName = `${CACHE_PREFIX}${this.manifest?.version || 'cdn-v1'}`;
+        // Entries of previous asset versions are dropped as a whole.
+        const names = await caches.keys();
+        await Promise.all(names
+          .filter(name => name.startsWith(CACHE_PREFIX) && name !== cacheName)
+          .map(name => caches.delete(name)));
+        this.cache = await caches.open(cacheName);
+      })();
+    }
+    return this.initPromise;
+  }
+
+  hasSelfHosted(group) {
+    if (group === 'ffmpeg') return Boolean(this.manifest?.ffmpeg);
+    return Boolean(this.manifest?.models?.[AI_ASSET_GROUPS[group]?.model]);
+  }
+
+  /** URL of a file of a group, self-hosted when the manifest lists it. */
+  assetUrl(group, file) {
+    if (group === 'ffmpeg') {
+      return this.hasSelfHosted('ffmpeg')
+        ? `${this.baseUrl}ffmpeg/${this.manifest.ffmpeg.version}/${file}`
+        : `${FFMPEG_CDN_BASE}/${file}`;
+    }
+    const { model } = AI_ASSET_GROUPS[group];
+    // Same URLs Transformers.js requests, so its cache lookups hit these entries.
+    return this.hasSelfHosted(group)
+      ? `${this.baseUrl}models/${model}/${file}`
+      : `${MODELS_CDN_BASE}/${model}/resolve/main/${file}`;
+  }
+
+  expectedDigest(group, file) {
+    if (group === 'ffmpeg') return this.manifest?.ffmpeg?.files?.[file]?.sha256 || null;
+    return this.manifest?.models?.[AI_ASSET_GROUPS[group].model]?.files?.[file]?.sha256 || null;
+  }
+
+  /**
+   * Returns the bytes of an asset, from the cache when present, otherwise
+   * downloaded, verified against the manifest and cached.
+   * @param {string} url
+   * @param {string|null} [expectedSha256]
+   * @param {Object} [options]
+   * @param {boolean} [options.read=true] - false only makes sure the asset is
+   * cached, without reading a cached copy back into memory.
+   * @returns {Promise<{buffer: ArrayBuffer|null, source: 'cache'|'network'}>}
+   */
+  async fetchAsset(url, expectedSha256 = null, { read = true } = {}) {
+    await this.init();
+    const cached = this.cache ? await this.cache.match(url) : null;
+    if (cached) {
+      // Entries are verified before they are stored, so a hit is trusted as is.
+      const buffer = read ? await cached.arrayBuffer() : null;
+      this.stats.hits += 1;
+      this.stats.bytesFromCache += buffer ? buffer.byteLength : Number(cached.headers.get('x-asset-bytes') || 0);
+      return { buffer, source: 'cache' };
+    }
+
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`Falha ao baixar ${url}: HTTP ${response.status}`);
+    }
+    const buffer = await response.arrayBuffer();
+    if (expectedSha256) {
+      const actual = await sha256Hex(buffer);
+      if (actual !== expectedSha256) {
+        throw new Error(`Integridade inválida para ${url} (esperado ${expectedSha256}, obtido ${actual}).`);
+      }
+    }
+    this.stats.misses += 1;
+    this.stats.bytesFromNetwork += buffer.byteLength;
+    if (this.cache) {
+      await this.cache.put(url, new Response(buffer, {
+        headers: {
+          'Content-Type': response.headers.get('content-type') || 'application/octet-stream',
+          'x-asset-bytes': String(buffer.byteLength),
+        },
+      }));
+    }
+    return { buffer, source: 'network' };
+  }
+
+  /**
+   * Downloads (or confirms in cache) every file of the given groups.
+   * @param {string[]} groups - Keys of AI_ASSET_GROUPS.
+   * @param {(progress: {group: string, file: string, loaded: number, total: number}) => void} [onProgress]
+   * @returns {Promise<Object[]>} One telemetry record per group.
+   */
+  async prefetch(groups, onProgress) {
+    const records = [];
+    for (const group of groups) {
+      const startedAt = performance.now();
+      const before = { ...this.stats };
+      await this.ensureCached(group, onProgress);
+      records.push(this.report(group, startedAt, before));
+    }
+    return records;
+  }
+
+  /** Makes sure every file of a group is in the cache, downloading and verifying the missing ones. */
+  async ensureCached(group, onProgress) {
+    await this.init();
+    const { files } = AI_ASSET_GROUPS[group];
+    for (let i = 0; i < files.length; i++) {
+      await this.fetchAsset(this.assetUrl(group, files[i]), this.expectedDigest(group, files[i]), { read: false });
+      onProgress?.({ group, file: files[i], loaded: i + 1, total: files.length });
+    }
+  }
+
+  /** Blob URLs for ffmpeg.load(), in place of @ffmpeg/util's toBlobURL. */
+  async getFFmpegCoreUrls() {
+    const load = async (file, type) => {
+      const { buffer } = await this.fetchAsset(this.assetUrl('ffmpeg', file), this.expectedDigest('ffmpeg', file));
+      return URL.createObjectURL(new Blob([buffer], { type }));
+    };
+    return {
+      coreURL: await load('ffmpeg-core.js', 'text/javascript'),
+      wasmURL: await load('ffmpeg-core.wasm', 'application/wasm'),
+    };
+  }
+
+  /**
+   * Cache interface for Transformers.js (env.customCache). Misses are left to
+   * Transformers.js, which then stores the download through put().
+   */
+  asTransformersCache() {
+    return {
+      match: async (key) => {
+        await this.init();
+        const response = this.cache ? await this.cache.match(key) : undefined;
+        if (response) this.stats.hits += 1;
+        return response;
+      },
+      put: async (key, response) => {
+        await this.init();
+        if (!this.cache) return;
+        const buffer = await response.arrayBuffer();
+        this.stats.misses += 1;
+        this.stats.bytesFromNetwork += buffer.byteLength;
+        const headers = new Headers(response.headers);
+        headers.set('x-asset-bytes', String(buffer.byteLength));
+        await this.cache.put(key, new Response(buffer, { headers }));
+      },
+    };
+  }
+
+  /** Builds (and emits) a telemetry record for work done since `before`. */
+  report(asset, startedAt, before) {
+    const misses = this.stats.misses - before.misses;
+    const record = {
+      asset,
+      source: misses === 0 ? 'cache' : (this.stats.hits > before.hits ? 'mixed' : 'network'),
+      warm: misses === 0,
+      durationMs: Math.round(performance.now() - startedAt),
+      bytesFromCache: this.stats.bytesFromCache - before.bytesFromCache,
+      bytesFromNetwork: this.stats.bytesFromNetwork - before.bytesFromNetwork,
+      selfHosted: this.hasSelfHosted(asset),
+      version: this.manifest?.version || null,
+    };
+    this.onTelemetry?.(record);
+    return record;
+  }
+}
+
+/**
+ * Warms the asset cache ahead of time (e.g. when the user opens a page that
+ * will transcribe), without starting the worker or instantiating any model.
+ */
+export const prefetchAiAssets = async (groups = ['ffmpeg', 'transcriber'], onProgress) => {
+  const cache = new AiAssetCache();
+  return cache.prefetch(groups, onProgress);
+};
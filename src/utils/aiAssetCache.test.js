@@ -0,0 +1,73 @@
+// @vitest-environment node
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { AiAssetCache, sha256Hex } from './aiAssetCache';
+
+const encoder = new TextEncoder();
+
+const jsonResponse = (body) => ({
+  ok: true,
+  headers: new Headers({ 'content-type': 'application/json' }),
+  json: async () => body,
+});
+
+const binaryResponse = (text) => ({
+  ok: true,
+  headers: new Headers({ 'content-type': 'application/octet-stream' }),
+  arrayBuffer: async () => encoder.encode(text).buffer,
+});
+
+describe('AiAssetCache', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('should fall back to the CDNs when there is no manifest', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue({ ok: false, headers: new Headers() }));
+    const cache = new AiAssetCache();
+    await cache.init();
+
+    expect(cache.hasSelfHosted('ffmpeg')).toBe(false);
+    expect(cache.assetUrl('ffmpeg', 'ffmpeg-core.wasm')).toMatch(/^https:\/\/unpkg\.com\/@ffmpeg\/core@/);
+    expect(cache.assetUrl('transcriber', 'config.json'))
+      .toBe('https://huggingface.co/Xenova/whisper-small/resolve/main/config.json');
+  });
+
+  it('should serve self-hosted assets listed in the manifest', async () => {
+    const manifest = {
+      version: 'abc123',
+      ffmpeg: { version: '0.12.6', files: {} },
+      models: { 'Xenova/whisper-small': { files: {} } },
+    };
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue(jsonResponse(manifest)));
+    const cache = new AiAssetCache();
+    await cache.init();
+
+    expect(cache.assetUrl('ffmpeg', 'ffmpeg-core.js')).toBe('/ai-assets/ffmpeg/0.12.6/ffmpeg-core.js');
+    expect(cache.assetUrl('transcriber', 'onnx/encoder_model_quantized.onnx'))
+      .toBe('/ai-assets/models/Xenova/whisper-small/onnx/encoder_model_quantized.onnx');
+    expect(cache.hasSelfHosted('translator')).toBe(false);
+  });
+
+  it('should reject a download whose digest does not match', async () => {
+    const expected = await sha256Hex(encoder.encode('original').buffer);
+    vi.stubGlobal('fetch', vi.fn(async (url) => (
+      url.endsWith('manifest.json') ? { ok: false, headers: new Headers() } : binaryResponse('tampered')
+    )));
+    const cache = new AiAssetCache();
+
+    await expect(cache.fetchAsset('/ai-assets/x.bin', expected)).rejects.toThrow('Integridade inválida');
+  });
+
+  it('should report a cold load with the bytes downloaded', async () => {
+    vi.stubGlobal('fetch', vi.fn(async (url) => (
+      url.endsWith('manifest.json') ? { ok: false, headers: new Headers() } : binaryResponse('0123456789')
+    )));
+    const onTelemetry = vi.fn();
+    const cache = new AiAssetCache({ onTelemetry });
+
+    const [record] = await cache.prefetch(['ffmpeg']);
+
+    expect(record).toMatchObject({ asset: 'ffmpeg', warm: false, source: 'network', bytesFromNetwork: 20 });
+    expect(onTelemetry).toHaveBeenCalledWith(record);
+  });
+});
@@ -0,0 +1,188 @@
+/**
+ * Audio preparation and voice-activity segmentation for the Whisper
+ * transcriber (worker.js, scripts/bench-transcription.mjs).
+ *
+ * FFmpeg decodes the media to 16 kHz mono float PCM through the usual filter
+ * chain. With VAD on, a second copy of the audio is taken before dynaudnorm
+ * (which lifts silence and background noise towards speech level) and used to
+ * find the speech: frames louder than an adaptive threshold, with a hangover
+ * so pauses between words do not cut a phrase. Only the speech is sent to
+ * Whisper, packed into windows of up to 30 s (the model's input size) that
+ * are cut at silences, so the windows need no stride overlap. Continuous
+ * speech longer than a window is still transcribed with the strided chunking.
+ *
+ * The detector is energy based: silent intros and pauses are removed, music
+ * as loud as the voice is kept (dropping speech is worse than transcribing
+ * music).
+ */
+export const AUDIO_SAMPLE_RATE = 16000;
+const DENOISE_FILTERS = 'highpass=f=100,lowpass=f=3000,afftdn';
+export const AUDIO_FILTERS = `${DENOISE_FILTERS},dynaudnorm`;
+// Part of the transcription cache key: bump when the detector's output changes.
+export const VAD_VERSION = 'vad-v1';
+// Whisper pads or cuts every input to 30 s.
+export const WHISPER_WINDOW_SECONDS = 30;
+const CHUNKING = { chunk_length_s: 30, stride_length_s: 5 };
+
+export const DEFAULT_VAD_OPTIONS = {
+  frameMs: 30,
+  // Speech is at least this much above the noise floor (10th percentile of
+  // the frame levels) or within this much of the loud frames.
+  marginDb: 10,
+  // Frames below this level are never speech.
+  floorDb: -60,
+  // Pauses shorter than this stay inside the segment.
+  hangoverMs: 500,
+  // Bursts shorter than this (clicks, pops) are dropped.
+  minSpeechMs: 200,
+  // Context kept around each segment.
+  padMs: 250,
+};
+
+const PCM_OUTPUT = ['-ar', String(AUDIO_SAMPLE_RATE), '-ac', '1', '-f', 'f32le', '-c:a', 'pcm_f32le'];
+
+/**
+ * FFmpeg arguments that decode `input` to raw 32-bit float PCM in `output`.
+ * With `vadOutput`, the same audio before dynaudnorm is written there too.
+ */
+export const ffmpegPcmArgs = (input, output, vadOutput = null) => {
+  if (!vadOutput) return ['-i', input, '-af', AUDIO_FILTERS, ...PCM_OUTPUT, output];
+  const graph = `[0:a]${DENOISE_FILTERS},asplit=2[asr][vad];[asr]dynaudnorm[norm]`;
+  return ['-i', input, '-filter_complex', graph, '-map', '[norm]', ...PCM_OUTPUT, output, '-map', '[vad]', ...PCM_OUTPUT, vadOutput];
+};
+
+/** RMS level in dBFS of each frame of `frameSize` samples. */
+export const frameLevelsDb = (samples, frameSize) => {
+  const levels = new Float32Array(Math.ceil(samples.length / frameSize));
+  for (let f = 0; f < levels.length; f++) {
+    const start = f * frameSize;
+    const end = Math.min(start + frameSize, samples.length);
+    let sum = 0;
+    for (let i = start; i < end; i++) sum += samples[i] * samples[i];
+    levels[f] = 10 * Math.log10(sum / (end - start) + 1e-12);
+  }
+  return levels;
+};
+
+const percentile = (values, p) => {
+  const sorted = Float32Array.from(values).sort();
+  return sorted[Math.floor(p * (sorted.length - 1))];
+};
+
+/**
+ * Speech segments of 16 kHz mono PCM.
+ * @param {Float32Array} samples
+ * @param {Object} [options] - See DEFAULT_VAD_OPTIONS; also sampleRate.
+ * @returns {{start: number, end: number}[]} Sample ranges, sorted and disjoint.
+ */
+export const detectSpeech = (samples, options = {}) => {
+  const {
+    sampleRate = AUDIO_SAMPLE_RATE, frameMs, marginDb, floorDb, hangoverMs, minSpeechMs, padMs,
+  } = { ...DEFAULT_VAD_OPTIONS, ...options };
+  const frameSize = Math.round((sampleRate * frameMs) / 1000);
+  const levels = frameLevelsDb(samples, frameSize);
+  if (levels.length === 0) return [];
+
+  const noise = percentile(levels, 0.1);
+  const peak = percentile(levels, 0.99);
+  // Capped below the peak so a clip that is speech from end to end (no real
+  // noise floor to measure) is not dropped as a whole.
+  const threshold = Math.max(floorDb, Math.min(noise + marginDb, peak - marginDb));
+
+  const runs = [];
+  levels.forEach((level, f) => {
+    if (level < threshold) return;
+    const last = runs[runs.length - 1];
+    if (last && (f - last.end) * frameMs < hangoverMs) last.end = f + 1;
+    else runs.push({ start: f, end: f + 1 });
+  });
+
+  const pad = Math.round((sampleRate * padMs) / 1000);
+  const segments = [];
+  runs
+    .filter(run => (run.end - run.start) * frameMs >= minSpeechMs)
+    .forEach((run) => {
+      const start = Math.max(0, run.start * frameSize - pad);
+      const end = Math.min(samples.length, run.end * frameSize + pad);
+      const last = segments[segments.length - 1];
+      if (last && start <= last.end) last.end = end;
+      else segments.push({ start, end });
+    });
+  return segments;
+};
+
+/**
+ * Packs consecutive segments into windows of at most `maxSeconds` of audio.
+ * A segment longer than that gets a window of its own, flagged `long`.
+ * @returns {{segments: Object[], length: number, long: boolean}[]}
+ */
+export const planSpeechWindows = (segments, { sampleRate = AUDIO_SAMPLE_RATE, maxSeconds = WHISPER_WINDOW_SECONDS } = {}) => {
+  const maxLength = maxSeconds * sampleRate;
+  const windows = [];
+  let current = null;
+  segments.forEach((segment) => {
+    const length = segment.end - segment.start;
+    if (length > maxLength) {
+      windows.push({ segments: [segment], length, long: true });
+      current = null;
+      return;
+    }
+    if (!current || current.length + length > maxLength) {
+      current = { segments: [], length: 0, long: false };
+      windows.push(current);
+    }
+    current.segments.push(segment);
+    current.length += length;
+  });
+  return windows;
+};
+
+/** The samples of a window's segments, back to back. */
+export const gatherWindow = (samples, speechWindow) => {
+  if (speechWindow.segments.length === 1) {
+    const [{ start, end }] = speechWindow.segments;
+    return samples.subarray(start, end);
+  }
+  const audio = new Float32Array(speechWindow.length);
+  let offset = 0;
+  speechWindow.segments.forEach(({ start, end }) => {
+    audio.set(samples.subarray(start, end), offset);
+    offset += end - start;
+  });
+  return audio;
+};
+
+/**
+ * Runs the transcriber over the speech of a clip.
+ * @param {(audio: Float32Array, options: Object) => Promise<{text: string}>} transcriber
+ * @param {Float32Array} samples - Normalized 16 kHz PCM, what Whisper hears.
+ * @param {Object} options
+ * @param {string} options.language
+ * @param {string} options.task
+ * @param {boolean} [options.vad=true] - false transcribes the whole clip with strided chunking.
+ * @param {Float32Array} [options.vadSamples] - The un-normalized copy to detect speech on.
+ * @param {Object} [options.vadOptions]
+ * @param {(progress: {done: number, total: number}) => void} [options.onProgress] - After each window.
+ * @returns {Promise<{text: string, speechSeconds: number}>}
+ */
+export const transcribeSpeech = async (transcriber, samples, {
+  language, task, vad = true, vadSamples = samples, vadOptions, onProgress,
+}) => {
+  if (!vad) {
+    const output = await transcriber(samples, { language, task, ...CHUNKING });
+    return { text: output.text, speechSeconds: samples.length / AUDIO_SAMPLE_RATE };
+  }
+
+  const windows = planSpeechWindows(detectSpeech(vadSamples, vadOptions));
+  const texts = [];
+  for (let i = 0; i < windows.length; i++) {
+    const speechWindow = windows[i];
+    const output = await transcriber(gatherWindow(samples, speechWindow), {
+      language, task, ...(speechWindow.long ? CHUNKING : {}),
+    });
+    texts.push(output.text.trim());
+    onProgress?.({ done: i + 1, total: windows.length });
+  }
+  const speechSamples = windows.reduce((sum, { length }) => sum + length, 0);
+  return { text: texts.filter(Boolean).join(' '), speechSeconds: speechSamples / AUDIO_SAMPLE_RATE };
+};
@@ -0,0 +1,95 @@
+import { describe, it, expect, vi } from 'vitest';
+import {
+  AUDIO_SAMPLE_RATE, ffmpegPcmArgs, detectSpeech, planSpeechWindows, transcribeSpeech,
+} from './audioPreprocess';
+
+const seconds = s => Math.round(s * AUDIO_SAMPLE_RATE);
+
+// Low noise with 440 Hz "speech" at the given [from, to] second ranges.
+const signal = (totalSeconds, bursts, { noise = 0.001, amplitude = 0.3 } = {}) => {
+  const samples = new Float32Array(seconds(totalSeconds));
+  for (let i = 0; i < samples.length; i++) samples[i] = noise * Math.sin(i * 1.7);
+  bursts.forEach(([from, to]) => {
+    for (let i = seconds(from); i < seconds(to); i++) samples[i] = amplitude * Math.sin((2 * Math.PI * 440 * i) / AUDIO_SAMPLE_RATE);
+  });
+  return samples;
+};
+
+describe('ffmpegPcmArgs', () => {
+  it('should split the audio before dynaudnorm for the speech detector', () => {
+    expect(ffmpegPcmArgs('in.mp4', 'out.pcm')).toContain('highpass=f=100,lowpass=f=3000,afftdn,dynaudnorm');
+
+    const args = ffmpegPcmArgs('in.mp4', 'out.pcm', 'vad.pcm');
+    expect(args[args.indexOf('-filter_complex') + 1])
+      .toBe('[0:a]highpass=f=100,lowpass=f=3000,afftdn,asplit=2[asr][vad];[asr]dynaudnorm[norm]');
+    expect(args.slice(-1)).toEqual(['vad.pcm']);
+  });
+});
+
+describe('detectSpeech', () => {
+  it('should drop the silent intro and keep short pauses inside a segment', () => {
+    const segments = detectSpeech(signal(10, [[3, 5], [5.3, 6], [8, 9]]));
+
+    expect(segments).toHaveLength(2);
+    expect(segments[0].start).toBeGreaterThan(seconds(2.5));
+    expect(segments[0].start).toBeLessThanOrEqual(seconds(3));
+    expect(segments[0].end).toBeGreaterThanOrEqual(seconds(6));
+    expect(segments[1].end).toBeLessThanOrEqual(seconds(9.5));
+  });
+
+  it('should ignore clicks and find nothing in silence', () => {
+    expect(detectSpeech(signal(5, [[2, 2.05]]))).toEqual([]);
+    expect(detectSpeech(new Float32Array(seconds(3)))).toEqual([]);
+  });
+
+  it('should keep a clip that is speech from end to end', () => {
+    expect(detectSpeech(signal(4, [[0, 4]]))).toEqual([{ start: 0, end: seconds(4) }]);
+  });
+});
+
+describe('planSpeechWindows', () => {
+  it('should pack segments up to 30 s and give long ones their own window', () => {
+    const windows = planSpeechWindows([
+      { start: 0, end: seconds(12) },
+      { start: seconds(20), end: seconds(35) },
+      { start: seconds(40), end: seconds(50) },
+      { start: seconds(60), end: seconds(100) },
+    ]);
+
+    expect(windows.map(w => [w.segments.length, w.length / AUDIO_SAMPLE_RATE, w.long]))
+      .toEqual([[2, 27, false], [1, 10, false], [1, 40, true]]);
+  });
+});
+
+describe('transcribeSpeech', () => {
+  it('should only send the speech to the transcriber, chunking long windows', async () => {
+    const samples = signal(80, [[5, 15], [40, 75]]);
+    const texts = [' Oi, gente. ', ' Comprei hoje.'];
+    const transcriber = vi.fn(async () => ({ text: texts.shift() }));
+    const onProgress = vi.fn();
+
+    const output = await transcribeSpeech(transcriber, samples, { language: 'portuguese', task: 'transcribe', onProgress });
+
+    expect(transcriber).toHaveBeenCalledTimes(2);
+    expect(transcriber.mock.calls[0][1]).toEqual({ language: 'portuguese', task: 'transcribe' });
+    expect(transcriber.mock.calls[1][1]).toMatchObject({ chunk_length_s: 30, stride_length_s: 5 });
+    expect(transcriber.mock.calls[0][0].length / AUDIO_SAMPLE_RATE).toBeCloseTo(10.5, 0);
+    expect(output.text).toBe('Oi, gente. Comprei hoje.');
+    expect(output.speechSeconds).toBeCloseTo(46, 0);
+    expect(onProgress).toHaveBeenLastCalledWith({ done: 2, total: 2 });
+  });
+
+  it('should skip the transcriber when there is no speech and keep the whole-clip path without VAD', async () => {
+    const transcriber = vi.fn(async () => ({ text: 'texto' }));
+
+    expect(await transcribeSpeech(transcriber, new Float32Array(seconds(2)), { language: 'portuguese', task: 'transcribe' }))
+      .toEqual({ text: '', speechSeconds: 0 });
+    expect(transcriber).not.toHaveBeenCalled();
+
+    const whole = await transcribeSpeech(transcriber, new Float32Array(seconds(2)), {
+      language: 'portuguese', task: 'transcribe', vad: false,
+    });
+    expect(whole).toEqual({ text: 'texto', speechSeconds: 2 });
+    expect(transcriber.mock.calls[0][1]).toMatchObject({ chunk_length_s: 30 });
+  });
+});
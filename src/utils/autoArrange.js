@@ -1,10 +1,12 @@
+import { textMetrics, getMeasureContext } from './textMetrics';
+
 // Helper function to find the best font size to fit text within a box
 export const findBestFitFontSize = (text, fontFamily, fontWeight, boxWidth, boxHeight) => {
   if (!text || !boxWidth || !boxHeight) {
     return 24; // Return a default size if inputs are invalid
   }
-  const canvas = document.createElement('canvas');
-  const ctx = canvas.getContext('2d');
+  // One shared context and cached widths instead of a new canvas per call.
+  const ctx = getMeasureContext();
   let minFontSize = 8;
   let maxFontSize = 300; // A reasonable max size
   let bestSize = minFontSize;
@@ -15,11 +17,11 @@ export const findBestFitFontSize = (text, fontFamily, fontWeight, boxWidth, boxH
     if (currentSize <= minFontSize) break; // Avoid infinite loop
 
     ctx.font = `${fontWeight} ${currentSize}px ${fontFamily}`;
-    const metrics = ctx.measureText(text);
+    const width = textMetrics.width(ctx, text);
 
     // A simple check: does it fit horizontally and vertically?
     // Add a small buffer for vertical fit.
-    if (metrics.width < boxWidth && currentSize < boxHeight) {
+    if (width < boxWidth && currentSize < boxHeight) {
       bestSize = currentSize; // This size is valid, try for a larger one
       minFontSize = currentSize + 1;
     } else {
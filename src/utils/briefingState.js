@@ -73,4 +73,21 @@ export const deleteBriefing = async (id) => {
         toast.error(`Delete failed: ${error.message}`);
         throw error;
     }
-};
\ No newline at end of file
+};
+/**
+ * Exports several briefings as Word documents in a single ZIP.
+ * @param {Array<string|number>} ids
+ * @returns {Promise<Blob>}
+ */
+export const exportBriefingsDocx = async (ids) => {
+    const res = await fetchWithAuth('/api/export', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ exportType: 'batch', briefingIds: ids }),
+    });
+    if (!res.ok) {
+        const err = await res.json().catch(() => ({}));
+        throw new Error(err.error || 'Failed to export briefings.');
+    }
+    return res.blob();
+};
@@ -0,0 +1,90 @@
+// Regras da avaliação em massa, compartilhadas entre o processamento no
+// navegador (EvaluationsPage) e o worker da fila de avaliações
+// (api/utils/evaluation-runner.js). O import com extensão permite que o Node
+// carregue este módulo diretamente.
+import { LANGUAGE_CONFIG, getCellValue } from './languageConfig.js';
+import { MAX_VIDEO_DURATION_SECONDS } from './mediaProbe.js';
+
+// Transcrições com menos palavras são reprovadas sem chamar a IA.
+export const MIN_EVALUATION_WORDS = 20;
+
+const configFor = language => LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
+
+export const getWordCount = (text) => {
+  if (!text) return 0;
+  return text.trim().split(/\s+/).filter(word => word.length > 0).length;
+};
+
+/** Avaliação de reprovação automática de uma transcrição curta (4 / 12). */
+export const shortTranscriptionEvaluation = (wordCount, language = 'pt-br') => {
+  const config = configFor(language);
+  const missingDetailsKey = config.jsonKeys.missingDetails;
+  const criterion = id => ({
+    id_criterio: id,
+    nome: config.criteria[id],
+    nota: 1,
+    status: config.statuses.RUIM,
+    comentario: config.messages.shortTranscription,
+    [missingDetailsKey]: config.messages.insufficientContent,
+  });
+  return {
+    avaliacoes: [criterion(1), criterion(3), criterion(4), criterion(7)],
+    score_final: { pontuacao_obtida: 4, pontuacao_maxima: 12 },
+    feedback_consolidado: { texto: config.messages.rejectedShort(wordCount) },
+  };
+};
+
+/** Limpa os detalhes ausentes dos critérios com nota máxima. */
+export const sanitizeEvaluation = (evalResult, language = 'pt-br') => {
+  if (!evalResult || !evalResult.avaliacoes) return evalResult;
+
+  const config = configFor(language);
+  const missingDetailsKey = config.jsonKeys.missingDetails;
+  return {
+    ...evalResult,
+    avaliacoes: evalResult.avaliacoes.map(av => (
+      // Bracket notation: 'detalhes_ausentes' ou 'detalles_ausentes', conforme o idioma.
+      av.nota === 3 || av.status === config.statuses.OTIMO ? { ...av, [missingDetailsKey]: '' } : av
+    )),
+  };
+};
+
+/**
+ * Reprova vídeos acima da duração máxima: todos os critérios com nota 1, o
+ * aviso no início do feedback e o score recalculado.
+ * @returns {Object|null} Uma cópia; a avaliação recebida (ex.: do cache) não é alterada.
+ */
+export const applyDurationRule = (evaluation, duration, language = 'pt-br') => {
+  if (!evaluation) return null;
+  const finalEval = structuredClone(evaluation);
+  if (!(duration > MAX_VIDEO_DURATION_SECONDS)) return finalEval;
+
+  const config = configFor(language);
+  if (finalEval.avaliacoes) {
+    finalEval.avaliacoes = finalEval.avaliacoes.map(av => ({ ...av, nota: 1, status: config.statuses.RUIM }));
+  }
+  const prefix = config.messages.videoTooLong;
+  if (finalEval.feedback_consolidado?.texto && !finalEval.feedback_consolidado.texto.startsWith(prefix)) {
+    finalEval.feedback_consolidado.texto = prefix + finalEval.feedback_consolidado.texto;
+  }
+  if (finalEval.score_final && finalEval.avaliacoes) {
+    finalEval.score_final.pontuacao_obtida = finalEval.avaliacoes.reduce((acc, curr) => acc + (Number(curr.nota) || 0), 0);
+  }
+  return finalEval;
+};
+
+/** transcription_data salvo para uma linha avaliada da planilha. */
+export const buildTranscriptionData = ({ row, caption, transcription, duration, evaluation }) => ({
+  captionText: caption || '',
+  transcription,
+  videoDuration: duration,
+  evaluationResult: evaluation,
+  userEvaluation: evaluation,
+  name: getCellValue(row, 'name') || '',
+  socialName: getCellValue(row, 'socialName') || '',
+  campanha: getCellValue(row, 'challengeId') || '',
+  missao: getCellValue(row, 'mediaId') || '',
+  brandHashtag: getCellValue(row, 'brandHashtag') || '',
+  campaignHashtag: getCellValue(row, 'campaignHashtag') || '',
+  missionHashtag: getCellValue(row, 'missionHashtag') || '',
+});
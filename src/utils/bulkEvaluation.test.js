@@ -0,0 +1,67 @@
+import { describe, it, expect } from 'vitest';
+import {
+  getWordCount, shortTranscriptionEvaluation, sanitizeEvaluation, applyDurationRule, buildTranscriptionData,
+} from './bulkEvaluation';
+
+const evaluation = () => ({
+  avaliacoes: [
+    { nome: 'Key Message', nota: 3, status: 'ÓTIMO', detalhes_ausentes: 'nada' },
+    { nome: 'CTA', nota: 2, status: 'BOM', detalhes_ausentes: 'link' },
+  ],
+  score_final: { pontuacao_obtida: 5, pontuacao_maxima: 6 },
+  feedback_consolidado: { texto: 'Bom vídeo.' },
+});
+
+describe('bulkEvaluation', () => {
+  it('should count words ignoring extra whitespace', () => {
+    expect(getWordCount('  uma   fala\ncurta ')).toBe(3);
+    expect(getWordCount('')).toBe(0);
+  });
+
+  it('should reject short transcriptions with the language labels', () => {
+    const result = shortTranscriptionEvaluation(7, 'es-la');
+
+    expect(result.avaliacoes).toHaveLength(4);
+    expect(result.avaliacoes[0]).toHaveProperty('detalles_ausentes');
+    expect(result.score_final).toEqual({ pontuacao_obtida: 4, pontuacao_maxima: 12 });
+    expect(result.feedback_consolidado.texto).toContain('7');
+  });
+
+  it('should clear missing details of top-scored criteria only', () => {
+    const [top, other] = sanitizeEvaluation(evaluation(), 'pt-br').avaliacoes;
+
+    expect(top.detalhes_ausentes).toBe('');
+    expect(other.detalhes_ausentes).toBe('link');
+  });
+
+  it('should fail over-length videos without touching the input', () => {
+    const input = evaluation();
+
+    const result = applyDurationRule(input, 75, 'pt-br');
+
+    expect(result.avaliacoes.map(av => [av.nota, av.status])).toEqual([[1, 'RUIM'], [1, 'RUIM']]);
+    expect(result.score_final.pontuacao_obtida).toBe(2);
+    expect(result.feedback_consolidado.texto).toMatch(/^\[VÍDEO REJEITADO.*Bom vídeo\.$/);
+    expect(input.avaliacoes[0].nota).toBe(3);
+    expect(applyDurationRule(input, 30, 'pt-br')).toEqual(input);
+  });
+
+  it('should keep the short-rejection score when the video is also too long', () => {
+    const result = applyDurationRule(shortTranscriptionEvaluation(3, 'pt-br'), 90, 'pt-br');
+
+    expect(result.score_final.pontuacao_obtida).toBe(4);
+    expect(result.feedback_consolidado.texto.startsWith('[VÍDEO REJEITADO')).toBe(true);
+  });
+
+  it('should take the saved metadata from the sheet row', () => {
+    const data = buildTranscriptionData({
+      row: { Nome: 'Ana Lima', URL: 'https://x' },
+      caption: 'legenda',
+      transcription: 'fala',
+      duration: 12,
+      evaluation: null,
+    });
+
+    expect(data).toMatchObject({ name: 'Ana Lima', captionText: 'legenda', videoDuration: 12, campanha: '' });
+  });
+});
@@ -0,0 +1,85 @@
+/**
+ * Composes batches of pages on OffscreenCanvas, off the main thread
+ * (see pageComposer.js for the client).
+ *
+ * Images are fetched and decoded to ImageBitmaps once per batch, so the
+ * background and brand images every page shares are decoded once, and closed
+ * when the batch ends. Text widths come from the worker's TextMetricsCache,
+ * which lives as long as the worker. Pages with HTML text are not sent here:
+ * they need html2canvas and the DOM.
+ */
+import { renderPage, getDimensionsFromAspectRatio, imageSourceUrl } from './pageRenderer';
+import { loadFontStylesheets, pageFonts } from './fontFaces';
+import { textMetrics } from './textMetrics';
+
+const DEFAULT_PAGE_SIZE = { width: 1080, height: 1080 };
+
+const fetchBitmap = async (src) => {
+    const response = await fetch(imageSourceUrl(src), { mode: 'cors' });
+    if (!response.ok) {
+        throw new Error(`Failed to fetch image: ${response.statusText}`);
+    }
+    return createImageBitmap(await response.blob());
+};
+
+const createBitmapLoader = () => {
+    const bitmaps = new Map();
+    return {
+        get: (src) => {
+            if (!bitmaps.has(src)) bitmaps.set(src, fetchBitmap(src));
+            return bitmaps.get(src);
+        },
+        close: async () => {
+            const decoded = await Promise.all([...bitmaps.values()].map(bitmap => bitmap.catch(() => null)));
+            decoded.forEach(bitmap => bitmap?.close());
+        },
+    };
+};
+
+/**
+ * @param {Object} page - drawAndComposeImage params plus `position` (its index in the batch).
+ * @param {'blob'|'bitmap'} output
+ */
+const composePage = async (page, output, getImage) => {
+    const size = getDimensionsFromAspectRatio(page.aspectRatio) || DEFAULT_PAGE_SIZE;
+    // Fonts that are still loading would be measured and drawn as the fallback.
+    await Promise.all(pageFonts(page).map(font => self.fonts.load(font).catch(() => [])));
+
+    const canvas = new OffscreenCanvas(size.width, size.height);
+    await renderPage(canvas.getContext('2d'), size, page, { getImage });
+
+    if (output === 'bitmap') {
+        const bitmap = canvas.transferToImageBitmap();
+        self.postMessage({ status: 'page', batchId: page.batchId, position: page.position, bitmap }, [bitmap]);
+    } else {
+        const blob = await canvas.convertToBlob({ type: 'image/png' });
+        self.postMessage({ status: 'page', batchId: page.batchId, position: page.position, blob });
+    }
+};
+
+self.addEventListener('message', async (event) => {
+    const { type, batchId, pages, output = 'blob', fontStylesheets = [] } = event.data;
+    if (type !== 'COMPOSE') return;
+
+    await loadFontStylesheets(self.fonts, fontStylesheets);
+    const bitmaps = createBitmapLoader();
+    const startedAt = performance.now();
+    try {
+        for (const page of pages) {
+            try {
+                await composePage({ ...page, batchId }, output, bitmaps.get);
+            } catch (error) {
+                console.error(`[compositionWorker] Failed to compose page ${page.index}:`, error);
+                self.postMessage({ status: 'page_error', batchId, position: page.position, error: String(error.message || error) });
+            }
+        }
+    } finally {
+        await bitmaps.close();
+    }
+    self.postMessage({
+        status: 'batch_complete',
+        batchId,
+        durationMs: Math.round(performance.now() - startedAt),
+        textMetrics: { ...textMetrics.stats },
+    });
+});
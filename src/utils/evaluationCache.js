@@ -0,0 +1,126 @@
+/**
+ * Content-addressed cache of AI evaluations.
+ *
+ * The key is a SHA-256 of everything that determines an evaluation (prompt
+ * version and kind, model, language, briefing, transcription, caption), so re-uploading
+ * a spreadsheet only sends the rows that actually changed to Gemini. Lookups go
+ * to IndexedDB first and then to /api/evaluation-cache; server hits are copied
+ * into IndexedDB for the next run.
+ */
+import fetchWithAuth from './fetchWithAuth';
+import { idbGetMany, idbPutMany } from './idbStore';
+
+// Bump whenever the evaluation prompts or the result schema change, so old
+// results are no longer served.
+export const EVALUATION_PROMPT_VERSION = 'eval-v1';
+
+// The single-item prompt (evaluateContent) and the grouped one
+// (evaluateMultipleContent) are worded differently: their results are kept apart.
+export const EVALUATION_KINDS = { SINGLE: 'single', GROUPED: 'grouped' };
+
+const STORE = 'evaluations';
+const LOOKUP_BATCH_SIZE = 100;
+const STORE_BATCH_SIZE = 200;
+// Local entries older than this are ignored; the server copy is still used.
+const LOCAL_TTL_MS = 30 * 24 * 60 * 60 * 1000;
+
+const normalizeText = (text) => String(text || '').replace(/\s+/g, ' ').trim();
+
+/**
+ * Serialises the inputs of an evaluation. Whitespace-only edits (common when a
+ * sheet is re-exported) do not change the key.
+ */
+export const buildEvaluationKeyMaterial = ({ kind, transcription, caption, briefing, model, language }) => JSON.stringify([
+  EVALUATION_PROMPT_VERSION,
+  kind,
+  (model || '').replace(/^models\//, ''),
+  language || 'pt-br',
+  normalizeText(briefing),
+  normalizeText(transcription),
+  normalizeText(caption),
+]);
+
+/** @returns {Promise<string>} Hex SHA-256 of the evaluation inputs. */
+export const computeEvaluationKey = async (inputs) => {
+  const data = new TextEncoder().encode(buildEvaluationKeyMaterial(inputs));
+  const digest = await crypto.subtle.digest('SHA-256', data);
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+const fetchRemote = async (keys) => {
+  const hits = new Map();
+  for (let i = 0; i < keys.length; i += LOOKUP_BATCH_SIZE) {
+    const batch = keys.slice(i, i + LOOKUP_BATCH_SIZE);
+    const res = await fetchWithAuth(`/api/evaluation-cache?keys=${batch.join(',')}`);
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.error || err.message || 'Failed to read the evaluation cache.');
+    }
+    const { hits: batchHits } = await res.json();
+    Object.entries(batchHits || {}).forEach(([key, result]) => hits.set(key, result));
+  }
+  return hits;
+};
+
+/**
+ * Looks up cached evaluations.
+ * @param {string[]} keys - Keys from computeEvaluationKey.
+ * @returns {Promise<Map<string, Object>>} key -> evaluation, for the hits only.
+ * A failing tier is treated as a miss, never as an error.
+ */
+export const lookupCachedEvaluations = async (keys) => {
+  const unique = [...new Set(keys)];
+  const hits = new Map();
+
+  const local = await idbGetMany(STORE, unique);
+  const now = Date.now();
+  local.forEach((record, key) => {
+    if (now - record.savedAt < LOCAL_TTL_MS) hits.set(key, record.result);
+  });
+
+  const missing = unique.filter(key => !hits.has(key));
+  if (missing.length > 0) {
+    try {
+      const remote = await fetchRemote(missing);
+      remote.forEach((result, key) => hits.set(key, result));
+      await idbPutMany(STORE, [...remote].map(([key, result]) => ({ key, result, savedAt: now })));
+    } catch (error) {
+      console.warn('Cache de avaliações do servidor indisponível:', error);
+    }
+  }
+  return hits;
+};
+
+/**
+ * Stores fresh evaluations in both tiers.
+ * @param {Array<{key: string, result: Object, model?: string, language?: string}>} entries
+ */
+export const storeCachedEvaluations = async (entries) => {
+  if (entries.length === 0) return;
+  const now = Date.now();
+  // Cloned up front: callers go on to adjust the evaluation they passed in.
+  const records = entries.map(entry => ({ ...entry, result: structuredClone(entry.result) }));
+
+  await idbPutMany(STORE, records.map(({ key, result }) => ({ key, result, savedAt: now })));
+
+  for (let i = 0; i < records.length; i += STORE_BATCH_SIZE) {
+    const batch = records.slice(i, i + STORE_BATCH_SIZE);
+    try {
+      const res = await fetchWithAuth('/api/evaluation-cache', {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          entries: batch.map(({ key, result, model, language }) => ({
+            key, result, model, language, promptVersion: EVALUATION_PROMPT_VERSION,
+          })),
+        }),
+      });
+      if (!res.ok) {
+        const err = await res.json().catch(() => ({}));
+        throw new Error(err.error || err.message || `Erro ${res.status}`);
+      }
+    } catch (error) {
+      console.warn('Falha ao gravar no cache de avaliações do servidor:', error);
+    }
+  }
+};
@@ -0,0 +1,68 @@
+// @vitest-environment node
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { EVALUATION_KINDS, computeEvaluationKey, lookupCachedEvaluations } from './evaluationCache';
+
+const inputs = {
+  kind: EVALUATION_KINDS.GROUPED,
+  transcription: 'Olá pessoal, hoje vou mostrar o produto novo',
+  caption: 'Legenda #publi',
+  briefing: 'Mensagem principal: produto novo',
+  model: 'gemini-2.5-flash',
+  language: 'pt-br',
+};
+
+describe('computeEvaluationKey', () => {
+  it('should return a hex SHA-256 digest', async () => {
+    expect(await computeEvaluationKey(inputs)).toMatch(/^[0-9a-f]{64}$/);
+  });
+
+  it('should ignore whitespace-only differences and the models/ prefix', async () => {
+    const key = await computeEvaluationKey(inputs);
+    const reformatted = await computeEvaluationKey({
+      ...inputs,
+      transcription: `  ${inputs.transcription.replace(/ /g, '\n')} `,
+      model: `models/${inputs.model}`,
+    });
+    expect(reformatted).toBe(key);
+  });
+
+  it('should change when any evaluation input changes', async () => {
+    const key = await computeEvaluationKey(inputs);
+    for (const field of ['transcription', 'caption', 'briefing', 'model']) {
+      expect(await computeEvaluationKey({ ...inputs, [field]: `${inputs[field]}!` })).not.toBe(key);
+    }
+    expect(await computeEvaluationKey({ ...inputs, language: 'en-us' })).not.toBe(key);
+  });
+
+  it('should keep single-item and grouped evaluations apart', async () => {
+    expect(await computeEvaluationKey({ ...inputs, kind: EVALUATION_KINDS.SINGLE }))
+      .not.toBe(await computeEvaluationKey(inputs));
+  });
+});
+
+describe('lookupCachedEvaluations', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('should return the server hits when there is no local tier', async () => {
+    const key = await computeEvaluationKey(inputs);
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({ hits: { [key]: { score_final: { pontuacao_obtida: 9 } } } }),
+    });
+    vi.stubGlobal('fetch', fetchMock);
+
+    const hits = await lookupCachedEvaluations([key, key]);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(fetchMock.mock.calls[0][0]).toBe(`/api/evaluation-cache?keys=${key}`);
+    expect(hits.get(key).score_final.pontuacao_obtida).toBe(9);
+  });
+
+  it('should treat a failing server as a miss', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockRejectedValue(new Error('offline')));
+    const hits = await lookupCachedEvaluations([await computeEvaluationKey(inputs)]);
+    expect(hits.size).toBe(0);
+  });
+});
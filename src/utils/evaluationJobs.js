@@ -0,0 +1,118 @@
+/**
+ * Client of the server-side bulk evaluation queue (/api/evaluation-jobs).
+ *
+ * The page creates a job, uploads the prepared spreadsheet rows in batches and
+ * then only polls the job's progress: the evaluation itself runs in the
+ * workers (scripts/evaluation-worker.mjs), so closing or reloading the tab
+ * does not stop it, and the page picks an unfinished job up again on load.
+ */
+import fetchWithAuth from './fetchWithAuth';
+import { EVALUATION_PROMPT_VERSION } from './evaluationCache';
+
+// Server limit per append request (MAX_APPEND_ITEMS in api/utils/evaluation-jobs.js).
+export const APPEND_BATCH_SIZE = 500;
+const RESULTS_PAGE_SIZE = 500;
+
+const request = async (url, options, failure) => {
+  const res = await fetchWithAuth(url, options);
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.error || err.message || failure);
+  }
+  return res.json();
+};
+
+const post = (url, body, failure) => request(url, {
+  method: 'POST',
+  headers: { 'Content-Type': 'application/json' },
+  body: JSON.stringify(body),
+}, failure);
+
+/** Whether workers still have (or may still get) rows of this job to process. */
+export const isJobActive = job => Boolean(job) && (job.status === 'running' || job.status === 'paused');
+
+/** Rows of the job that reached a final state. */
+export const finishedCount = job => (job.done || 0) + (job.failed || 0) + (job.skipped || 0);
+
+/** Estimated ms until the job is done, from the recent throughput; null when unknown. */
+export const estimateRemainingMs = (job) => {
+  if (!job?.rowsPerMinute) return null;
+  const remaining = (job.pending || 0) + (job.running || 0);
+  return (remaining / job.rowsPerMinute) * 60000;
+};
+
+/** @returns {Promise<Object>} The new job (status 'running', no items yet). */
+export const createEvaluationJob = ({ briefingId, language }) => post(
+  '/api/evaluation-jobs',
+  { briefingId, language, promptVersion: EVALUATION_PROMPT_VERSION },
+  'Failed to create the evaluation job.'
+);
+
+/**
+ * Uploads prepared rows; the workers start on them right away.
+ * @param {Object[]} items - { rowIndex, name, videoUrl, caption, transcription,
+ * duration, row, cacheKey } or { rowIndex, name, row, skipped: ai_status }.
+ * @param {Object} [options]
+ * @param {boolean} [options.sealed] - These are the last rows of the job.
+ */
+export const appendEvaluationJobItems = async (jobId, items, { sealed = false } = {}) => {
+  let inserted = 0;
+  for (let i = 0; i < items.length || (i === 0 && sealed); i += APPEND_BATCH_SIZE) {
+    const batch = items.slice(i, i + APPEND_BATCH_SIZE);
+    const last = i + APPEND_BATCH_SIZE >= items.length;
+    const result = await post(
+      `/api/evaluation-jobs/${jobId}`,
+      { items: batch, sealed: sealed && last },
+      'Failed to upload rows to the evaluation job.'
+    );
+    inserted += result.inserted;
+  }
+  return inserted;
+};
+
+/** Counts, throughput (rowsPerMinute) and latest failures of a job. */
+export const getEvaluationJob = jobId => request(`/api/evaluation-jobs/${jobId}`, {}, 'Failed to fetch the evaluation job.');
+
+/** The user's latest jobs, newest first. */
+export const listEvaluationJobs = async () => (
+  await request('/api/evaluation-jobs', {}, 'Failed to fetch evaluation jobs.')
+).jobs;
+
+/**
+ * @param {'pause'|'resume'|'retry'|'cancel'|'fail'} action - 'retry' re-queues
+ * the failed rows; 'fail' closes a job whose rows could not all be uploaded.
+ * @returns {Promise<Object>} The job's progress after the action.
+ */
+export const evaluationJobAction = (jobId, action) => post(
+  `/api/evaluation-jobs/${jobId}`,
+  { action },
+  'Failed to update the evaluation job.'
+);
+
+/**
+ * Every row of a job in sheet order, shaped like the results of the in-browser
+ * run ({ row, transcription, evaluation, ai_status }) for exportEvaluationsToExcel.
+ */
+export const getEvaluationJobResults = async (jobId) => {
+  const results = [];
+  let after = -1;
+  while (after !== null) {
+    const page = await request(
+      `/api/evaluation-jobs/${jobId}?items=1&after=${after}&limit=${RESULTS_PAGE_SIZE}`,
+      {},
+      'Failed to fetch the evaluation job results.'
+    );
+    page.items.forEach((item) => {
+      let aiStatus = item.ai_status;
+      if (!aiStatus) aiStatus = item.status === 'failed' ? `Erro: ${item.last_error}` : 'Pendente';
+      results.push({
+        row: item.row_data,
+        transcription: item.transcription || '',
+        evaluation: item.result,
+        ai_status: aiStatus,
+      });
+    });
+    after = page.nextAfter;
+  }
+  return results;
+};
@@ -0,0 +1,136 @@
+// Linhas das planilhas de avaliação, compartilhadas entre a exportação no
+// navegador (exportUtils.js) e a exportação em streaming da API
+// (api/transcriptions/export.js). O import com extensão permite que o Node
+// carregue este módulo diretamente.
+import { LANGUAGE_CONFIG, getColumnName, getCellValue } from './languageConfig.js';
+
+/**
+ * Achata o objeto de avaliação para um formato compatível com planilha.
+ * @param {Object} evaluation - O objeto de avaliação (evaluationResult ou userEvaluation).
+ * @param {string} language - O idioma selecionado.
+ * @returns {Object} O objeto achatado.
+ */
+export const flattenEvaluation = (evaluation, language = 'pt-br') => {
+  const flat = {};
+  const config = LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
+  const labels = config.export;
+
+  if (evaluation && evaluation.avaliacoes) {
+    evaluation.avaliacoes.forEach(av => {
+      const prefix = av.nome.split('/')[0].trim();
+      const missingDetailsKey = config.jsonKeys.missingDetails;
+      flat[`${prefix} - ${labels.nota}`] = av.nota;
+      flat[`${prefix} - ${labels.status}`] = av.status;
+      flat[`${prefix} - ${labels.comentario}`] = av.comentario;
+      flat[`${prefix} - ${labels.detalhesAusentes}`] = av[missingDetailsKey];
+    });
+    flat[labels.scoreFinal] = `${evaluation.score_final?.pontuacao_obtida} / ${evaluation.score_final?.pontuacao_maxima}`;
+    flat[labels.feedbackConsolidado] = evaluation.feedback_consolidado?.texto;
+  }
+  return flat;
+};
+
+/**
+ * Processa uma linha para a aba "Dados Originais" mantendo-a idêntica à entrada.
+ */
+export const processRowOriginal = (row, language = 'pt-br') => {
+  return { ...row };
+};
+
+/**
+ * Processa uma linha para a aba "Resultados IA" com reordenação de colunas.
+ */
+export const processRowIA = (item, language = 'pt-br') => {
+  const config = LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
+  const labels = config.export;
+  const data = item.transcription_data || {};
+  const evalToUse = data.userEvaluation || data.evaluationResult || item.evaluation;
+
+  const brandVal = data.brandHashtag || getCellValue(item.row || {}, 'brandHashtag') || '';
+  const campaignVal = data.campaignHashtag || getCellValue(item.row || {}, 'campaignHashtag') || '';
+  const missionVal = data.missionHashtag || getCellValue(item.row || {}, 'missionHashtag') || '';
+
+  const baseRow = item.row ? { ...item.row } : {
+    [labels.challengeId]: data.campanha || item.campanha || '',
+    [labels.mediaId]: data.missao || item.missao || '',
+    [labels.name]: item.name || '',
+    [labels.socialName]: item.socialName || '',
+    [labels.url || 'URL']: item.video_url || '',
+    [labels.caption || 'Legenda']: data.captionText || '',
+    [labels.transcription]: data.transcription || item.transcription || '',
+    [labels.brandHashtag]: brandVal,
+    [labels.campaignHashtag]: campaignVal,
+    [labels.missionHashtag]: missionVal,
+  };
+
+  const socialNameCol = getColumnName(baseRow, 'socialName') || labels.socialName;
+  const brandCol = getColumnName(baseRow, 'brandHashtag') || labels.brandHashtag;
+  const campaignCol = getColumnName(baseRow, 'campaignHashtag') || labels.campaignHashtag;
+  const missionCol = getColumnName(baseRow, 'missionHashtag') || labels.missionHashtag;
+  const contentScoreCol = getColumnName(baseRow, 'contentScore') || labels.contentScore;
+
+  // Remover colunas que serão movidas/reordenadas para evitar duplicatas e garantir nova posição
+  const keysToMove = [brandCol, campaignCol, missionCol, contentScoreCol].filter(Boolean);
+  keysToMove.forEach(k => delete baseRow[k]);
+
+  const finalOrderedRow = {};
+  Object.keys(baseRow).forEach(key => {
+    finalOrderedRow[key] = baseRow[key];
+    if (key === socialNameCol) {
+      finalOrderedRow[labels.contentScore] = '';
+      finalOrderedRow[labels.brandHashtag] = brandVal;
+      finalOrderedRow[labels.campaignHashtag] = campaignVal;
+      finalOrderedRow[labels.missionHashtag] = missionVal;
+    }
+  });
+
+  // Se Nome social não existia na baseRow, garantir a inserção no final
+  if (!finalOrderedRow.hasOwnProperty(labels.contentScore)) {
+    finalOrderedRow[labels.contentScore] = '';
+    finalOrderedRow[labels.brandHashtag] = brandVal;
+    finalOrderedRow[labels.campaignHashtag] = campaignVal;
+    finalOrderedRow[labels.missionHashtag] = missionVal;
+  }
+
+  Object.assign(finalOrderedRow, {
+    [labels.idConteudo]: baseRow[labels.idConteudo] || baseRow['ID Conteúdo'] || '',
+    [labels.transcription]: data.transcription || item.transcription || '',
+    ...flattenEvaluation(evalToUse, language),
+    [labels.aiStatus]: item.ai_status || 'Sucesso',
+    [`oportunidadeTrends - ${labels.nota}`]: '',
+    [`visibilidadeProduto - ${labels.nota}`]: '',
+    [`combinaComunidade - ${labels.nota}`]: '',
+  });
+
+  return finalOrderedRow;
+};
+
+/**
+ * Cabeçalhos mínimos da aba "Dados Originais" quando não há planilha de entrada.
+ * @param {string} language - O idioma selecionado.
+ * @returns {Array<string>}
+ */
+export const getDefaultOriginalHeaders = (language = 'pt-br') => {
+  const labels = (LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br']).export;
+  return [
+    labels.challengeId,
+    labels.mediaId,
+    labels.url,
+    labels.name,
+    labels.socialName,
+    labels.contentScore,
+    labels.brandHashtag,
+    labels.campaignHashtag,
+    labels.missionHashtag,
+    labels.status,
+    'Instagram Feed',
+    'Instagram Stories',
+    'TikTok',
+    'YouTube',
+    'LinkedIn',
+    'Briefing',
+    labels.caption,
+    labels.transcription,
+    labels.idConteudo
+  ];
+};
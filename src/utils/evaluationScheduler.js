@@ -0,0 +1,289 @@
+/**
+ * Rate-limit-aware scheduler for bulk Gemini calls.
+ *
+ * Requests are admitted by two token buckets (requests per minute and tokens
+ * per minute) sized to the model's quota, several run concurrently, and a 429
+ * from any of them pauses the whole queue until the delay the API asked for
+ * has passed. Progress metrics (throughput, ETA) are derived from completed work.
+ */
+
+// Free-tier defaults; paid projects should pass their own quota to the scheduler.
+export const MODEL_QUOTAS = {
+  'gemini-2.5-pro': { rpm: 5, tpm: 250000 },
+  'gemini-2.5-flash': { rpm: 10, tpm: 250000 },
+  'gemini-2.5-flash-lite': { rpm: 15, tpm: 250000 },
+  'gemini-2.0-flash': { rpm: 15, tpm: 1000000 },
+  'gemini-2.0-flash-lite': { rpm: 30, tpm: 1000000 },
+  default: { rpm: 10, tpm: 250000 },
+};
+
+export const getModelQuota = (model) => {
+  const name = (model || '').replace(/^models\//, '');
+  const key = Object.keys(MODEL_QUOTAS)
+    .filter(k => k !== 'default' && name.startsWith(k))
+    .sort((a, b) => b.length - a.length)[0];
+  return MODEL_QUOTAS[key] || MODEL_QUOTAS.default;
+};
+
+/** Rough token estimate (~4 characters per token) used for TPM admission. */
+export const estimateTokens = (text) => Math.ceil((text || '').length / 4);
+
+/**
+ * Extracts the wait the API asked for from a quota error ("Please retry in 23.5s").
+ * @returns {number|null} Milliseconds, or null when the error carries no hint.
+ */
+export const parseRetryDelayMs = (error) => {
+  if (error?.retryAfterMs) return error.retryAfterMs;
+  const match = (error?.message || '').match(/retry in ([\d.]+)\s*(ms|s)/i);
+  if (!match) return null;
+  const value = parseFloat(match[1]);
+  return match[2].toLowerCase() === 'ms' ? value : value * 1000;
+};
+
+export const isRateLimitError = (error) =>
+  error?.status === 429 ||
+  /retry in [\d.]+\s*m?s|RESOURCE_EXHAUSTED|quota|rate limit|\b429\b/i.test(error?.message || '');
+
+export class TokenBucket {
+  /**
+   * @param {number} capacity - Maximum tokens (the per-minute quota).
+   * @param {number} refillPerMs - Tokens added per millisecond.
+   * @param {() => number} [now]
+   */
+  constructor(capacity, refillPerMs, now = Date.now) {
+    this.capacity = capacity;
+    this.refillPerMs = refillPerMs;
+    this.now = now;
+    this.tokens = capacity;
+    this.updatedAt = now();
+  }
+
+  refill() {
+    const t = this.now();
+    this.tokens = Math.min(this.capacity, this.tokens + (t - this.updatedAt) * this.refillPerMs);
+    this.updatedAt = t;
+  }
+
+  /** Milliseconds until `amount` tokens are available (0 if they are now). */
+  msUntil(amount) {
+    this.refill();
+    // A request larger than the whole bucket is admitted once the bucket is full.
+    const needed = Math.min(amount, this.capacity);
+    if (this.tokens >= needed) return 0;
+    return Math.ceil((needed - this.tokens) / this.refillPerMs);
+  }
+
+  take(amount) {
+    this.refill();
+    this.tokens -= Math.min(amount, this.capacity);
+  }
+
+  /** Empties the bucket, e.g. after the server reported the quota as exhausted. */
+  drain() {
+    this.refill();
+    this.tokens = Math.min(this.tokens, 0);
+  }
+}
+
+export class EvaluationScheduler {
+  /**
+   * @param {Object} options
+   * @param {number} [options.rpm] - Requests per minute allowed by the quota.
+   * @param {number} [options.tpm] - Input tokens per minute allowed by the quota.
+   * @param {number} [options.concurrency] - Maximum requests in flight.
+   * @param {number} [options.maxQuotaRetries=5] - 429 retries per task.
+   * @param {number} [options.maxCommRetries=3] - Retries for other failures per task.
+   * @param {number} [options.commRetryDelayMs=2000]
+   * @param {number} [options.defaultBackoffMs=15000] - Pause after a 429 without a retry hint.
+   * @param {(metrics: Object) => void} [options.onProgress] - Called whenever metrics change.
+   * @param {() => number} [options.now]
+   */
+  constructor({
+    rpm = MODEL_QUOTAS.default.rpm,
+    tpm = MODEL_QUOTAS.default.tpm,
+    concurrency,
+    maxQuotaRetries = 5,
+    maxCommRetries = 3,
+    commRetryDelayMs = 2000,
+    defaultBackoffMs = 15000,
+    onProgress,
+    now = Date.now,
+  } = {}) {
+    this.now = now;
+    this.requestBucket = new TokenBucket(rpm, rpm / 60000, now);
+    this.tokenBucket = new TokenBucket(tpm, tpm / 60000, now);
+    this.concurrency = concurrency || Math.max(1, Math.min(4, rpm));
+    this.maxQuotaRetries = maxQuotaRetries;
+    this.maxCommRetries = maxCommRetries;
+    this.commRetryDelayMs = commRetryDelayMs;
+    this.defaultBackoffMs = defaultBackoffMs;
+    this.onProgress = onProgress;
+
+    this.queue = [];
+    this.inFlight = 0;
+    this.pausedUntil = 0;
+    this.timer = null;
+    this.cancelled = null;
+
+    this.startedAt = null;
+    this.totalUnits = 0;
+    this.completedUnits = 0;
+    this.failedUnits = 0;
+    this.requests = 0;
+    this.rateLimitHits = 0;
+  }
+
+  /** Declares how many units (rows) the whole run has, for ETA purposes. */
+  setTotal(units) {
+    this.totalUnits = units;
+    this.emit();
+  }
+
+  /**
+   * Records units finished without going through the scheduler (skipped or
+   * auto-rejected rows) so that throughput and ETA include them.
+   */
+  markDone(units = 1) {
+    if (this.startedAt === null) this.startedAt = this.now();
+    this.completedUnits += units;
+    this.emit();
+  }
+
+  /**
+   * Queues a request.
+   * @param {() => Promise<*>} task - Performs one API call; retried on failure.
+   * @param {Object} [options]
+   * @param {number} [options.tokens=0] - Estimated input tokens of the request.
+   * @param {number} [options.units=1] - Rows this request completes.
+   * @param {(status: string) => void} [options.onRetry] - Status messages for retries.
+   * @returns {Promise<*>} The task's result, or its last error.
+   */
+  schedule(task, { tokens = 0, units = 1, onRetry } = {}) {
+    if (this.cancelled) return Promise.reject(this.cancelled);
+    if (this.startedAt === null) this.startedAt = this.now();
+    return new Promise((resolve, reject) => {
+      this.queue.push({
+        task, tokens, units, onRetry, resolve, reject, quotaRetries: 0, commRetries: 0, notBefore: 0,
+      });
+      this.emit();
+      this.pump();
+    });
+  }
+
+  /**
+   * Rejects everything still queued and every later schedule(); requests
+   * already in flight finish normally but are not retried.
+   */
+  cancel(reason = 'Processamento cancelado.') {
+    this.cancelled = new Error(reason);
+    clearTimeout(this.timer);
+    this.timer = null;
+    const pending = this.queue.splice(0);
+    pending.forEach(job => job.reject(this.cancelled));
+    this.emit();
+  }
+
+  pump() {
+    if (this.cancelled) return;
+    clearTimeout(this.timer);
+    this.timer = null;
+
+    while (this.inFlight < this.concurrency && this.queue.length > 0) {
+      const t = this.now();
+      const index = this.queue.findIndex(job => job.notBefore <= t);
+      const job = this.queue[index];
+      const wait = Math.max(
+        this.pausedUntil - t,
+        job ? this.requestBucket.msUntil(1) : 0,
+        job ? this.tokenBucket.msUntil(job.tokens) : 0,
+        job ? 0 : Math.min(...this.queue.map(j => j.notBefore)) - t,
+      );
+      if (wait > 0) {
+        this.timer = setTimeout(() => this.pump(), wait);
+        return;
+      }
+
+      this.queue.splice(index, 1);
+      this.requestBucket.take(1);
+      this.tokenBucket.take(job.tokens);
+      this.run(job);
+    }
+  }
+
+  async run(job) {
+    this.inFlight += 1;
+    this.requests += 1;
+    this.emit();
+    try {
+      const result = await job.task();
+      this.completedUnits += job.units;
+      job.resolve(result);
+    } catch (error) {
+      this.handleFailure(job, error);
+    } finally {
+      this.inFlight -= 1;
+      this.emit();
+      this.pump();
+    }
+  }
+
+  handleFailure(job, error) {
+    if (this.cancelled) {
+      this.failedUnits += job.units;
+      job.reject(error);
+      return;
+    }
+    if (isRateLimitError(error) && job.quotaRetries < this.maxQuotaRetries) {
+      job.quotaRetries += 1;
+      this.rateLimitHits += 1;
+      const delay = parseRetryDelayMs(error) ?? this.defaultBackoffMs * 2 ** (job.quotaRetries - 1);
+      // Shared backoff: every queued request waits, not only the one that failed.
+      this.pausedUntil = Math.max(this.pausedUntil, this.now() + delay);
+      this.requestBucket.drain();
+      job.onRetry?.(`Quota excedida. Retentando em ${Math.ceil(delay / 1000)}s (tentativa ${job.quotaRetries}/${this.maxQuotaRetries})...`);
+      this.queue.unshift(job);
+      return;
+    }
+    if (!isRateLimitError(error) && job.commRetries < this.maxCommRetries) {
+      job.commRetries += 1;
+      job.notBefore = this.now() + this.commRetryDelayMs;
+      job.onRetry?.(`Erro de comunicação. Retentando (${job.commRetries}/${this.maxCommRetries})...`);
+      this.queue.push(job);
+      return;
+    }
+    this.failedUnits += job.units;
+    job.reject(error);
+  }
+
+  getMetrics() {
+    const elapsedMs = this.startedAt === null ? 0 : this.now() - this.startedAt;
+    const doneUnits = this.completedUnits + this.failedUnits;
+    const unitsPerMs = elapsedMs > 0 ? doneUnits / elapsedMs : 0;
+    const remainingUnits = Math.max(0, this.totalUnits - doneUnits);
+    return {
+      totalUnits: this.totalUnits,
+      completedUnits: this.completedUnits,
+      failedUnits: this.failedUnits,
+      queued: this.queue.length,
+      inFlight: this.inFlight,
+      requests: this.requests,
+      rateLimitHits: this.rateLimitHits,
+      pausedForMs: Math.max(0, this.pausedUntil - this.now()),
+      elapsedMs,
+      rowsPerMinute: unitsPerMs * 60000,
+      etaMs: unitsPerMs > 0 ? remainingUnits / unitsPerMs : null,
+    };
+  }
+
+  emit() {
+    this.onProgress?.(this.getMetrics());
+  }
+}
+
+/** Formats a duration in ms as "Xmin Ys" / "Ys", matching the bulk UI. */
+export const formatDuration = (ms) => {
+  if (ms === null || ms === undefined) return null;
+  const minutes = Math.floor(ms / 60000);
+  const seconds = Math.floor((ms % 60000) / 1000);
+  return minutes > 0 ? `${minutes}min ${seconds}s` : `${seconds}s`;
+};
@@ -0,0 +1,134 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import {
+  EvaluationScheduler, TokenBucket, getModelQuota, parseRetryDelayMs, isRateLimitError,
+} from './evaluationScheduler';
+
+describe('evaluationScheduler helpers', () => {
+  it('should parse the retry delay from a quota message', () => {
+    expect(parseRetryDelayMs(new Error('Quota exceeded. Please retry in 23.5s.'))).toBe(23500);
+    expect(parseRetryDelayMs(new Error('retry in 500ms'))).toBe(500);
+    expect(parseRetryDelayMs(new Error('Erro 500'))).toBeNull();
+  });
+
+  it('should recognise rate limit errors by status or message', () => {
+    expect(isRateLimitError(Object.assign(new Error('x'), { status: 429 }))).toBe(true);
+    expect(isRateLimitError(new Error('RESOURCE_EXHAUSTED'))).toBe(true);
+    expect(isRateLimitError(new Error('A resposta da IA não continha um JSON válido.'))).toBe(false);
+  });
+
+  it('should pick the most specific model quota', () => {
+    expect(getModelQuota('models/gemini-2.0-flash-lite-001').rpm).toBe(30);
+    expect(getModelQuota('gemini-2.0-flash').rpm).toBe(15);
+    expect(getModelQuota('unknown-model')).toEqual(getModelQuota());
+  });
+
+  it('should refill the bucket over time', () => {
+    let now = 0;
+    const bucket = new TokenBucket(2, 2 / 60000, () => now);
+    bucket.take(1);
+    bucket.take(1);
+    expect(bucket.msUntil(1)).toBe(30000);
+    now = 30000;
+    expect(bucket.msUntil(1)).toBe(0);
+  });
+});
+
+describe('EvaluationScheduler', () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+  });
+
+  it('should run up to `concurrency` tasks at once', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 60, concurrency: 3 });
+    let running = 0;
+    let peak = 0;
+    const task = async () => {
+      running += 1;
+      peak = Math.max(peak, running);
+      await new Promise(resolve => setTimeout(resolve, 1000));
+      running -= 1;
+      return 'ok';
+    };
+
+    const all = Promise.all(Array.from({ length: 6 }, () => scheduler.schedule(task)));
+    await vi.runAllTimersAsync();
+
+    expect(await all).toEqual(Array(6).fill('ok'));
+    expect(peak).toBe(3);
+  });
+
+  it('should not exceed the requests-per-minute quota', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 2, concurrency: 5 });
+    const task = vi.fn().mockResolvedValue('ok');
+
+    scheduler.schedule(task);
+    scheduler.schedule(task);
+    scheduler.schedule(task);
+    await vi.advanceTimersByTimeAsync(0);
+    expect(task).toHaveBeenCalledTimes(2);
+
+    await vi.advanceTimersByTimeAsync(30000);
+    expect(task).toHaveBeenCalledTimes(3);
+  });
+
+  it('should pause every queued task after a 429 and retry after the requested delay', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 600, concurrency: 1 });
+    const quotaError = Object.assign(new Error('Please retry in 10s'), { status: 429 });
+    const first = vi.fn().mockRejectedValueOnce(quotaError).mockResolvedValue('first');
+    const second = vi.fn().mockResolvedValue('second');
+
+    const results = Promise.all([scheduler.schedule(first), scheduler.schedule(second)]);
+    await vi.advanceTimersByTimeAsync(9000);
+    expect(first).toHaveBeenCalledTimes(1);
+    expect(second).not.toHaveBeenCalled();
+
+    await vi.advanceTimersByTimeAsync(2000);
+    await vi.runAllTimersAsync();
+    expect(await results).toEqual(['first', 'second']);
+    expect(scheduler.getMetrics().rateLimitHits).toBe(1);
+  });
+
+  it('should reject after exhausting communication retries', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 600, maxCommRetries: 2, commRetryDelayMs: 100 });
+    const task = vi.fn().mockRejectedValue(new Error('Falha na comunicação'));
+
+    const result = scheduler.schedule(task, { units: 5 });
+    const assertion = expect(result).rejects.toThrow('Falha na comunicação');
+    await vi.runAllTimersAsync();
+    await assertion;
+
+    expect(task).toHaveBeenCalledTimes(3);
+    expect(scheduler.getMetrics().failedUnits).toBe(5);
+  });
+
+  it('should reject queued and later tasks once cancelled', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 600, concurrency: 1 });
+    const running = scheduler.schedule(() => new Promise(resolve => setTimeout(() => resolve('ok'), 1000)));
+    const queued = vi.fn();
+    const waiting = scheduler.schedule(queued);
+
+    scheduler.cancel('Cancelado.');
+    await expect(waiting).rejects.toThrow('Cancelado.');
+    await expect(scheduler.schedule(queued)).rejects.toThrow('Cancelado.');
+    await vi.runAllTimersAsync();
+
+    expect(await running).toBe('ok');
+    expect(queued).not.toHaveBeenCalled();
+  });
+
+  it('should report throughput and ETA from completed units', async () => {
+    const scheduler = new EvaluationScheduler({ rpm: 600, concurrency: 1 });
+    scheduler.setTotal(20);
+    scheduler.schedule(() => new Promise(resolve => setTimeout(() => resolve('ok'), 6000)), { units: 5 });
+    await vi.advanceTimersByTimeAsync(6000);
+
+    const metrics = scheduler.getMetrics();
+    expect(metrics.completedUnits).toBe(5);
+    expect(metrics.rowsPerMinute).toBeCloseTo(50);
+    expect(metrics.etaMs).toBeCloseTo(18000);
+  });
+});
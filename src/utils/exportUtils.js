@@ -1,7 +1,10 @@
 import Papa from 'papaparse';
 import * as XLSX from 'xlsx';
 import { saveAs } from 'file-saver';
-import { LANGUAGE_CONFIG, getColumnName, getCellValue } from './languageConfig';
+import { processRowIA, processRowOriginal, getDefaultOriginalHeaders } from './evaluationRows';
+import { getTranscriptionsExportUrl } from './transcriptionState';
+
+export { flattenEvaluation, processRowIA, processRowOriginal } from './evaluationRows';
 
 /**
  * Converte um array de objetos em uma string CSV e inicia o download.
@@ -33,107 +36,6 @@ export const exportCsv = (data, headers) => {
   URL.revokeObjectURL(url);
 };
 
-/**
- * Achata o objeto de avaliação para um formato compatível com planilha.
- * @param {Object} evaluation - O objeto de avaliação (evaluationResult ou userEvaluation).
- * @param {string} language - O idioma selecionado.
- * @returns {Object} O objeto achatado.
- */
-export const flattenEvaluation = (evaluation, language = 'pt-br') => {
-  const flat = {};
-  const config = LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
-  const labels = config.export;
-
-  if (evaluation && evaluation.avaliacoes) {
-    evaluation.avaliacoes.forEach(av => {
-      const prefix = av.nome.split('/')[0].trim();
-      const missingDetailsKey = config.jsonKeys.missingDetails;
-      flat[`${prefix} - ${labels.nota}`] = av.nota;
-      flat[`${prefix} - ${labels.status}`] = av.status;
-      flat[`${prefix} - ${labels.comentario}`] = av.comentario;
-      flat[`${prefix} - ${labels.detalhesAusentes}`] = av[missingDetailsKey];
-    });
-    flat[labels.scoreFinal] = `${evaluation.score_final?.pontuacao_obtida} / ${evaluation.score_final?.pontuacao_maxima}`;
-    flat[labels.feedbackConsolidado] = evaluation.feedback_consolidado?.texto;
-  }
-  return flat;
-};
-
-/**
- * Processa uma linha para a aba "Dados Originais" mantendo-a idêntica à entrada.
- */
-export const processRowOriginal = (row, language = 'pt-br') => {
-  return { ...row };
-};
-
-/**
- * Processa uma linha para a aba "Resultados IA" com reordenação de colunas.
- */
-export const processRowIA = (item, language = 'pt-br') => {
-  const config = LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
-  const labels = config.export;
-  const data = item.transcription_data || {};
-  const evalToUse = data.userEvaluation || data.evaluationResult || item.evaluation;
-
-  const brandVal = data.brandHashtag || getCellValue(item.row || {}, 'brandHashtag') || '';
-  const campaignVal = data.campaignHashtag || getCellValue(item.row || {}, 'campaignHashtag') || '';
-  const missionVal = data.missionHashtag || getCellValue(item.row || {}, 'missionHashtag') || '';
-
-  const baseRow = item.row ? { ...item.row } : {
-    [labels.challengeId]: data.campanha || item.campanha || '',
-    [labels.mediaId]: data.missao || item.missao || '',
-    [labels.name]: item.name || '',
-    [labels.socialName]: item.socialName || '',
-    [labels.url || 'URL']: item.video_url || '',
-    [labels.caption || 'Legenda']: data.captionText || '',
-    [labels.transcription]: data.transcription || item.transcription || '',
-    [labels.brandHashtag]: brandVal,
-    [labels.campaignHashtag]: campaignVal,
-    [labels.missionHashtag]: missionVal,
-  };
-
-  const socialNameCol = getColumnName(baseRow, 'socialName') || labels.socialName;
-  const brandCol = getColumnName(baseRow, 'brandHashtag') || labels.brandHashtag;
-  const campaignCol = getColumnName(baseRow, 'campaignHashtag') || labels.campaignHashtag;
-  const missionCol = getColumnName(baseRow, 'missionHashtag') || labels.missionHashtag;
-  const contentScoreCol = getColumnName(baseRow, 'contentScore') || labels.contentScore;
-
-  // Remover colunas que serão movidas/reordenadas para evitar duplicatas e garantir nova posição
-  const keysToMove = [brandCol, campaignCol, missionCol, contentScoreCol].filter(Boolean);
-  keysToMove.forEach(k => delete baseRow[k]);
-
-  const finalOrderedRow = {};
-  Object.keys(baseRow).forEach(key => {
-    finalOrderedRow[key] = baseRow[key];
-    if (key === socialNameCol) {
-      finalOrderedRow[labels.contentScore] = '';
-      finalOrderedRow[labels.brandHashtag] = brandVal;
-      finalOrderedRow[labels.campaignHashtag] = campaignVal;
-      finalOrderedRow[labels.missionHashtag] = missionVal;
-    }
-  });
-
-  // Se Nome social não existia na baseRow, garantir a inserção no final
-  if (!finalOrderedRow.hasOwnProperty(labels.contentScore)) {
-    finalOrderedRow[labels.contentScore] = '';
-    finalOrderedRow[labels.brandHashtag] = brandVal;
-    finalOrderedRow[labels.campaignHashtag] = campaignVal;
-    finalOrderedRow[labels.missionHashtag] = missionVal;
-  }
-
-  Object.assign(finalOrderedRow, {
-    [labels.idConteudo]: baseRow[labels.idConteudo] || baseRow['ID Conteúdo'] || '',
-    [labels.transcription]: data.transcription || item.transcription || '',
-    ...flattenEvaluation(evalToUse, language),
-    [labels.aiStatus]: item.ai_status || 'Sucesso',
-    [`oportunidadeTrends - ${labels.nota}`]: '',
-    [`visibilidadeProduto - ${labels.nota}`]: '',
-    [`combinaComunidade - ${labels.nota}`]: '',
-  });
-
-  return finalOrderedRow;
-};
-
 /**
  * Exporta avaliações para um arquivo Excel (.xlsx) com duas abas.
  * @param {Array<Object>} evaluations - Lista de avaliações do banco de dados ou processadas.
@@ -143,8 +45,6 @@ export const processRowIA = (item, language = 'pt-br') => {
  */
 export const exportEvaluationsToExcel = (evaluations, originalData = [], language = 'pt-br', originalGrid = []) => {
   const wb = XLSX.utils.book_new();
-  const config = LANGUAGE_CONFIG[language] || LANGUAGE_CONFIG['pt-br'];
-  const labels = config.export;
 
   // Mapear os dados para o formato da aba "Resultados IA"
   const results = evaluations.map(item => processRowIA(item, language));
@@ -159,27 +59,7 @@ export const exportEvaluationsToExcel = (evaluations, originalData = [], languag
     ws1 = XLSX.utils.json_to_sheet(processedOriginal);
   } else {
     // Cabeçalhos mínimos se não houver dados originais
-    const defaultHeaders = [
-        labels.challengeId,
-        labels.mediaId,
-        labels.url,
-        labels.name,
-        labels.socialName,
-        labels.contentScore,
-        labels.brandHashtag,
-        labels.campaignHashtag,
-        labels.missionHashtag,
-        labels.status,
-        'Instagram Feed',
-        'Instagram Stories',
-        'TikTok',
-        'YouTube',
-        'LinkedIn',
-        'Briefing',
-        labels.caption,
-        labels.transcription,
-        labels.idConteudo
-    ];
+    const defaultHeaders = getDefaultOriginalHeaders(language);
     ws1 = XLSX.utils.json_to_sheet([], { header: defaultHeaders });
   }
   XLSX.utils.book_append_sheet(wb, ws1, "Dados Originais");
@@ -203,6 +83,21 @@ export const exportEvaluationsToExcel = (evaluations, originalData = [], languag
   );
 };
 
+/**
+ * Baixa avaliações salvas pela exportação em streaming do servidor, sem
+ * carregá-las no navegador.
+ * @param {Object} options - Filtros e formato (ver getTranscriptionsExportUrl).
+ */
+export const downloadEvaluationsExport = (options) => {
+  const link = document.createElement("a");
+  link.href = getTranscriptionsExportUrl(options);
+  // Nome vindo do Content-Disposition do servidor.
+  link.download = "";
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+};
+
 /**
  * Gera um arquivo HTML a partir dos dados da campanha e inicia o download.
  * @param {object} campaignData - Objeto contendo os dados da campanha.
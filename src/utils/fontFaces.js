@@ -0,0 +1,72 @@
+/**
+ * Web fonts for the composition worker. Workers do not see the document's
+ * fonts, so the worker fetches the same stylesheets (the Google Fonts link in
+ * index.html), turns their @font-face rules into FontFace objects and adds
+ * them to its own FontFaceSet (self.fonts). Each face downloads only when a
+ * page asks for it.
+ */
+const FONT_FACE_RE = /@font-face\s*{([^}]*)}/g;
+
+const descriptor = (block, name) => {
+  const match = block.match(new RegExp(`(?:^|;)\\s*${name}\\s*:\\s*([^;]+)`, 'i'));
+  return match ? match[1].trim() : null;
+};
+
+/**
+ * @font-face rules of a stylesheet.
+ * @param {string} css
+ * @param {string} [baseUrl] - Relative url() sources are resolved against it.
+ * @returns {{family: string, source: string, descriptors: Object}[]} source is
+ * a CSS src value with absolute URLs, ready for new FontFace().
+ */
+export const parseFontFaceRules = (css, baseUrl) => {
+  const rules = [];
+  for (const [, block] of String(css || '').matchAll(FONT_FACE_RE)) {
+    const family = descriptor(block, 'font-family')?.replace(/^['"]|['"]$/g, '');
+    const src = descriptor(block, 'src');
+    if (!family || !src) continue;
+    const source = src.replace(/url\((['"]?)([^'")]+)\1\)/g, (_, quote, url) => `url(${new URL(url, baseUrl).href})`);
+    const descriptors = {};
+    [['font-style', 'style'], ['font-weight', 'weight'], ['unicode-range', 'unicodeRange'], ['font-display', 'display']]
+      .forEach(([property, key]) => {
+        const value = descriptor(block, property);
+        if (value) descriptors[key] = value;
+      });
+    rules.push({ family, source, descriptors });
+  }
+  return rules;
+};
+
+const loadedStylesheets = new Map();
+
+/**
+ * Registers the faces of each stylesheet in `fontFaceSet` (once per URL).
+ * A stylesheet that cannot be fetched is skipped: text falls back to the
+ * next font of the family list.
+ */
+export const loadFontStylesheets = (fontFaceSet, urls) => Promise.all(urls.map((url) => {
+  if (!loadedStylesheets.has(url)) {
+    loadedStylesheets.set(url, (async () => {
+      try {
+        const response = await fetch(url);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        parseFontFaceRules(await response.text(), url).forEach(({ family, source, descriptors }) => {
+          fontFaceSet.add(new FontFace(family, source, descriptors));
+        });
+      } catch (error) {
+        console.warn(`[fontFaces] Could not load ${url}:`, error);
+      }
+    })());
+  }
+  return loadedStylesheets.get(url);
+}));
+
+/** CSS font shorthands of the visible text fields of a page, for FontFaceSet.load(). */
+export const pageFonts = ({ record, fieldPositions = {}, fieldStyles = {} }) => [...new Set(
+  Object.keys(record)
+    .filter(field => fieldPositions[field]?.visible && fieldStyles[field] && record[field])
+    .map((field) => {
+      const style = fieldStyles[field];
+      return `${style.fontWeight || 'normal'} ${style.fontStyle || 'normal'} ${style.fontSize || 24}px ${style.fontFamily || 'Arial'}`;
+    })
+)];
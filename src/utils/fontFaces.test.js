@@ -0,0 +1,61 @@
+import { describe, it, expect } from 'vitest';
+import { parseFontFaceRules, pageFonts } from './fontFaces';
+
+const GOOGLE_FONTS_CSS = `
+/* latin */
+@font-face {
+  font-family: 'Anton';
+  font-style: normal;
+  font-weight: 400;
+  font-display: swap;
+  src: url(https://fonts.gstatic.com/s/anton/v25/1Ptgg87LROyAm3Kz-C8.woff2) format('woff2');
+  unicode-range: U+0000-00FF, U+0131;
+}
+@font-face {
+  font-family: "Roboto";
+  font-weight: 700;
+  src: url("fonts/roboto-bold.woff2") format('woff2');
+}
+@font-face {
+  font-style: italic;
+}
+`;
+
+describe('parseFontFaceRules', () => {
+  it('should read family, source and descriptors of each rule', () => {
+    const rules = parseFontFaceRules(GOOGLE_FONTS_CSS, 'https://example.com/css/fonts.css');
+
+    expect(rules).toHaveLength(2);
+    expect(rules[0]).toEqual({
+      family: 'Anton',
+      source: "url(https://fonts.gstatic.com/s/anton/v25/1Ptgg87LROyAm3Kz-C8.woff2) format('woff2')",
+      descriptors: { style: 'normal', weight: '400', unicodeRange: 'U+0000-00FF, U+0131', display: 'swap' },
+    });
+    expect(rules[1].family).toBe('Roboto');
+    expect(rules[1].source).toBe("url(https://example.com/css/fonts/roboto-bold.woff2) format('woff2')");
+  });
+
+  it('should return nothing for empty stylesheets', () => {
+    expect(parseFontFaceRules('', 'https://example.com/')).toEqual([]);
+    expect(parseFontFaceRules(undefined)).toEqual([]);
+  });
+});
+
+describe('pageFonts', () => {
+  it('should list the distinct fonts of visible, filled fields', () => {
+    const fonts = pageFonts({
+      record: { title: 'Oferta', subtitle: 'Só hoje', label: 'Novo', empty: '' },
+      fieldPositions: {
+        title: { visible: true }, subtitle: { visible: true }, label: { visible: false }, empty: { visible: true },
+      },
+      fieldStyles: {
+        title: { fontFamily: 'Anton', fontSize: 80 },
+        subtitle: { fontFamily: 'Anton', fontSize: 80 },
+        label: { fontFamily: 'Roboto' },
+        empty: { fontFamily: 'Lobster' },
+      },
+    });
+
+    expect(fonts).toEqual(['normal normal 80px Anton']);
+  });
+});
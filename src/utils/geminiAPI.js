@@ -1,7 +1,21 @@
-class GeminiAPI {
+import { estimateTokens } from './evaluationScheduler.js';
+
+// Gemini refuses to cache prompts shorter than this (2.5 Flash minimum).
+const MIN_CACHEABLE_TOKENS = 1024;
+
+const MATERIALS_HEADERS = {
+  'en-us': '**MATERIALS TO EVALUATE (JSON):**',
+  'es-la': '**MATERIALES A EVALUAR (JSON):**',
+  'pt-br': '**MATERIAIS PARA AVALIAR (JSON):**',
+};
+
+export class GeminiAPI {
   constructor() {
     this.isInitialized = false;
     this.apiKey = null;
+    // prefix key -> Promise<cachedContent name | null>
+    this.promptCaches = new Map();
+    this.releasedCaches = new Set();
   }
 
   initialize(apiKey) {
@@ -14,21 +28,29 @@ class GeminiAPI {
     this.isInitialized = true;
   }
 
+  /**
+   * Sends one request to the Gemini proxy (/api/gemini). Server-side callers
+   * (the evaluation worker) override it to call Gemini directly.
+   * @returns {Promise<{ok: boolean, status: number, data: Object}>}
+   */
+  async callProxy(body) {
+    const response = await fetch('/api/gemini', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ ...body, apiKey: this.apiKey }),
+    });
+    return { ok: response.ok, status: response.status, data: await response.json() };
+  }
+
   async listModels() {
     if (!this.isInitialized) {
       throw new Error('GeminiAPI não foi inicializada. Chame initialize() primeiro.');
     }
     console.log('Fetching available Gemini models via proxy...');
     try {
-      const response = await fetch('/api/gemini', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ action: 'listModels', apiKey: this.apiKey }),
-      });
-
-      const data = await response.json();
-      if (!response.ok) {
-        throw new Error(data.error || `Erro ${response.status}`);
+      const { ok, status, data } = await this.callProxy({ action: 'listModels' });
+      if (!ok) {
+        throw new Error(data.error || `Erro ${status}`);
       }
 
       const supportedModels = data.models.filter(model =>
@@ -42,7 +64,7 @@ class GeminiAPI {
     }
   }
 
-  async generateContent(promptString, model, purpose = 'Chamada Genérica') {
+  async generateContent(promptString, model, purpose = 'Chamada Genérica', { cachedContent } = {}) {
     if (!this.isInitialized) {
       throw new Error('GeminiAPI não foi inicializada. Chame initialize() primeiro.');
     }
@@ -56,21 +78,19 @@ class GeminiAPI {
     console.log(`[${purpose}] Prompt:`, promptString);
 
     try {
-      const response = await fetch('/api/gemini', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          action: 'generateContent',
-          apiKey: this.apiKey,
-          prompt: promptString,
-          model: model,
-        }),
+      const { ok, status, data: responseData } = await this.callProxy({
+        action: 'generateContent',
+        prompt: promptString,
+        model: model,
+        cachedContent,
       });
 
-      const responseData = await response.json();
-      if (!response.ok) {
+      if (!ok) {
         console.error('Erro do proxy da API Gemini:', responseData);
-        throw new Error(responseData.error || `Erro ${response.status}`);
+        const proxyError = new Error(responseData.error || `Erro ${status}`);
+        // Kept so callers (e.g. the bulk scheduler) can tell a 429 from other failures.
+        proxyError.status = status;
+        throw proxyError;
       }
 
       console.log(`[${purpose}] Resposta da API Gemini (bruta):`, responseData);
@@ -88,7 +108,52 @@ class GeminiAPI {
       if (error instanceof Error && error.message.startsWith('Erro do proxy da API Gemini:')) {
         throw error;
       }
-      throw new Error(`Falha na comunicação com o proxy da API Gemini: ${error.message}`);
+      const wrapped = new Error(`Falha na comunicação com o proxy da API Gemini: ${error.message}`);
+      wrapped.status = error.status;
+      throw wrapped;
+    }
+  }
+
+  /**
+   * Stores a prompt prefix with Gemini context caching.
+   * @returns {Promise<string|null>} The cachedContents resource name, or null
+   * when the model or prompt cannot be cached (the caller then inlines the prefix).
+   */
+  async createPromptCache(promptString, model, ttlSeconds = 3600) {
+    if (!this.isInitialized) {
+      throw new Error('GeminiAPI não foi inicializada. Chame initialize() primeiro.');
+    }
+    if (estimateTokens(promptString) < MIN_CACHEABLE_TOKENS) return null;
+
+    try {
+      const { ok, data } = await this.callProxy({
+        action: 'createCachedContent',
+        prompt: promptString,
+        model: model || 'gemini-pro',
+        ttlSeconds,
+      });
+      if (!ok) {
+        console.warn('Cache de contexto indisponível, o prefixo será enviado em cada chamada:', data.error);
+        return null;
+      }
+      return data.name;
+    } catch (error) {
+      console.warn('Falha ao criar cache de contexto:', error);
+      return null;
+    }
+  }
+
+  async deletePromptCache(name) {
+    if (!name || !this.isInitialized) return;
+    this.releasedCaches.add(name);
+    for (const [key, pending] of this.promptCaches) {
+      if (await pending === name) this.promptCaches.delete(key);
+    }
+    try {
+      await this.callProxy({ action: 'deleteCachedContent', cachedContent: name });
+    } catch (error) {
+      // The cache expires on its own (TTL), so a failed delete is harmless.
+      console.warn('Falha ao remover cache de contexto:', error);
     }
   }
 
@@ -263,14 +328,12 @@ class GeminiAPI {
     }
   }
 
-  async evaluateMultipleContent(items, briefing, model, language = 'pt-br') {
-    const purpose = 'Avaliação de Conteúdo Agrupada';
-    const itemsJson = items.map(item => ({
-      id: item.id,
-      transcricao: item.transcription,
-      legenda: item.caption
-    }));
-
+  /**
+   * Instructions, briefing and output format of a grouped evaluation. This part
+   * is identical for every group of a bulk run, so it comes first in the prompt
+   * and can be stored once with context caching.
+   */
+  buildGroupedEvaluationPrefix(briefing, language = 'pt-br') {
     let prompt = '';
 
     if (language === 'en-us') {
@@ -306,11 +369,6 @@ EXCLUSION GUIDELINE (CRITICAL):
 **BRIEFING:**
 ${briefing}
 
----
-**MATERIALS TO EVALUATE (JSON):**
-\`\`\`json
-${JSON.stringify(itemsJson, null, 2)}
-\`\`\`
 ---
 
 Output Instruction: Your response must be exclusively a JSON object structured as follows (array of evaluations):
@@ -366,11 +424,6 @@ DIRECTRIZ DE EXCLUSIÓN (CRÍTICO):
 **BRIEFING:**
 ${briefing}
 
----
-**MATERIALES A EVALUAR (JSON):**
-\`\`\`json
-${JSON.stringify(itemsJson, null, 2)}
-\`\`\`
 ---
 
 Instrucción de Salida: Tu respuesta debe ser exclusivamente un objeto JSON estructurado de la siguiente manera (array de evaluaciones):
@@ -425,11 +478,6 @@ DIRETRIZ DE EXCLUSÃO (CRÍTICO):
 **BRIEFING:**
 ${briefing}
 
----
-**MATERIAIS PARA AVALIAR (JSON):**
-\`\`\`json
-${JSON.stringify(itemsJson, null, 2)}
-\`\`\`
 ---
 
 Instrução de Saída: Sua resposta deve ser exclusivamente um objeto JSON estruturado da seguinte forma (array de avaliações):
@@ -452,8 +500,64 @@ Instrução de Saída: Sua resposta deve ser exclusivamente um objeto JSON estru
 `;
     }
 
+    return prompt;
+  }
+
+  /** Materials section of a grouped evaluation; appended after the shared prefix. */
+  buildGroupedEvaluationItems(items, language = 'pt-br') {
+    const itemsJson = items.map(item => ({
+      id: item.id,
+      transcricao: item.transcription,
+      legenda: item.caption
+    }));
+    const header = MATERIALS_HEADERS[language] || MATERIALS_HEADERS['pt-br'];
+    return `---
+${header}
+\`\`\`json
+${JSON.stringify(itemsJson)}
+\`\`\`
+`;
+  }
+
+  /**
+   * Prepares the shared prefix of a bulk run once: estimates its size for the
+   * packer/scheduler and, where the model supports it, caches it on Gemini so
+   * each grouped call only sends its materials.
+   * @returns {Promise<{prefixTokens: number, cachedContent: string|null}>}
+   */
+  async prepareGroupedEvaluation(briefing, model, language = 'pt-br') {
+    const prefix = this.buildGroupedEvaluationPrefix(briefing, language);
+    const key = `${model}|${language}|${prefix}`;
+    if (!this.promptCaches.has(key)) {
+      this.promptCaches.set(key, this.createPromptCache(prefix, model));
+    }
+    const pending = this.promptCaches.get(key);
+    const cachedContent = await pending;
+    // Only a created cache is reused; after a failure the next run tries again.
+    if (!cachedContent && this.promptCaches.get(key) === pending) this.promptCaches.delete(key);
+    return { prefixTokens: estimateTokens(prefix), cachedContent };
+  }
+
+  async evaluateMultipleContent(items, briefing, model, language = 'pt-br', { cachedContent } = {}) {
+    const purpose = 'Avaliação de Conteúdo Agrupada';
+    const itemsPrompt = this.buildGroupedEvaluationItems(items, language);
+    const fullPrompt = () => this.buildGroupedEvaluationPrefix(briefing, language) + itemsPrompt;
+
     try {
-      const responseText = await this.generateContent(prompt, model, purpose);
+      let responseText;
+      if (cachedContent && !this.releasedCaches.has(cachedContent)) {
+        try {
+          responseText = await this.generateContent(itemsPrompt, model, purpose, { cachedContent });
+        } catch (error) {
+          // Expired or rejected cache: forget it and send the prefix inline.
+          if (![400, 403, 404].includes(error.status)) throw error;
+          console.warn(`[${purpose}] Cache de contexto inválido, reenviando prompt completo.`);
+          this.deletePromptCache(cachedContent);
+          responseText = await this.generateContent(fullPrompt(), model, purpose);
+        }
+      } else {
+        responseText = await this.generateContent(fullPrompt(), model, purpose);
+      }
       let jsonString = responseText;
       const codeBlockMatch = responseText.match(/```json\n([\s\S]*?)\n```/);
       if (codeBlockMatch && codeBlockMatch[1]) {
@@ -471,7 +575,9 @@ Instrução de Saída: Sua resposta deve ser exclusivamente um objeto JSON estru
 
     } catch (error) {
       console.error(`[${purpose}] Erro ao avaliar conteúdo agrupado:`, error);
-      throw new Error(`A avaliação agrupada da IA falhou. Motivo: ${error.message}`);
+      const wrapped = new Error(`A avaliação agrupada da IA falhou. Motivo: ${error.message}`);
+      wrapped.status = error.status;
+      throw wrapped;
     }
   }
 
@@ -1,14 +1,7 @@
 import html2canvas from 'html2canvas';
 
-/**
- * Checks if a string contains HTML tags.
- * @param {string} text The text to check.
- * @returns {boolean} True if the text contains HTML.
- */
-export const containsHtml = (text) => {
-  if (!text) return false;
-  return /<[a-z][\s\S]*>/i.test(text);
-};
+// Kept here for existing importers; pageRenderer.js has to stay free of html2canvas.
+export { containsHtml } from './pageRenderer';
 
 /**
  * Renders HTML content onto a canvas using html2canvas, with a robust method to ensure proper layout and wrapping.
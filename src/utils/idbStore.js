@@ -0,0 +1,135 @@
+/**
+ * Minimal promise wrapper around the browser's IndexedDB, used as a local
+ * cache tier in front of the API. Every helper degrades to a miss / no-op
+ * when IndexedDB is unavailable (private browsing, tests without a DOM).
+ */
+const DB_NAME = 'copoc-cache';
+// Bump DB_VERSION whenever a store is added to STORES.
+const DB_VERSION = 3;
+const STORES = {
+  evaluations: { keyPath: 'key' },
+  transcriptions: { keyPath: 'key' },
+  // Synced copies of the API lists (syncedCollection.js) and their sync state.
+  briefings: { keyPath: 'id' },
+  transcriptionList: { keyPath: 'id' },
+  syncMeta: { keyPath: 'key' },
+};
+
+let dbPromise = null;
+
+const requestToPromise = (request) => new Promise((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+});
+
+export const openCacheDb = () => {
+  if (typeof indexedDB === 'undefined') return Promise.resolve(null);
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve) => {
+      let settled = false;
+      const settle = (db) => {
+        settled = true;
+        resolve(db);
+      };
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        Object.entries(STORES).forEach(([name, options]) => {
+          if (!db.objectStoreNames.contains(name)) db.createObjectStore(name, options);
+        });
+      };
+      request.onsuccess = () => {
+        const db = request.result;
+        // Another tab is upgrading: let it, and reopen on the next call.
+        db.onversionchange = () => {
+          db.close();
+          dbPromise = null;
+        };
+        if (settled) dbPromise = Promise.resolve(db);
+        else settle(db);
+      };
+      // An older version is open in another tab: callers fall back to the API
+      // now, and the database is picked up once that tab lets the upgrade run.
+      request.onblocked = () => {
+        console.warn('Atualização do cache local bloqueada por outra aba; usando apenas o servidor.');
+        settle(null);
+      };
+      request.onerror = () => {
+        console.warn('IndexedDB indisponível, cache local desativado:', request.error);
+        settle(null);
+      };
+    });
+  }
+  return dbPromise;
+};
+
+/**
+ * Reads several records by key.
+ * @returns {Promise<Map<string, Object>>} Only the keys that were found.
+ */
+export const idbGetMany = async (storeName, keys) => {
+  const found = new Map();
+  const db = await openCacheDb();
+  if (!db || keys.length === 0) return found;
+  try {
+    const store = db.transaction(storeName, 'readonly').objectStore(storeName);
+    const records = await Promise.all(keys.map(key => requestToPromise(store.get(key))));
+    records.forEach((record, i) => {
+      if (record !== undefined) found.set(keys[i], record);
+    });
+  } catch (error) {
+    console.warn(`Falha ao ler o cache local (${storeName}):`, error);
+  }
+  return found;
+};
+
+/** Writes several records in one transaction. */
+export const idbPutMany = async (storeName, records) => {
+  const db = await openCacheDb();
+  if (!db || records.length === 0) return;
+  try {
+    const tx = db.transaction(storeName, 'readwrite');
+    const store = tx.objectStore(storeName);
+    records.forEach(record => store.put(record));
+    await new Promise((resolve, reject) => {
+      tx.oncomplete = resolve;
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    });
+  } catch (error) {
+    console.warn(`Falha ao gravar no cache local (${storeName}):`, error);
+  }
+};
+
+export const idbDeleteMany = async (storeName, keys) => {
+  const db = await openCacheDb();
+  if (!db || keys.length === 0) return;
+  try {
+    const store = db.transaction(storeName, 'readwrite').objectStore(storeName);
+    await Promise.all(keys.map(key => requestToPromise(store.delete(key))));
+  } catch (error) {
+    console.warn(`Falha ao remover do cache local (${storeName}):`, error);
+  }
+};
+
+/** Every record of a store. */
+export const idbGetAll = async (storeName) => {
+  const db = await openCacheDb();
+  if (!db) return [];
+  try {
+    return await requestToPromise(db.transaction(storeName, 'readonly').objectStore(storeName).getAll());
+  } catch (error) {
+    console.warn(`Falha ao ler o cache local (${storeName}):`, error);
+    return [];
+  }
+};
+
+export const idbClear = async (storeName) => {
+  const db = await openCacheDb();
+  if (!db) return;
+  try {
+    await requestToPromise(db.transaction(storeName, 'readwrite').objectStore(storeName).clear());
+  } catch (error) {
+    console.warn(`Falha ao limpar o cache local (${storeName}):`, error);
+  }
+};
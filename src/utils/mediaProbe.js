@@ -0,0 +1,258 @@
+/**
+ * Reads the duration and track layout of an MP4/MOV file from its `moov`
+ * box using HTTP Range requests, so over-length or silent videos can be
+ * rejected before they are downloaded and transcribed.
+ *
+ * Only the first bytes of the file are fetched; when `moov` sits after
+ * `mdat` (not "fast start"), the probe jumps over `mdat` and fetches just the
+ * `moov` box. Anything that is not an MP4, or a server that ignores Range,
+ * yields null and the caller falls back to the full pipeline.
+ */
+export const MAX_VIDEO_DURATION_SECONDS = 60;
+
+const HEAD_BYTES = 64 * 1024;
+const MAX_MOOV_BYTES = 16 * 1024 * 1024;
+const MAX_HOPS = 8;
+// Boxes an MP4/MOV file can start with; anything else is not worth probing.
+const LEADING_BOXES = new Set(['ftyp', 'styp', 'moov', 'mdat', 'free', 'skip', 'wide', 'pnot']);
+const CONTAINER_BOXES = new Set(['trak', 'mdia', 'mvex']);
+
+const fourcc = (bytes, offset) => String.fromCharCode(
+  bytes[offset], bytes[offset + 1], bytes[offset + 2], bytes[offset + 3]
+);
+
+/**
+ * Reads a box header at `offset`.
+ * @returns {{type: string, size: number|null, headerSize: number}|null}
+ * size is null for a box that runs to the end of the file.
+ */
+const readBoxHeader = (bytes, offset) => {
+  if (offset + 8 > bytes.length) return null;
+  const view = new DataView(bytes.buffer, bytes.byteOffset + offset);
+  const type = fourcc(bytes, offset + 4);
+  const size32 = view.getUint32(0);
+  if (size32 === 1) {
+    if (offset + 16 > bytes.length) return null;
+    return { type, size: Number(view.getBigUint64(8)), headerSize: 16 };
+  }
+  return { type, size: size32 === 0 ? null : size32, headerSize: 8 };
+};
+
+const forEachBox = (bytes, start, end, callback) => {
+  let offset = start;
+  while (offset < end) {
+    const header = readBoxHeader(bytes, offset);
+    if (!header) return;
+    const boxEnd = header.size === null ? end : offset + header.size;
+    if (boxEnd > end || boxEnd < offset + header.headerSize) return;
+    callback(header.type, offset + header.headerSize, boxEnd);
+    offset = boxEnd;
+  }
+};
+
+// mvhd, mdhd and mehd share the version-dependent layout of their time fields.
+const readTimeFields = (bytes, start, { hasTimescale }) => {
+  const view = new DataView(bytes.buffer, bytes.byteOffset + start);
+  const version = view.getUint8(0);
+  if (!hasTimescale) {
+    return { duration: version === 1 ? Number(view.getBigUint64(4)) : view.getUint32(4) };
+  }
+  return version === 1
+    ? { timescale: view.getUint32(20), duration: Number(view.getBigUint64(24)) }
+    : { timescale: view.getUint32(12), duration: view.getUint32(16) };
+};
+
+/**
+ * Parses the payload of a `moov` box.
+ * @param {Uint8Array} bytes - The box contents, without its header.
+ * @returns {{durationSeconds: number|null, hasAudio: boolean, hasVideo: boolean}}
+ */
+export const parseMoov = (bytes) => {
+  let movie = null;
+  let fragmentDuration = null;
+  const tracks = [];
+
+  const walk = (start, end, track) => {
+    forEachBox(bytes, start, end, (type, boxStart, boxEnd) => {
+      if (type === 'mvhd') {
+        movie = readTimeFields(bytes, boxStart, { hasTimescale: true });
+      } else if (type === 'mehd') {
+        fragmentDuration = readTimeFields(bytes, boxStart, { hasTimescale: false }).duration;
+      } else if (type === 'hdlr' && track) {
+        track.handler = fourcc(bytes, boxStart + 8);
+      } else if (type === 'mdhd' && track) {
+        Object.assign(track, readTimeFields(bytes, boxStart, { hasTimescale: true }));
+      } else if (CONTAINER_BOXES.has(type)) {
+        const child = type === 'trak' ? {} : track;
+        if (type === 'trak') tracks.push(child);
+        walk(boxStart, boxEnd, child);
+      }
+    });
+  };
+  walk(0, bytes.length, null);
+
+  let durationSeconds = null;
+  if (movie?.timescale) {
+    // Fragmented files leave mvhd.duration at 0 and carry the length in mehd.
+    const duration = movie.duration || fragmentDuration;
+    if (duration) durationSeconds = duration / movie.timescale;
+  }
+  if (durationSeconds === null) {
+    const trackSeconds = tracks
+      .filter(track => track.timescale && track.duration)
+      .map(track => track.duration / track.timescale);
+    if (trackSeconds.length > 0) durationSeconds = Math.max(...trackSeconds);
+  }
+
+  return {
+    durationSeconds,
+    hasAudio: tracks.some(track => track.handler === 'soun'),
+    hasVideo: tracks.some(track => track.handler === 'vide'),
+  };
+};
+
+const readAtMost = async (response, limit) => {
+  if (!response.body?.getReader) {
+    return new Uint8Array(await response.arrayBuffer()).subarray(0, limit);
+  }
+  const reader = response.body.getReader();
+  const chunks = [];
+  let received = 0;
+  while (received < limit) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    chunks.push(value);
+    received += value.length;
+  }
+  reader.cancel().catch(() => {});
+  const bytes = new Uint8Array(Math.min(received, limit));
+  let offset = 0;
+  for (const chunk of chunks) {
+    const part = chunk.subarray(0, bytes.length - offset);
+    bytes.set(part, offset);
+    offset += part.length;
+    if (offset >= bytes.length) break;
+  }
+  return bytes;
+};
+
+const fetchRange = async (url, start, length, { fetchImpl, signal }) => {
+  const response = await fetchImpl(url, {
+    headers: { Range: `bytes=${start}-${start + length - 1}` },
+    signal,
+  });
+  if (response.status === 206) {
+    const total = Number((response.headers.get('Content-Range') || '').split('/')[1]) || null;
+    return { bytes: new Uint8Array(await response.arrayBuffer()), total };
+  }
+  if (response.ok && start === 0) {
+    // Range ignored: read the head of the full response and drop the rest.
+    const total = Number(response.headers.get('Content-Length')) || null;
+    return { bytes: await readAtMost(response, length), total, rangeIgnored: true };
+  }
+  throw new Error(response.ok ? 'Range requests not supported' : `HTTP ${response.status}`);
+};
+
+/**
+ * Probes an MP4/MOV URL.
+ * @param {string} url - Same-origin or CORS-enabled (e.g. /api/proxy-download?url=...).
+ * @param {Object} [options]
+ * @param {typeof fetch} [options.fetchImpl]
+ * @param {AbortSignal} [options.signal]
+ * @returns {Promise<{durationSeconds: number|null, hasAudio: boolean, hasVideo: boolean, fileSize: number|null, bytesRead: number}|null>}
+ */
+export const probeMp4 = async (url, { fetchImpl = fetch, signal } = {}) => {
+  let offset = 0;
+  let fileSize = null;
+  let bytesRead = 0;
+
+  for (let hop = 0; hop < MAX_HOPS; hop++) {
+    const chunk = await fetchRange(url, offset, HEAD_BYTES, { fetchImpl, signal });
+    bytesRead += chunk.bytes.length;
+    fileSize = fileSize ?? chunk.total;
+    const { bytes } = chunk;
+
+    if (offset === 0) {
+      const first = readBoxHeader(bytes, 0);
+      if (!first || !LEADING_BOXES.has(first.type)) return null;
+    }
+
+    let pos = 0;
+    while (pos + 8 <= bytes.length) {
+      const header = readBoxHeader(bytes, pos);
+      if (!header) break;
+      if (header.type === 'moov') {
+        const size = header.size ?? (fileSize ? fileSize - offset - pos : null);
+        if (!size || size > MAX_MOOV_BYTES) return null;
+        if (pos + size <= bytes.length) {
+          return { ...parseMoov(bytes.subarray(pos + header.headerSize, pos + size)), fileSize, bytesRead };
+        }
+        if (chunk.rangeIgnored) return null;
+        const moov = await fetchRange(url, offset + pos, size, { fetchImpl, signal });
+        bytesRead += moov.bytes.length;
+        return { ...parseMoov(moov.bytes.subarray(header.headerSize, size)), fileSize, bytesRead };
+      }
+      // A box that runs to the end of the file leaves no room for moov.
+      if (header.size === null || header.size < header.headerSize) return null;
+      pos += header.size;
+    }
+
+    // moov comes after the boxes seen so far (typically after mdat).
+    if (chunk.rangeIgnored || pos === 0) return null;
+    offset += pos;
+    if (fileSize !== null && offset >= fileSize) return null;
+  }
+  return null;
+};
+
+/**
+ * probeMp4() that never throws: failures are logged and reported as null.
+ */
+export const probeMedia = async (url, options) => {
+  try {
+    return await probeMp4(url, options);
+  } catch (error) {
+    if (error.name === 'AbortError') throw error;
+    console.warn(`[MediaProbe] Não foi possível ler os metadados de ${url}:`, error.message);
+    return null;
+  }
+};
+
+/**
+ * Decides from a probe result whether the media should be rejected.
+ * @returns {'VIDEO_TOO_LONG'|'NO_AUDIO_TRACK'|null}
+ */
+export const getProbeRejection = (probe, { maxDurationSeconds = MAX_VIDEO_DURATION_SECONDS } = {}) => {
+  if (!probe) return null;
+  if (probe.durationSeconds !== null && probe.durationSeconds > maxDurationSeconds) return 'VIDEO_TOO_LONG';
+  if (!probe.hasAudio && probe.hasVideo) return 'NO_AUDIO_TRACK';
+  return null;
+};
+
+/**
+ * Probes many URLs with bounded concurrency.
+ * @param {string[]} urls
+ * @param {Object} [options]
+ * @param {number} [options.concurrency=6]
+ * @returns {Promise<Map<string, Object|null>>}
+ */
+export const probeMany = async (urls, { concurrency = 6, ...options } = {}) => {
+  const unique = [...new Set(urls)];
+  const probes = new Map();
+  let next = 0;
+  const runner = async () => {
+    while (next < unique.length) {
+      const url = unique[next++];
+      probes.set(url, await probeMedia(url, options));
+    }
+  };
+  await Promise.all(Array.from({ length: Math.min(concurrency, unique.length) }, runner));
+  return probes;
+};
+
+/** Cross-origin media is probed through the proxy, which forwards Range. */
+export const toProbeUrl = (url) => {
+  const parsed = new URL(url, window.location.origin);
+  if (parsed.origin === window.location.origin) return parsed.href;
+  return new URL(`/api/proxy-download?url=${encodeURIComponent(parsed.href)}`, window.location.origin).href;
+};
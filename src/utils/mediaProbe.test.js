@@ -0,0 +1,84 @@
+// @vitest-environment node
+import { describe, it, expect, vi } from 'vitest';
+import { probeMp4, parseMoov, getProbeRejection } from './mediaProbe';
+
+const box = (type, ...payloads) => {
+  const size = 8 + payloads.reduce((sum, p) => sum + p.length, 0);
+  const bytes = new Uint8Array(size);
+  new DataView(bytes.buffer).setUint32(0, size);
+  bytes.set([...type].map(c => c.charCodeAt(0)), 4);
+  let offset = 8;
+  payloads.forEach((p) => { bytes.set(p, offset); offset += p.length; });
+  return bytes;
+};
+
+const u32 = (...values) => {
+  const bytes = new Uint8Array(values.length * 4);
+  values.forEach((v, i) => new DataView(bytes.buffer).setUint32(i * 4, v));
+  return bytes;
+};
+
+// version 0: version/flags, creation, modification, timescale, duration
+const timeBox = (type, timescale, duration) => box(type, u32(0, 0, 0, timescale, duration));
+const hdlr = (handler) => box('hdlr', u32(0, 0), new TextEncoder().encode(handler), u32(0, 0, 0));
+const trak = (handler, timescale, duration) => box('trak', box('mdia', timeBox('mdhd', timescale, duration), hdlr(handler)));
+
+const moov = ({ seconds, audio = true }) => box('moov',
+  timeBox('mvhd', 1000, seconds * 1000),
+  trak('vide', 15360, seconds * 15360),
+  ...(audio ? [trak('soun', 44100, seconds * 44100)] : [])
+);
+
+const concat = (...parts) => {
+  const bytes = new Uint8Array(parts.reduce((sum, p) => sum + p.length, 0));
+  let offset = 0;
+  parts.forEach((p) => { bytes.set(p, offset); offset += p.length; });
+  return bytes;
+};
+
+const rangeServer = (file) => vi.fn(async (url, { headers }) => {
+  const [, start, end] = headers.Range.match(/bytes=(\d+)-(\d+)/).map(Number);
+  const slice = file.slice(start, Math.min(end + 1, file.length));
+  return {
+    ok: true,
+    status: 206,
+    headers: new Headers({ 'Content-Range': `bytes ${start}-${start + slice.length - 1}/${file.length}` }),
+    arrayBuffer: async () => slice.buffer,
+  };
+});
+
+describe('mediaProbe', () => {
+  it('should read duration and tracks from a fast-start file in one request', async () => {
+    const file = concat(box('ftyp', new TextEncoder().encode('isom')), moov({ seconds: 42 }), box('mdat', new Uint8Array(1000)));
+    const fetchImpl = rangeServer(file);
+
+    const probe = await probeMp4('/video.mp4', { fetchImpl });
+
+    expect(probe).toMatchObject({ durationSeconds: 42, hasAudio: true, hasVideo: true, fileSize: file.length });
+    expect(fetchImpl).toHaveBeenCalledTimes(1);
+  });
+
+  it('should jump over mdat to a trailing moov without reading the media', async () => {
+    const mdat = box('mdat', new Uint8Array(200 * 1024));
+    const file = concat(box('ftyp', new TextEncoder().encode('isom')), mdat, moov({ seconds: 95 }));
+    const fetchImpl = rangeServer(file);
+
+    const probe = await probeMp4('/video.mp4', { fetchImpl });
+
+    expect(probe.durationSeconds).toBe(95);
+    expect(probe.bytesRead).toBeLessThan(mdat.length);
+    expect(getProbeRejection(probe)).toBe('VIDEO_TOO_LONG');
+  });
+
+  it('should flag videos without an audio track', () => {
+    const probe = parseMoov(moov({ seconds: 10, audio: false }).subarray(8));
+    expect(probe).toEqual({ durationSeconds: 10, hasAudio: false, hasVideo: true });
+    expect(getProbeRejection(probe)).toBe('NO_AUDIO_TRACK');
+  });
+
+  it('should give up on content that is not an MP4', async () => {
+    const html = new TextEncoder().encode('<!DOCTYPE html><html></html>');
+    expect(await probeMp4('/page', { fetchImpl: rangeServer(html) })).toBeNull();
+    expect(getProbeRejection(null)).toBeNull();
+  });
+});
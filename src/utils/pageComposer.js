@@ -0,0 +1,128 @@
+/**
+ * Batch page composition. Pages are drawn in compositionWorker.js on
+ * OffscreenCanvas so generating a campaign's creatives does not block the UI;
+ * pages with HTML text (html2canvas needs the DOM), pages the worker failed on
+ * and browsers without OffscreenCanvas fall back to drawAndComposeImage on
+ * the main thread, sharing one image loader for the batch.
+ */
+import { drawAndComposeImage, createImageLoader } from './imageComposer';
+import { pageNeedsDom, pageFilename } from './pageRenderer';
+
+let worker = null;
+let workerBroken = false;
+let nextBatchId = 1;
+
+export const canComposeInWorker = () => !workerBroken
+  && typeof Worker !== 'undefined'
+  && typeof OffscreenCanvas !== 'undefined'
+  && typeof OffscreenCanvas.prototype.convertToBlob === 'function';
+
+const getWorker = () => {
+  if (!worker) {
+    worker = new Worker(new URL('./compositionWorker.js', import.meta.url), { type: 'module' });
+  }
+  return worker;
+};
+
+// The worker cannot see document.fonts; it loads the same stylesheets itself.
+const fontStylesheets = () => Array.from(
+  document.querySelectorAll('link[rel="stylesheet"][href*="fonts.googleapis.com"]'),
+  link => link.href
+);
+
+// Only what the worker draws from: structured-clonable, no callbacks.
+const workerPage = ({ record, index, brandElements, fieldPositions, fieldStyles, aspectRatio, pageTemplate }, position) => ({
+  record, index, brandElements, fieldPositions, fieldStyles, aspectRatio, pageTemplate, position,
+});
+
+/**
+ * Sends pages to the worker.
+ * @returns {Promise<number[]>} Positions the worker could not compose.
+ */
+const composeInWorker = (pages, positions, output, onComposed) => new Promise((resolve) => {
+  const batchId = nextBatchId++;
+  const target = getWorker();
+  const failed = [];
+  const composed = new Set();
+  const cleanup = () => {
+    target.removeEventListener('message', onMessage);
+    target.removeEventListener('error', onError);
+  };
+  function onMessage({ data }) {
+    if (data.batchId !== batchId) return;
+    if (data.status === 'page') {
+      composed.add(data.position);
+      onComposed(data.position, data);
+    } else if (data.status === 'page_error') {
+      failed.push(data.position);
+    } else if (data.status === 'batch_complete') {
+      const { hits, misses } = data.textMetrics;
+      console.info(`[pageComposer] ${positions.length} página(s) no worker em ${data.durationMs}ms; medidas de texto em cache: ${hits}/${hits + misses}.`);
+      cleanup();
+      resolve(failed);
+    }
+  }
+  // The worker script itself failed (e.g. unsupported module worker):
+  // everything of this batch goes to the main thread, and so do later batches.
+  function onError(event) {
+    console.error('[pageComposer] Worker de composição indisponível:', event.message || event);
+    event.preventDefault?.();
+    workerBroken = true;
+    worker?.terminate();
+    worker = null;
+    cleanup();
+    resolve(positions.filter(position => !composed.has(position)));
+  }
+  target.addEventListener('message', onMessage);
+  target.addEventListener('error', onError);
+  target.postMessage({
+    type: 'COMPOSE',
+    batchId,
+    pages: positions.map(position => workerPage(pages[position], position)),
+    output,
+    fontStylesheets: fontStylesheets(),
+  });
+});
+
+/**
+ * Composes a batch of pages.
+ * @param {Object[]} pages - drawAndComposeImage params ({ record, index, brandElements,
+ * fieldPositions, fieldStyles, aspectRatio, pageTemplate }).
+ * @param {Object} [options]
+ * @param {'blob'|'bitmap'} [options.output='blob'] - 'blob' gives { blob, url } (an object
+ * URL; revoke it when done), 'bitmap' gives { bitmap } (an ImageBitmap, e.g. for previews).
+ * @param {(result: Object, position: number) => void} [options.onPage] - As each page is ready.
+ * @returns {Promise<Object[]>} In input order: { blob, url } or { bitmap }, plus record,
+ * index, filename and pageTemplateUsed.
+ */
+export const composePages = async (pages, { output = 'blob', onPage } = {}) => {
+  const results = new Array(pages.length);
+  const finish = (position, { blob, bitmap }) => {
+    const page = pages[position];
+    results[position] = {
+      ...(output === 'bitmap' ? { bitmap } : { blob, url: URL.createObjectURL(blob) }),
+      record: page.record,
+      index: page.index,
+      filename: pageFilename(page.index),
+      pageTemplateUsed: page.pageTemplate,
+    };
+    onPage?.(results[position], position);
+  };
+
+  const inWorker = [];
+  const onMainThread = [];
+  pages.forEach((page, position) => {
+    (canComposeInWorker() && !pageNeedsDom(page) ? inWorker : onMainThread).push(position);
+  });
+  if (inWorker.length > 0) {
+    const failed = await composeInWorker(pages, inWorker, output, finish);
+    onMainThread.push(...failed);
+  }
+
+  const getImage = createImageLoader();
+  for (const position of onMainThread.sort((a, b) => a - b)) {
+    const { blob } = await drawAndComposeImage({ ...pages[position], getImage });
+    finish(position, output === 'bitmap' ? { bitmap: await createImageBitmap(blob) } : { blob });
+  }
+  return results;
+};
@@ -0,0 +1,89 @@
+/**
+ * Packs bulk evaluation items into grouped Gemini requests by token budget.
+ *
+ * A group is closed when the next item would push the request past the input
+ * budget (shared prefix + items) or the expected response past the output
+ * budget, so short transcriptions share one request while long ones are
+ * spread out, instead of always grouping a fixed number of rows.
+ */
+import { estimateTokens } from './evaluationScheduler.js';
+
+export const DEFAULT_PACKING_BUDGET = {
+  maxInputTokens: 30000,
+  // Most Gemini models cap a response at 8192 tokens unless configured otherwise.
+  maxOutputTokens: 8192,
+  // One "resultados" entry: four criteria with comments plus consolidated feedback.
+  outputTokensPerItem: 700,
+  maxItems: 25,
+};
+
+/** Tokens an item adds to the materials JSON of a grouped prompt. */
+export const estimateItemTokens = (item) => estimateTokens(JSON.stringify({
+  id: item.id,
+  transcricao: item.transcription,
+  legenda: item.caption,
+}));
+
+export class PromptPacker {
+  /**
+   * @param {Object} [options]
+   * @param {number} [options.prefixTokens=0] - Tokens of the shared instructions + briefing.
+   * @param {number} [options.maxInputTokens]
+   * @param {number} [options.maxOutputTokens]
+   * @param {number} [options.outputTokensPerItem]
+   * @param {number} [options.maxItems]
+   */
+  constructor({ prefixTokens = 0, ...budget } = {}) {
+    this.prefixTokens = prefixTokens;
+    this.budget = { ...DEFAULT_PACKING_BUDGET, ...budget };
+    this.group = [];
+    this.groupTokens = 0;
+  }
+
+  fits(itemTokens) {
+    const { maxInputTokens, maxOutputTokens, outputTokensPerItem, maxItems } = this.budget;
+    const count = this.group.length + 1;
+    return count <= maxItems
+      && this.prefixTokens + this.groupTokens + itemTokens <= maxInputTokens
+      && count * outputTokensPerItem <= maxOutputTokens;
+  }
+
+  /**
+   * Adds an item to the current group.
+   * @returns {{items: Object[], tokens: number}|null} The previous group when
+   * the item did not fit into it, otherwise null.
+   */
+  add(item) {
+    const itemTokens = estimateItemTokens(item);
+    let closed = null;
+    // An item larger than the budget on its own still gets a request of its own.
+    if (this.group.length > 0 && !this.fits(itemTokens)) {
+      closed = this.flush();
+    }
+    this.group.push(item);
+    this.groupTokens += itemTokens;
+    return closed;
+  }
+
+  /** Closes the current group, if any. */
+  flush() {
+    if (this.group.length === 0) return null;
+    const closed = { items: this.group, tokens: this.prefixTokens + this.groupTokens };
+    this.group = [];
+    this.groupTokens = 0;
+    return closed;
+  }
+}
+
+/** Splits `items` into groups that each fit the budget. */
+export const packItems = (items, options) => {
+  const packer = new PromptPacker(options);
+  const groups = [];
+  items.forEach((item) => {
+    const closed = packer.add(item);
+    if (closed) groups.push(closed);
+  });
+  const last = packer.flush();
+  if (last) groups.push(last);
+  return groups;
+};
@@ -0,0 +1,44 @@
+import { describe, it, expect } from 'vitest';
+import { PromptPacker, packItems, estimateItemTokens } from './promptPacker';
+
+const makeItem = (id, words) => ({
+  id,
+  transcription: Array(words).fill('palavra').join(' '),
+  caption: '',
+});
+
+describe('promptPacker', () => {
+  it('should put many short items into a single group', () => {
+    const items = Array.from({ length: 10 }, (_, i) => makeItem(`item${i}`, 30));
+    const groups = packItems(items, { prefixTokens: 2000 });
+
+    expect(groups).toHaveLength(1);
+    expect(groups[0].items).toHaveLength(10);
+  });
+
+  it('should close a group when the input budget would be exceeded', () => {
+    const items = Array.from({ length: 4 }, (_, i) => makeItem(`item${i}`, 400));
+    const perItem = estimateItemTokens(items[0]);
+    const groups = packItems(items, { prefixTokens: 1000, maxInputTokens: 1000 + perItem * 2 });
+
+    expect(groups.map(g => g.items.length)).toEqual([2, 2]);
+    expect(groups[0].tokens).toBe(1000 + perItem * 2);
+  });
+
+  it('should respect the output budget', () => {
+    const items = Array.from({ length: 7 }, (_, i) => makeItem(`item${i}`, 30));
+    const groups = packItems(items, { maxOutputTokens: 2100, outputTokensPerItem: 700 });
+
+    expect(groups.map(g => g.items.length)).toEqual([3, 3, 1]);
+  });
+
+  it('should give an oversized item a group of its own', () => {
+    const packer = new PromptPacker({ maxInputTokens: 100 });
+
+    expect(packer.add(makeItem('small', 5))).toBeNull();
+    const closed = packer.add(makeItem('huge', 1000));
+    expect(closed.items.map(i => i.id)).toEqual(['small']);
+    expect(packer.flush().items.map(i => i.id)).toEqual(['huge']);
+    expect(packer.flush()).toBeNull();
+  });
+});
@@ -0,0 +1,123 @@
+/**
+ * Sentence batching for the local M2M100 translator (worker.js).
+ *
+ * M2M100 is trained on sentence pairs: a whole transcription in one call gets
+ * truncated at the model's max length and decodes slowly, since attention cost
+ * grows with the square of the input. The text is cut into segments of whole
+ * sentences (long sentences are split at clause and word boundaries), the
+ * segments are translated a batch at a time and the output is put back
+ * together with the original paragraph breaks.
+ */
+export const DEFAULT_MAX_SEGMENT_CHARS = 400;
+export const DEFAULT_TRANSLATION_BATCH_SIZE = 8;
+
+// A sentence ends at terminal punctuation, plus any closing quotes or
+// brackets, that is followed by whitespace: "3.5" or "R$1.200" are not cut.
+const SENTENCE_END_RE = /(?<=[.!?…]["'”’)\]]*)\s+/;
+// A period after an initial or a common abbreviation does not end the sentence.
+const ABBREVIATION_RE = /(?:^|[\s("'“‘])(?:\p{L}|e\.g|i\.e|p\.ex|sra?|srta|dra?|profa?|av|ex|vs|mrs?|ms|st)\.$/iu;
+// Blank lines and other whitespace around a line break, kept as they were.
+const PARAGRAPH_BREAK_RE = /(\s*\n\s*)/;
+
+/** Sentences of one paragraph, trimmed, in order. */
+export const splitSentences = (paragraph) => {
+  const sentences = [];
+  paragraph.split(SENTENCE_END_RE).forEach((piece) => {
+    const last = sentences.length - 1;
+    if (last >= 0 && ABBREVIATION_RE.test(sentences[last])) sentences[last] = `${sentences[last]} ${piece}`;
+    else sentences.push(piece);
+  });
+  return sentences.map(sentence => sentence.trim()).filter(Boolean);
+};
+
+// Cuts a piece longer than maxChars at the last separator that fits, falling
+// back to a hard cut for a single overlong word.
+const splitLong = (text, maxChars) => {
+  const pieces = [];
+  let rest = text;
+  while (rest.length > maxChars) {
+    const head = rest.slice(0, maxChars + 1);
+    const clause = Math.max(head.lastIndexOf(', '), head.lastIndexOf('; '), head.lastIndexOf(': '));
+    const space = head.lastIndexOf(' ');
+    const cut = clause > maxChars / 2 ? clause + 1 : (space > 0 ? space : maxChars);
+    pieces.push(rest.slice(0, cut).trim());
+    rest = rest.slice(cut).trim();
+  }
+  if (rest) pieces.push(rest);
+  return pieces;
+};
+
+/**
+ * Splits text into segments of at most maxChars, packing consecutive
+ * sentences of a paragraph together.
+ * @returns {{segments: string[], separators: string[]}} separators[i] goes
+ * after the translation of segments[i]: the original line breaks between
+ * paragraphs ('\n', '\n\n', ...), ' ' within one.
+ */
+export const segmentText = (text, { maxChars = DEFAULT_MAX_SEGMENT_CHARS } = {}) => {
+  const segments = [];
+  const separators = [];
+  // Odd parts are the breaks between the paragraphs at even indexes.
+  String(text || '').split(PARAGRAPH_BREAK_RE).forEach((part, i) => {
+    if (i % 2 === 1) {
+      if (separators.length > 0) separators[separators.length - 1] = part.replace(/[^\S\r\n]/g, '');
+      return;
+    }
+    const paragraph = part.trim();
+    if (!paragraph) return;
+    let current = '';
+    const flush = () => {
+      if (!current) return;
+      segments.push(current);
+      separators.push(' ');
+      current = '';
+    };
+    splitSentences(paragraph).flatMap(sentence => splitLong(sentence, maxChars)).forEach((piece) => {
+      if (current && current.length + 1 + piece.length > maxChars) flush();
+      current = current ? `${current} ${piece}` : piece;
+    });
+    flush();
+  });
+  if (separators.length > 0) separators[separators.length - 1] = '';
+  return { segments, separators };
+};
+
+/** Inverse of segmentText for the translated segments. */
+export const joinSegments = (translated, separators) => translated
+  .map((segment, i) => `${String(segment).trim()}${separators[i]}`)
+  .join('');
+
+/**
+ * Translates text a batch of segments at a time.
+ * @param {(batch: string[]) => Promise<string[]>} translateBatch - Translates
+ * every string of the batch, in order.
+ * @param {string} text
+ * @param {Object} [options]
+ * @param {number} [options.batchSize=DEFAULT_TRANSLATION_BATCH_SIZE]
+ * @param {number} [options.maxChars=DEFAULT_MAX_SEGMENT_CHARS]
+ * @param {({done: number, total: number}) => void} [options.onProgress] - After every batch.
+ * @returns {Promise<string>}
+ */
+export const translateInBatches = async (translateBatch, text, {
+  batchSize = DEFAULT_TRANSLATION_BATCH_SIZE,
+  maxChars = DEFAULT_MAX_SEGMENT_CHARS,
+  onProgress,
+} = {}) => {
+  const { segments, separators } = segmentText(text, { maxChars });
+  if (segments.length === 0) return '';
+
+  // Batches of similar length waste less work on padding; the output goes
+  // back to the original order.
+  const order = segments.map((_, i) => i).sort((a, b) => segments[a].length - segments[b].length);
+  const translated = new Array(segments.length);
+  for (let start = 0; start < order.length; start += batchSize) {
+    const indices = order.slice(start, start + batchSize);
+    const output = await translateBatch(indices.map(i => segments[i]));
+    if (!Array.isArray(output) || output.length !== indices.length) {
+      throw new Error(`Translator returned ${output?.length ?? 'no'} results for ${indices.length} segments.`);
+    }
+    indices.forEach((segmentIndex, i) => { translated[segmentIndex] = output[i]; });
+    onProgress?.({ done: Math.min(start + batchSize, order.length), total: order.length });
+  }
+  return joinSegments(translated, separators);
+};
@@ -0,0 +1,67 @@
+import { describe, it, expect, vi } from 'vitest';
+import { splitSentences, segmentText, translateInBatches } from './sentenceBatcher';
+
+describe('splitSentences', () => {
+  it('should keep terminal punctuation and closing quotes with the sentence', () => {
+    expect(splitSentences('Oi, gente! Vocês viram? Ele disse "compra já." E acabou'))
+      .toEqual(['Oi, gente!', 'Vocês viram?', 'Ele disse "compra já."', 'E acabou']);
+  });
+
+  it('should not cut at decimal points or abbreviations', () => {
+    expect(splitSentences('Preço 3.5 reais, ou R$1.200 no total. O Sr. Silva e a Dra. Ana aprovaram.'))
+      .toEqual(['Preço 3.5 reais, ou R$1.200 no total.', 'O Sr. Silva e a Dra. Ana aprovaram.']);
+  });
+});
+
+describe('segmentText', () => {
+  it('should pack sentences up to the limit and keep paragraph breaks', () => {
+    const { segments, separators } = segmentText('Um. Dois. Três.\nQuatro.', { maxChars: 10 });
+
+    expect(segments).toEqual(['Um. Dois.', 'Três.', 'Quatro.']);
+    expect(separators).toEqual([' ', '\n', '']);
+  });
+
+  it('should keep blank lines between paragraphs', () => {
+    const { segments, separators } = segmentText('Um.\n\nDois.\n  \nTrês.\n');
+
+    expect(segments).toEqual(['Um.', 'Dois.', 'Três.']);
+    expect(separators).toEqual(['\n\n', '\n\n', '']);
+  });
+
+  it('should split an overlong sentence at clauses and words', () => {
+    const sentence = 'primeiro trecho longo, segundo trecho bem mais longo que o limite permitido';
+    const { segments } = segmentText(sentence, { maxChars: 30 });
+
+    expect(segments[0]).toBe('primeiro trecho longo,');
+    expect(segments.every(segment => segment.length <= 30)).toBe(true);
+    expect(segments.join(' ')).toBe(sentence);
+  });
+});
+
+describe('translateInBatches', () => {
+  it('should translate in bounded batches and restore the original order', async () => {
+    const translateBatch = vi.fn(async batch => batch.map(segment => segment.toUpperCase()));
+    const onProgress = vi.fn();
+    const text = 'Frase curta. Uma frase um pouco maior.\nOutra.';
+
+    const output = await translateInBatches(translateBatch, text, { batchSize: 2, maxChars: 30, onProgress });
+
+    expect(output).toBe('FRASE CURTA. UMA FRASE UM POUCO MAIOR.\nOUTRA.');
+    expect(translateBatch).toHaveBeenCalledTimes(2);
+    expect(translateBatch.mock.calls[0][0]).toEqual(['Outra.', 'Frase curta.']);
+    expect(onProgress.mock.calls.map(([progress]) => progress)).toEqual([{ done: 2, total: 3 }, { done: 3, total: 3 }]);
+  });
+
+  it('should rebuild the original paragraph breaks', async () => {
+    const translateBatch = async batch => batch.map(segment => segment.toUpperCase());
+
+    expect(await translateInBatches(translateBatch, 'Custa 3.5 reais.\n\nCompre já.'))
+      .toBe('CUSTA 3.5 REAIS.\n\nCOMPRE JÁ.');
+  });
+
+  it('should not call the translator for empty text', async () => {
+    const translateBatch = vi.fn();
+    expect(await translateInBatches(translateBatch, '  \n ')).toBe('');
+    expect(translateBatch).not.toHaveBeenCalled();
+  });
+});
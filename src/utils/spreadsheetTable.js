@@ -0,0 +1,187 @@
+/**
+ * Spreadsheet rows streamed from spreadsheetWorker.js.
+ *
+ * Every row is stored once, as the array of its cell values. `grid` holds those
+ * arrays as they came (header first, blank rows included) for the export, and
+ * `rows` exposes the non-blank rows as objects keyed by header through a view
+ * over the same arrays, so the sheet is never materialized twice.
+ */
+
+/**
+ * Object keys for a header row, as XLSX.utils.sheet_to_json names them: empty
+ * headers become `__EMPTY`, `__EMPTY_1`..., repeated ones get a `_1`, `_2` suffix.
+ */
+export const uniqueColumns = (header) => {
+  const seen = new Map();
+  return header.map((cell) => {
+    const base = cell === null || cell === undefined || String(cell).trim() === '' ? '__EMPTY' : String(cell);
+    const count = seen.get(base) || 0;
+    seen.set(base, count + 1);
+    return count === 0 ? base : `${base}_${count}`;
+  });
+};
+
+const isBlankRow = values => values.every(value => value === '' || value === null || value === undefined);
+
+// The view target only carries the row's values and its sheet row number;
+// columns and their positions are shared by all rows of the table.
+const createRowHandler = (columns, indexOf) => {
+  const keys = [...columns, '__rowNum__'];
+  const valueOf = (target, key) => {
+    if (key === '__rowNum__') return target.rowNum;
+    const value = target.values[indexOf.get(key)];
+    return value === undefined ? '' : value;
+  };
+  const owns = key => key === '__rowNum__' || indexOf.has(key);
+
+  return {
+    get: (target, key) => (owns(key) ? valueOf(target, key) : Reflect.get(Object.prototype, key)),
+    has: (target, key) => owns(key),
+    ownKeys: () => keys,
+    getOwnPropertyDescriptor: (target, key) => (owns(key)
+      ? { value: valueOf(target, key), writable: true, enumerable: true, configurable: true }
+      : undefined),
+    set: (target, key, value) => {
+      if (key === '__rowNum__') target.rowNum = value;
+      else if (indexOf.has(key)) target.values[indexOf.get(key)] = value;
+      else return false;
+      return true;
+    },
+  };
+};
+
+export class SpreadsheetTable {
+  /**
+   * @param {Object} [options]
+   * @param {(row: Object) => boolean} [options.filter] - Rows left out of `rows` (they stay in `grid`).
+   * @param {(table: SpreadsheetTable) => void} [options.onChange] - Called after the header and every chunk.
+   */
+  constructor({ filter = () => true, onChange = () => {} } = {}) {
+    this.filter = filter;
+    this.onChange = onChange;
+    this.columns = null;
+    this.grid = [];
+    this.rows = [];
+    this.complete = false;
+    this.error = null;
+    this.firstRow = 1;
+    this.waiters = [];
+    this.ready = new Promise((resolve, reject) => {
+      this.resolveReady = resolve;
+      this.rejectReady = reject;
+    });
+    this.done = new Promise((resolve, reject) => {
+      this.resolveDone = resolve;
+      this.rejectDone = reject;
+    });
+    // Callers that only await one of them must not leave the other unhandled.
+    this.ready.catch(() => {});
+    this.done.catch(() => {});
+  }
+
+  /** @param {Array<any>} header - First row of the sheet. @param {number} [firstRow=1] - Its sheet row number. */
+  setHeader(header, firstRow = 1) {
+    this.columns = uniqueColumns(header);
+    this.handler = createRowHandler(this.columns, new Map(this.columns.map((key, index) => [key, index])));
+    this.grid.push(header);
+    this.firstRow = firstRow;
+    this.resolveReady(this);
+    this.onChange(this);
+  }
+
+  /** Appends data rows (arrays of cell values) in sheet order. */
+  appendRows(rows) {
+    rows.forEach((values) => {
+      // Sheet row number of this row: the header is grid[0].
+      const rowNum = this.firstRow + this.grid.length;
+      this.grid.push(values);
+      if (isBlankRow(values)) return;
+      const row = new Proxy({ values, rowNum }, this.handler);
+      if (this.filter(row)) this.rows.push(row);
+    });
+    this.notify();
+  }
+
+  finish() {
+    this.complete = true;
+    this.resolveDone(this);
+    this.notify();
+  }
+
+  fail(error) {
+    this.error = error;
+    this.complete = true;
+    this.rejectReady(error);
+    this.rejectDone(error);
+    this.notify();
+  }
+
+  notify() {
+    const waiters = this.waiters;
+    this.waiters = [];
+    waiters.forEach(resolve => resolve());
+    this.onChange(this);
+  }
+
+  /**
+   * The `index`-th row of `rows`, waiting for it to be parsed if needed.
+   * Resolves to undefined past the last row of a fully parsed sheet.
+   */
+  async rowAt(index) {
+    while (index >= this.rows.length && !this.complete) {
+      await new Promise(resolve => this.waiters.push(resolve));
+    }
+    if (this.error) throw this.error;
+    return this.rows[index];
+  }
+
+  /** An empty row with the table's columns, for header-only checks. */
+  headerRow() {
+    return Object.fromEntries((this.columns || []).map(key => [key, '']));
+  }
+}
+
+const createSpreadsheetWorker = () => new Worker(new URL('./spreadsheetWorker.js', import.meta.url), {
+  type: 'module',
+});
+
+/**
+ * Parses `file` in a worker and returns its table right away; rows are appended
+ * as the worker streams them.
+ * @param {File} file - .xlsx, .xls or .csv.
+ * @param {Object} [options]
+ * @param {number} [options.chunkSize=1000] - Rows per message from the worker.
+ * @param {() => Worker} [options.createWorker]
+ * @returns {SpreadsheetTable & {cancel: () => void}}
+ */
+export const loadSpreadsheet = (file, { chunkSize = 1000, createWorker = createSpreadsheetWorker, ...options } = {}) => {
+  const table = new SpreadsheetTable(options);
+  const worker = createWorker();
+  const stop = () => worker.terminate();
+
+  worker.onmessage = ({ data }) => {
+    if (data.type === 'header') {
+      table.setHeader(data.header, data.firstRow);
+    } else if (data.type === 'rows') {
+      table.appendRows(data.rows);
+    } else if (data.type === 'done') {
+      stop();
+      table.finish();
+    } else if (data.type === 'error') {
+      stop();
+      table.fail(new Error(data.message));
+    }
+  };
+  worker.onerror = (event) => {
+    stop();
+    table.fail(new Error(event.message || 'Falha ao ler a planilha.'));
+  };
+  table.cancel = () => {
+    if (table.complete) return;
+    stop();
+    table.fail(new Error('Leitura da planilha cancelada.'));
+  };
+
+  worker.postMessage({ file, chunkSize });
+  return table;
+};
@@ -0,0 +1,98 @@
+// @vitest-environment node
+import { describe, it, expect } from 'vitest';
+import { SpreadsheetTable, uniqueColumns, loadSpreadsheet } from './spreadsheetTable';
+
+class FakeWorker {
+  constructor() {
+    this.posted = [];
+    this.terminated = false;
+  }
+
+  postMessage(message) {
+    this.posted.push(message);
+  }
+
+  terminate() {
+    this.terminated = true;
+  }
+
+  emit(data) {
+    this.onmessage({ data });
+  }
+}
+
+describe('uniqueColumns', () => {
+  it('should name empty and repeated headers like sheet_to_json', () => {
+    expect(uniqueColumns(['Nome', '', 'Nome', null, 'URL'])).toEqual(['Nome', '__EMPTY', 'Nome_1', '__EMPTY_1', 'URL']);
+  });
+});
+
+describe('SpreadsheetTable', () => {
+  it('should expose rows as objects over the grid arrays', () => {
+    const table = new SpreadsheetTable();
+    table.setHeader(['Nome', 'Status']);
+    table.appendRows([['Ana', 'OK'], ['', ''], ['Bia']]);
+
+    expect(table.grid).toEqual([['Nome', 'Status'], ['Ana', 'OK'], ['', ''], ['Bia']]);
+    expect(table.rows).toHaveLength(2);
+    expect({ ...table.rows[0] }).toEqual({ Nome: 'Ana', Status: 'OK', __rowNum__: 2 });
+    expect(Object.keys(table.rows[1])).toEqual(['Nome', 'Status', '__rowNum__']);
+    expect(table.rows[1].Status).toBe('');
+    expect(table.rows[1].__rowNum__).toBe(4);
+
+    table.rows[0].Status = 'Revisado';
+    expect(table.grid[1]).toEqual(['Ana', 'Revisado']);
+  });
+
+  it('should leave filtered rows out of rows but keep them in the grid', () => {
+    const table = new SpreadsheetTable({ filter: row => row.Status !== 'Duplicado' });
+    table.setHeader(['Nome', 'Status']);
+    table.appendRows([['Ana', 'Duplicado'], ['Bia', '']]);
+
+    expect(table.rows.map(row => row.Nome)).toEqual(['Bia']);
+    expect(table.grid).toHaveLength(3);
+  });
+
+  it('should let rowAt wait for rows that are still being parsed', async () => {
+    const table = new SpreadsheetTable();
+    table.setHeader(['Nome']);
+    const second = table.rowAt(1);
+    const past = table.rowAt(2);
+
+    table.appendRows([['Ana']]);
+    table.appendRows([['Bia']]);
+    table.finish();
+
+    expect((await second).Nome).toBe('Bia');
+    expect(await past).toBeUndefined();
+  });
+});
+
+describe('loadSpreadsheet', () => {
+  it('should build the table from the worker messages', async () => {
+    const worker = new FakeWorker();
+    const file = { name: 'carga.xlsx' };
+    const table = loadSpreadsheet(file, { chunkSize: 2, createWorker: () => worker });
+
+    expect(worker.posted).toEqual([{ file, chunkSize: 2 }]);
+    worker.emit({ type: 'header', header: ['Nome'], firstRow: 1 });
+    expect((await table.ready).columns).toEqual(['Nome']);
+    worker.emit({ type: 'rows', rows: [['Ana'], ['Bia']] });
+    worker.emit({ type: 'done', totalRows: 2 });
+
+    await table.done;
+    expect(table.rows).toHaveLength(2);
+    expect(worker.terminated).toBe(true);
+  });
+
+  it('should reject and stop the worker on a parse error', async () => {
+    const worker = new FakeWorker();
+    const table = loadSpreadsheet({ name: 'x.xlsx' }, { createWorker: () => worker });
+
+    worker.emit({ type: 'error', message: 'arquivo corrompido' });
+
+    await expect(table.done).rejects.toThrow('arquivo corrompido');
+    await expect(table.rowAt(0)).rejects.toThrow('arquivo corrompido');
+    expect(worker.terminated).toBe(true);
+  });
+});
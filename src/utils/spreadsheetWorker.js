@@ -0,0 +1,67 @@
+import * as XLSX from 'xlsx';
+import Papa from 'papaparse';
+
+// Parses a spreadsheet off the main thread and streams it back as
+// { type: 'header' } followed by { type: 'rows' } chunks and { type: 'done' }.
+// Rows travel as plain arrays indexed by column; the page builds its row
+// objects on top of them (see spreadsheetTable.js).
+
+const isCsv = (file) => /\.csv$/i.test(file.name || '') || file.type === 'text/csv';
+
+const streamCsv = (file, chunkSize) => new Promise((resolve, reject) => {
+  let header = null;
+  let pending = [];
+  let total = 0;
+  const flush = () => {
+    if (pending.length === 0) return;
+    self.postMessage({ type: 'rows', rows: pending });
+    total += pending.length;
+    pending = [];
+  };
+
+  // Papa reads the File in slices, so rows reach the page before the whole
+  // file has been read.
+  Papa.parse(file, {
+    dynamicTyping: true,
+    step: ({ data }) => {
+      if (!header) {
+        header = data;
+        self.postMessage({ type: 'header', header, firstRow: 1 });
+        return;
+      }
+      pending.push(data.map(value => (value === null || value === undefined ? '' : value)));
+      if (pending.length >= chunkSize) flush();
+    },
+    complete: () => {
+      if (!header) self.postMessage({ type: 'header', header: [], firstRow: 1 });
+      flush();
+      resolve(total);
+    },
+    error: reject,
+  });
+});
+
+const streamWorkbook = async (file, chunkSize) => {
+  const buffer = await file.arrayBuffer();
+  const workbook = XLSX.read(new Uint8Array(buffer), { type: 'array' });
+  const sheet = workbook.Sheets[workbook.SheetNames[0]];
+  const range = XLSX.utils.decode_range(sheet['!ref'] || 'A1');
+  // A single conversion: the grid is both the exported copy and the source
+  // of the row objects.
+  const grid = XLSX.utils.sheet_to_json(sheet, { header: 1, defval: '' });
+  self.postMessage({ type: 'header', header: grid[0] || [], firstRow: range.s.r + 1 });
+  for (let start = 1; start < grid.length; start += chunkSize) {
+    self.postMessage({ type: 'rows', rows: grid.slice(start, start + chunkSize) });
+  }
+  return Math.max(grid.length - 1, 0);
+};
+
+self.onmessage = async (event) => {
+  const { file, chunkSize = 1000 } = event.data;
+  try {
+    const totalRows = isCsv(file) ? await streamCsv(file, chunkSize) : await streamWorkbook(file, chunkSize);
+    self.postMessage({ type: 'done', totalRows });
+  } catch (error) {
+    self.postMessage({ type: 'error', message: error?.message || String(error) });
+  }
+};
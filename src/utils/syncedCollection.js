@@ -0,0 +1,118 @@
+/**
+ * Local copy of one of the user's API lists (briefings, the transcription
+ * list), persisted in IndexedDB and kept current by incremental sync.
+ *
+ * load() returns the persisted rows right away; sync() then asks the API for
+ * what changed since the last sync (GET <url>?sync=1&since=, see
+ * api/utils/sync.js): changed rows are upserted, tombstoned ids removed. The
+ * request carries the ETag of the last sync, so an unchanged collection costs
+ * one 304. Rows of another user are dropped on load.
+ */
+import fetchWithAuth from './fetchWithAuth';
+import { idbGetAll, idbGetMany, idbPutMany, idbDeleteMany, idbClear } from './idbStore';
+
+const META_STORE = 'syncMeta';
+
+export class SyncedCollection {
+  /**
+   * @param {Object} options
+   * @param {string} options.name - IndexedDB store of the rows (keyPath 'id').
+   * @param {string} options.url - List endpoint that supports ?sync=1.
+   * @param {string} options.scope - Owner of the rows (user UUID).
+   * @param {(a: Object, b: Object) => number} [options.compare] - Order of list().
+   */
+  constructor({ name, url, scope, compare = (a, b) => a.id - b.id }) {
+    this.name = name;
+    this.url = url;
+    this.scope = scope;
+    this.compare = compare;
+    this.rows = new Map();
+    this.meta = { key: name, scope, etag: null, since: null, complete: false };
+    this.loaded = false;
+    this.syncing = null;
+  }
+
+  /** True once a full sync has completed: list() then holds every row. */
+  get complete() {
+    return this.meta.complete;
+  }
+
+  get size() {
+    return this.rows.size;
+  }
+
+  list() {
+    return [...this.rows.values()].sort(this.compare);
+  }
+
+  /** Reads the persisted copy. @returns {Promise<Object[]>} list() */
+  async load() {
+    if (this.loaded) return this.list();
+    const meta = (await idbGetMany(META_STORE, [this.name])).get(this.name);
+    if (meta && meta.scope === this.scope) {
+      this.meta = meta;
+      (await idbGetAll(this.name)).forEach(row => this.rows.set(row.id, row));
+    } else if (meta) {
+      await idbClear(this.name);
+    }
+    this.loaded = true;
+    return this.list();
+  }
+
+  async fetchPage(params, etag) {
+    const headers = etag ? { 'If-None-Match': etag } : {};
+    // The ETag is handled here, not by the HTTP cache.
+    const res = await fetchWithAuth(`${this.url}?${new URLSearchParams(params)}`, { headers, cache: 'no-store' });
+    if (res.status === 304) return null;
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.error || err.message || `Failed to sync ${this.name}.`);
+    }
+    return { body: await res.json(), etag: res.headers.get('ETag') };
+  }
+
+  /**
+   * Pulls the changes since the last sync. Concurrent calls share one sync.
+   * @returns {Promise<boolean>} Whether any row changed.
+   */
+  sync() {
+    if (!this.syncing) {
+      this.syncing = this.pull().finally(() => { this.syncing = null; });
+    }
+    return this.syncing;
+  }
+
+  async pull() {
+    await this.load();
+    const since = this.meta.complete ? this.meta.since : null;
+    const base = since ? { sync: '1', since } : { sync: '1' };
+
+    const first = await this.fetchPage(base, this.meta.complete ? this.meta.etag : null);
+    if (!first) return false;
+
+    const { body } = first;
+    const upserts = [...body.items];
+    let { nextCursor } = body;
+    while (nextCursor) {
+      const { body: page } = await this.fetchPage({ ...base, cursor: nextCursor });
+      upserts.push(...page.items);
+      nextCursor = page.nextCursor;
+    }
+
+    const reset = body.reset || !since;
+    if (reset) {
+      this.rows.clear();
+      await idbClear(this.name);
+    }
+    body.deleted.forEach(id => this.rows.delete(id));
+    upserts.forEach(row => this.rows.set(row.id, row));
+    await idbDeleteMany(this.name, body.deleted);
+    await idbPutMany(this.name, upserts);
+
+    // The first page's watermark and ETag: changes made while the later pages
+    // were read are picked up by the next sync.
+    this.meta = { ...this.meta, etag: first.etag, since: body.syncedAt, complete: true };
+    await idbPutMany(META_STORE, [this.meta]);
+    return reset || upserts.length > 0 || body.deleted.length > 0;
+  }
+}
@@ -0,0 +1,77 @@
+// @vitest-environment node
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { SyncedCollection } from './syncedCollection';
+
+const reply = (status, body, etag) => ({
+  status,
+  ok: status >= 200 && status < 300,
+  json: async () => body,
+  headers: { get: name => (name === 'ETag' ? etag : null) },
+});
+
+const page = (items, extra = {}) => ({ items, deleted: [], nextCursor: null, syncedAt: 't1', reset: false, ...extra });
+
+describe('SyncedCollection', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('should page through the first sync and keep the first watermark', async () => {
+    const fetchMock = vi.fn()
+      .mockResolvedValueOnce(reply(200, page([{ id: 2 }], { nextCursor: 'c1' }), 'W/"v1"'))
+      .mockResolvedValueOnce(reply(200, page([{ id: 1 }], { syncedAt: 't2' })));
+    vi.stubGlobal('fetch', fetchMock);
+    const collection = new SyncedCollection({ name: 'briefings', url: '/api/briefings', scope: 'u1' });
+
+    expect(await collection.sync()).toBe(true);
+
+    expect(fetchMock.mock.calls.map(([url]) => url)).toEqual([
+      '/api/briefings?sync=1',
+      '/api/briefings?sync=1&cursor=c1',
+    ]);
+    expect(collection.list()).toEqual([{ id: 1 }, { id: 2 }]);
+    expect(collection.meta).toMatchObject({ etag: 'W/"v1"', since: 't1', complete: true });
+  });
+
+  it('should apply changes and tombstones since the last sync', async () => {
+    const fetchMock = vi.fn()
+      .mockResolvedValueOnce(reply(200, page([{ id: 1, name: 'a' }, { id: 2, name: 'b' }]), 'W/"v1"'))
+      .mockResolvedValueOnce(reply(200, page([{ id: 1, name: 'a2' }], { deleted: [2], syncedAt: 't2' }), 'W/"v2"'));
+    vi.stubGlobal('fetch', fetchMock);
+    const collection = new SyncedCollection({ name: 'briefings', url: '/api/briefings', scope: 'u1' });
+
+    await collection.sync();
+    await collection.sync();
+
+    expect(fetchMock.mock.calls[1][0]).toBe('/api/briefings?sync=1&since=t1');
+    expect(fetchMock.mock.calls[1][1].headers).toEqual({ 'If-None-Match': 'W/"v1"' });
+    expect(collection.list()).toEqual([{ id: 1, name: 'a2' }]);
+  });
+
+  it('should keep its rows on 304 and share concurrent syncs', async () => {
+    const fetchMock = vi.fn()
+      .mockResolvedValueOnce(reply(200, page([{ id: 1 }]), 'W/"v1"'))
+      .mockResolvedValueOnce(reply(304));
+    vi.stubGlobal('fetch', fetchMock);
+    const collection = new SyncedCollection({ name: 'briefings', url: '/api/briefings', scope: 'u1' });
+    await collection.sync();
+
+    const results = await Promise.all([collection.sync(), collection.sync()]);
+
+    expect(results).toEqual([false, false]);
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(collection.size).toBe(1);
+  });
+
+  it('should start over when the server resets the sync', async () => {
+    vi.stubGlobal('fetch', vi.fn()
+      .mockResolvedValueOnce(reply(200, page([{ id: 1 }, { id: 2 }]), 'W/"v1"'))
+      .mockResolvedValueOnce(reply(200, page([{ id: 3 }], { reset: true }), 'W/"v2"')));
+    const collection = new SyncedCollection({ name: 'briefings', url: '/api/briefings', scope: 'u1' });
+
+    await collection.sync();
+    await collection.sync();
+
+    expect(collection.list()).toEqual([{ id: 3 }]);
+  });
+});
@@ -0,0 +1,62 @@
+/**
+ * Memoized text measurement for the page composer and the auto-arrange font
+ * fitting. Wrapping a field measures every growing prefix of its lines, and
+ * the same texts come back for each page of a campaign and each step of the
+ * font-size search, so widths are cached by (font, text).
+ *
+ * Widths measured while a web font is still loading are those of the
+ * fallback font, so the cache is cleared whenever the document (or worker)
+ * finishes loading fonts.
+ */
+const DEFAULT_MAX_ENTRIES = 5000;
+
+export class TextMetricsCache {
+  /**
+   * @param {Object} [options]
+   * @param {number} [options.maxEntries] - Oldest entries are dropped beyond this.
+   * @param {FontFaceSet} [options.fontFaceSet] - Defaults to document.fonts, or self.fonts in a worker.
+   */
+  constructor({ maxEntries = DEFAULT_MAX_ENTRIES, fontFaceSet = globalThis.document?.fonts ?? globalThis.fonts } = {}) {
+    this.maxEntries = maxEntries;
+    this.widths = new Map();
+    this.stats = { hits: 0, misses: 0 };
+    fontFaceSet?.addEventListener?.('loadingdone', () => this.clear());
+  }
+
+  /** Width of `text` in the context's current font. */
+  width(ctx, text) {
+    const key = `${ctx.font}\u0000${text}`;
+    const cached = this.widths.get(key);
+    if (cached !== undefined) {
+      this.stats.hits += 1;
+      return cached;
+    }
+    this.stats.misses += 1;
+    const { width } = ctx.measureText(text);
+    if (this.widths.size >= this.maxEntries) {
+      this.widths.delete(this.widths.keys().next().value);
+    }
+    this.widths.set(key, width);
+    return width;
+  }
+
+  clear() {
+    this.widths.clear();
+  }
+}
+
+/** Cache shared by everything measuring text in this thread. */
+export const textMetrics = new TextMetricsCache();
+
+let measureContext = null;
+
+/** A 2D context kept around just for measuring (OffscreenCanvas when available). */
+export const getMeasureContext = () => {
+  if (!measureContext) {
+    const canvas = typeof OffscreenCanvas !== 'undefined'
+      ? new OffscreenCanvas(1, 1)
+      : document.createElement('canvas');
+    measureContext = canvas.getContext('2d');
+  }
+  return measureContext;
+};
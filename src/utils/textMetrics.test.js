@@ -0,0 +1,62 @@
+import { describe, it, expect } from 'vitest';
+import { TextMetricsCache } from './textMetrics';
+
+const fakeContext = () => {
+  const ctx = {
+    font: '24px Arial',
+    calls: 0,
+    measureText(text) {
+      ctx.calls += 1;
+      return { width: text.length * parseInt(ctx.font, 10) };
+    },
+  };
+  return ctx;
+};
+
+const fakeFontFaceSet = () => {
+  const listeners = {};
+  return {
+    addEventListener: (type, listener) => { listeners[type] = listener; },
+    dispatch: type => listeners[type]?.(),
+  };
+};
+
+describe('TextMetricsCache', () => {
+  it('should measure each (font, text) once', () => {
+    const cache = new TextMetricsCache({ fontFaceSet: null });
+    const ctx = fakeContext();
+
+    expect(cache.width(ctx, 'abc')).toBe(72);
+    expect(cache.width(ctx, 'abc')).toBe(72);
+    ctx.font = '10px Arial';
+    expect(cache.width(ctx, 'abc')).toBe(30);
+
+    expect(ctx.calls).toBe(2);
+    expect(cache.stats).toEqual({ hits: 1, misses: 2 });
+  });
+
+  it('should drop the oldest entries beyond maxEntries', () => {
+    const cache = new TextMetricsCache({ maxEntries: 2, fontFaceSet: null });
+    const ctx = fakeContext();
+
+    cache.width(ctx, 'a');
+    cache.width(ctx, 'b');
+    cache.width(ctx, 'c');
+    cache.width(ctx, 'a');
+
+    expect(cache.widths.size).toBe(2);
+    expect(ctx.calls).toBe(4);
+  });
+
+  it('should forget widths once fonts finish loading', () => {
+    const fonts = fakeFontFaceSet();
+    const cache = new TextMetricsCache({ fontFaceSet: fonts });
+    const ctx = fakeContext();
+
+    cache.width(ctx, 'abc');
+    fonts.dispatch('loadingdone');
+    cache.width(ctx, 'abc');
+
+    expect(ctx.calls).toBe(2);
+  });
+});
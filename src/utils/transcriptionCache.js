@@ -0,0 +1,207 @@
+/**
+ * Cache of Whisper transcriptions, shared by everyone using the app.
+ *
+ * A transcription is stored under two kinds of key, each a SHA-256 of the
+ * pipeline version, model, language and task plus:
+ *  - 'content': the SHA-256 of the media bytes (exact, known after download);
+ *  - 'url': the normalized media URL (known before download, so a hit skips
+ *    the download as well).
+ * Lookups go to IndexedDB first and then to /api/transcription-cache; server
+ * hits are copied into IndexedDB. Used inside worker.js (IndexedDB and fetch
+ * work in workers) and by the bulk evaluation, which reuses transcriptions
+ * made in the Instagram extractor.
+ */
+import CryptoJS from 'crypto-js';
+import fetchWithAuth from './fetchWithAuth';
+import { idbGetMany, idbPutMany } from './idbStore';
+
+// Bump whenever the audio pipeline (FFmpeg filters, chunking) changes the output.
+// Transcriptions made with voice-activity segmentation (audioPreprocess.js)
+// carry its version too, e.g. 'asr-v1+vad-v1'.
+export const TRANSCRIPTION_PIPELINE_VERSION = 'asr-v1';
+export const DEFAULT_TRANSCRIPTION_MODEL = 'Xenova/whisper-small';
+
+const STORE = 'transcriptions';
+const LOOKUP_BATCH_SIZE = 100;
+const LOCAL_TTL_MS = 90 * 24 * 60 * 60 * 1000;
+// Signed CDN URLs: the query string only carries expiry and signature, the
+// path identifies the file.
+const SIGNED_CDN_HOST_RE = /(^|\.)(cdninstagram\.com|fbcdn\.net)$/i;
+// A post, reel or IGTV link; all of them resolve under /p/<code>/.
+const INSTAGRAM_POST_RE = /^\/(?:[^/]+\/)?(?:p|reels?|tv)\/([A-Za-z0-9_-]+)/;
+
+const toHex = buffer => Array.from(new Uint8Array(buffer), byte => byte.toString(16).padStart(2, '0')).join('');
+
+// SubtleCrypto cannot hash incrementally, so Blobs (whole videos) are streamed
+// through crypto-js instead of being read into one more ArrayBuffer.
+const sha256HexOfBlob = async (blob) => {
+  const hasher = CryptoJS.algo.SHA256.create();
+  const reader = blob.stream().getReader();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    hasher.update(CryptoJS.lib.WordArray.create(value));
+  }
+  return hasher.finalize().toString(CryptoJS.enc.Hex);
+};
+
+/** Hex SHA-256 of a string, an ArrayBuffer/view or a Blob. */
+export const sha256Hex = async (data) => {
+  if (typeof Blob !== 'undefined' && data instanceof Blob) return sha256HexOfBlob(data);
+  const bytes = typeof data === 'string' ? new TextEncoder().encode(data) : data;
+  return toHex(await crypto.subtle.digest('SHA-256', bytes));
+};
+
+/**
+ * The stable part of a media URL: the target of a /api/proxy-download URL,
+ * without the signature query of Instagram/Facebook CDN URLs and without the
+ * fragment. Instagram post links become https://www.instagram.com/p/<code>/.
+ * Returns null for anything that is not an http(s) URL.
+ */
+export const normalizeMediaUrl = (url) => {
+  let parsed;
+  try {
+    parsed = new URL(url, typeof location !== 'undefined' ? location.href : undefined);
+  } catch {
+    return null;
+  }
+  if (parsed.pathname === '/api/proxy-download' && parsed.searchParams.get('url')) {
+    return normalizeMediaUrl(parsed.searchParams.get('url'));
+  }
+  if (!/^https?:$/.test(parsed.protocol)) return null;
+  parsed.hash = '';
+  if (/(^|\.)instagram\.com$/i.test(parsed.hostname)) {
+    const post = parsed.pathname.match(INSTAGRAM_POST_RE);
+    if (post) return `https://www.instagram.com/p/${post[1]}/`;
+  }
+  if (SIGNED_CDN_HOST_RE.test(parsed.hostname)) parsed.search = '';
+  return parsed.href;
+};
+
+const variantOf = ({ model = DEFAULT_TRANSCRIPTION_MODEL, language, task = 'transcribe', vad }) => [
+  vad ? `${TRANSCRIPTION_PIPELINE_VERSION}+${vad}` : TRANSCRIPTION_PIPELINE_VERSION,
+  model,
+  String(language || '').toLowerCase(),
+  task,
+];
+
+/** Cache key of a transcription of these exact media bytes. */
+export const contentCacheKey = (contentHash, variant) => sha256Hex(JSON.stringify([...variantOf(variant), 'content', contentHash]));
+
+/** Cache key of a transcription of the media behind this URL, or null for unusable URLs. */
+export const urlCacheKey = async (url, variant) => {
+  const normalized = normalizeMediaUrl(url);
+  return normalized ? sha256Hex(JSON.stringify([...variantOf(variant), 'url', normalized])) : null;
+};
+
+const fetchRemote = async (keys) => {
+  const hits = new Map();
+  for (let i = 0; i < keys.length; i += LOOKUP_BATCH_SIZE) {
+    const batch = keys.slice(i, i + LOOKUP_BATCH_SIZE);
+    const res = await fetchWithAuth(`/api/transcription-cache?keys=${batch.join(',')}`);
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.error || err.message || 'Failed to read the transcription cache.');
+    }
+    const { hits: batchHits } = await res.json();
+    Object.entries(batchHits || {}).forEach(([key, result]) => hits.set(key, result));
+  }
+  return hits;
+};
+
+/**
+ * Looks up cached transcriptions.
+ * @param {string[]} keys - From contentCacheKey / urlCacheKey.
+ * @returns {Promise<Map<string, {text: string, duration: number}>>} Hits only;
+ * a failing tier is a miss, never an error.
+ */
+export const lookupCachedTranscriptions = async (keys) => {
+  const unique = [...new Set(keys.filter(Boolean))];
+  const hits = new Map();
+  if (unique.length === 0) return hits;
+
+  const local = await idbGetMany(STORE, unique);
+  const now = Date.now();
+  local.forEach((record, key) => {
+    if (now - record.savedAt < LOCAL_TTL_MS) hits.set(key, record.result);
+  });
+
+  const missing = unique.filter(key => !hits.has(key));
+  if (missing.length > 0) {
+    try {
+      const remote = await fetchRemote(missing);
+      remote.forEach((result, key) => hits.set(key, result));
+      await idbPutMany(STORE, [...remote].map(([key, result]) => ({ key, result, savedAt: now })));
+    } catch (error) {
+      console.warn('Cache de transcrições do servidor indisponível:', error);
+    }
+  }
+  return hits;
+};
+
+/**
+ * Stores a transcription in both tiers, under its content key and the keys of
+ * the URLs it was downloaded from.
+ * @param {Object} entry
+ * @param {string} [entry.contentHash] - sha256Hex of the media.
+ * @param {string[]} [entry.urls]
+ * @param {{model?: string, language: string, task?: string, vad?: string}} entry.variant
+ * @param {{text: string, duration: number}} entry.result
+ */
+export const storeCachedTranscription = async ({ contentHash, urls = [], variant, result }) => {
+  const [pipelineVersion, model, language, task] = variantOf(variant);
+  const keyed = [];
+  if (contentHash) keyed.push({ key: await contentCacheKey(contentHash, variant), kind: 'content' });
+  for (const url of urls) {
+    const key = await urlCacheKey(url, variant);
+    if (key) keyed.push({ key, kind: 'url' });
+  }
+  if (keyed.length === 0) return;
+
+  const now = Date.now();
+  await idbPutMany(STORE, keyed.map(({ key }) => ({ key, result, savedAt: now })));
+  try {
+    const res = await fetchWithAuth('/api/transcription-cache', {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        entries: keyed.map(({ key, kind }) => ({
+          key, kind, contentHash, model, language, task, pipelineVersion, result,
+        })),
+      }),
+    });
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.error || err.message || `Erro ${res.status}`);
+    }
+  } catch (error) {
+    console.warn('Falha ao gravar no cache de transcrições do servidor:', error);
+  }
+};
+
+/**
+ * Cached transcriptions for media URLs (no download, URL keys only).
+ * @param {string[]} urls
+ * @param {Object|Object[]} variants - Acceptable variants, best first; each
+ * URL gets the first one found.
+ * @returns {Promise<Map<string, {text: string, duration: number}>>} url -> result, hits only.
+ */
+export const lookupTranscriptionsByUrl = async (urls, variants) => {
+  const preferred = Array.isArray(variants) ? variants : [variants];
+  const keysByUrl = new Map();
+  for (const url of new Set(urls)) {
+    const keys = [];
+    for (const variant of preferred) {
+      const key = await urlCacheKey(url, variant);
+      if (key) keys.push(key);
+    }
+    if (keys.length > 0) keysByUrl.set(url, keys);
+  }
+  const hits = await lookupCachedTranscriptions([...keysByUrl.values()].flat());
+  const byUrl = new Map();
+  keysByUrl.forEach((keys, url) => {
+    const key = keys.find(candidate => hits.has(candidate));
+    if (key) byUrl.set(url, hits.get(key));
+  });
+  return byUrl;
+};
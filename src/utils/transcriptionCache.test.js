@@ -0,0 +1,130 @@
+// @vitest-environment node
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import {
+  normalizeMediaUrl, sha256Hex, contentCacheKey, urlCacheKey, lookupTranscriptionsByUrl, storeCachedTranscription,
+} from './transcriptionCache';
+
+const variant = { language: 'portuguese', task: 'transcribe' };
+
+describe('normalizeMediaUrl', () => {
+  it('should drop the signature of CDN URLs and unwrap the download proxy', () => {
+    const cdn = 'https://scontent.cdninstagram.com/v/t50/video.mp4?_nc_ht=x&oe=123#t=1';
+    const proxied = `https://app.example.com/api/proxy-download?url=${encodeURIComponent(cdn)}`;
+
+    expect(normalizeMediaUrl(cdn)).toBe('https://scontent.cdninstagram.com/v/t50/video.mp4');
+    expect(normalizeMediaUrl(proxied)).toBe('https://scontent.cdninstagram.com/v/t50/video.mp4');
+  });
+
+  it('should map post, reel and IGTV links to one post URL', () => {
+    for (const url of [
+      'https://instagram.com/reel/Cx1_ab-2/?igsh=abc',
+      'https://www.instagram.com/someone/p/Cx1_ab-2/',
+      'https://www.instagram.com/tv/Cx1_ab-2',
+    ]) {
+      expect(normalizeMediaUrl(url)).toBe('https://www.instagram.com/p/Cx1_ab-2/');
+    }
+  });
+
+  it('should keep the query of other URLs and reject non-http ones', () => {
+    expect(normalizeMediaUrl('https://example.com/video.mp4?id=1')).toBe('https://example.com/video.mp4?id=1');
+    expect(normalizeMediaUrl('blob:https://example.com/abc')).toBeNull();
+    expect(normalizeMediaUrl('not a url')).toBeNull();
+  });
+});
+
+describe('sha256Hex', () => {
+  it('should hash a Blob in chunks to the same digest as its bytes', async () => {
+    const bytes = new Uint8Array(200000).map((_, i) => i % 251);
+    const blob = new Blob([bytes.subarray(0, 70000), bytes.subarray(70000)]);
+
+    expect(await sha256Hex(blob)).toBe(await sha256Hex(bytes));
+    expect(await sha256Hex(new Blob([]))).toBe('e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855');
+  });
+});
+
+describe('cache keys', () => {
+  it('should depend on the variant and the kind of key', async () => {
+    const hash = 'a'.repeat(64);
+    const key = await contentCacheKey(hash, variant);
+
+    expect(key).toMatch(/^[0-9a-f]{64}$/);
+    expect(await contentCacheKey(hash, { ...variant, language: 'Portuguese' })).toBe(key);
+    expect(await contentCacheKey(hash, { ...variant, task: 'translate' })).not.toBe(key);
+    expect(await contentCacheKey(hash, { ...variant, model: 'Xenova/whisper-base' })).not.toBe(key);
+    expect(await contentCacheKey(hash, { ...variant, vad: 'vad-v1' })).not.toBe(key);
+    expect(await urlCacheKey(hash, variant)).toBeNull();
+  });
+});
+
+describe('remote tier', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('should find a transcription by any equivalent URL', async () => {
+    const key = await urlCacheKey('https://www.instagram.com/p/Cx1/', variant);
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({ hits: { [key]: { text: 'olá', duration: 12 } } }),
+    });
+    vi.stubGlobal('fetch', fetchMock);
+
+    const hits = await lookupTranscriptionsByUrl(['https://instagram.com/reel/Cx1/?igsh=1'], variant);
+
+    expect(fetchMock.mock.calls[0][0]).toBe(`/api/transcription-cache?keys=${key}`);
+    expect(hits.get('https://instagram.com/reel/Cx1/?igsh=1')).toEqual({ text: 'olá', duration: 12 });
+  });
+
+  it('should prefer the first variant found for each URL', async () => {
+    const small = { ...variant, vad: 'vad-v1' };
+    const tiny = { ...variant, model: 'Xenova/whisper-tiny' };
+    const url = 'https://example.com/v2.mp4';
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({
+        hits: {
+          [await urlCacheKey(url, small)]: { text: 'small', duration: 5 },
+          [await urlCacheKey(url, tiny)]: { text: 'tiny', duration: 5 },
+        },
+      }),
+    });
+    vi.stubGlobal('fetch', fetchMock);
+
+    const hits = await lookupTranscriptionsByUrl([url], [small, tiny]);
+
+    expect(fetchMock.mock.calls[0][0].split(',')).toHaveLength(2);
+    expect(hits.get(url).text).toBe('small');
+  });
+
+  it('should store under the content key and every URL key', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({ ok: true, json: async () => ({ stored: 2 }) });
+    vi.stubGlobal('fetch', fetchMock);
+
+    await storeCachedTranscription({
+      contentHash: 'b'.repeat(64),
+      urls: ['https://example.com/v.mp4', 'not a url'],
+      variant,
+      result: { text: 'oi', duration: 3 },
+    });
+
+    const { entries } = JSON.parse(fetchMock.mock.calls[0][1].body);
+    expect(entries.map(entry => entry.kind)).toEqual(['content', 'url']);
+    expect(entries[0]).toMatchObject({ model: 'Xenova/whisper-small', language: 'portuguese', pipelineVersion: 'asr-v1' });
+  });
+
+  it('should record the VAD version in the pipeline version', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({ ok: true, json: async () => ({ stored: 1 }) });
+    vi.stubGlobal('fetch', fetchMock);
+
+    await storeCachedTranscription({ urls: ['https://example.com/v3.mp4'], variant: { ...variant, vad: 'vad-v1' }, result: { text: 'oi', duration: 3 } });
+
+    const { entries } = JSON.parse(fetchMock.mock.calls[0][1].body);
+    expect(entries[0].pipelineVersion).toBe('asr-v1+vad-v1');
+  });
+
+  it('should treat a failing server as a miss', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockRejectedValue(new Error('offline')));
+    const hits = await lookupTranscriptionsByUrl(['https://example.com/v.mp4'], variant);
+    expect(hits.size).toBe(0);
+  });
+});
@@ -1,15 +1,91 @@
 import fetchWithAuth from './fetchWithAuth';
 import { toast } from 'sonner';
 
-export const getTranscriptions = async () => {
-  const res = await fetchWithAuth('/api/transcriptions');
+/**
+ * Fetches one page of the transcription list (id, name, briefing_id, score, created_at, updated_at).
+ * The full transcription_data is only returned by getTranscription / getTranscriptionsByIds.
+ * @param {Object} [options]
+ * @param {string} [options.cursor] - nextCursor from the previous page.
+ * @param {number} [options.limit] - Page size (server caps it at 200).
+ * @param {string|number} [options.briefingId] - Only transcriptions of this briefing ('none' for unlinked).
+ * @param {string} [options.from] - Inclusive lower bound for created_at (ISO date).
+ * @param {string} [options.to] - Exclusive upper bound for created_at (ISO date).
+ * @returns {Promise<{items: Array<Object>, nextCursor: string|null}>}
+ */
+export const getTranscriptions = async ({ cursor, limit, briefingId, from, to } = {}) => {
+  const params = new URLSearchParams();
+  if (cursor) params.set('cursor', cursor);
+  if (limit) params.set('limit', String(limit));
+  if (briefingId) params.set('briefing_id', String(briefingId));
+  if (from) params.set('from', from);
+  if (to) params.set('to', to);
+  const qs = params.toString();
+
+  const res = await fetchWithAuth(`/api/transcriptions${qs ? `?${qs}` : ''}`);
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.error || err.message || 'Failed to fetch transcriptions.');
+  }
+  return res.json();
+};
+
+export const getTranscription = async (id) => {
+  const res = await fetchWithAuth(`/api/transcriptions/${id}`);
   if (!res.ok) {
     const err = await res.json().catch(() => ({}));
-    throw new Error(err.error || 'Failed to fetch transcriptions.');
+    throw new Error(err.error || err.message || 'Failed to fetch transcription.');
   }
   return res.json();
 };
 
+/**
+ * URL of the streaming evaluation export (GET /api/transcriptions/export).
+ * The server writes the file while it reads the rows, so it is downloaded
+ * directly instead of being assembled in the browser.
+ * @param {Object} [options]
+ * @param {'xlsx'|'csv'} [options.format='xlsx']
+ * @param {string} [options.language] - Column labels (LANGUAGES code).
+ * @param {Array<string|number>} [options.ids] - Only these transcriptions.
+ * @param {string|number} [options.briefingId] - Only transcriptions of this briefing ('none' for unlinked).
+ * @param {string} [options.campaign]
+ * @param {string} [options.mission]
+ * @param {string} [options.from] - Inclusive lower bound for created_at (ISO date).
+ * @param {string} [options.to] - Exclusive upper bound for created_at (ISO date).
+ */
+export const getTranscriptionsExportUrl = ({
+  format = 'xlsx', language, ids, briefingId, campaign, mission, from, to,
+} = {}) => {
+  const params = new URLSearchParams({ format });
+  if (language) params.set('language', language);
+  if (ids && ids.length > 0) params.set('ids', ids.join(','));
+  if (briefingId) params.set('briefing_id', String(briefingId));
+  if (campaign) params.set('campaign', campaign);
+  if (mission) params.set('mission', mission);
+  if (from) params.set('from', from);
+  if (to) params.set('to', to);
+  return `/api/transcriptions/export?${params.toString()}`;
+};
+
+const DETAIL_BATCH_SIZE = 200;
+
+/**
+ * Fetches full rows (including transcription_data) for the given ids, in batches.
+ */
+export const getTranscriptionsByIds = async (ids) => {
+  const results = [];
+  for (let i = 0; i < ids.length; i += DETAIL_BATCH_SIZE) {
+    const batch = ids.slice(i, i + DETAIL_BATCH_SIZE);
+    const res = await fetchWithAuth(`/api/transcriptions?ids=${batch.map(encodeURIComponent).join(',')}`);
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.error || err.message || 'Failed to fetch transcriptions.');
+    }
+    const { items } = await res.json();
+    results.push(...items);
+  }
+  return results;
+};
+
 export const saveTranscription = async (name, videoUrl, briefingId, transcriptionData) => {
   try {
     const requestBody = JSON.stringify({
@@ -38,6 +114,45 @@ export const saveTranscription = async (name, videoUrl, briefingId, transcriptio
   }
 };
 
+// Must match MAX_BULK_ITEMS in api/transcriptions.js.
+const BULK_SAVE_BATCH_SIZE = 500;
+
+/**
+ * Creates many transcriptions with one request per 500 items.
+ * @param {Array<{name: string, videoUrl: string, briefingId: *, transcriptionData: Object}>} items
+ * @returns {Promise<Array<{index: number, id: (number|null), error: (string|null)}>>}
+ *   One entry per input item, in the same order.
+ */
+export const saveTranscriptionsBatch = async (items) => {
+  const results = [];
+  try {
+    for (let offset = 0; offset < items.length; offset += BULK_SAVE_BATCH_SIZE) {
+      const batch = items.slice(offset, offset + BULK_SAVE_BATCH_SIZE);
+      const res = await fetchWithAuth('/api/transcriptions', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(batch.map(item => ({
+          name: item.name,
+          video_url: item.videoUrl,
+          briefing_id: item.briefingId,
+          transcription_data: item.transcriptionData,
+        }))),
+      });
+
+      // 400 still carries per-item results when every item was rejected.
+      const body = await res.json().catch(() => null);
+      if (!body?.results) {
+        throw new Error(`Failed to create transcriptions. Server says: ${body?.message || res.status}`);
+      }
+      body.results.forEach(r => results.push({ ...r, index: r.index + offset }));
+    }
+    return results;
+  } catch (error) {
+    toast.error(`Batch save failed: ${error.message}`);
+    throw error;
+  }
+};
+
 export const updateTranscription = async (id, name, videoUrl, briefingId, transcriptionData) => {
     try {
         const requestBody = JSON.stringify({
@@ -0,0 +1,313 @@
+/**
+ * Pool of transcription workers (src/utils/worker.js) with a priority queue.
+ *
+ * Each worker runs one job at a time (transcription or local translation), so
+ * a job is routed by the worker it was dispatched to. Workers are spawned
+ * lazily up to the pool size, which is derived from the CPU count and the
+ * device memory (each worker holds FFmpeg plus the Whisper model).
+ */
+const TERMINAL_STATUSES = new Set(['complete', 'translation_complete', 'error']);
+// Whisper-small + FFmpeg + audio buffers peak at roughly this much per worker.
+const MEMORY_PER_WORKER_GB = 1.5;
+// A worker that fails to load is respawned this many times, with doubling
+// delays, before its slot is given up.
+const MAX_INIT_ATTEMPTS = 3;
+const INIT_RETRY_DELAY_MS = 1000;
+const CRASH_EVENTS = ['error', 'messageerror'];
+
+export const CANCELLED = 'CANCELLED';
+
+/**
+ * @param {Object} [env]
+ * @param {number} [env.hardwareConcurrency] - navigator.hardwareConcurrency.
+ * @param {number} [env.deviceMemory] - navigator.deviceMemory in GB (browsers cap it at 8).
+ * @param {number} [env.maxWorkers=4]
+ * @param {number} [env.memoryPerWorkerGb] - Peak memory of one worker with the
+ * chosen Whisper model (WHISPER_MODELS[size].memoryGb); defaults to whisper-small.
+ * @returns {{size: number, threadsPerWorker: number}}
+ */
+export const computePoolSize = ({
+  hardwareConcurrency, deviceMemory, maxWorkers = 4, memoryPerWorkerGb = MEMORY_PER_WORKER_GB,
+} = {}) => {
+  const cores = hardwareConcurrency || 2;
+  // ONNX Runtime is multi-threaded itself; two threads per worker keeps the
+  // cores busy without oversubscribing them.
+  const byCpu = Math.max(1, Math.floor(cores / 2));
+  const byMemory = Math.max(1, Math.floor((deviceMemory || 4) / memoryPerWorkerGb));
+  const size = Math.min(byCpu, byMemory, maxWorkers);
+  return { size, threadsPerWorker: Math.max(1, Math.floor(cores / size)) };
+};
+
+export class TranscriptionWorkerPool {
+  /**
+   * @param {Object} options
+   * @param {() => Worker} options.createWorker
+   * @param {number} options.size
+   * @param {Object} options.initMessage - Sent to every worker when it starts.
+   * @param {(data: Object, workerIndex: number) => void} [options.onMessage] - Every message of every worker.
+   * @param {(progress: Object) => void} [options.onProgress] - Aggregated job counters.
+   */
+  constructor({ createWorker, size, initMessage, onMessage, onProgress }) {
+    this.createWorker = createWorker;
+    this.size = Math.max(1, size);
+    this.initMessage = initMessage;
+    this.onMessage = onMessage;
+    this.onProgress = onProgress;
+    this.slots = [];
+    this.queue = [];
+    this.jobs = new Map();
+    this.nextJobId = 1;
+    this.counters = { completed: 0, failed: 0, cancelled: 0 };
+    this.terminated = false;
+    this.initError = null;
+  }
+
+  /** Starts the first worker so it is warm before any job arrives. */
+  start() {
+    if (this.slots.length === 0) this.spawn();
+  }
+
+  spawn() {
+    const slot = {
+      index: this.slots.length,
+      worker: this.createWorker(),
+      ready: false,
+      job: null,
+      pendingInits: 0,
+      reinit: false,
+      initFailures: 0,
+      dead: false,
+      retryTimer: null,
+    };
+    slot.listener = (event) => this.handleMessage(slot, event.data);
+    slot.crashListener = (event) => this.handleCrash(slot, event);
+    this.attach(slot);
+    this.slots.push(slot);
+    this.sendInit(slot);
+    return slot;
+  }
+
+  attach(slot) {
+    slot.worker.addEventListener('message', slot.listener);
+    CRASH_EVENTS.forEach(type => slot.worker.addEventListener(type, slot.crashListener));
+  }
+
+  // Stops the slot's worker; the slot itself stays in place.
+  retire(slot) {
+    slot.worker.removeEventListener('message', slot.listener);
+    CRASH_EVENTS.forEach(type => slot.worker.removeEventListener(type, slot.crashListener));
+    slot.worker.terminate();
+  }
+
+  // A slot is ready once every INIT sent to it has been answered: the worker
+  // handles messages concurrently, so an older INIT can complete first.
+  sendInit(slot) {
+    slot.ready = false;
+    slot.reinit = false;
+    slot.pendingInits += 1;
+    slot.worker.postMessage(this.initMessage);
+  }
+
+  /**
+   * Updates the INIT message (e.g. to load the translator) and re-sends it to
+   * the workers. A busy worker gets it once its current job ends; no job is
+   * dispatched to a worker until it has confirmed the reload.
+   */
+  reinitialize(initMessage) {
+    this.initMessage = initMessage;
+    this.slots.forEach((slot) => {
+      // Slots waiting to respawn pick the new message up when they do.
+      if (slot.dead || slot.retryTimer) return;
+      slot.ready = false;
+      if (slot.job) slot.reinit = true;
+      else this.sendInit(slot);
+    });
+    this.emitProgress();
+  }
+
+  /**
+   * Queues a job.
+   * @param {Object} message - Message for worker.js ({ audio, ... } or { type: 'TRANSLATE', ... }).
+   * @param {Object} [options]
+   * @param {number} [options.priority=0] - Higher runs first; equal priorities run in submission order.
+   * @param {(data: Object) => void} [options.onStatus] - Intermediate statuses of this job.
+   * @param {Transferable[]} [options.transfer]
+   * @returns {{id: number, promise: Promise<Object>}} Resolves with the worker's final message.
+   */
+  submit(message, { priority = 0, onStatus, transfer = [] } = {}) {
+    const id = this.nextJobId++;
+    let resolve;
+    let reject;
+    const promise = new Promise((res, rej) => { resolve = res; reject = rej; });
+    const job = { id, message, priority, onStatus, transfer, resolve, reject, seq: id, state: 'queued' };
+    this.jobs.set(id, job);
+    this.enqueue(job);
+    this.dispatch();
+    return { id, promise };
+  }
+
+  enqueue(job) {
+    const at = this.queue.findIndex(other =>
+      other.priority < job.priority || (other.priority === job.priority && other.seq > job.seq)
+    );
+    if (at === -1) this.queue.push(job);
+    else this.queue.splice(at, 0, job);
+  }
+
+  /** Moves a queued job ahead of everything with a lower priority (e.g. the row the user clicked). */
+  prioritize(id, priority = 10) {
+    const job = this.jobs.get(id);
+    if (!job || job.state !== 'queued') return false;
+    this.queue.splice(this.queue.indexOf(job), 1);
+    job.priority = Math.max(job.priority, priority);
+    this.enqueue(job);
+    this.emitProgress();
+    return true;
+  }
+
+  /**
+   * Cancels a job. A running job's worker is terminated (FFmpeg and ONNX calls
+   * cannot be interrupted) and replaced by a fresh one.
+   */
+  cancel(id) {
+    const job = this.jobs.get(id);
+    if (!job) return false;
+    if (job.state === 'queued') {
+      this.queue.splice(this.queue.indexOf(job), 1);
+    } else {
+      const slot = this.slots.find(s => s.job === job);
+      if (slot) this.replace(slot);
+    }
+    this.finish(job, 'cancelled', new Error(CANCELLED));
+    this.dispatch();
+    return true;
+  }
+
+  replace(slot) {
+    this.retire(slot);
+    clearTimeout(slot.retryTimer);
+    Object.assign(slot, { worker: this.createWorker(), ready: false, job: null, pendingInits: 0, retryTimer: null });
+    this.attach(slot);
+    this.sendInit(slot);
+  }
+
+  /**
+   * The worker crashed (e.g. out of memory) or could not deserialize a
+   * message: its job fails and the worker is replaced.
+   */
+  handleCrash(slot, event) {
+    const error = new Error(event?.message || 'Transcription worker crashed.');
+    const { job } = slot;
+    if (!job && !slot.ready) {
+      this.initFailed(slot, error);
+      return;
+    }
+    this.replace(slot);
+    if (job) this.finish(job, 'failed', error);
+    this.dispatch();
+  }
+
+  // The worker could not load its models: retry with a fresh worker after a
+  // delay, and give the slot up after MAX_INIT_ATTEMPTS.
+  initFailed(slot, error) {
+    this.retire(slot);
+    Object.assign(slot, { ready: false, pendingInits: 0 });
+    slot.initFailures += 1;
+    if (slot.initFailures < MAX_INIT_ATTEMPTS) {
+      slot.retryTimer = setTimeout(() => {
+        slot.retryTimer = null;
+        if (!this.terminated) this.replace(slot);
+      }, INIT_RETRY_DELAY_MS * 2 ** (slot.initFailures - 1));
+    } else {
+      slot.dead = true;
+      this.initError = error;
+    }
+    this.dispatch();
+  }
+
+  handleMessage(slot, data) {
+    this.onMessage?.(data, slot.index);
+    if (data.status === 'INIT_COMPLETE') {
+      slot.pendingInits = Math.max(0, slot.pendingInits - 1);
+      slot.ready = slot.pendingInits === 0 && !slot.reinit;
+      if (slot.ready) slot.initFailures = 0;
+      this.dispatch();
+      return;
+    }
+    if (data.status === 'ERROR' && !slot.ready && !slot.job) {
+      this.initFailed(slot, new Error(data.error));
+      return;
+    }
+    const { job } = slot;
+    if (!job) return;
+    if (TERMINAL_STATUSES.has(data.status)) {
+      slot.job = null;
+      if (slot.reinit) this.sendInit(slot);
+      if (data.status === 'error') this.finish(job, 'failed', new Error(data.error));
+      else this.finish(job, 'completed', null, data);
+      this.dispatch();
+    } else {
+      job.onStatus?.(data);
+    }
+  }
+
+  /** Whether any queued job can still run: a live slot, or room for a new one. */
+  canRun() {
+    return this.slots.length < this.size || this.slots.some(slot => !slot.dead);
+  }
+
+  finish(job, outcome, error, data) {
+    job.state = outcome;
+    this.jobs.delete(job.id);
+    this.counters[outcome] += 1;
+    if (error) job.reject(error);
+    else job.resolve(data);
+    this.emitProgress();
+  }
+
+  dispatch() {
+    if (this.terminated) return;
+    for (const slot of this.slots) {
+      if (this.queue.length === 0) break;
+      if (!slot.ready || slot.job) continue;
+      const job = this.queue.shift();
+      job.state = 'running';
+      slot.job = job;
+      slot.worker.postMessage(job.message, job.transfer);
+    }
+    // Grow only while jobs are waiting and no worker is about to become free.
+    const starting = this.slots.filter(slot => !slot.ready && !slot.dead).length;
+    if (this.queue.length > starting && this.slots.length < this.size) {
+      this.spawn();
+    }
+    if (!this.canRun()) {
+      this.queue.splice(0).forEach(job => this.finish(job, 'failed', this.initError));
+    }
+    this.emitProgress();
+  }
+
+  getProgress() {
+    return {
+      ...this.counters,
+      queued: this.queue.length,
+      running: this.slots.filter(slot => slot.job).length,
+      workers: this.slots.length,
+      readyWorkers: this.slots.filter(slot => slot.ready).length,
+    };
+  }
+
+  emitProgress() {
+    this.onProgress?.(this.getProgress());
+  }
+
+  terminate() {
+    this.terminated = true;
+    this.queue.splice(0).forEach(job => this.finish(job, 'cancelled', new Error(CANCELLED)));
+    this.slots.forEach((slot) => {
+      if (slot.job) this.finish(slot.job, 'cancelled', new Error(CANCELLED));
+      clearTimeout(slot.retryTimer);
+      this.retire(slot);
+    });
+    this.slots = [];
+  }
+}
@@ -0,0 +1,241 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { TranscriptionWorkerPool, computePoolSize, CANCELLED } from './transcriptionWorkerPool';
+
+class FakeWorker {
+  constructor() {
+    this.listeners = { message: new Set(), error: new Set(), messageerror: new Set() };
+    this.posted = [];
+    this.terminated = false;
+  }
+
+  addEventListener(type, listener) {
+    this.listeners[type].add(listener);
+  }
+
+  removeEventListener(type, listener) {
+    this.listeners[type].delete(listener);
+  }
+
+  postMessage(message) {
+    this.posted.push(message);
+  }
+
+  terminate() {
+    this.terminated = true;
+  }
+
+  emit(data) {
+    this.listeners.message.forEach(listener => listener({ data }));
+  }
+
+  crash(message = 'out of memory') {
+    this.listeners.error.forEach(listener => listener({ message }));
+  }
+
+  get jobs() {
+    return this.posted.filter(message => message.type !== 'INIT');
+  }
+}
+
+const createPool = (size) => {
+  const workers = [];
+  const pool = new TranscriptionWorkerPool({
+    size,
+    createWorker: () => {
+      const worker = new FakeWorker();
+      workers.push(worker);
+      return worker;
+    },
+    initMessage: { type: 'INIT' },
+  });
+  return { pool, workers };
+};
+
+describe('computePoolSize', () => {
+  it('should use half the cores when memory allows', () => {
+    expect(computePoolSize({ hardwareConcurrency: 8, deviceMemory: 8 })).toEqual({ size: 4, threadsPerWorker: 2 });
+  });
+
+  it('should be limited by device memory', () => {
+    expect(computePoolSize({ hardwareConcurrency: 16, deviceMemory: 2 }).size).toBe(1);
+  });
+
+  it('should default to a single worker when nothing is known', () => {
+    expect(computePoolSize({}).size).toBe(1);
+  });
+
+  it('should fit more workers of a smaller model in the same memory', () => {
+    expect(computePoolSize({ hardwareConcurrency: 16, deviceMemory: 2, memoryPerWorkerGb: 0.5 }).size).toBe(4);
+  });
+});
+
+describe('TranscriptionWorkerPool', () => {
+  it('should spawn workers lazily and run one job per ready worker', async () => {
+    const { pool, workers } = createPool(2);
+    pool.start();
+    const a = pool.submit({ audio: 'a' });
+    const b = pool.submit({ audio: 'b' });
+    expect(workers).toHaveLength(2);
+
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[0].jobs).toEqual([{ audio: 'a' }]);
+
+    workers[1].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[1].jobs).toEqual([{ audio: 'b' }]);
+
+    workers[1].emit({ status: 'complete', output: 'texto b' });
+    workers[0].emit({ status: 'complete', output: 'texto a' });
+    await expect(a.promise).resolves.toMatchObject({ output: 'texto a' });
+    await expect(b.promise).resolves.toMatchObject({ output: 'texto b' });
+    expect(pool.getProgress()).toMatchObject({ completed: 2, queued: 0, running: 0 });
+  });
+
+  it('should route intermediate statuses to the job running on that worker', () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    const onStatus = vi.fn();
+    pool.submit({ audio: 'a' }, { onStatus });
+
+    workers[0].emit({ status: 'transcribing' });
+    expect(onStatus).toHaveBeenCalledWith({ status: 'transcribing' });
+  });
+
+  it('should run prioritized jobs first', () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    pool.submit({ audio: 'running' });
+    pool.submit({ audio: 'first' });
+    const clicked = pool.submit({ audio: 'clicked' });
+    pool.submit({ audio: 'urgent' }, { priority: 5 });
+
+    expect(pool.prioritize(clicked.id, 10)).toBe(true);
+    workers[0].emit({ status: 'complete' });
+    workers[0].emit({ status: 'complete' });
+    workers[0].emit({ status: 'complete' });
+
+    expect(workers[0].jobs.map(job => job.audio)).toEqual(['running', 'clicked', 'urgent', 'first']);
+  });
+
+  it('should cancel a queued job without touching the workers', async () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    pool.submit({ audio: 'a' });
+    const queued = pool.submit({ audio: 'b' });
+
+    pool.cancel(queued.id);
+
+    await expect(queued.promise).rejects.toThrow(CANCELLED);
+    expect(workers[0].terminated).toBe(false);
+    expect(pool.getProgress()).toMatchObject({ cancelled: 1, queued: 0 });
+  });
+
+  it('should replace the worker of a cancelled running job', async () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    const running = pool.submit({ audio: 'a' });
+    const next = pool.submit({ audio: 'b' });
+
+    pool.cancel(running.id);
+    await expect(running.promise).rejects.toThrow(CANCELLED);
+    expect(workers[0].terminated).toBe(true);
+    expect(workers).toHaveLength(2);
+
+    workers[1].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[1].jobs).toEqual([{ audio: 'b' }]);
+    workers[1].emit({ status: 'complete', output: 'ok' });
+    await expect(next.promise).resolves.toMatchObject({ output: 'ok' });
+  });
+
+  it('should reject a job whose worker reports an error and keep going', async () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    const failing = pool.submit({ audio: 'a' });
+    pool.submit({ audio: 'b' });
+
+    workers[0].emit({ status: 'error', error: 'VIDEO_TOO_LONG' });
+
+    await expect(failing.promise).rejects.toThrow('VIDEO_TOO_LONG');
+    expect(workers[0].jobs.map(job => job.audio)).toEqual(['a', 'b']);
+  });
+
+  it('should reload a busy worker only after its job and dispatch again once it confirms', async () => {
+    const { pool, workers } = createPool(2);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    const running = pool.submit({ audio: 'a' });
+    pool.submit({ audio: 'b' });
+    workers[1].emit({ status: 'INIT_COMPLETE' });
+
+    pool.reinitialize({ type: 'INIT', model: 'tiny' });
+    expect(workers[0].posted.filter(message => message.type === 'INIT')).toHaveLength(1);
+    expect(workers[1].posted.filter(message => message.type === 'INIT')).toHaveLength(1);
+
+    pool.submit({ audio: 'c' });
+    workers[0].emit({ status: 'complete', output: 'a' });
+    await expect(running.promise).resolves.toMatchObject({ output: 'a' });
+    expect(workers[0].posted[workers[0].posted.length - 1]).toEqual({ type: 'INIT', model: 'tiny' });
+    expect(workers[0].jobs).toEqual([{ audio: 'a' }]);
+
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[0].jobs).toEqual([{ audio: 'a' }, { audio: 'c' }]);
+  });
+
+  it('should fail the job of a crashed worker and replace the worker', async () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    const crashed = pool.submit({ audio: 'a' });
+    const next = pool.submit({ audio: 'b' });
+
+    workers[0].crash();
+
+    await expect(crashed.promise).rejects.toThrow('out of memory');
+    expect(workers[0].terminated).toBe(true);
+    workers[1].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[1].jobs).toEqual([{ audio: 'b' }]);
+    workers[1].emit({ status: 'complete', output: 'ok' });
+    await expect(next.promise).resolves.toMatchObject({ output: 'ok' });
+  });
+
+  describe('when a worker cannot load', () => {
+    afterEach(() => {
+      vi.useRealTimers();
+    });
+
+    it('should respawn it with backoff and then reject current and later jobs', async () => {
+      vi.useFakeTimers();
+      const { pool, workers } = createPool(1);
+      pool.start();
+      const queued = pool.submit({ audio: 'a' });
+
+      workers[0].emit({ status: 'ERROR', error: 'model download failed' });
+      expect(workers).toHaveLength(1);
+      await vi.advanceTimersByTimeAsync(1000);
+      expect(workers).toHaveLength(2);
+      workers[1].emit({ status: 'ERROR', error: 'model download failed' });
+      await vi.advanceTimersByTimeAsync(2000);
+      workers[2].emit({ status: 'ERROR', error: 'model download failed' });
+
+      await expect(queued.promise).rejects.toThrow('model download failed');
+      await expect(pool.submit({ audio: 'b' }).promise).rejects.toThrow('model download failed');
+      expect(workers).toHaveLength(3);
+    });
+  });
+
+  it('should stay not ready until every INIT sent to a worker has completed', () => {
+    const { pool, workers } = createPool(1);
+    pool.start();
+    pool.reinitialize({ type: 'INIT', loadTranslator: true });
+    pool.submit({ audio: 'a' });
+
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[0].jobs).toEqual([]);
+    workers[0].emit({ status: 'INIT_COMPLETE' });
+    expect(workers[0].jobs).toEqual([{ audio: 'a' }]);
+  });
+});
@@ -0,0 +1,51 @@
+/**
+ * Whisper model sizes for the transcription worker and the policy that picks
+ * one. All are the quantized Transformers.js exports; `small` is the default
+ * and the only one self-hosted under /ai-assets/ (the others load from the
+ * CDN through the same asset cache). Run `npm run bench:transcription` to
+ * compare their real-time factor and word error rate on a local corpus.
+ */
+import { VAD_VERSION } from './audioPreprocess.js';
+
+export const WHISPER_MODELS = {
+  tiny: { model: 'Xenova/whisper-tiny', label: 'Tiny', memoryGb: 0.5 },
+  base: { model: 'Xenova/whisper-base', label: 'Base', memoryGb: 0.75 },
+  small: { model: 'Xenova/whisper-small', label: 'Small', memoryGb: 1.5 },
+};
+
+// Larger first: the order cached transcriptions are preferred in.
+const SIZES_BY_QUALITY = ['small', 'base', 'tiny'];
+
+export const TRANSCRIPTION_PROFILES = {
+  quality: 'small',
+  balanced: 'base',
+  speed: 'tiny',
+};
+export const DEFAULT_TRANSCRIPTION_PROFILE = 'quality';
+
+/**
+ * Model size for a speed/quality profile. On devices reporting 2 GB or less
+ * (navigator.deviceMemory) the choice drops one size, since one worker has to
+ * hold the model, FFmpeg and the audio.
+ * @param {Object} [options]
+ * @param {'quality'|'balanced'|'speed'} [options.profile]
+ * @param {number} [options.deviceMemory]
+ * @returns {'tiny'|'base'|'small'}
+ */
+export const selectWhisperModel = ({ profile = DEFAULT_TRANSCRIPTION_PROFILE, deviceMemory } = {}) => {
+  const size = TRANSCRIPTION_PROFILES[profile] || TRANSCRIPTION_PROFILES[DEFAULT_TRANSCRIPTION_PROFILE];
+  if (deviceMemory && deviceMemory <= 2) {
+    return SIZES_BY_QUALITY[Math.min(SIZES_BY_QUALITY.indexOf(size) + 1, SIZES_BY_QUALITY.length - 1)];
+  }
+  return size;
+};
+
+/**
+ * Every transcription cache variant the worker can produce for a language and
+ * task, best first (larger model, then VAD before the whole-clip pipeline).
+ * For lookups that accept a transcription made with any configuration.
+ */
+export const transcriptionVariants = (language, task = 'transcribe') => SIZES_BY_QUALITY.flatMap(size => [
+  { model: WHISPER_MODELS[size].model, language, task, vad: VAD_VERSION },
+  { model: WHISPER_MODELS[size].model, language, task },
+]);
@@ -0,0 +1,27 @@
+import { describe, it, expect } from 'vitest';
+import { selectWhisperModel, transcriptionVariants } from './whisperModels';
+
+describe('selectWhisperModel', () => {
+  it('should map profiles to sizes and default to small', () => {
+    expect(selectWhisperModel()).toBe('small');
+    expect(selectWhisperModel({ profile: 'balanced', deviceMemory: 8 })).toBe('base');
+    expect(selectWhisperModel({ profile: 'speed' })).toBe('tiny');
+    expect(selectWhisperModel({ profile: 'unknown' })).toBe('small');
+  });
+
+  it('should drop one size on low-memory devices', () => {
+    expect(selectWhisperModel({ profile: 'quality', deviceMemory: 2 })).toBe('base');
+    expect(selectWhisperModel({ profile: 'speed', deviceMemory: 1 })).toBe('tiny');
+  });
+});
+
+describe('transcriptionVariants', () => {
+  it('should list every size, larger first, with VAD before the whole-clip pipeline', () => {
+    const variants = transcriptionVariants('portuguese');
+
+    expect(variants).toHaveLength(6);
+    expect(variants[0]).toEqual({ model: 'Xenova/whisper-small', language: 'portuguese', task: 'transcribe', vad: 'vad-v1' });
+    expect(variants[1]).toEqual({ model: 'Xenova/whisper-small', language: 'portuguese', task: 'transcribe' });
+    expect(variants[5].model).toBe('Xenova/whisper-tiny');
+  });
+});
@@ -0,0 +1,50 @@
+/**
+ * Word error rate of a transcription against a reference, for
+ * scripts/bench-transcription.mjs. Both texts are lowercased and stripped of
+ * punctuation first, since Whisper's casing and punctuation vary between
+ * model sizes; accents are kept, they change Portuguese words.
+ */
+
+/** Words of a text, lowercased, without punctuation. */
+export const normalizeWords = text => String(text || '')
+  .normalize('NFC')
+  .toLowerCase()
+  .replace(/[^\p{L}\p{N}\s'-]/gu, ' ')
+  .replace(/(^|\s)['-]+|['-]+(?=\s|$)/g, ' ')
+  .split(/\s+/)
+  .filter(Boolean);
+
+/**
+ * Word-level edit distance between reference and hypothesis.
+ * @returns {{wer: number, substitutions: number, deletions: number, insertions: number, referenceWords: number}}
+ * wer is (S + D + I) / N; with an empty reference it is 0 for an empty
+ * hypothesis and 1 otherwise.
+ */
+export const wordErrorRate = (reference, hypothesis) => {
+  const ref = normalizeWords(reference);
+  const hyp = normalizeWords(hypothesis);
+
+  // One row of the DP table at a time; each cell keeps the operation counts
+  // of its cheapest alignment.
+  let previous = Array.from({ length: hyp.length + 1 }, (_, j) => ({ cost: j, s: 0, d: 0, i: j }));
+  for (let r = 1; r <= ref.length; r++) {
+    const row = [{ cost: r, s: 0, d: r, i: 0 }];
+    for (let h = 1; h <= hyp.length; h++) {
+      const diagonal = previous[h - 1];
+      const match = ref[r - 1] === hyp[h - 1];
+      const candidates = [
+        { ...diagonal, cost: diagonal.cost + (match ? 0 : 1), s: diagonal.s + (match ? 0 : 1) },
+        { ...previous[h], cost: previous[h].cost + 1, d: previous[h].d + 1 },
+        { ...row[h - 1], cost: row[h - 1].cost + 1, i: row[h - 1].i + 1 },
+      ];
+      row.push(candidates.reduce((best, candidate) => (candidate.cost < best.cost ? candidate : best)));
+    }
+    previous = row;
+  }
+
+  const { s, d, i } = previous[hyp.length];
+  const errors = s + d + i;
+  let wer = errors / ref.length;
+  if (ref.length === 0) wer = hyp.length === 0 ? 0 : 1;
+  return { wer, substitutions: s, deletions: d, insertions: i, referenceWords: ref.length };
+};
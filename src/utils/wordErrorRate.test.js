@@ -0,0 +1,26 @@
+import { describe, it, expect } from 'vitest';
+import { normalizeWords, wordErrorRate } from './wordErrorRate';
+
+describe('normalizeWords', () => {
+  it('should ignore case and punctuation but keep accents and contractions', () => {
+    expect(normalizeWords('Oi, gente! Tá "bom"? D\'água — é isso...'))
+      .toEqual(['oi', 'gente', 'tá', 'bom', "d'água", 'é', 'isso']);
+  });
+});
+
+describe('wordErrorRate', () => {
+  it('should count substitutions, deletions and insertions', () => {
+    expect(wordErrorRate('o produto chegou ontem em casa', 'então o produto chegou hoje casa'))
+      .toEqual({ wer: 0.5, substitutions: 1, deletions: 1, insertions: 1, referenceWords: 6 });
+  });
+
+  it('should be zero for the same words with different punctuation', () => {
+    expect(wordErrorRate('Oi gente, tudo bem?', ' oi gente tudo bem').wer).toBe(0);
+  });
+
+  it('should handle empty texts', () => {
+    expect(wordErrorRate('', '').wer).toBe(0);
+    expect(wordErrorRate('', 'ruído').wer).toBe(1);
+    expect(wordErrorRate('uma fala', '')).toMatchObject({ wer: 1, deletions: 2 });
+  });
+});
@@ -1,9 +1,27 @@
 import { pipeline, env } from '@xenova/transformers';
 import { FFmpeg } from '@ffmpeg/ffmpeg';
+import { fetchFile } from '@ffmpeg/util';
+import { AiAssetCache, AI_ASSETS_BASE, AI_ASSET_GROUPS } from './aiAssetCache';
+import {
+    DEFAULT_TRANSCRIPTION_MODEL, sha256Hex, contentCacheKey, urlCacheKey,
+    lookupCachedTranscriptions, storeCachedTranscription,
+} from './transcriptionCache';
+import { translateInBatches } from './sentenceBatcher';
+import { AUDIO_SAMPLE_RATE, VAD_VERSION, ffmpegPcmArgs, transcribeSpeech } from './audioPreprocess';
+
+// Every load is reported to the page as warm (Cache Storage) or cold (network).
+const assetCache = new AiAssetCache({
+    onTelemetry: (record) => self.postMessage({ status: 'asset_telemetry', telemetry: record }),
+});
 
-// Configure Transformers.js environment
-env.allowLocalModels = false; // Ensure we always use the CDN for models
-import { fetchFile, toBlobURL } from '@ffmpeg/util';
+// Configure Transformers.js environment: models come from /ai-assets/models/
+// when self-hosted (allowLocalModels is set per model) or from the CDN, and
+// both go through the versioned asset cache instead of 'transformers-cache'.
+env.allowLocalModels = false;
+env.localModelPath = `${AI_ASSETS_BASE}models/`;
+env.useBrowserCache = false;
+env.useCustomCache = true;
+env.customCache = assetCache.asTransformersCache();
 
 // Set environment variables for Transformers.js
 if (process.env.VITE_MODELS_URL) {
@@ -15,13 +33,60 @@ class MediaAIService {
     constructor() {
         this.ffmpeg = null;
         this.transcriber = null;
+        this.transcriberModel = null;
+        // Set by INIT; vad: false transcribes whole clips (the asr-v1 pipeline).
+        this.transcriberOptions = { model: DEFAULT_TRANSCRIPTION_MODEL, vad: true };
         this.translator = null;
+        // Set by INIT; quantized: false loads the full-precision weights.
+        this.translatorOptions = { model: 'Xenova/m2m100_418M', quantized: true };
         this.ffmpegReady = false;
         this.transcriberReady = false;
         this.translatorReady = false;
         this.ffmpegLoadingPromise = null;
         this.transcriberLoadingPromise = null;
         this.translatorLoadingPromise = null;
+        this.telemetry = [];
+        // Pipeline loads run one at a time (see loadPipeline).
+        this.pipelineQueue = Promise.resolve();
+        // Transcriptions in progress; a model switch waits for them.
+        this.activeTranscriptions = new Set();
+    }
+
+    /**
+     * Loads a Transformers.js pipeline. Self-hosted models are verified and
+     * cached file by file first, so the pipeline itself only reads the cache.
+     * Only the quantized weights are self-hosted.
+     */
+    async loadPipeline(group, task, model, progressName, { quantized = true } = {}) {
+        const startedAt = performance.now();
+        const before = { ...assetCache.stats };
+        await assetCache.init();
+        const selfHosted = quantized && model === AI_ASSET_GROUPS[group].model && assetCache.hasSelfHosted(group);
+        if (selfHosted) {
+            await assetCache.ensureCached(group, (progress) => {
+                self.postMessage({
+                    status: 'model_download_progress',
+                    model: progressName,
+                    progress: { ...progress, progress: (progress.loaded / progress.total) * 100 },
+                });
+            });
+        }
+        // env is shared by every pipeline of the worker and read while files
+        // load: a concurrent load (e.g. the translator while the transcriber
+        // loads) could otherwise resolve its files from the other's source.
+        const load = this.pipelineQueue.then(() => {
+            env.allowLocalModels = selfHosted;
+            return pipeline(task, model, {
+                quantized,
+                progress_callback: (progress) => {
+                    self.postMessage({ status: 'model_download_progress', model: progressName, progress });
+                },
+            });
+        });
+        this.pipelineQueue = load.catch(() => {});
+        const instance = await load;
+        this.telemetry.push(assetCache.report(group, startedAt, before));
+        return instance;
     }
 
     async loadFFmpeg() {
@@ -36,10 +101,11 @@ class MediaAIService {
                     throw new Error('crossOriginIsolated is false. FFmpeg requires COOP/COEP headers.');
                 }
                 const ffmpeg = new FFmpeg();
-                const baseURL = 'https://unpkg.com/@ffmpeg/core@0.12.6/dist/esm';
-                const coreURL = await toBlobURL(`${baseURL}/ffmpeg-core.js`, 'text/javascript');
-                const wasmURL = await toBlobURL(`${baseURL}/ffmpeg-core.wasm`, 'application/wasm');
+                const startedAt = performance.now();
+                const before = { ...assetCache.stats };
+                const { coreURL, wasmURL } = await assetCache.getFFmpegCoreUrls();
                 await ffmpeg.load({ coreURL, wasmURL });
+                this.telemetry.push(assetCache.report('ffmpeg', startedAt, before));
                 this.ffmpeg = ffmpeg;
                 this.ffmpegReady = true;
                 self.postMessage({ status: 'ffmpeg_ready' });
@@ -55,19 +121,26 @@ class MediaAIService {
         return this.ffmpegLoadingPromise;
     }
 
-    async loadTranscriber(model = 'Xenova/whisper-small') {
-        if (this.transcriberReady) return;
-        if (this.transcriberLoadingPromise) return this.transcriberLoadingPromise;
+    async loadTranscriber(model = this.transcriberOptions.model) {
+        if (this.transcriberReady && this.transcriberModel === model) return;
+        if (this.transcriberLoadingPromise) {
+            await this.transcriberLoadingPromise;
+            return this.loadTranscriber(model);
+        }
 
         self.postMessage({ status: 'transcriber_loading' });
 
         this.transcriberLoadingPromise = new Promise(async (resolve, reject) => {
             try {
-                this.transcriber = await pipeline('automatic-speech-recognition', model, {
-                    progress_callback: (progress) => {
-                        self.postMessage({ status: 'model_download_progress', model: 'transcription', progress });
-                    },
-                });
+                // Switching model sizes: free the previous ONNX sessions first.
+                if (this.transcriber) {
+                    this.transcriberReady = false;
+                    await Promise.allSettled([...this.activeTranscriptions]);
+                    await this.transcriber.dispose?.();
+                    this.transcriber = null;
+                }
+                this.transcriber = await this.loadPipeline('transcriber', 'automatic-speech-recognition', model, 'transcription');
+                this.transcriberModel = model;
                 this.transcriberReady = true;
                 self.postMessage({ status: 'transcriber_ready' });
                 resolve();
@@ -82,7 +155,7 @@ class MediaAIService {
         return this.transcriberLoadingPromise;
     }
 
-    async loadTranslator(model = 'Xenova/m2m100_418M') {
+    async loadTranslator({ model, quantized } = this.translatorOptions) {
         if (this.translatorReady) return;
         if (this.translatorLoadingPromise) return this.translatorLoadingPromise;
 
@@ -90,11 +163,7 @@ class MediaAIService {
 
         this.translatorLoadingPromise = new Promise(async (resolve, reject) => {
             try {
-                this.translator = await pipeline('translation', model, {
-                    progress_callback: (progress) => {
-                        self.postMessage({ status: 'model_download_progress', model: 'translation', progress });
-                    },
-                });
+                this.translator = await this.loadPipeline('translator', 'translation', model, 'translation', { quantized });
                 this.translatorReady = true;
                 self.postMessage({ status: 'translator_ready' });
                 resolve();
@@ -121,69 +190,169 @@ class MediaAIService {
         return this.ffmpegReady && this.transcriberReady;
     }
 
-    async transcribe(audioUrl, language, task) {
+    /**
+     * Streams the media into a Blob. Chunks are handed to the Blob as they
+     * arrive instead of being accumulated into one ArrayBuffer and copied again.
+     */
+    async downloadMedia(audioUrl) {
+        const response = await fetch(audioUrl);
+        if (!response.ok) {
+            const errorBody = await response.text().catch(() => 'No body');
+            throw new Error(`HTTP ${response.status}: ${response.statusText}. Body: ${errorBody.substring(0, 100)}`);
+        }
+        const total = Number(response.headers.get('content-length')) || 0;
+        const reader = response.body.getReader();
+        const chunks = [];
+        let received = 0;
+        let lastReport = 0;
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            chunks.push(value);
+            received += value.byteLength;
+            if (received - lastReport >= 1 << 20) {
+                lastReport = received;
+                self.postMessage({ status: 'audio_downloading', progress: { received, total } });
+            }
+        }
+        return new Blob(chunks, { type: response.headers.get('content-type') || 'application/octet-stream' });
+    }
+
+    /**
+     * Makes the input visible to FFmpeg. WORKERFS reads the Blob lazily, so the
+     * media is never copied into the in-memory FS; MEMFS is only the fallback.
+     * @returns {Promise<{path: string, cleanup: () => Promise<void>}>}
+     */
+    async mountInput(blob) {
+        const mountPoint = '/input';
+        const name = 'input.audio';
+        try {
+            await this.ffmpeg.createDir(mountPoint).catch(() => {});
+            await this.ffmpeg.mount('WORKERFS', { blobs: [{ name, data: blob }] }, mountPoint);
+            return {
+                path: `${mountPoint}/${name}`,
+                cleanup: () => this.ffmpeg.unmount(mountPoint),
+            };
+        } catch (error) {
+            console.warn('[Worker] WORKERFS indisponível, copiando entrada para MEMFS:', error);
+            // writeFile transfers the buffer to the FFmpeg worker instead of cloning it.
+            await this.ffmpeg.writeFile(name, new Uint8Array(await blob.arrayBuffer()));
+            return { path: name, cleanup: () => this.ffmpeg.deleteFile(name) };
+        }
+    }
+
+    /** First cached transcription among `keys`, reported to the page as a cache hit. */
+    async findCached(keys, tier) {
+        const hits = await lookupCachedTranscriptions(keys);
+        const hit = keys.map(key => hits.get(key)).find(Boolean);
+        if (hit) self.postMessage({ status: 'cache_hit', tier });
+        return hit || null;
+    }
+
+    /**
+     * @param {string|Blob|ArrayBuffer} audioSource - URL to download, or the
+     * media itself. ArrayBuffers should be posted in the transfer list so they
+     * are moved into the worker rather than copied.
+     * @param {Object} [options]
+     * @param {string[]} [options.sourceUrls] - Other URLs of the same media
+     * (e.g. the post URL), used as extra cache keys.
+     * @param {boolean} [options.useCache=true]
+     */
+    async transcribe(audioSource, language, task, { sourceUrls = [], useCache = true } = {}) {
         if (!this.isLoaded()) {
             throw new Error('Services not initialized. Send INIT message first.');
         }
 
-        console.log(`[Worker] Iniciando fetch de áudio: ${audioUrl}`);
-        self.postMessage({ status: 'audio_downloading' });
+        // The cache is checked by URL before downloading and by content hash
+        // before FFmpeg and Whisper.
+        const { vad } = this.transcriberOptions;
+        const variant = { model: this.transcriberModel, language, task, vad: vad ? VAD_VERSION : undefined };
+        const urls = [...(typeof audioSource === 'string' ? [audioSource] : []), ...sourceUrls];
+        if (useCache && urls.length > 0) {
+            const urlKeys = await Promise.all(urls.map(url => urlCacheKey(url, variant)));
+            const cached = await this.findCached(urlKeys, 'url');
+            if (cached) return cached;
+        }
 
-        let audioData;
-        try {
-            const response = await fetch(audioUrl);
-            if (!response.ok) {
-                const errorBody = await response.text().catch(() => 'No body');
-                throw new Error(`HTTP ${response.status}: ${response.statusText}. Body: ${errorBody.substring(0, 100)}`);
+        let media;
+        if (typeof audioSource === 'string') {
+            console.log(`[Worker] Iniciando fetch de áudio: ${audioSource}`);
+            self.postMessage({ status: 'audio_downloading' });
+            try {
+                media = await this.downloadMedia(audioSource);
+            } catch (e) {
+                console.error('Worker fetch failed:', e);
+                throw new Error(`Falha ao baixar áudio para transcrição: ${e.message}`);
             }
-            const buffer = await response.arrayBuffer();
-            audioData = new Uint8Array(buffer);
-        } catch (e) {
-            console.error('Worker fetch failed:', e);
-            throw new Error(`Falha ao baixar áudio para transcrição: ${e.message}`);
+        } else {
+            media = audioSource instanceof Blob ? audioSource : new Blob([audioSource]);
         }
 
-        const inputFileName = 'input.audio';
-        const outputFileName = 'output.wav';
-        await this.ffmpeg.writeFile(inputFileName, audioData);
-
-        self.postMessage({ status: 'audio_converting' });
-        const filters = 'highpass=f=100,lowpass=f=3000,afftdn,dynaudnorm';
-        const exitCode = await this.ffmpeg.exec([
-            '-i', inputFileName,
-            '-af', filters,
-            '-ar', '16000',
-            '-ac', '1',
-            '-c:a', 'pcm_s16le',
-            outputFileName
-        ]);
-        if (exitCode !== 0) {
-            throw new Error(`FFmpeg conversion failed with exit code ${exitCode}. The input file might be corrupted or in an unsupported format.`);
+        let contentHash = null;
+        if (useCache) {
+            // Blobs are hashed as a stream; a posted ArrayBuffer is hashed as is.
+            const loaded = typeof audioSource === 'string' || audioSource instanceof Blob ? media : audioSource;
+            contentHash = await sha256Hex(loaded);
+            const cached = await this.findCached([await contentCacheKey(contentHash, variant)], 'content');
+            if (cached) {
+                // Same file under a new URL: remember the URL for next time.
+                await storeCachedTranscription({ urls, variant, result: cached });
+                return cached;
+            }
         }
-        const wavData = await this.ffmpeg.readFile(outputFileName);
 
-        const pcmData = new Int16Array(wavData.buffer.slice(44));
-        const durationSeconds = pcmData.length / 16000;
+        const outputFileName = 'output.pcm';
+        // The un-normalized copy the speech detector runs on.
+        const vadFileName = vad ? 'vad.pcm' : null;
+        const input = await this.mountInput(media);
+        media = null;
 
-        const floatData = new Float32Array(pcmData.length);
-        for (let i = 0; i < pcmData.length; i++) {
-            floatData[i] = pcmData[i] / 32768.0;
+        let samples;
+        let vadSamples;
+        try {
+            self.postMessage({ status: 'audio_converting' });
+            // Raw 32-bit float PCM is what the transcriber consumes: no WAV header
+            // to skip and no Int16 -> Float32 conversion pass.
+            const exitCode = await this.ffmpeg.exec(ffmpegPcmArgs(input.path, outputFileName, vadFileName));
+            if (exitCode !== 0) {
+                throw new Error(`FFmpeg conversion failed with exit code ${exitCode}. The input file might be corrupted or in an unsupported format.`);
+            }
+            // Views over the transferred bytes, not copies.
+            const toSamples = bytes => new Float32Array(bytes.buffer, bytes.byteOffset, bytes.byteLength >> 2);
+            samples = toSamples(await this.ffmpeg.readFile(outputFileName));
+            if (vadFileName) vadSamples = toSamples(await this.ffmpeg.readFile(vadFileName));
+        } finally {
+            await input.cleanup().catch(() => {});
+            await this.ffmpeg.deleteFile(outputFileName).catch(() => {});
+            if (vadFileName) await this.ffmpeg.deleteFile(vadFileName).catch(() => {});
         }
 
+        const durationSeconds = samples.length / AUDIO_SAMPLE_RATE;
+
         self.postMessage({ status: 'transcribing' });
-        const output = await this.transcriber(floatData, {
-            language: language,
-            task: task,
-            chunk_length_s: 30,
-            stride_length_s: 5,
+        const output = await transcribeSpeech(this.transcriber, samples, {
+            language,
+            task,
+            vad,
+            vadSamples,
+            onProgress: (progress) => self.postMessage({ status: 'transcribing', progress }),
         });
 
-        await this.ffmpeg.deleteFile(inputFileName);
-        await this.ffmpeg.deleteFile(outputFileName);
-        return { text: output.text, duration: durationSeconds };
+        const result = { text: output.text, duration: durationSeconds, speechDuration: output.speechSeconds };
+        if (useCache) {
+            await storeCachedTranscription({ contentHash, urls, variant, result });
+        }
+        return result;
     }
 
-    async translate(text, src_lang, tgt_lang) {
+    /**
+     * Translates sentence batches rather than the whole text in one call
+     * (see sentenceBatcher.js), reporting translation_progress per batch.
+     * @param {Object} [options]
+     * @param {number} [options.batchSize]
+     * @param {number} [options.maxChars] - Longest segment sent to the model.
+     */
+    async translate(text, src_lang, tgt_lang, { batchSize, maxChars } = {}) {
         if (!this.translatorReady) {
             await this.loadTranslator();
         }
@@ -202,12 +371,17 @@ class MediaAIService {
         const src = langMap[src_lang.toLowerCase()] || src_lang;
         const tgt = langMap[tgt_lang.toLowerCase()] || tgt_lang;
 
-        const output = await this.translator(text, {
-            src_lang: src,
-            tgt_lang: tgt,
+        return translateInBatches(async (batch) => {
+            const output = await this.translator(batch, {
+                src_lang: src,
+                tgt_lang: tgt,
+            });
+            return output.map(item => item.translation_text);
+        }, text, {
+            batchSize,
+            maxChars,
+            onProgress: (progress) => self.postMessage({ status: 'translation_progress', progress }),
         });
-
-        return output[0].translation_text;
     }
 }
 
@@ -219,9 +393,24 @@ self.addEventListener('message', async (event) => {
 
     if (type === 'INIT') {
         try {
-            const { loadTranslator } = event.data;
+            const { loadTranslator, numThreads, transcriber, translator } = event.data;
+            // Pooled workers split the cores between them instead of each
+            // ONNX session claiming all of them.
+            if (numThreads) {
+                env.backends.onnx.wasm.numThreads = numThreads;
+            }
+            if (transcriber) {
+                service.transcriberOptions = { ...service.transcriberOptions, ...transcriber };
+            }
+            if (translator) {
+                service.translatorOptions = { ...service.translatorOptions, ...translator };
+            }
             await service.ensureReady(loadTranslator);
-            self.postMessage({ status: 'INIT_COMPLETE' });
+            self.postMessage({
+                status: 'INIT_COMPLETE',
+                warmStart: service.telemetry.every(record => record.warm),
+                telemetry: service.telemetry,
+            });
         } catch (error) {
             console.error('Initialization failed in worker:', error);
             self.postMessage({
@@ -232,10 +421,25 @@ self.addEventListener('message', async (event) => {
         return;
     }
 
+    // Explicit warm-up: downloads and verifies assets without instantiating them.
+    if (type === 'PREFETCH') {
+        try {
+            const { assets = ['ffmpeg', 'transcriber'] } = event.data;
+            const telemetry = await assetCache.prefetch(assets, (progress) => {
+                self.postMessage({ status: 'prefetch_progress', progress });
+            });
+            self.postMessage({ status: 'PREFETCH_COMPLETE', telemetry });
+        } catch (error) {
+            console.error('Asset prefetch failed in worker:', error);
+            self.postMessage({ status: 'prefetch_error', error: String(error.message || error) });
+        }
+        return;
+    }
+
     if (type === 'TRANSLATE') {
         try {
-            const { text, src_lang, tgt_lang } = event.data;
-            const translation = await service.translate(text, src_lang, tgt_lang);
+            const { text, src_lang, tgt_lang, batchSize, maxChars } = event.data;
+            const translation = await service.translate(text, src_lang, tgt_lang, { batchSize, maxChars });
             self.postMessage({ status: 'translation_complete', output: translation });
         } catch (error) {
             console.error('Error in worker during translation:', error);
@@ -249,12 +453,23 @@ self.addEventListener('message', async (event) => {
 
     if (event.data.audio) {
         try {
+            // A model switch in progress: wait for it rather than failing the job.
+            if (!service.isLoaded() && service.transcriberLoadingPromise) {
+                await service.transcriberLoadingPromise.catch(() => {});
+            }
             if (!service.isLoaded()) {
                 throw new Error('Worker not initialized. Send INIT message first.');
             }
-            const { audio: audioUrl, language, task } = event.data;
-            const result = await service.transcribe(audioUrl, language, task);
-            self.postMessage({ status: 'complete', output: result.text, duration: result.duration });
+            const { audio, language, task, sourceUrls, useCache } = event.data;
+            const transcription = service.transcribe(audio, language, task, { sourceUrls, useCache });
+            service.activeTranscriptions.add(transcription);
+            const result = await transcription.finally(() => service.activeTranscriptions.delete(transcription));
+            self.postMessage({
+                status: 'complete',
+                output: result.text,
+                duration: result.duration,
+                speechDuration: result.speechDuration,
+            });
         } catch (error) {
             console.error('Error in worker during transcription:', error);
             self.postMessage({
@@ -0,0 +1,85 @@
+"""Fixtures for the front-end performance benchmarks.
+
+Run against a dev or preview server:
+
+    npm run dev &
+    python -m pytest tests/perf --perf-base-url http://localhost:5173
+
+Every measured page load is appended to the JSON report (default
+test-results/perf-report.json). Budgets live in budgets.json; a test fails when
+any metric of a (page, size) pair exceeds its budget.
+"""
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import pytest
+
+from .datasets import Dataset
+
+DEFAULT_SIZES = "10,1000,10000,50000"
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "front-end performance benchmarks")
+    group.addoption("--perf-base-url", default=os.environ.get("PERF_BASE_URL", "http://localhost:5173"),
+                    help="URL of the running vite dev/preview server.")
+    group.addoption("--perf-sizes", default=os.environ.get("PERF_SIZES", DEFAULT_SIZES),
+                    help="Comma-separated dataset sizes (briefings and transcriptions per user).")
+    group.addoption("--perf-report", default=os.environ.get("PERF_REPORT", "test-results/perf-report.json"),
+                    help="Where to write the JSON report.")
+    group.addoption("--perf-runs", type=int, default=int(os.environ.get("PERF_RUNS", "3")),
+                    help="Page loads per case; the median of each metric is reported.")
+
+
+def pytest_generate_tests(metafunc):
+    if "dataset_size" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("--perf-sizes").split(",") if s.strip()]
+        metafunc.parametrize("dataset_size", sizes, ids=[f"n{s}" for s in sizes], scope="module")
+
+
+@pytest.fixture(scope="session")
+def perf_config(request):
+    return {
+        "base_url": request.config.getoption("--perf-base-url").rstrip("/"),
+        "runs": request.config.getoption("--perf-runs"),
+    }
+
+
+@pytest.fixture(scope="session")
+def budgets():
+    with open(BUDGETS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def perf_report(request):
+    results = []
+    yield results
+
+    report_path = Path(request.config.getoption("--perf-report"))
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "base_url": request.config.getoption("--perf-base-url"),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+
+
+@pytest.fixture(scope="module")
+def dataset(dataset_size):
+    return Dataset(dataset_size)
+
+
+@pytest.fixture(scope="session")
+def browser():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as p:
+        browser = p.chromium.launch(args=["--enable-precise-memory-info"])
+        yield browser
+        browser.close()
@@ -0,0 +1,122 @@
+"""Synthetic briefings/transcriptions shaped like the rows returned by the api/ handlers.
+
+The generators are deterministic for a given (size, seed) so two benchmark runs
+against the same build always render exactly the same data.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+USER_UUID = "00000000-0000-4000-8000-000000000001"
+
+FAKE_USER = {
+    "id": 1,
+    "uuid": USER_UUID,
+    "name": "Perf User",
+    "email": "perf@example.com",
+    "gemini_api_key": "fake-key",
+    "gemini_model": "gemini-2.5-flash",
+}
+
+_WORDS = (
+    "produto marca campanha vídeo criador roteiro chamada ação benefício "
+    "hashtag missão desafio legenda público engajamento oferta"
+).split()
+
+_CRITERIA = {1: "Aderência ao briefing", 3: "Mensagem-chave", 4: "Chamada para ação", 7: "Hashtags"}
+_STATUSES = {1: "RUIM", 2: "BOM", 3: "ÓTIMO"}
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _timestamp(base, rng, max_days=365):
+    return (base - timedelta(seconds=rng.randint(0, max_days * 86400))).isoformat()
+
+
+def make_briefings(count, seed=0):
+    rng = random.Random(f"briefings-{count}-{seed}")
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    briefings = []
+    for i in range(count):
+        created = _timestamp(base, rng)
+        briefings.append({
+            "id": i + 1,
+            "uuid": _uuid(rng),
+            "user_id": USER_UUID,
+            "name": f"Briefing {i:05d} {rng.choice(_WORDS)}",
+            "briefing_data": {
+                "revisedText": "<p>" + " ".join(_sentence(rng, 12) for _ in range(8)) + "</p>",
+            },
+            "created_at": created,
+            "updated_at": created,
+        })
+    return briefings
+
+
+def _evaluation(rng):
+    avaliacoes = []
+    for criterion_id, name in _CRITERIA.items():
+        nota = rng.randint(1, 3)
+        avaliacoes.append({
+            "id_criterio": criterion_id,
+            "nome": name,
+            "nota": nota,
+            "status": _STATUSES[nota],
+            "comentario": _sentence(rng, 15),
+            "detalhes_ausentes": "" if nota == 3 else _sentence(rng, 8),
+        })
+    return {
+        "avaliacoes": avaliacoes,
+        "score_final": {
+            "pontuacao_obtida": sum(a["nota"] for a in avaliacoes),
+            "pontuacao_maxima": 3 * len(avaliacoes),
+        },
+        "feedback_consolidado": {"texto": " ".join(_sentence(rng, 14) for _ in range(3))},
+    }
+
+
+def make_transcriptions(count, briefings, seed=0):
+    rng = random.Random(f"transcriptions-{count}-{seed}")
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    briefing_ids = [b["id"] for b in briefings] or [None]
+    transcriptions = []
+    for i in range(count):
+        created = _timestamp(base, rng)
+        evaluation = _evaluation(rng)
+        transcriptions.append({
+            "id": i + 1,
+            "uuid": _uuid(rng),
+            "user_id": USER_UUID,
+            "name": f"AVAL{i:06d}",
+            "video_url": f"https://www.instagram.com/reel/{_uuid(rng)[:11]}/",
+            "briefing_id": rng.choice(briefing_ids),
+            "transcription_data": {
+                "captionText": _sentence(rng, 25),
+                "transcription": " ".join(_sentence(rng, 14) for _ in range(10)),
+                "videoDuration": rng.randint(10, 90),
+                "evaluationResult": evaluation,
+                "userEvaluation": evaluation,
+                "campanha": f"CH{rng.randint(1, 40):03d}",
+                "missao": f"M{rng.randint(1, 400):04d}",
+            },
+            "created_at": created,
+            "updated_at": created,
+        })
+    transcriptions.sort(key=lambda t: t["created_at"], reverse=True)
+    return transcriptions
+
+
+class Dataset:
+    """A user plus `size` briefings and `size` transcriptions."""
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.user = dict(FAKE_USER)
+        self.briefings = make_briefings(size, seed)
+        self.transcriptions = make_transcriptions(size, self.briefings, seed)
@@ -0,0 +1,113 @@
+"""Playwright route handler that serves a Dataset in place of the api/ handlers.
+
+This replaces the `handle_route` function that used to be copied into every
+verify_*.py script. Response bodies are serialised once per dataset so the
+handler itself does not distort the timings being measured.
+"""
+import json
+from collections import Counter
+from urllib.parse import parse_qs, urlparse
+
+LIST_FIELDS = ("id", "name", "briefing_id", "created_at", "updated_at")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SYNC_PAGE_SIZE = 1000
+# The dataset never changes, so every sync after the first one is a 304.
+SYNC_ETAG = 'W/"perf-dataset"'
+SYNCED_AT = "2026-01-01 00:00:00+00"
+
+
+class MockApi:
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.calls = Counter()
+        self.bytes_served = 0
+        self._bodies = {
+            "/api/auth/me": json.dumps(dataset.user),
+            "/api/briefings": json.dumps(dataset.briefings),
+            "/api/user/settings": json.dumps({
+                "gemini_api_key": dataset.user["gemini_api_key"],
+                "gemini_model": dataset.user["gemini_model"],
+            }),
+            "/api/briefing-template": json.dumps({"template_data": {}}),
+            "/api/evaluation-jobs": json.dumps({"jobs": []}),
+        }
+        self._summaries = [_summary(t) for t in dataset.transcriptions]
+        self._details = {str(t["id"]): t for t in dataset.transcriptions}
+
+    @property
+    def api_calls(self):
+        return sum(self.calls.values())
+
+    def _fulfill(self, route, body, status=200):
+        self.bytes_served += len(body)
+        route.fulfill(status=status, content_type="application/json", body=body)
+
+    def handle_route(self, route):
+        path = urlparse(route.request.url).path
+        if not path.startswith("/api/"):
+            route.continue_()
+            return
+
+        self.calls[f"{route.request.method} {path}"] += 1
+        params = parse_qs(urlparse(route.request.url).query)
+        if route.request.method == "GET" and "sync" in params and path in ("/api/briefings", "/api/transcriptions"):
+            rows = self.dataset.briefings if path == "/api/briefings" else self._summaries
+            self._handle_sync(route, rows, params)
+            return
+        if route.request.method == "GET" and path.startswith("/api/transcriptions"):
+            self._handle_transcriptions(route, path, params)
+            return
+        body = self._bodies.get(path)
+        if body is not None and route.request.method == "GET":
+            self._fulfill(route, body)
+        elif route.request.method in ("POST", "PUT", "DELETE"):
+            self._fulfill(route, json.dumps({"ok": True}))
+        else:
+            self._fulfill(route, json.dumps({"message": "Not mocked"}), status=404)
+
+    def _handle_transcriptions(self, route, path, params):
+        """Mirrors the keyset-paginated list and the detail endpoints of api/transcriptions."""
+        if path != "/api/transcriptions":
+            detail = self._details.get(path.rsplit("/", 1)[-1])
+            if detail is None:
+                self._fulfill(route, json.dumps({"message": "Not found"}), status=404)
+            else:
+                self._fulfill(route, json.dumps(detail))
+            return
+
+        if "ids" in params:
+            ids = params["ids"][0].split(",")
+            items = [self._details[i] for i in ids if i in self._details]
+            self._fulfill(route, json.dumps({"items": items, "nextCursor": None}))
+            return
+
+        # The cursor is opaque to the app, so a plain offset is enough here.
+        start = int(params.get("cursor", ["0"])[0] or 0)
+        limit = min(int(params.get("limit", [DEFAULT_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        items = self._summaries[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(self._summaries) else None
+        self._fulfill(route, json.dumps({"items": items, "nextCursor": next_cursor}))
+
+    def _handle_sync(self, route, rows, params):
+        """Mirrors the incremental sync of api/utils/sync.js for an unchanging dataset."""
+        if route.request.headers.get("if-none-match") == SYNC_ETAG:
+            route.fulfill(status=304, headers={"ETag": SYNC_ETAG})
+            return
+        start = int(params.get("cursor", ["0"])[0] or 0)
+        items = rows[start:start + SYNC_PAGE_SIZE]
+        next_cursor = str(start + SYNC_PAGE_SIZE) if start + SYNC_PAGE_SIZE < len(rows) else None
+        body = json.dumps({
+            "items": items, "deleted": [], "nextCursor": next_cursor, "syncedAt": SYNCED_AT, "reset": False,
+        })
+        self.bytes_served += len(body)
+        route.fulfill(status=200, content_type="application/json", headers={"ETag": SYNC_ETAG}, body=body)
+
+    def install(self, page):
+        page.route("**/api/**", self.handle_route)
+
+
+def _summary(transcription):
+    item = {key: transcription[key] for key in LIST_FIELDS}
+    item["score"] = transcription["transcription_data"]["userEvaluation"]["score_final"]["pontuacao_obtida"]
+    return item
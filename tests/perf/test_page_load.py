@@ -0,0 +1,86 @@
+"""Page-load benchmarks for the authenticated pages at increasing data sizes."""
+import statistics
+
+import pytest
+
+from . import metrics
+from .mock_api import MockApi
+
+# path -> text that is only rendered once the page has mounted with its data.
+PAGES = {
+    "/": "Selecione uma opção",
+    "/avaliacoes": "Gestão de Avaliações",
+    "/briefings": "Nenhum briefing selecionado",
+    "/instagram-extractor": "Extração de Vídeos Instagram",
+}
+
+REPORTED_METRICS = (
+    "ttfb_ms",
+    "dom_content_loaded_ms",
+    "load_ms",
+    "first_contentful_paint_ms",
+    "time_to_interactive_ms",
+    "long_task_count",
+    "long_task_total_ms",
+    "js_heap_used_bytes",
+    "js_heap_total_bytes",
+    "dom_nodes",
+    "api_calls",
+    "api_bytes",
+)
+
+
+def _median(samples, key):
+    values = [s[key] for s in samples if s.get(key) is not None]
+    return statistics.median(values) if values else None
+
+
+def _load_once(browser, base_url, path, ready_text, dataset):
+    context = browser.new_context()
+    context.add_cookies([{"name": "auth_token", "value": "perf-token", "url": base_url}])
+    page = context.new_page()
+    page.add_init_script(metrics.INIT_SCRIPT)
+    api = MockApi(dataset)
+    api.install(page)
+    cdp = context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+
+    try:
+        page.goto(base_url + path, wait_until="domcontentloaded", timeout=120_000)
+        page.get_by_text(ready_text).first.wait_for(timeout=120_000)
+        page.wait_for_load_state("networkidle", timeout=120_000)
+        sample = metrics.collect(page, cdp)
+    finally:
+        context.close()
+
+    sample["api_calls"] = api.api_calls
+    sample["api_bytes"] = api.bytes_served
+    sample["api_calls_by_endpoint"] = dict(api.calls)
+    return sample
+
+
+@pytest.mark.parametrize("path", list(PAGES))
+def test_page_load(browser, perf_config, perf_report, budgets, dataset, dataset_size, path):
+    samples = [
+        _load_once(browser, perf_config["base_url"], path, PAGES[path], dataset)
+        for _ in range(perf_config["runs"])
+    ]
+    result = {
+        "page": path,
+        "size": dataset_size,
+        "runs": len(samples),
+        "metrics": {key: _median(samples, key) for key in REPORTED_METRICS},
+        "api_calls_by_endpoint": samples[-1]["api_calls_by_endpoint"],
+    }
+
+    budget = budgets.get(path, budgets["default"]).get(str(dataset_size), {})
+    result["budget"] = budget
+    exceeded = {
+        key: (result["metrics"][key], limit)
+        for key, limit in budget.items()
+        if result["metrics"].get(key) is not None and result["metrics"][key] > limit
+    }
+    result["passed"] = not exceeded
+    perf_report.append(result)
+
+    assert not exceeded, f"{path} @ {dataset_size} rows over budget (value, limit): {exceeded}"